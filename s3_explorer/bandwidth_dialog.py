@@ -0,0 +1,115 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QDoubleSpinBox, QSpinBox,
+    QPushButton, QTableWidget, QTableWidgetItem, QTimeEdit, QDialogButtonBox,
+    QLabel, QAbstractItemView, QHeaderView, QMessageBox
+)
+from PyQt6.QtCore import Qt, QTime
+
+BYTES_PER_MB = 1024 * 1024
+
+# Schedule table columns
+SCOL_START = 0
+SCOL_END = 1
+SCOL_REQUESTS = 2
+SCOL_MBPS = 3
+
+
+class BandwidthDialog(QDialog):
+    """Edits the "rate_limits" dict of a profile (see S3RateLimiter). 0 = unlimited everywhere."""
+
+    def __init__(self, profile_name, rate_limits=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Bandwidth Limits - {profile_name}")
+        self.setMinimumSize(560, 380)
+        rate_limits = rate_limits or {}
+
+        main_layout = QVBoxLayout(self)
+
+        form_layout = QFormLayout()
+        self.requests_spin = self._make_requests_spin(rate_limits.get("requests_per_sec", 0))
+        self.mbps_spin = self._make_mbps_spin(rate_limits.get("bytes_per_sec", 0))
+        form_layout.addRow("Requests per second:", self.requests_spin)
+        form_layout.addRow("Bandwidth (MB/s):", self.mbps_spin)
+        main_layout.addLayout(form_layout)
+
+        main_layout.addWidget(QLabel("Schedule (local time; the first matching window overrides the limits above):"))
+        self.schedule_table = QTableWidget(0, 4)
+        self.schedule_table.setHorizontalHeaderLabels(["Start", "End", "Requests/s", "MB/s"])
+        self.schedule_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.schedule_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.schedule_table.verticalHeader().setVisible(False)
+        main_layout.addWidget(self.schedule_table)
+        for window in rate_limits.get("schedules", []):
+            self.add_schedule_row(window)
+
+        schedule_button_layout = QHBoxLayout()
+        add_button = QPushButton("Add Window")
+        add_button.clicked.connect(lambda: self.add_schedule_row())
+        remove_button = QPushButton("Remove Selected Window")
+        remove_button.clicked.connect(self.remove_selected_schedule_rows)
+        schedule_button_layout.addWidget(add_button)
+        schedule_button_layout.addWidget(remove_button)
+        schedule_button_layout.addStretch(1)
+        main_layout.addLayout(schedule_button_layout)
+
+        main_layout.addWidget(QLabel("Changes apply immediately to running transfers and the WebDAV server."))
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        main_layout.addWidget(self.button_box)
+
+    @staticmethod
+    def _make_requests_spin(value):
+        spin = QSpinBox()
+        spin.setRange(0, 100000)
+        spin.setSpecialValueText("Unlimited")
+        spin.setValue(int(value or 0))
+        return spin
+
+    @staticmethod
+    def _make_mbps_spin(bytes_per_sec):
+        spin = QDoubleSpinBox()
+        spin.setRange(0, 100000)
+        spin.setDecimals(2)
+        spin.setSpecialValueText("Unlimited")
+        spin.setValue((bytes_per_sec or 0) / BYTES_PER_MB)
+        return spin
+
+    def add_schedule_row(self, window=None):
+        window = window or {"start": "09:00", "end": "18:00"}
+        row = self.schedule_table.rowCount()
+        self.schedule_table.insertRow(row)
+        for column, key in ((SCOL_START, "start"), (SCOL_END, "end")):
+            time_edit = QTimeEdit(QTime.fromString(window.get(key, "00:00"), "HH:mm"))
+            time_edit.setDisplayFormat("HH:mm")
+            self.schedule_table.setCellWidget(row, column, time_edit)
+        self.schedule_table.setCellWidget(row, SCOL_REQUESTS, self._make_requests_spin(window.get("requests_per_sec", 0)))
+        self.schedule_table.setCellWidget(row, SCOL_MBPS, self._make_mbps_spin(window.get("bytes_per_sec", 0)))
+
+    def remove_selected_schedule_rows(self):
+        rows = sorted({index.row() for index in self.schedule_table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.schedule_table.removeRow(row)
+
+    def accept(self):
+        for row in range(self.schedule_table.rowCount()):
+            if self.schedule_table.cellWidget(row, SCOL_START).time() == self.schedule_table.cellWidget(row, SCOL_END).time():
+                QMessageBox.warning(self, "Invalid Schedule", f"Window {row + 1} starts and ends at the same time.")
+                return
+        super().accept()
+
+    def get_rate_limits(self):
+        schedules = []
+        for row in range(self.schedule_table.rowCount()):
+            schedules.append({
+                "start": self.schedule_table.cellWidget(row, SCOL_START).time().toString("HH:mm"),
+                "end": self.schedule_table.cellWidget(row, SCOL_END).time().toString("HH:mm"),
+                "requests_per_sec": self.schedule_table.cellWidget(row, SCOL_REQUESTS).value(),
+                "bytes_per_sec": int(self.schedule_table.cellWidget(row, SCOL_MBPS).value() * BYTES_PER_MB),
+            })
+        return {
+            "requests_per_sec": self.requests_spin.value(),
+            "bytes_per_sec": int(self.mbps_spin.value() * BYTES_PER_MB),
+            "schedules": schedules,
+        }
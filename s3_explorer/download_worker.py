@@ -8,12 +8,13 @@ class DownloadFolderWorker(QThread):
     error = pyqtSignal(str)
     canceled = pyqtSignal()
 
-    def __init__(self, s3_client, bucket, s3_key, local_folder):
+    def __init__(self, s3_client, bucket, s3_key, local_folder, rate_limiter=None):
         super().__init__()
         self.s3_client = s3_client
         self.bucket = bucket
         self.s3_key = s3_key
         self.local_folder = local_folder
+        self.rate_limiter = rate_limiter # S3RateLimiter; throttles bandwidth through the download callback
         self._cancel = False
 
     def cancel(self):
@@ -48,7 +49,11 @@ class DownloadFolderWorker(QThread):
                 rel_path = key[len(self.s3_key):].lstrip('/')
                 local_path = os.path.join(self.local_folder, rel_path)
                 os.makedirs(os.path.dirname(local_path), exist_ok=True)
-                self.s3_client.download_file(self.bucket, key, local_path)
+                if self.rate_limiter:
+                    self.s3_client.download_file(self.bucket, key, local_path,
+                                                 Callback=self.rate_limiter.wrap_callback(is_cancelled=lambda: self._cancel))
+                else:
+                    self.s3_client.download_file(self.bucket, key, local_path)
 
                 self.progress_updated.emit(i + 1, total, key)
 
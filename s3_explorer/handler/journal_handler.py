@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from PyQt6.QtCore import QObject, QTimer
+
+from s3ops.S3Operation import S3Operation, S3OpType
+
+
+class OperationJournal(QObject):
+    """Crash-safe SQLite journal of batch operations so unfinished batches can be resumed after a restart."""
+
+    FLUSH_INTERVAL_MS = 250 # Completion marks are buffered and written in one transaction
+
+    # Batch states
+    BATCH_ACTIVE = "active"
+    BATCH_DONE = "done"
+    BATCH_CANCELLED = "cancelled"
+    BATCH_ABANDONED = "abandoned" # User declined to resume
+
+    # Operation states
+    OP_PENDING = "pending"
+    OP_DONE = "done"
+    OP_FAILED = "failed"
+    OP_CANCELLED = "cancelled"
+
+    def __init__(self, app_data_dir, parent=None):
+        super().__init__(parent)
+        self.app_data_dir = app_data_dir
+        self.journal_file = os.path.join(self.app_data_dir, "operation_journal.sqlite3")
+        self._conn = None
+        self._lock = threading.Lock() # Connection is shared (check_same_thread=False), serialise access
+        self._pending_op_updates = [] # (status, error, updated_at, op_id)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def _ensure_app_data_dir_exists(self):
+        if not os.path.exists(self.app_data_dir):
+            try:
+                os.makedirs(self.app_data_dir, exist_ok=True)
+            except OSError as e:
+                print(f"Error creating application data directory {self.app_data_dir}: {e}")
+                return False
+        return True
+
+    def open(self):
+        if self._conn: return True
+        if not self._ensure_app_data_dir_exists(): return False
+        try:
+            self._conn = sqlite3.connect(self.journal_file, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL") # WAL + NORMAL survives app crashes; only power loss can drop the last commit
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS batches (
+                    batch_id TEXT PRIMARY KEY,
+                    profile_name TEXT,
+                    op_type_display TEXT,
+                    total INTEGER,
+                    status TEXT,
+                    extra_json TEXT,
+                    created_at REAL,
+                    updated_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS operations (
+                    op_id TEXT PRIMARY KEY,
+                    batch_id TEXT,
+                    op_type TEXT,
+                    bucket TEXT,
+                    key TEXT,
+                    new_key TEXT,
+                    local_path TEXT,
+                    is_part_of_move INTEGER,
+                    original_source_key_for_move TEXT,
+                    callback_json TEXT,
+                    status TEXT,
+                    error TEXT,
+                    updated_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_operations_batch_status ON operations (batch_id, status);
+            """)
+            self._conn.commit()
+            self.flush_timer.start()
+            print(f"JOURNAL: Opened {self.journal_file}")
+            return True
+        except sqlite3.Error as e:
+            print(f"JOURNAL: Could not open journal {self.journal_file}: {e}")
+            self._conn = None
+            return False
+
+    def close(self):
+        self.flush_timer.stop()
+        self.flush()
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def _json_safe(data: dict):
+        # callback_data / extra batch data can hold widget refs and tokens; only persist plain values
+        safe = {}
+        for k, v in (data or {}).items():
+            try:
+                json.dumps(v)
+                safe[k] = v
+            except (TypeError, ValueError):
+                continue
+        return safe
+
+    def _operation_rows(self, batch_id, operations, now):
+        return [(
+            str(op.id), batch_id, op.op_type.value, op.bucket, op.key, op.new_key, op.local_path,
+            1 if op.is_part_of_move else 0, op.original_source_key_for_move,
+            json.dumps(self._json_safe(op.callback_data)), self.OP_PENDING, None, now
+        ) for op in operations]
+
+    def _insert_operation_rows(self, op_rows):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO operations (op_id, batch_id, op_type, bucket, key, new_key, local_path, "
+            "is_part_of_move, original_source_key_for_move, callback_json, status, error, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", op_rows)
+
+    # --- Writes (called by OperationManager) ---
+    def record_batch_started(self, batch_id, profile_name, op_type_display, total_items, extra_batch_data, operations):
+        if not self._conn: return
+        now = time.time()
+        op_rows = self._operation_rows(batch_id, operations, now)
+        try:
+            with self._lock:
+                # Resumed batches keep their original row (and total), they only become active again
+                self._conn.execute(
+                    "INSERT INTO batches (batch_id, profile_name, op_type_display, total, status, extra_json, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(batch_id) DO UPDATE SET status=excluded.status, updated_at=excluded.updated_at",
+                    (batch_id, profile_name, op_type_display, total_items, self.BATCH_ACTIVE,
+                     json.dumps(self._json_safe(extra_batch_data)), now, now))
+                self._insert_operation_rows(op_rows)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"JOURNAL: Error recording batch '{batch_id}': {e}")
+
+    def record_operations_added(self, batch_id, operations, new_total):
+        """Streaming batches (S3BatchPlanner) journal each listing page before it is queued."""
+        if not self._conn: return
+        op_rows = self._operation_rows(batch_id, operations, time.time())
+        try:
+            with self._lock:
+                self._conn.execute("UPDATE batches SET total=?, updated_at=? WHERE batch_id=?", (new_total, time.time(), batch_id))
+                self._insert_operation_rows(op_rows)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"JOURNAL: Error adding {len(op_rows)} operation(s) to batch '{batch_id}': {e}")
+
+    def record_planning_finished(self, batch_id, extra_batch_data):
+        """Rewrites the batch's extra data once its listing completed (drops the 'planning_incomplete' marker)."""
+        if not self._conn: return
+        try:
+            with self._lock:
+                self._conn.execute("UPDATE batches SET extra_json=?, updated_at=? WHERE batch_id=?",
+                                   (json.dumps(self._json_safe(extra_batch_data)), time.time(), batch_id))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"JOURNAL: Error marking planning finished for batch '{batch_id}': {e}")
+
+    def record_operation_checkpoint(self, operation: S3Operation):
+        """Persists the operation's callback_data mid-run (MOVE_PREFIX progress), so a resume continues the counts."""
+        if not self._conn: return
+        try:
+            with self._lock:
+                self._conn.execute("UPDATE operations SET callback_json=?, updated_at=? WHERE op_id=?",
+                                   (json.dumps(self._json_safe(operation.callback_data)), time.time(), str(operation.id)))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"JOURNAL: Error checkpointing operation {operation.id}: {e}")
+
+    def record_operation_finished(self, operation: S3Operation, status, error_message=None):
+        if not self._conn: return
+        with self._lock:
+            self._pending_op_updates.append((status, error_message or None, time.time(), str(operation.id)))
+
+    def record_batch_finished(self, batch_id, status):
+        if not self._conn: return
+        self.flush() # Op marks first, so a finished batch never has stale pending rows
+        try:
+            with self._lock:
+                self._conn.execute("UPDATE batches SET status=?, updated_at=? WHERE batch_id=?", (status, time.time(), batch_id))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"JOURNAL: Error finishing batch '{batch_id}': {e}")
+
+    def flush(self):
+        with self._lock:
+            if not self._conn or not self._pending_op_updates: return
+            updates, self._pending_op_updates = self._pending_op_updates, []
+            try:
+                self._conn.executemany("UPDATE operations SET status=?, error=?, updated_at=? WHERE op_id=?", updates)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"JOURNAL: Error flushing {len(updates)} operation update(s): {e}")
+
+    def purge_finished_batches(self, older_than_seconds=7 * 24 * 3600):
+        # Keeps the journal small; finished batches are only useful for a while (debugging)
+        if not self._conn: return
+        cutoff = time.time() - older_than_seconds
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM operations WHERE batch_id IN (SELECT batch_id FROM batches WHERE status != ? AND updated_at < ?)",
+                                   (self.BATCH_ACTIVE, cutoff))
+                self._conn.execute("DELETE FROM batches WHERE status != ? AND updated_at < ?", (self.BATCH_ACTIVE, cutoff))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"JOURNAL: Error purging old batches: {e}")
+
+    # --- Reads (startup resume) ---
+    def get_unfinished_batches(self, profile_name):
+        """Returns [{'batch_id', 'op_type_display', 'total', 'remaining', 'extra'}] for batches left active by a crash."""
+        if not self._conn: return []
+        self.flush()
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT b.batch_id, b.op_type_display, b.total, b.extra_json, "
+                    "(SELECT COUNT(*) FROM operations o WHERE o.batch_id = b.batch_id AND o.status = ?) "
+                    "FROM batches b WHERE b.status = ? AND b.profile_name = ? ORDER BY b.created_at",
+                    (self.OP_PENDING, self.BATCH_ACTIVE, profile_name)).fetchall()
+        except sqlite3.Error as e:
+            print(f"JOURNAL: Error reading unfinished batches: {e}")
+            return []
+        return [{'batch_id': r[0], 'op_type_display': r[1], 'total': r[2], 'extra': json.loads(r[3] or "{}"), 'remaining': r[4]}
+                for r in rows]
+
+    def load_pending_operations(self, batch_id):
+        """Rebuilds the S3Operations of a batch that had not completed (same ids, so marks keep updating the same rows)."""
+        if not self._conn: return []
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT op_id, op_type, bucket, key, new_key, local_path, is_part_of_move, original_source_key_for_move, callback_json "
+                    "FROM operations WHERE batch_id = ? AND status = ?", (batch_id, self.OP_PENDING)).fetchall()
+        except sqlite3.Error as e:
+            print(f"JOURNAL: Error loading operations for batch '{batch_id}': {e}")
+            return []
+        operations = []
+        for op_id, op_type, bucket, key, new_key, local_path, is_move, orig_key, callback_json in rows:
+            try:
+                op = S3Operation(S3OpType(op_type), bucket, key=key, new_key=new_key, local_path=local_path,
+                                 is_part_of_move=bool(is_move), original_source_key_for_move=orig_key,
+                                 callback_data=json.loads(callback_json or "{}"))
+                op.id = uuid.UUID(op_id)
+                operations.append(op)
+            except (ValueError, TypeError) as e:
+                print(f"JOURNAL: Skipping unreadable journal entry {op_id}: {e}")
+        return operations
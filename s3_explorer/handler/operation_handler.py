@@ -1,20 +1,41 @@
 import os
-import queue
+import sys
 import time
 from datetime import datetime
+from collections import deque
 import platform
 import subprocess
 import tempfile
 
 from PyQt6.QtCore import QObject, pyqtSignal, QTimer, Qt
-from PyQt6.QtWidgets import QProgressDialog, QMessageBox, QApplication # For processEvents
+from PyQt6.QtWidgets import QProgressDialog, QMessageBox, QApplication
 
-from s3ops.S3Operation import S3Operation, S3OpType
+from s3ops.S3Operation import S3Operation, S3OpType, CancellationToken, CANCELLED_ERROR_MESSAGE
 from s3ops.S3OperationWorker import S3OperationWorker
+from s3ops.S3OperationScheduler import S3OperationScheduler
+from s3ops.S3ConcurrencyController import S3ConcurrencyController
+from s3ops.S3DeleteAggregator import S3DeleteAggregator
+from s3ops.S3ProgressTracker import S3ProgressTracker
+from s3ops.S3RetryPolicy import S3RetryPolicy
+from s3ops.S3RateLimiter import get_rate_limiter
+from s3ops.S3BatchPlanner import S3BatchPlanner
+from s3ops.S3Metrics import get_metrics_collector
+from s3ops.S3ListingCache import S3ListingCache
+from s3ops.S3FolderSummaries import S3FolderSummaryCache
+from s3ops.S3ListingPrefetcher import S3ListingPrefetcher
+from s3ops.S3ChangeSet import S3ChangeSet
+from s3ops.S3TabContentWidget import format_size
 # from temp_file_handler import TempFileManager # For type hinting if needed later
 
 class OperationManager(QObject):
-    MAX_WORKER_THREADS = 4
+    INITIAL_WORKER_THREADS = 4
+    DEFAULT_MIN_WORKER_THREADS = 2   # Per-profile override: profile["min_workers"]
+    DEFAULT_MAX_WORKER_THREADS = 32  # Per-profile override: profile["max_workers"]
+    WORKER_POOL_EVALUATION_MS = 2000
+    INTERACTIVE_RESERVED_WORKERS = 1 # Extra workers that only take interactive lane ops (LIST, HEAD, open file)
+    PROGRESS_SAMPLE_MS = 100 # Progress dialogs are refreshed from shared counters at ~10 Hz
+    PROGRESS_DIALOG_STEPS = 1000 # Byte progress is scaled to this range (QProgressDialog values are 32-bit ints)
+    MAX_RUNNING_FOLDER_SUMMARIES = 2 # Recursive listings in flight at once; the rest wait in _waiting_folder_summaries
 
     # Signals for external components (e.g., S3Explorer, S3TabContentWidget)
     list_op_completed = pyqtSignal(object, object, str) # S3Operation, result_dict, error_message
@@ -24,28 +45,59 @@ class OperationManager(QObject):
     delete_op_completed = pyqtSignal(object, object, str)           # S3Operation, result_dict, error_message
     create_folder_op_completed = pyqtSignal(object, object, str)    # S3Operation, result_dict, error_message
     copy_object_op_completed = pyqtSignal(object, object, str)      # S3Operation, result_dict, error_message
+    head_object_op_completed = pyqtSignal(object, object, str)      # S3Operation, result_dict, error_message
+    move_prefix_op_completed = pyqtSignal(object, object, str)      # S3Operation, result_dict, error_message
     
     batch_processing_update = pyqtSignal(str, int, int) # message, completed, total
     batch_processing_finished = pyqtSignal(str) # batch_id
+    batch_planning_error = pyqtSignal(str, str) # batch_id, error_message (listing the batch's source failed part way)
     
     request_status_bar_message = pyqtSignal(str, int) # For worker to request status bar update
+    concurrency_changed = pyqtSignal(int, float, float) # worker count (bulk capable), ops/sec, bytes/sec
+    operation_enqueued = pyqtSignal(object) # S3Operation; feeds the Transfers panel model (which batches its own updates)
+    change_set_ready = pyqtSignal(object) # S3ChangeSet of a finished single mutation (batches: batch data 'change_set' on completion)
 
-    # Signals for S3OperationWorker to update progress dialogs (internal routing)
-    _request_download_progress_update = pyqtSignal(str, int, int, bool) # label, current, total, show/hide
-    _request_upload_progress_update = pyqtSignal(str, int, int, bool)   # label, current, total, show/hide
-    _request_batch_progress_update = pyqtSignal(str, int, int, bool)    # label, current, total, show/hide
 
-
-    def __init__(self, parent_widget, temp_file_manager_ref): # parent_widget for dialogs
+    def __init__(self, parent_widget, temp_file_manager_ref, journal_ref=None, profile_client_provider=None, search_index_ref=None): # parent_widget for dialogs
         super().__init__(parent_widget) 
         self.s3_client = None 
+        self.active_profile_name = None # Recorded with journaled batches so resume uses the right profile
         self.temp_file_manager = temp_file_manager_ref 
+        self.journal = journal_ref # OperationJournal (optional)
+        self.search_index = search_index_ref # SearchIndex (optional), follows finished mutations
+        self.profile_client_provider = profile_client_provider # ProfileManager.get_client_for_profile (cross-profile copies)
 
-        self.s3_operation_queue = queue.Queue()
+        self.s3_operation_queue = S3OperationScheduler() # queue.Queue compatible, with interactive/bulk lanes
         self.s3_workers = []
+        self._retiring_s3_workers = [] # Stopped by pool shrink, kept referenced until their thread exits
+        self.delete_aggregator = None # S3DeleteAggregator, one per worker generation (flushes with the client it started with)
+        self._worker_name_counter = 0
         self.active_batch_operations = {} 
+        self.batch_planners = {} # batch_id -> S3BatchPlanner still listing (or just finished) for a streaming batch
         self.current_batch_id_for_dialog = None 
         self.completed_operation_ids = set()
+        self.paused_operations = {} # operation.id -> S3Operation taken out of the queue by "Pause" in the Transfers panel
+        self.last_progress_snapshot = {"transfers": [], "batches": {}} # Latest S3ProgressTracker.sample(), for the Transfers panel
+        self.listing_cache = S3ListingCache() # Shared by all tabs; filled by LIST results, invalidated by mutations below
+        self.folder_summary_cache = S3FolderSummaryCache() # Recursive folder totals (SUMMARIZE_PREFIX), invalidated the same way
+        self.folder_summaries_enabled = True # View > Folder Sizes; the properties dialog asks regardless
+        self._folder_summary_ops = {} # (profile, bucket, prefix) -> SUMMARIZE_PREFIX op, waiting or running
+        self._waiting_folder_summaries = deque() # Ops not handed to the queue yet (at most MAX_RUNNING_FOLDER_SUMMARIES are)
+        self._running_folder_summaries = 0
+        self.listing_prefetcher = S3ListingPrefetcher(self) # Low priority one-page LISTs of folders likely to be opened next
+
+        # Adaptive (AIMD) worker pool sizing
+        self.concurrency_controller = S3ConcurrencyController(
+            min_workers=self.DEFAULT_MIN_WORKER_THREADS,
+            max_workers=self.DEFAULT_MAX_WORKER_THREADS,
+            initial_workers=self.INITIAL_WORKER_THREADS
+        )
+        self.worker_pool_timer = QTimer(self)
+        self.worker_pool_timer.timeout.connect(self._evaluate_worker_pool)
+
+        # Operation level retries (per op type caps, per batch budget); shared by all workers
+        self.retry_policy = S3RetryPolicy()
+        self.rate_limiter = None # S3RateLimiter of the active profile (set_s3_client)
 
         # Progress Dialogs
         self.download_progress_dialog = QProgressDialog("Downloading...", "Cancel", 0, 100, parent_widget)
@@ -60,23 +112,26 @@ class OperationManager(QObject):
         self._setup_progress_dialog(self.batch_progress_dialog)
         QTimer.singleShot(12000, self.batch_progress_dialog.hide)
 
-        # Connect internal signals for dialog updates
-        self._request_download_progress_update.connect(
-            lambda lbl, cur, tot, show: self._update_progress_dialog_slot(self.download_progress_dialog, lbl, cur, tot, show)
+        # Workers only write byte counters into the tracker; this timer is the single place dialogs get refreshed
+        self.progress_tracker = S3ProgressTracker()
+        self._last_sampled_batch_progress = {} # batch_id -> completed count last pushed to batch_processing_update
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(self.PROGRESS_SAMPLE_MS)
+        self.progress_timer.timeout.connect(self._sample_progress)
+        self.progress_timer.start()
+
+        # Cancel buttons: drop queued work and abort in-flight transfers between chunks
+        self.download_progress_dialog.canceled.connect(
+            lambda: self.cancel_operations_of_types((S3OpType.DOWNLOAD_TO_TEMP, S3OpType.DOWNLOAD_FILE))
         )
-        self._request_upload_progress_update.connect(
-            lambda lbl, cur, tot, show: self._update_progress_dialog_slot(self.upload_progress_dialog, lbl, cur, tot, show)
-        )
-        self._request_batch_progress_update.connect(
-            lambda lbl, cur, tot, show: self._update_progress_dialog_slot(self.batch_progress_dialog, lbl, cur, tot, show)
+        self.upload_progress_dialog.canceled.connect(
+            lambda: self.cancel_operations_of_types((S3OpType.UPLOAD_FILE,))
         )
+        self.batch_progress_dialog.canceled.connect(self._on_batch_progress_dialog_canceled)
         
         # This dictionary is passed to S3OperationWorker
         self.worker_signals_passthrough = {
             "request_status_bar_message": self.request_status_bar_message,
-            "request_download_progress_dialog_update": self._request_download_progress_update,
-            "request_upload_progress_dialog_update": self._request_upload_progress_update,
-            "request_batch_progress_dialog_update": self._request_batch_progress_update, # For worker to update batch dialog if needed
         }
 
 
@@ -85,7 +140,7 @@ class OperationManager(QObject):
         dialog.setAutoClose(True)
         dialog.setAutoReset(True)
         dialog.hide()
-        # dialog.canceled.connect(self.handle_progress_dialog_cancel) # Optional: Implement cancellation logic
+        # canceled is connected per dialog in __init__ (cancel_operations_of_types / cancel_batch)
 
     def _update_progress_dialog_slot(self, dialog: QProgressDialog, label: str, current_value: int, total_value: int, show_dialog: bool):
         if not dialog: return
@@ -103,17 +158,88 @@ class OperationManager(QObject):
             else:
                 dialog.setRange(0, total_value)
                 dialog.setValue(current_value)
-            QApplication.processEvents() # Keep UI responsive
         else: 
             if dialog.isVisible():
                 dialog.reset() 
 
-    def set_s3_client(self, s3_client):
+    @staticmethod
+    def format_rate_and_eta(bytes_per_sec, eta_seconds):
+        parts = []
+        if bytes_per_sec: parts.append(f"{format_size(int(bytes_per_sec))}/s")
+        if eta_seconds is not None:
+            minutes, seconds = divmod(int(eta_seconds), 60)
+            hours, minutes = divmod(minutes, 60)
+            parts.append(f"ETA {hours}:{minutes:02d}:{seconds:02d}" if hours else f"ETA {minutes}:{seconds:02d}")
+        return ", ".join(parts)
+
+    def _sample_progress(self):
+        snapshot = self.progress_tracker.sample()
+        self.last_progress_snapshot = snapshot
+
+        # Download / upload dialogs: every running transfer of that kind is folded into one bar
+        for kind, dialog, verb in (("download", self.download_progress_dialog, "Downloading"),
+                                   ("upload", self.upload_progress_dialog, "Uploading")):
+            transfers = [t for t in snapshot["transfers"] if t["kind"] == kind]
+            if not transfers:
+                if dialog.isVisible():
+                    self._update_progress_dialog_slot(dialog, "", 0, 0, False)
+                continue
+            bytes_done = sum(t["bytes_done"] for t in transfers)
+            total_bytes = sum(t["total_bytes"] for t in transfers)
+            rate = sum(t["rate"] or 0 for t in transfers)
+            if len(transfers) == 1:
+                op = transfers[0]["operation"]
+                label = f"{verb} {os.path.basename((op.key or op.new_key or 'item').rstrip('/'))}"
+            else:
+                label = f"{verb} {len(transfers)} files"
+            if total_bytes > 0:
+                label += f" ({bytes_done / total_bytes * 100:.0f}%)"
+                eta = self.progress_tracker.eta_seconds(total_bytes - bytes_done, rate)
+                steps = self.PROGRESS_DIALOG_STEPS
+                current, total = min(steps, int(bytes_done / total_bytes * steps)), steps
+            else:
+                label += "..."
+                eta = None
+                current, total = 0, 0 # Indeterminate
+            rate_text = self.format_rate_and_eta(rate, eta)
+            if rate_text: label += f"\n{rate_text}"
+            self._update_progress_dialog_slot(dialog, label, current, total, True)
+
+        # Batches: one throttled update per batch instead of one per finished item
+        for batch_id, batch in snapshot["batches"].items():
+            batch_info = self.active_batch_operations.get(batch_id)
+            if not batch_info: continue
+            completed, total = batch["completed"], batch["total"]
+            planning = batch_info.get('planning', False) # Total still growing: no ETA, and keep the bar short of 100%
+            label = f"{batch_info.get('op_type_display', 'Processing')}: "
+            if batch["item_name"]: label += f"{batch['item_name']} "
+            label += f"({completed:,}/\u2265{total:,}, listing...)" if planning else f"({completed}/{total})"
+            details = []
+            if batch["items_rate"]: details.append(f"{batch['items_rate']:.1f} items/s")
+            rate_text = self.format_rate_and_eta(batch["bytes_rate"], None if planning else batch["eta"])
+            if rate_text: details.append(rate_text)
+            if details: label += "\n" + ", ".join(details)
+            if batch_id == self.current_batch_id_for_dialog:
+                self._update_progress_dialog_slot(self.batch_progress_dialog, label, completed, total + 1 if planning else total, True)
+            if self._last_sampled_batch_progress.get(batch_id) != completed:
+                self._last_sampled_batch_progress[batch_id] = completed
+                self.batch_processing_update.emit(label, completed, total)
+
+    def set_s3_client(self, s3_client, profile_name=None):
         print(f"OPERATION_MANAGER: S3 client {'set' if s3_client else 'cleared'}.")
         old_s3_client = self.s3_client
         self.s3_client = s3_client
+        self.active_profile_name = profile_name if s3_client else None
+        # Same limiter ProfileManager attached to the client (requests/sec); workers spend its bytes/sec tokens
+        self.rate_limiter = get_rate_limiter(profile_name) if s3_client and profile_name else None
+        for worker in self.s3_workers:
+            worker.rate_limiter = self.rate_limiter
         
         if old_s3_client is not s3_client: # Only re-init workers if client actually changed or was set/cleared
+            # Summaries of the previous client are not waited for (running ones may never report back)
+            self._folder_summary_ops, self._waiting_folder_summaries = {}, deque()
+            self._running_folder_summaries = 0
+            self.listing_prefetcher.reset()
             if self.s3_workers: # If workers exist from a previous client
                 self.stop_all_s3_workers(join_threads=False) 
             
@@ -131,41 +257,123 @@ class OperationManager(QObject):
             self.stop_all_s3_workers(join_threads=False) 
 
         self.s3_workers = []
-        print(f"OPERATION_MANAGER: Initializing {self.MAX_WORKER_THREADS} S3 workers.")
-        for i in range(self.MAX_WORKER_THREADS):
-            worker = S3OperationWorker(self.s3_operation_queue, main_app_signals=self.worker_signals_passthrough)
-            worker.setObjectName(f"S3Worker_{i}")
-            worker.set_s3_client(self.s3_client) 
-            worker.operation_finished.connect(self.on_worker_s3_operation_finished)
-            self.s3_workers.append(worker)
-            worker.start()
+        self.s3_operation_queue.discard_sentinels()
+        self.delete_aggregator = S3DeleteAggregator(self.s3_operation_queue)
+        self.delete_aggregator.retry_policy = self.retry_policy
+        self.delete_aggregator.concurrency_controller = self.concurrency_controller
+        self.delete_aggregator.setObjectName("S3DeleteAggregator")
+        self.delete_aggregator.set_s3_client(self.s3_client)
+        self.delete_aggregator.operation_finished.connect(self.on_worker_s3_operation_finished)
+        self.delete_aggregator.start()
+        initial_count = self.concurrency_controller.target_workers
+        print(f"OPERATION_MANAGER: Initializing {initial_count} S3 workers (+{self.INTERACTIVE_RESERVED_WORKERS} interactive).")
+        for _ in range(initial_count):
+            self._start_s3_worker()
+        for i in range(self.INTERACTIVE_RESERVED_WORKERS):
+            self._start_s3_worker(f"S3InteractiveWorker_{i}", lanes=(S3OperationScheduler.LANE_INTERACTIVE,))
         print(f"OPERATION_MANAGER: S3 workers started. Count: {len(self.s3_workers)}")
+        self.worker_pool_timer.start(self.WORKER_POOL_EVALUATION_MS)
+        self._emit_concurrency_changed()
+
+    def _start_s3_worker(self, name=None, lanes=None):
+        if name is None:
+            name = f"S3Worker_{self._worker_name_counter}"
+            self._worker_name_counter += 1
+        worker = S3OperationWorker(self.s3_operation_queue, main_app_signals=self.worker_signals_passthrough, lanes=lanes)
+        worker.setObjectName(name)
+        worker.set_s3_client(self.s3_client) 
+        worker.delete_aggregator = self.delete_aggregator
+        worker.progress_tracker = self.progress_tracker
+        worker.retry_policy = self.retry_policy
+        worker.concurrency_controller = self.concurrency_controller
+        worker.rate_limiter = self.rate_limiter
+        worker.journal = self.journal
+        worker.profile_client_provider = self.profile_client_provider
+        worker.operation_finished.connect(self.on_worker_s3_operation_finished)
+        worker.list_page_ready.connect(self.on_worker_list_page_ready)
+        self.s3_workers.append(worker)
+        worker.start()
+        return worker
+
+    def _get_pool_workers(self):
+        # Workers that take bulk work (i.e. not the reserved interactive ones); these are what AIMD resizes
+        return [w for w in self.s3_workers if w.lanes is None]
+
+    def set_worker_pool_bounds(self, min_workers=None, max_workers=None):
+        """Per-profile bounds for the adaptive worker pool (None -> defaults)."""
+        self.concurrency_controller.set_bounds(min_workers or self.DEFAULT_MIN_WORKER_THREADS,
+                                               max_workers or self.DEFAULT_MAX_WORKER_THREADS)
+        print(f"OPERATION_MANAGER: Worker pool bounds set to {self.concurrency_controller.min_workers}-{self.concurrency_controller.max_workers}.")
+        if self.s3_workers:
+            self._resize_worker_pool(self.concurrency_controller.target_workers)
+
+    def set_max_retries(self, max_retries=None):
+        """Per-profile cap on automatic retries per operation (None -> per op type defaults)."""
+        self.retry_policy.set_max_retries(max_retries)
+        print(f"OPERATION_MANAGER: Max retries per operation set to {'op type defaults' if max_retries is None else max_retries}.")
+
+    def _resize_worker_pool(self, target_count):
+        pool_workers = self._get_pool_workers()
+        if target_count > len(pool_workers):
+            for _ in range(target_count - len(pool_workers)):
+                self._start_s3_worker()
+        elif target_count < len(pool_workers):
+            # Retire the newest workers; each exits after finishing its current operation
+            for worker in pool_workers[target_count:]:
+                worker.stop()
+                self.s3_workers.remove(worker)
+                self._retiring_s3_workers.append(worker)
+        if target_count != len(pool_workers):
+            print(f"OPERATION_MANAGER: Worker pool resized {len(pool_workers)} -> {target_count}.")
+            self._emit_concurrency_changed()
+
+    def _evaluate_worker_pool(self):
+        self._retiring_s3_workers = [w for w in self._retiring_s3_workers if w.isRunning()]
+        if not self.s3_client or not self.s3_workers:
+            return
+        pending_count = self.s3_operation_queue.qsize()
+        target_count, throttled_count = self.concurrency_controller.evaluate(pending_count)
+        if throttled_count:
+            print(f"OPERATION_MANAGER: {throttled_count} throttled/timed out ops in last window, backing off to {target_count} workers.")
+        self._resize_worker_pool(target_count)
+        self._emit_concurrency_changed()
+
+    def _emit_concurrency_changed(self):
+        self.concurrency_changed.emit(len(self._get_pool_workers()),
+                                      self.concurrency_controller.ops_per_sec,
+                                      self.concurrency_controller.bytes_per_sec)
 
     def stop_all_s3_workers(self, join_threads=True):
         print("OPERATION_MANAGER: Stopping S3 workers...")
+        self.worker_pool_timer.stop()
         for worker in self.s3_workers:
             worker.stop()
         
-        # Send sentinels
-        for _ in range(len(self.s3_workers) + self.MAX_WORKER_THREADS): # Ample sentinels
-             if self.s3_operation_queue: 
-                try: self.s3_operation_queue.put_nowait(None)
-                except queue.Full: break # Queue might be full if workers already exited
+        # Send one sentinel per worker (sentinels are served before any lane, so reserved workers get theirs too)
+        for _ in range(len(self.s3_workers)):
+            self.s3_operation_queue.put_nowait(None)
+
+        if self.delete_aggregator is not None:
+            # Flushes whatever is buffered, then exits; kept referenced until its thread is done
+            self.delete_aggregator.stop()
+            self._retiring_s3_workers.append(self.delete_aggregator)
+            self.delete_aggregator = None
 
         if join_threads:
-            for worker in self.s3_workers:
+            self.stop_batch_planners()
+            for worker in self.s3_workers + self._retiring_s3_workers:
                 if worker.isRunning():
                     if not worker.wait(1500): # Increased timeout slightly
                         print(f"Warning: S3 worker {worker.objectName()} did not terminate gracefully.")
         
         self.s3_workers.clear()
+        self._emit_concurrency_changed()
         print("OPERATION_MANAGER: S3 workers stopped/cleared.")
 
     def enqueue_s3_operation(self, operation: S3Operation):
-        import inspect
-        curframe = inspect.currentframe()
-        calframe = inspect.getouterframes(curframe, 2)
-        caller_name = calframe[1][3] if len(calframe) > 1 else "UnknownCaller"
+        # sys._getframe instead of inspect.getouterframes: the latter reads source files and made 100k-item batches take minutes
+        caller_frame = sys._getframe(1)
+        caller_name = caller_frame.f_code.co_name if caller_frame else "UnknownCaller"
         print(f"OP_MGR ENQUEUE (from {caller_name}): OpID={operation.id}, OpType={operation.op_type.name}, Bucket='{operation.bucket}', Key='{operation.key}'")
         
         if not self.s3_client:
@@ -187,6 +395,10 @@ class OperationManager(QObject):
                 # Emit error signals as above if needed
                 return
 
+        operation.enqueued_at = time.monotonic()
+        # Cache / index key: the active profile may change before the operation finishes
+        operation.callback_data.setdefault('profile_name', self.active_profile_name)
+        self.operation_enqueued.emit(operation)
         self.s3_operation_queue.put(operation)
 
     def on_worker_s3_operation_finished(self, operation: S3Operation, result, error_message):
@@ -196,6 +408,16 @@ class OperationManager(QObject):
         print(f"  Error: '{error_message}'")
         
         op_type = operation.op_type
+        operation.last_error = error_message or ""
+        if operation.started_at is not None: # Coalesced duplicates and ops dropped from the queue never ran
+            self.concurrency_controller.record_operation(operation.bytes_transferred, operation.error_code)
+            get_metrics_collector().record_operation(operation) # Queue wait vs run time, next to the per-API latencies
+        elif operation.finished_at is None:
+            operation.finished_at = time.monotonic()
+        self._invalidate_cached_listings(operation) # Before any slot refreshes a tab from the cache
+        self._record_change_set(operation, result, error_message)
+        if self.search_index is not None:
+            self.search_index.apply_operation(self._operation_profile(operation), operation, error_message)
 
         # --- Debugging block for duplicate LIST operation finishes ---
         if op_type == S3OpType.LIST:
@@ -205,13 +427,20 @@ class OperationManager(QObject):
                 return 
             # If it's the first time seeing this LIST op ID, add it to the set.
             self.completed_operation_ids.add(operation.id)
+            if not error_message and isinstance(result, dict) and not result.get("next_continuation_token") \
+                    and not result.get("continued_from"): # Only complete listings are cached, never fetchMore pieces
+                self.listing_cache.put(self._operation_profile(operation), operation.bucket,
+                                       result.get("requested_prefix", operation.key or ""), result,
+                                       listed_at=operation.started_at or operation.enqueued_at)
             
             # Directly call the tab's handler method to update its UI
             target_tab_ref = operation.callback_data.get('tab_widget_ref')
-            if target_tab_ref and hasattr(target_tab_ref, 'on_s3_list_finished_tab'):
+            if operation.callback_data.get('prefetch'):
+                self.listing_prefetcher.on_prefetch_finished(operation) # Only the cache wanted it (tabs merged in are coalesced ops)
+            elif target_tab_ref and hasattr(target_tab_ref, 'on_s3_list_finished_tab'):
                 print(f"  OP_MGR: Calling target_tab_ref.on_s3_list_finished_tab for LIST op (ID: {operation.id})")
                 try:
-                    target_tab_ref.on_s3_list_finished_tab(result, error_message)
+                    target_tab_ref.on_s3_list_finished_tab(result, error_message, operation)
                 except Exception as e_tab_handler:
                     print(f"  OP_MGR ERROR: Exception in target_tab_ref.on_s3_list_finished_tab: {e_tab_handler}")
                     # Optionally emit a critical error signal or show a message box
@@ -245,6 +474,23 @@ class OperationManager(QObject):
             # No special internal handling beyond emitting the signal
             self.copy_object_op_completed.emit(operation, result, error_message)
 
+        elif op_type == S3OpType.MOVE_PREFIX:
+            # No special internal handling beyond emitting the signal
+            self.move_prefix_op_completed.emit(operation, result, error_message)
+
+        elif op_type == S3OpType.SUMMARIZE_PREFIX:
+            self._handle_folder_summary_finished(operation, result, error_message)
+
+        elif op_type == S3OpType.HEAD_OBJECT:
+            # Properties dialog asked for this HEAD; hand the result straight back like LIST does for tabs
+            target_dialog_ref = operation.callback_data.get('properties_dialog_ref')
+            if target_dialog_ref and hasattr(target_dialog_ref, 'on_head_object_finished'):
+                try:
+                    target_dialog_ref.on_head_object_finished(result, error_message)
+                except Exception as e_dialog_handler: # Dialog may already be closed/deleted
+                    print(f"  OP_MGR ERROR: Exception in properties_dialog_ref.on_head_object_finished: {e_dialog_handler}")
+            self.head_object_op_completed.emit(operation, result, error_message)
+
         # Batch progress update logic (should be after specific handlers)
         is_batch_item = "batch_id" in operation.callback_data
         batch_id = operation.callback_data.get("batch_id")
@@ -253,6 +499,154 @@ class OperationManager(QObject):
         
         print(f"--- END OP_MGR: WORKER_OP_FINISHED (ID: {operation.id}) ---\n")
 
+        # Duplicates the scheduler merged into this op (same LIST prefix, superseded uploads of the same key)
+        # get the same outcome so each caller's callback still fires.
+        coalesced_operations, operation.coalesced_operations = operation.coalesced_operations, []
+        for coalesced_op in coalesced_operations:
+            if operation.is_cancelled():
+                coalesced_op.cancel_token.cancel()
+            self.on_worker_s3_operation_finished(coalesced_op, result, error_message)
+
+    def on_worker_list_page_ready(self, operation: S3Operation, page):
+        # Streamed LIST page: straight to the tab(s), like the final result (LISTs merged into this one included)
+        for list_op in [operation] + list(operation.coalesced_operations):
+            if not list_op.callback_data.get('stream_pages', False):
+                continue # That tab shows a cached view and diff-applies the final listing instead
+            target_tab_ref = list_op.callback_data.get('tab_widget_ref')
+            if target_tab_ref and hasattr(target_tab_ref, 'on_s3_list_page_tab'):
+                try:
+                    target_tab_ref.on_s3_list_page_tab(page, list_op)
+                except Exception as e_tab_handler: # Tab may have been closed meanwhile
+                    print(f"  OP_MGR ERROR: Exception in target_tab_ref.on_s3_list_page_tab: {e_tab_handler}")
+
+    def abandon_list_operation(self, operation: S3Operation):
+        """The tab navigated away from this LIST's folder: stop paging it, unless another tab's LIST rides along on it."""
+        if operation.coalesced_operations:
+            print(f"OP_MGR: LIST s3://{operation.bucket}/{operation.key} abandoned by its tab but still wanted by {len(operation.coalesced_operations)} other(s).")
+            return
+        print(f"OP_MGR: Cancelling remaining pages of LIST s3://{operation.bucket}/{operation.key}.")
+        self.cancel_operation(operation)
+
+    def _operation_profile(self, operation: S3Operation):
+        """Profile the operation ran against (set at enqueue), not the one active when it finishes."""
+        return operation.callback_data.get('profile_name', self.active_profile_name)
+
+    def _invalidate_cached_listings(self, operation: S3Operation):
+        """Marks the listings a finished mutating operation changed as stale (also on failure: it may have been partial)."""
+        op_type = operation.op_type
+        profile, bucket, key = self._operation_profile(operation), operation.bucket, operation.key or ""
+        cache, summaries = self.listing_cache, self.folder_summary_cache # Folder totals include every key below them
+        if op_type in (S3OpType.UPLOAD_FILE, S3OpType.CREATE_FOLDER):
+            written_key = key if op_type == S3OpType.UPLOAD_FILE or key.endswith('/') else key + '/'
+            cache.invalidate_key(profile, bucket, written_key)
+            summaries.invalidate_key(profile, bucket, written_key)
+        elif op_type == S3OpType.DELETE_OBJECT:
+            cache.invalidate_key(profile, bucket, key, removed=True)
+            summaries.invalidate_key(profile, bucket, key)
+        elif op_type == S3OpType.DELETE_FOLDER:
+            folder_prefix = key if key.endswith('/') else key + '/'
+            cache.drop_subtree(profile, bucket, folder_prefix)
+            cache.invalidate_key(profile, bucket, folder_prefix, removed=True)
+            summaries.drop_subtree(profile, bucket, folder_prefix)
+            summaries.invalidate_key(profile, bucket, folder_prefix)
+        elif op_type == S3OpType.COPY_OBJECT and operation.new_key:
+            cache.invalidate_key(profile, bucket, operation.new_key)
+            summaries.invalidate_key(profile, bucket, operation.new_key)
+            if operation.is_part_of_move: # Source is gone too (possibly on another profile / bucket)
+                source_profile = operation.callback_data.get("source_profile") or profile
+                source_bucket = operation.callback_data.get("source_bucket_override", bucket)
+                source_key = operation.original_source_key_for_move or key
+                cache.invalidate_key(source_profile, source_bucket, source_key, removed=True)
+                summaries.invalidate_key(source_profile, source_bucket, source_key)
+        elif op_type == S3OpType.MOVE_PREFIX and operation.new_key:
+            source_bucket = operation.callback_data.get("source_bucket_override", bucket)
+            source_prefix = key if key.endswith('/') else key + '/'
+            dest_prefix = operation.new_key if operation.new_key.endswith('/') else operation.new_key + '/'
+            for invalidated_cache in (cache, summaries):
+                invalidated_cache.drop_subtree(profile, source_bucket, source_prefix)
+                invalidated_cache.drop_subtree(profile, bucket, dest_prefix)
+            cache.invalidate_key(profile, source_bucket, source_prefix, removed=True)
+            cache.invalidate_key(profile, bucket, dest_prefix)
+            summaries.invalidate_key(profile, source_bucket, source_prefix)
+            summaries.invalidate_key(profile, bucket, dest_prefix)
+
+    def _record_change_set(self, operation: S3Operation, result, error_message):
+        """Describes what a finished mutation did for the open views; a batch's changes reach them once, when it completes."""
+        if operation.op_type not in S3ChangeSet.RECORDED_OP_TYPES: return
+        batch_info = self.active_batch_operations.get(operation.callback_data.get("batch_id"))
+        if batch_info is not None:
+            batch_info.setdefault('change_set', S3ChangeSet(self._operation_profile(operation))).record_operation(operation, result, error_message)
+            return
+        change_set = S3ChangeSet(self._operation_profile(operation))
+        change_set.record_operation(operation, result, error_message)
+        if not change_set.is_empty():
+            self.change_set_ready.emit(change_set)
+
+    # --- Recursive folder totals (SUMMARIZE_PREFIX), for listing rows and the properties dialog ---
+    def cached_folder_summary(self, bucket, prefix):
+        """FolderSummary of prefix from the cache, or None."""
+        return self.folder_summary_cache.get(self.active_profile_name, bucket, prefix)
+
+    def request_folder_summary(self, bucket, prefix, requester, urgent=False):
+        """Returns the cached FolderSummary of prefix, or None after queueing a SUMMARIZE_PREFIX for it;
+        requester.on_folder_summary_ready(bucket, summaries, error_message) is called when that finishes
+        (summaries: prefix -> FolderSummary for the folder and everything below it). urgent (properties
+        dialog) puts it ahead of the summaries tabs asked for and ignores View > Folder Sizes."""
+        prefix = prefix if not prefix or prefix.endswith('/') else prefix + '/'
+        summary = self.cached_folder_summary(bucket, prefix)
+        if summary is not None or not self.s3_client or not (urgent or self.folder_summaries_enabled):
+            return summary
+        summary_key = (self.active_profile_name, bucket, prefix)
+        operation = self._folder_summary_ops.get(summary_key)
+        if operation is None:
+            operation = S3Operation(S3OpType.SUMMARIZE_PREFIX, bucket, key=prefix,
+                                    callback_data={'profile_name': self.active_profile_name, 'summary_requesters': []})
+            self._folder_summary_ops[summary_key] = operation
+            if urgent: self._waiting_folder_summaries.appendleft(operation)
+            else: self._waiting_folder_summaries.append(operation)
+        elif urgent and operation in self._waiting_folder_summaries:
+            self._waiting_folder_summaries.remove(operation)
+            self._waiting_folder_summaries.appendleft(operation)
+        if requester not in operation.callback_data['summary_requesters']:
+            operation.callback_data['summary_requesters'].append(requester)
+        self._start_waiting_folder_summaries()
+        return None
+
+    def forget_folder_summary_requester(self, requester):
+        """The tab navigated away (or the dialog closed): summaries nobody else waits for and that have not started are dropped."""
+        for operation in list(self._waiting_folder_summaries):
+            requesters = operation.callback_data['summary_requesters']
+            if requester in requesters:
+                requesters.remove(requester)
+                if not requesters:
+                    self._waiting_folder_summaries.remove(operation)
+                    self._folder_summary_ops.pop((operation.callback_data['profile_name'], operation.bucket, operation.key), None)
+        for operation in self._folder_summary_ops.values(): # Running ones still finish into the cache
+            requesters = operation.callback_data['summary_requesters']
+            if requester in requesters:
+                requesters.remove(requester)
+
+    def _start_waiting_folder_summaries(self):
+        while self._waiting_folder_summaries and self._running_folder_summaries < self.MAX_RUNNING_FOLDER_SUMMARIES:
+            operation = self._waiting_folder_summaries.popleft()
+            self._running_folder_summaries += 1
+            self.enqueue_s3_operation(operation)
+
+    def _handle_folder_summary_finished(self, operation: S3Operation, result, error_message):
+        profile = self._operation_profile(operation)
+        if self._folder_summary_ops.pop((profile, operation.bucket, operation.key), None) is not None:
+            self._running_folder_summaries = max(0, self._running_folder_summaries - 1)
+        summaries = result.get("summaries", {}) if isinstance(result, dict) and not error_message else {}
+        if summaries:
+            self.folder_summary_cache.put_subtree(profile, operation.bucket, summaries,
+                                                  listed_at=operation.started_at or operation.enqueued_at)
+        for requester in operation.callback_data.get('summary_requesters', []):
+            try:
+                requester.on_folder_summary_ready(operation.bucket, summaries, error_message)
+            except Exception as e_requester: # Tab closed or dialog deleted meanwhile
+                print(f"  OP_MGR ERROR: Exception in on_folder_summary_ready: {e_requester}")
+        self._start_waiting_folder_summaries()
+
     def _handle_download_to_temp_finished(self, operation: S3Operation, result, error_message):
         if error_message:
             # Clean up temp file if download failed but file might have been partially created
@@ -339,46 +733,259 @@ class OperationManager(QObject):
             print(f"OpMgr: Batch ID {batch_id} not found in active_batch_operations for op {operation.id}")
             return
 
-        if error_message and not operation.callback_data.get("is_cleanup_delete", False): 
+        if error_message and operation.is_cancelled():
+            batch_info['cancelled'] += 1
+        elif error_message and not operation.callback_data.get("is_cleanup_delete", False): 
             batch_info['failed'] += 1
         batch_info['completed'] += 1
+        batch_info['retries'] += operation.auto_retry_count
+        if batch_id in self.batch_planners: self.batch_planners[batch_id].note_finished()
+
+        if self.journal:
+            if not error_message: journal_status = self.journal.OP_DONE
+            elif operation.is_cancelled(): journal_status = self.journal.OP_CANCELLED
+            else: journal_status = self.journal.OP_FAILED
+            self.journal.record_operation_finished(operation, journal_status, error_message)
         
+        self._emit_batch_progress(batch_id, operation.bytes_transferred)
+
+    def _emit_batch_progress(self, batch_id, bytes_transferred=0):
+        batch_info = self.active_batch_operations[batch_id]
         processed_count = batch_info['completed']
         total_count = batch_info['total']
-        item_name_prog = os.path.basename((operation.key or operation.new_key or "item").rstrip('/'))
-        
-        # Update the main batch progress dialog via its specific signal
-        msg = f"{batch_info.get('op_type_display', 'Processing')}: {item_name_prog} ({processed_count}/{total_count})"
-        self._request_batch_progress_update.emit(msg, processed_count, total_count, True)
-        
-        # Emit a more general signal for S3Explorer or other components
-        self.batch_processing_update.emit(msg, processed_count, total_count)
 
-        if processed_count >= total_count:
-            self.current_batch_id_for_dialog = None # This batch no longer controls the main dialog
-            self._request_batch_progress_update.emit("",0,0,False) # Hide/reset the dialog
+        # Dialog label/value and batch_processing_update are pushed by _sample_progress (~10 Hz), not per item
+        self.progress_tracker.record_batch_item_finished(batch_id, processed_count, bytes_transferred)
+
+        if processed_count >= total_count and not batch_info.get('planning'): # Streaming batches end once listing is done too
+            self.progress_tracker.finish_batch(batch_id)
+            self.retry_policy.unregister_batch(batch_id)
+            self._last_sampled_batch_progress.pop(batch_id, None)
+            msg = f"{batch_info.get('op_type_display', 'Processing')}: done ({processed_count}/{total_count})"
+            self.batch_processing_update.emit(msg, processed_count, total_count)
+            if self.journal:
+                self.journal.record_batch_finished(batch_id, self.journal.BATCH_CANCELLED if batch_info.get('cancelled') else self.journal.BATCH_DONE)
+            if batch_id == self.current_batch_id_for_dialog:
+                self.current_batch_id_for_dialog = None # This batch no longer controls the main dialog
+                self._update_progress_dialog_slot(self.batch_progress_dialog, "", 0, 0, False) # Hide/reset the dialog
             self.batch_processing_finished.emit(batch_id) # Signal S3Explorer to finalize
 
-    def start_batch_operation(self, batch_id, total_items, op_type_display, operations_to_queue, extra_batch_data=None):
+    # --- Cancellation ---
+    def cancel_operation(self, operation: S3Operation):
+        """Cancels a single operation: dropped if still queued, aborted between chunks if running."""
+        operation.cancel_token.cancel()
+        removed = self.s3_operation_queue.remove_pending(lambda op: op.id == operation.id)
+        removed += self._take_paused_operations(lambda op: op.id == operation.id)
+        self._finish_removed_operations(removed)
+
+    def cancel_batch(self, batch_id):
+        batch_info = self.active_batch_operations.get(batch_id)
+        if not batch_info:
+            print(f"OP_MGR: cancel_batch - batch '{batch_id}' not active.")
+            return
+        batch_info['cancel_token'].cancel() # In-flight items see it via operation.batch_cancel_token
+        removed = self.s3_operation_queue.remove_pending(lambda op: op.callback_data.get("batch_id") == batch_id)
+        removed += self._take_paused_operations(lambda op: op.callback_data.get("batch_id") == batch_id)
+        print(f"OP_MGR: Batch '{batch_id}' cancelled. Dropped {len(removed)} queued operation(s).")
+        self.request_status_bar_message.emit(
+            f"Cancelling {batch_info.get('op_type_display', 'batch')}: {len(removed)} queued item(s) dropped.", 5000)
+        self._finish_removed_operations(removed)
+
+    def cancel_operations_of_types(self, op_types):
+        """Cancels every queued and in-flight operation of the given types (Cancel on the transfer dialogs)."""
+        for op in self.s3_operation_queue.get_in_flight_operations():
+            if op.op_type in op_types:
+                op.cancel_token.cancel()
+        removed = self.s3_operation_queue.remove_pending(lambda op: op.op_type in op_types)
+        removed += self._take_paused_operations(lambda op: op.op_type in op_types)
+        print(f"OP_MGR: Cancel requested for {[t.name for t in op_types]}. Dropped {len(removed)} queued operation(s).")
+        self._finish_removed_operations(removed)
+
+    def _take_paused_operations(self, predicate):
+        taken = [op for op in self.paused_operations.values() if predicate(op)]
+        for op in taken:
+            del self.paused_operations[op.id]
+        return taken
+
+    def _on_batch_progress_dialog_canceled(self):
+        if self.current_batch_id_for_dialog:
+            self.cancel_batch(self.current_batch_id_for_dialog)
+
+    def _finish_removed_operations(self, removed_operations):
+        # Ops pulled out of the queue never reach a worker, so account for them here.
+        # Batch items are counted in bulk (a cancelled paste can drop 100k ops at once).
+        dropped_per_batch = {}
+        for op in removed_operations:
+            op.cancel_token.cancel()
+            batch_id = op.callback_data.get("batch_id")
+            if batch_id and batch_id in self.active_batch_operations:
+                dropped_per_batch[batch_id] = dropped_per_batch.get(batch_id, 0) + 1
+                op.last_error = CANCELLED_ERROR_MESSAGE
+                op.finished_at = time.monotonic()
+                if self.journal: self.journal.record_operation_finished(op, self.journal.OP_CANCELLED, CANCELLED_ERROR_MESSAGE)
+            else:
+                self.on_worker_s3_operation_finished(op, None, CANCELLED_ERROR_MESSAGE)
+
+        for batch_id, dropped_count in dropped_per_batch.items():
+            batch_info = self.active_batch_operations[batch_id]
+            batch_info['completed'] += dropped_count
+            batch_info['cancelled'] += dropped_count
+            if batch_id in self.batch_planners: self.batch_planners[batch_id].note_finished(dropped_count)
+            self._emit_batch_progress(batch_id)
+
+    # --- Transfers panel actions ---
+    def pause_operations(self, operations):
+        """Takes still-queued operations out of the scheduler until resume_operations(); running ones are unaffected."""
+        wanted_ids = {op.id for op in operations}
+        removed = self.s3_operation_queue.remove_pending(lambda op: op.id in wanted_ids)
+        for op in removed:
+            self.paused_operations[op.id] = op
+        print(f"OP_MGR: Paused {len(removed)} queued operation(s).")
+        return len(removed)
+
+    def resume_operations(self, operations=None):
+        """Re-queues paused operations (all of them if operations is None)."""
+        ids_to_resume = list(self.paused_operations.keys()) if operations is None else [op.id for op in operations]
+        resumed = 0
+        for op_id in ids_to_resume:
+            op = self.paused_operations.pop(op_id, None)
+            if op is None: continue
+            if op.is_cancelled(): # Batch was cancelled while paused
+                self._finish_removed_operations([op])
+                continue
+            self.s3_operation_queue.put(op)
+            resumed += 1
+        print(f"OP_MGR: Resumed {resumed} operation(s).")
+        return resumed
+
+    def is_operation_paused(self, operation: S3Operation):
+        return operation.id in self.paused_operations
+
+    def retry_operations(self, operations):
+        """Queues failed/cancelled operations again (same op object, so the panel row and callbacks are reused)."""
+        retried = 0
+        for op in operations:
+            if op.finished_at is None or not op.last_error: continue # Still pending/running, or succeeded
+            batch_id = op.callback_data.get("batch_id")
+            batch_info = self.active_batch_operations.get(batch_id) if batch_id else None
+            if batch_info: # Batch still open: take the item back out of its finished counts
+                batch_info['completed'] -= 1
+                if op.is_cancelled(): batch_info['cancelled'] -= 1
+                else: batch_info['failed'] -= 1
+                batch_info['retries'] += 1
+                if self.journal: self.journal.record_operation_finished(op, self.journal.OP_PENDING)
+            if op.batch_cancel_token is not None and op.batch_cancel_token.is_cancelled():
+                op.batch_cancel_token = None # Retrying one item of a cancelled batch
+            op.cancel_token = CancellationToken()
+            op.started_at = op.finished_at = None
+            op.bytes_transferred = 0
+            op.error_code = None
+            op.last_error = ""
+            op.retry_count += 1
+            op.auto_retry_count = 0 # Fresh automatic retry allowance for the manual retry
+            self.completed_operation_ids.discard(op.id) # LIST duplicate guard
+            self.enqueue_s3_operation(op)
+            retried += 1
+        print(f"OP_MGR: Retrying {retried} operation(s).")
+        return retried
+
+    def reprioritize_operations(self, operations, interactive):
+        """Moves queued operations to the front of the interactive lane ("Run Next") or the back of the bulk lane."""
+        wanted_ids = {op.id for op in operations}
+        lane = S3OperationScheduler.LANE_INTERACTIVE if interactive else S3OperationScheduler.LANE_BULK
+        moved = self.s3_operation_queue.move_to_lane(lambda op: op.id in wanted_ids, lane, to_front=interactive)
+        print(f"OP_MGR: Moved {moved} queued operation(s) to the {lane} lane.")
+        return moved
+
+    def start_batch_operation(self, batch_id, total_items, op_type_display, operations_to_queue, extra_batch_data=None,
+                              already_completed=0):
+        # already_completed > 0 when resuming a journaled batch: only the remaining ops are queued
         if batch_id in self.active_batch_operations:
             print(f"OpMgr: Warning - Batch ID {batch_id} already active. Overwriting existing batch data.")
 
+        batch_cancel_token = CancellationToken()
         self.active_batch_operations[batch_id] = {
-            'total': total_items, 'completed': 0, 'failed': 0,
+            'total': total_items, 'completed': already_completed, 'failed': 0, 'cancelled': 0, 'retries': 0,
             'op_type_display': op_type_display, # User-friendly display name for the operation
+            'cancel_token': batch_cancel_token,
             **(extra_batch_data or {}) # Merge any additional context
         }
         self.current_batch_id_for_dialog = batch_id # This batch now owns the main progress dialog
         
-        initial_msg = f"{op_type_display} (0/{total_items})"
-        self._request_batch_progress_update.emit(initial_msg, 0, total_items, True) # Show and initialize dialog
+        self.progress_tracker.start_batch(batch_id, total_items, already_completed)
+        self.retry_policy.register_batch(batch_id, total_items)
+        initial_msg = f"{op_type_display} ({already_completed}/{total_items})"
+        self._update_progress_dialog_slot(self.batch_progress_dialog, initial_msg, already_completed, total_items, True) # Show and initialize dialog
+
+        if self.journal: # Journal before queuing so a crash right now is still resumable
+            for op_to_journal in operations_to_queue:
+                op_to_journal.callback_data.setdefault("batch_id", batch_id)
+            self.journal.record_batch_started(batch_id, self.active_profile_name, op_type_display, total_items,
+                                              extra_batch_data, operations_to_queue)
 
+        self._enqueue_batch_operations(batch_id, operations_to_queue)
+
+    def _enqueue_batch_operations(self, batch_id, operations_to_queue):
+        batch_cancel_token = self.active_batch_operations[batch_id]['cancel_token']
         for op_to_enqueue in operations_to_queue:
             # Ensure the operation is tagged with this batch_id for tracking
             if "batch_id" not in op_to_enqueue.callback_data: 
                 op_to_enqueue.callback_data["batch_id"] = batch_id
+            op_to_enqueue.batch_cancel_token = batch_cancel_token
             self.enqueue_s3_operation(op_to_enqueue)
 
+    # --- Streaming batches (source listed page by page on an S3BatchPlanner thread) ---
+    def start_streaming_batch_operation(self, batch_id, op_type_display, page_generator, extra_batch_data=None):
+        """Like start_batch_operation, but operations come from page_generator (a generator yielding one list
+        of S3Operations per listing page), run off the GUI thread. The batch total grows as pages arrive, and
+        the batch only completes once the generator is exhausted and every planned operation finished."""
+        # 'planning_incomplete' is journaled so a resume after a crash knows the listing never finished
+        extra_batch_data = dict(extra_batch_data or {})
+        self.start_batch_operation(batch_id, 0, op_type_display, [], {**extra_batch_data, 'planning_incomplete': True})
+        self.active_batch_operations[batch_id]['planning'] = True
+        planner = S3BatchPlanner(batch_id, page_generator, self.active_batch_operations[batch_id]['cancel_token'])
+        planner.extra_batch_data = extra_batch_data # Journaled again (without the marker) once listing completes
+        planner.setObjectName(f"S3BatchPlanner_{batch_id}")
+        planner.operations_planned.connect(self._on_batch_operations_planned)
+        planner.planning_finished.connect(self._on_batch_planning_finished)
+        self.batch_planners[batch_id] = planner
+        planner.start()
+
+    def _on_batch_operations_planned(self, batch_id, operations):
+        batch_info = self.active_batch_operations.get(batch_id)
+        if not batch_info or batch_info['cancel_token'].is_cancelled():
+            return # Listed after a cancel: never counted, never queued
+        batch_info['total'] += len(operations)
+        self.progress_tracker.set_batch_total(batch_id, batch_info['total'])
+        self.retry_policy.extend_batch(batch_id, len(operations))
+        if self.journal:
+            for op_to_journal in operations:
+                op_to_journal.callback_data.setdefault("batch_id", batch_id)
+            self.journal.record_operations_added(batch_id, operations, batch_info['total'])
+        self._enqueue_batch_operations(batch_id, operations)
+
+    def _on_batch_planning_finished(self, batch_id, planned_count, error_message):
+        planner = self.batch_planners.pop(batch_id, None)
+        if planner is not None: planner.wait() # run() has returned (this signal is its last act)
+        batch_info = self.active_batch_operations.get(batch_id)
+        if not batch_info: return
+        batch_info['planning'] = False
+        if error_message:
+            batch_info['planning_error'] = error_message # e.g. a cut must not delete its source folders now
+            self.batch_planning_error.emit(batch_id, error_message)
+        else:
+            batch_info.pop('planning_incomplete', None)
+            if self.journal and planner is not None: self.journal.record_planning_finished(batch_id, planner.extra_batch_data)
+        print(f"OP_MGR: Batch '{batch_id}' fully listed: {batch_info['total']} operation(s).")
+        self._emit_batch_progress(batch_id) # Completes the batch if everything planned has already finished
+
+    def stop_batch_planners(self):
+        for planner in list(self.batch_planners.values()):
+            planner.stop()
+        for planner in list(self.batch_planners.values()):
+            if not planner.wait(1500):
+                print(f"Warning: batch planner {planner.objectName()} did not terminate gracefully.")
+
     def get_active_batch_operation_data(self, batch_id):
         return self.active_batch_operations.get(batch_id)
 
@@ -386,8 +993,12 @@ class OperationManager(QObject):
         return self.active_batch_operations.pop(batch_id, None)
 
     def get_queue_status(self):
-        """Returns True if there are operations in the queue."""
-        return not self.s3_operation_queue.empty()
+        """Returns True if there are operations in the queue (or paused in the Transfers panel)."""
+        return not self.s3_operation_queue.empty() or bool(self.paused_operations)
+
+    def get_queue_lane_sizes(self):
+        """Returns pending operation counts per scheduler lane, e.g. {'interactive': 0, 'bulk': 1200}."""
+        return self.s3_operation_queue.get_lane_sizes()
     
     def get_active_batch_operations_status(self):
         """Returns True if there are any active batch operations."""
@@ -1,10 +1,14 @@
 import os
 import json
+import threading
 import boto3
 from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtWidgets import QMessageBox # For potential error messages if not handled by main app
 from dotenv import load_dotenv, find_dotenv
 
+from s3ops.S3RateLimiter import get_rate_limiter
+from s3ops.S3Metrics import get_metrics_collector
+
 class ProfileManager(QObject):
     s3_client_initialized = pyqtSignal(object, str) # client, profile_name
     s3_client_init_failed = pyqtSignal(str, str)    # profile_name, error_message
@@ -20,6 +24,8 @@ class ProfileManager(QObject):
         self.aws_profiles = {}
         self.active_profile_name = None
         self.s3_client = None
+        self._profile_clients = {} # profile_name -> client for non-active profiles (cross-profile copies)
+        self._profile_clients_lock = threading.Lock() # get_client_for_profile is called from worker threads
 
     def _ensure_app_data_dir_exists(self): # Keep for self-sufficiency if needed
         if not os.path.exists(self.app_data_dir):
@@ -113,6 +119,8 @@ class ProfileManager(QObject):
 
     def update_profiles_data(self, new_profiles_data, new_active_profile_name):
         self.aws_profiles = new_profiles_data
+        with self._profile_clients_lock:
+            self._profile_clients.clear() # Credentials/endpoints may have changed
         # Active profile switch will be handled by switch_profile or init_s3_client_with_config
         # This method is primarily for when the ProfileManagerDialog returns updated data.
         # The S3Explorer will then decide if a re-initialization is needed based on new_active_profile_name.
@@ -164,21 +172,8 @@ class ProfileManager(QObject):
             self.s3_client_init_failed.emit(profile_name_being_initialized, error_msg)
             return False
         try:
-            session_params = {
-                "aws_access_key_id": access_key,
-                "aws_secret_access_key": secret_key,
-                "region_name": region
-            }
-            session = boto3.Session(**session_params)
-            
-            client_params = {}
-            if endpoint_url:
-                client_params['endpoint_url'] = endpoint_url
-                # For some S3-compatible services, signature version might be important
-                # client_params['config'] = boto3.session.Config(signature_version='s3v4') # Example
-            
             print(f"  Attempting S3 client creation. Endpoint URL: {endpoint_url}, Region: {region}")
-            new_s3_client = session.client('s3', **client_params)
+            new_s3_client = self._create_s3_client(profile_config, profile_name_being_initialized)
             
             # Perform a test call
             test_call_description = ""
@@ -211,6 +206,45 @@ class ProfileManager(QObject):
             self.s3_client_init_failed.emit(profile_name_being_initialized, error_msg)
             return False
 
+    @staticmethod
+    def _create_s3_client(profile_config, profile_name):
+        """Builds an S3 client for a profile (no test call) with the profile's rate limiter attached."""
+        session = boto3.Session(aws_access_key_id=profile_config.get("aws_access_key_id"),
+                                aws_secret_access_key=profile_config.get("aws_secret_access_key"),
+                                region_name=profile_config.get("aws_default_region"))
+        client_params = {}
+        endpoint_url = profile_config.get("endpoint_url")
+        if isinstance(endpoint_url, str) and endpoint_url.strip():
+            client_params['endpoint_url'] = endpoint_url
+            # For some S3-compatible services, signature version might be important
+            # client_params['config'] = boto3.session.Config(signature_version='s3v4') # Example
+        s3_client = session.client('s3', **client_params)
+        # Requests/sec + bytes/sec caps for this profile; the limiter is shared with workers, folder downloads and WebDAV
+        rate_limiter = get_rate_limiter(profile_name)
+        rate_limiter.configure(profile_config.get("rate_limits"))
+        rate_limiter.attach_to_client(s3_client)
+        get_metrics_collector().attach_to_client(s3_client) # After the limiter: measured latency excludes throttling waits
+        return s3_client
+
+    def get_client_for_profile(self, profile_name):
+        """Client for any configured profile (the active one's client, else a cached one built on first use).
+        Used to read from another endpoint while the active profile is the destination. Raises ValueError
+        for unknown or incomplete profiles."""
+        if profile_name == self.active_profile_name and self.s3_client is not None:
+            return self.s3_client
+        with self._profile_clients_lock:
+            if profile_name in self._profile_clients:
+                return self._profile_clients[profile_name]
+            profile_config = self.aws_profiles.get(profile_name)
+            if not profile_config:
+                raise ValueError(f"Profile '{profile_name}' not found.")
+            if not all(profile_config.get(k) for k in ("aws_access_key_id", "aws_secret_access_key", "aws_default_region")):
+                raise ValueError(f"Profile '{profile_name}' is incomplete (missing Key ID, Secret Key, or Region).")
+            print(f"PROFILE_MANAGER: Creating S3 client for non-active profile '{profile_name}'.")
+            s3_client = self._create_s3_client(profile_config, profile_name)
+            self._profile_clients[profile_name] = s3_client
+            return s3_client
+
     def set_active_profile_name_only(self, profile_name):
         """Only sets the active profile name, does not attempt to initialize. Caller saves."""
         if profile_name in self.aws_profiles or profile_name is None:
@@ -0,0 +1,328 @@
+import os
+import time
+import queue
+import sqlite3
+import threading
+from PyQt6.QtCore import QObject, QTimer
+
+from s3ops.S3Operation import S3Operation, S3OpType
+from s3ops.S3IndexCrawler import S3IndexCrawler, upsert_objects, parent_folder_keys, object_name
+
+
+def prefix_upper_bound(prefix):
+    """Smallest string greater than every key under prefix ('a/' -> 'a0'), for index range scans."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SearchIndex(QObject):
+    """Optional per-bucket SQLite index of object names for instant search (View > Search).
+
+    Buckets are added explicitly; an S3IndexCrawler fills each one in the background and re-crawls it
+    periodically. Between crawls the index follows the app's own mutations (uploads, deletes, copies,
+    moves), written by a single background writer so the GUI thread never waits on a large update.
+    Names are matched with an FTS5 trigram index (substring search, case-insensitive); SQLite builds
+    without the trigram tokenizer fall back to LIKE."""
+
+    RECRAWL_INTERVAL_SECONDS = 6 * 3600
+    RECRAWL_CHECK_INTERVAL_MS = 10 * 60 * 1000
+    DEFAULT_RESULT_LIMIT = 500
+    MIN_TRIGRAM_QUERY_LENGTH = 3 # Shorter queries match name prefixes instead
+
+    def __init__(self, app_data_dir, profile_client_provider=None, parent=None):
+        super().__init__(parent)
+        self.app_data_dir = app_data_dir
+        self.index_file = os.path.join(self.app_data_dir, "search_index.sqlite3")
+        self.profile_client_provider = profile_client_provider # ProfileManager.get_client_for_profile
+        self.has_trigram = False
+        self._conn = None # GUI thread: searches and the small bookkeeping writes
+        self._bucket_ids = {} # (profile_name, bucket) -> indexed_buckets.id
+        self._crawlers = {}   # bucket_id -> S3IndexCrawler
+        self._crawl_progress = {} # bucket_id -> rows indexed by the running crawl
+        self._removal_after_crawl = set() # bucket_ids removed while their crawler was still committing a page
+        self._write_queue = queue.Queue() # callables taking a connection; None stops the writer
+        self._writer_thread = None
+
+        self.recrawl_timer = QTimer(self)
+        self.recrawl_timer.setInterval(self.RECRAWL_CHECK_INTERVAL_MS)
+        self.recrawl_timer.timeout.connect(self.recrawl_due_buckets)
+
+    # --- Lifecycle ---
+    def _connect(self):
+        conn = sqlite3.connect(self.index_file, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def open(self):
+        if self._conn: return True
+        try:
+            os.makedirs(self.app_data_dir, exist_ok=True)
+            self._conn = self._connect()
+            self._conn.execute("PRAGMA journal_mode=WAL") # Searches read while the crawler and writer commit
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS indexed_buckets (
+                    id INTEGER PRIMARY KEY,
+                    profile_name TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    crawl_generation INTEGER NOT NULL DEFAULT 0,
+                    resume_token TEXT,
+                    object_count INTEGER NOT NULL DEFAULT 0,
+                    last_crawl_started REAL,
+                    last_crawl_finished REAL,
+                    UNIQUE (profile_name, bucket)
+                );
+                CREATE TABLE IF NOT EXISTS objects (
+                    id INTEGER PRIMARY KEY,
+                    bucket_id INTEGER NOT NULL,
+                    key TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    size INTEGER,
+                    mtime REAL,
+                    is_folder INTEGER NOT NULL,
+                    generation INTEGER NOT NULL
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_objects_bucket_key ON objects (bucket_id, key);
+                CREATE INDEX IF NOT EXISTS idx_objects_name ON objects (name COLLATE NOCASE);
+            """)
+            self.has_trigram = self._create_fts_table()
+            self._conn.commit()
+            self._bucket_ids = {(profile_name, bucket): bucket_id for bucket_id, profile_name, bucket
+                                in self._conn.execute("SELECT id, profile_name, bucket FROM indexed_buckets")}
+        except (OSError, sqlite3.Error) as e:
+            print(f"SEARCH_INDEX: Could not open index {self.index_file}: {e}")
+            self._conn = None
+            return False
+        self._writer_thread = threading.Thread(target=self._run_writer, name="SearchIndexWriter", daemon=True)
+        self._writer_thread.start()
+        self.recrawl_timer.start()
+        print(f"SEARCH_INDEX: Opened {self.index_file} ({len(self._bucket_ids)} indexed bucket(s), trigram: {self.has_trigram})")
+        return True
+
+    def _create_fts_table(self):
+        try:
+            # External content: names are stored once, in objects; triggers keep the trigram index in step
+            self._conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS objects_fts USING fts5(name, content='objects', content_rowid='id', tokenize='trigram');
+                CREATE TRIGGER IF NOT EXISTS objects_fts_insert AFTER INSERT ON objects BEGIN
+                    INSERT INTO objects_fts (rowid, name) VALUES (new.id, new.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS objects_fts_delete AFTER DELETE ON objects BEGIN
+                    INSERT INTO objects_fts (objects_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS objects_fts_update AFTER UPDATE OF name ON objects BEGIN
+                    INSERT INTO objects_fts (objects_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                    INSERT INTO objects_fts (rowid, name) VALUES (new.id, new.name);
+                END;
+            """)
+            return True
+        except sqlite3.OperationalError as e: # No FTS5 or no trigram tokenizer (SQLite < 3.34)
+            print(f"SEARCH_INDEX: Trigram full-text index unavailable ({e}); searching with LIKE.")
+            return False
+
+    def close(self):
+        self.recrawl_timer.stop()
+        for crawler in list(self._crawlers.values()):
+            crawler.stop()
+        for crawler in list(self._crawlers.values()):
+            crawler.wait(3000)
+        self._crawlers.clear()
+        if self._writer_thread is not None:
+            self._write_queue.put(None)
+            self._writer_thread.join(5)
+            self._writer_thread = None
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def _run_writer(self):
+        conn = self._connect()
+        try:
+            while True:
+                job = self._write_queue.get()
+                if job is None: break
+                try:
+                    with conn:
+                        job(conn)
+                except sqlite3.Error as e:
+                    print(f"SEARCH_INDEX: Index update failed: {e}")
+        finally:
+            conn.close()
+
+    # --- Indexed buckets ---
+    def is_bucket_indexed(self, profile_name, bucket):
+        return (profile_name, bucket) in self._bucket_ids
+
+    def bucket_status(self, profile_name, bucket):
+        """{'object_count', 'last_crawl_finished', 'crawling', 'crawl_progress'} or None if the bucket is not indexed."""
+        bucket_id = self._bucket_ids.get((profile_name, bucket))
+        if bucket_id is None or not self._conn: return None
+        object_count, last_crawl_finished = self._conn.execute(
+            "SELECT object_count, last_crawl_finished FROM indexed_buckets WHERE id = ?", (bucket_id,)).fetchone()
+        return {'object_count': object_count, 'last_crawl_finished': last_crawl_finished,
+                'crawling': bucket_id in self._crawlers, 'crawl_progress': self._crawl_progress.get(bucket_id, 0)}
+
+    def add_bucket(self, profile_name, bucket):
+        if not self._conn or self.is_bucket_indexed(profile_name, bucket): return
+        with self._conn:
+            bucket_id = self._conn.execute("INSERT INTO indexed_buckets (profile_name, bucket) VALUES (?, ?)",
+                                           (profile_name, bucket)).lastrowid
+        self._bucket_ids[(profile_name, bucket)] = bucket_id
+        self.start_crawl(profile_name, bucket)
+
+    def remove_bucket(self, profile_name, bucket):
+        bucket_id = self._bucket_ids.pop((profile_name, bucket), None)
+        if bucket_id is None: return
+        crawler = self._crawlers.get(bucket_id)
+        if crawler is not None:
+            crawler.stop()
+            self._removal_after_crawl.add(bucket_id) # Rows go once its last page is committed
+        else:
+            self._delete_bucket_rows(bucket_id)
+
+    def _delete_bucket_rows(self, bucket_id):
+        def delete_bucket_rows(conn):
+            conn.execute("DELETE FROM objects WHERE bucket_id = ?", (bucket_id,))
+            conn.execute("DELETE FROM indexed_buckets WHERE id = ?", (bucket_id,))
+        self._write_queue.put(delete_bucket_rows)
+
+    # --- Crawling ---
+    def start_crawl(self, profile_name, bucket):
+        bucket_id = self._bucket_ids.get((profile_name, bucket))
+        if bucket_id is None or bucket_id in self._crawlers or self.profile_client_provider is None: return
+        try:
+            s3_client = self.profile_client_provider(profile_name)
+        except ValueError as e:
+            print(f"SEARCH_INDEX: Cannot crawl s3://{bucket} for profile '{profile_name}': {e}")
+            return
+        crawler = S3IndexCrawler(self.index_file, bucket_id, bucket, s3_client)
+        crawler.setObjectName(f"S3IndexCrawler_{bucket}")
+        crawler.crawl_progress.connect(self._on_crawl_progress)
+        crawler.crawl_finished.connect(self._on_crawl_finished)
+        self._crawlers[bucket_id] = crawler
+        self._crawl_progress[bucket_id] = 0
+        crawler.start()
+
+    def recrawl_due_buckets(self, profile_name=None):
+        """Starts crawls of the profile's buckets that were never completed or are older than RECRAWL_INTERVAL_SECONDS
+        (an interrupted crawl resumes from its continuation token). Called on the timer and when a profile connects."""
+        if not self._conn: return
+        due_before = time.time() - self.RECRAWL_INTERVAL_SECONDS
+        rows = self._conn.execute(
+            "SELECT profile_name, bucket FROM indexed_buckets "
+            "WHERE resume_token IS NOT NULL OR last_crawl_finished IS NULL OR last_crawl_finished < ?", (due_before,)).fetchall()
+        for row_profile_name, bucket in rows:
+            if profile_name is None or row_profile_name == profile_name:
+                self.start_crawl(row_profile_name, bucket)
+
+    def _on_crawl_progress(self, bucket_id, indexed_rows):
+        self._crawl_progress[bucket_id] = indexed_rows
+
+    def _on_crawl_finished(self, bucket_id, object_count, error_message):
+        crawler = self._crawlers.pop(bucket_id, None)
+        if crawler is not None: crawler.wait()
+        self._crawl_progress.pop(bucket_id, None)
+        if bucket_id in self._removal_after_crawl:
+            self._removal_after_crawl.discard(bucket_id)
+            self._delete_bucket_rows(bucket_id)
+            return
+        if error_message:
+            print(f"SEARCH_INDEX: Crawl of bucket #{bucket_id} ended early: {error_message}")
+
+    # --- Search ---
+    def search(self, profile_name, text, bucket=None, limit=DEFAULT_RESULT_LIMIT):
+        """[{'bucket', 'key', 'size', 'mtime', 'is_folder'}] of indexed objects whose name contains text."""
+        text = text.strip()
+        if not text or not self._conn: return []
+        scope_sql, scope_params = "b.profile_name = ?", [profile_name]
+        if bucket:
+            scope_sql += " AND b.bucket = ?"
+            scope_params.append(bucket)
+        if self.has_trigram and len(text) >= self.MIN_TRIGRAM_QUERY_LENGTH:
+            sql = ("SELECT b.bucket, o.key, o.size, o.mtime, o.is_folder FROM objects_fts f "
+                   "JOIN objects o ON o.id = f.rowid JOIN indexed_buckets b ON b.id = o.bucket_id "
+                   f"WHERE objects_fts MATCH ? AND {scope_sql} LIMIT ?")
+            params = ['"' + text.replace('"', '""') + '"'] + scope_params + [limit]
+        else:
+            like_pattern = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            # Short queries: name prefix (uses the NOCASE name index); without trigrams: substring scan
+            like_pattern = like_pattern + '%' if self.has_trigram else '%' + like_pattern + '%'
+            sql = ("SELECT b.bucket, o.key, o.size, o.mtime, o.is_folder FROM objects o "
+                   "JOIN indexed_buckets b ON b.id = o.bucket_id "
+                   f"WHERE o.name LIKE ? ESCAPE '\\' AND {scope_sql} LIMIT ?")
+            params = [like_pattern] + scope_params + [limit]
+        try:
+            rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"SEARCH_INDEX: Search for '{text}' failed: {e}")
+            return []
+        return [{'bucket': r[0], 'key': r[1], 'size': r[2], 'mtime': r[3], 'is_folder': bool(r[4])} for r in rows]
+
+    # --- Following the app's own mutations (called by OperationManager) ---
+    def apply_operation(self, profile_name, operation: S3Operation, error_message):
+        """Updates the index for a finished mutating operation; failed ones are left to the next crawl."""
+        if error_message or not self._bucket_ids: return
+        op_type = operation.op_type
+        bucket_id = self._bucket_ids.get((profile_name, operation.bucket))
+        key = operation.key or ""
+        job = None
+        if op_type == S3OpType.UPLOAD_FILE and bucket_id is not None:
+            local_path = operation.local_path
+            size = os.path.getsize(local_path) if local_path and os.path.exists(local_path) else None
+            job = lambda conn: self._upsert_key(conn, bucket_id, key, size, time.time())
+        elif op_type == S3OpType.CREATE_FOLDER and bucket_id is not None:
+            folder_key = key if key.endswith('/') else key + '/'
+            job = lambda conn: self._upsert_key(conn, bucket_id, folder_key, None, None)
+        elif op_type == S3OpType.DELETE_OBJECT and bucket_id is not None:
+            job = lambda conn: conn.execute("DELETE FROM objects WHERE bucket_id = ? AND key = ?", (bucket_id, key))
+        elif op_type == S3OpType.DELETE_FOLDER and bucket_id is not None:
+            folder_prefix = key if key.endswith('/') else key + '/'
+            job = lambda conn: self._delete_subtree(conn, bucket_id, folder_prefix)
+        elif op_type == S3OpType.COPY_OBJECT and operation.new_key:
+            source_location = (operation.callback_data.get("source_profile") or profile_name,
+                               operation.callback_data.get("source_bucket_override", operation.bucket))
+            source_bucket_id = self._bucket_ids.get(source_location)
+            source_key = operation.original_source_key_for_move or key
+            new_key, is_move = operation.new_key, operation.is_part_of_move
+            def job(conn):
+                source_row = conn.execute("SELECT size, mtime FROM objects WHERE bucket_id = ? AND key = ?",
+                                          (source_bucket_id, source_key)).fetchone() if source_bucket_id is not None else None
+                if bucket_id is not None:
+                    self._upsert_key(conn, bucket_id, new_key, source_row[0] if source_row else None, time.time())
+                if is_move and source_bucket_id is not None:
+                    conn.execute("DELETE FROM objects WHERE bucket_id = ? AND key = ?", (source_bucket_id, source_key))
+        elif op_type == S3OpType.MOVE_PREFIX and operation.new_key:
+            source_bucket_id = self._bucket_ids.get((profile_name, operation.callback_data.get("source_bucket_override", operation.bucket)))
+            source_prefix = key if key.endswith('/') else key + '/'
+            dest_prefix = operation.new_key if operation.new_key.endswith('/') else operation.new_key + '/'
+            def job(conn):
+                if bucket_id is not None and source_bucket_id is not None:
+                    # Rows below the moved folder keep their names, only the key prefix changes
+                    conn.execute(
+                        "INSERT INTO objects (bucket_id, key, name, size, mtime, is_folder, generation) "
+                        "SELECT ?, ? || substr(key, ?), name, size, mtime, is_folder, "
+                        "(SELECT crawl_generation FROM indexed_buckets WHERE id = ?) FROM objects "
+                        "WHERE bucket_id = ? AND key > ? AND key < ? "
+                        "ON CONFLICT(bucket_id, key) DO UPDATE SET size = excluded.size, mtime = excluded.mtime",
+                        (bucket_id, dest_prefix, len(source_prefix) + 1, bucket_id,
+                         source_bucket_id, source_prefix, prefix_upper_bound(source_prefix)))
+                if source_bucket_id is not None:
+                    self._delete_subtree(conn, source_bucket_id, source_prefix)
+                if bucket_id is not None:
+                    self._upsert_key(conn, bucket_id, dest_prefix, None, None)
+        if job is not None:
+            self._write_queue.put(job)
+
+    @staticmethod
+    def _upsert_key(conn, bucket_id, key, size, mtime):
+        generation = conn.execute("SELECT crawl_generation FROM indexed_buckets WHERE id = ?", (bucket_id,)).fetchone()
+        if generation is None: return # Bucket removed meanwhile
+        is_folder = key.endswith('/')
+        rows = [(bucket_id, key, object_name(key), None if is_folder else size, None if is_folder else mtime,
+                 1 if is_folder else 0, generation[0])]
+        rows.extend((bucket_id, folder_key, object_name(folder_key), None, None, 1, generation[0])
+                    for folder_key in parent_folder_keys(key))
+        upsert_objects(conn, rows)
+
+    @staticmethod
+    def _delete_subtree(conn, bucket_id, folder_prefix):
+        conn.execute("DELETE FROM objects WHERE bucket_id = ? AND key >= ? AND key < ?",
+                     (bucket_id, folder_prefix, prefix_upper_bound(folder_prefix)))
@@ -8,12 +8,15 @@ def show_keyboard_shortcuts(parent):
     shortcuts = [
         ("General", [
             ("New Tab", "Ctrl+T"),
-            ("Save", "Ctrl+S")
+            ("Save", "Ctrl+S"),
+            ("Show/Hide Transfers Panel", "Ctrl+J"),
+            ("Show/Hide Search Panel", "Ctrl+F")
         ]),
         ("Navigation", [
             ("Back", "Alt+Left Arrow"),
             ("Forward", "Alt+Right Arrow"),
-            ("Up", "Alt+Up")
+            ("Up", "Alt+Up"),
+            ("Load All Items in Folder", "Ctrl+Shift+L")
         ]),
         ("Edit", [
             ("Copy", "Ctrl+C"),
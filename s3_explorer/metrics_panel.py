@@ -0,0 +1,133 @@
+import time
+
+from PyQt6.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QLabel,
+    QPushButton, QTabWidget, QAbstractItemView, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt, QTimer
+
+from s3ops.S3Metrics import get_metrics_collector
+from s3ops.S3TabContentWidget import format_size
+from transfers_panel import format_duration
+
+API_COLUMN_TITLES = ["Op Type", "API", "Calls", "Errors", "Retries", "p50", "p95", "p99", "Max", "Avg", "Sent", "Received", "Statuses"]
+OPERATION_COLUMN_TITLES = ["Op Type", "Count", "Failed", "Cancelled", "Queue p50", "Queue p95", "Run p50", "Run p95", "Run Avg", "Bytes"]
+
+
+def _ms(value_ms):
+    return format_duration(value_ms / 1000.0) if value_ms else ""
+
+
+class MetricsPanel(QDockWidget):
+    """Debug / Metrics (View menu): per-API latency, retries and status codes from the botocore hooks
+    (S3MetricsCollector), next to how long operations waited in the queue and ran in a worker."""
+
+    REFRESH_INTERVAL_MS = 1000
+
+    def __init__(self, parent=None):
+        super().__init__("Debug / Metrics", parent)
+        self.setObjectName("MetricsDock") # Needed for QMainWindow.saveState/restoreState
+        self.collector = get_metrics_collector()
+
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(4, 4, 4, 4)
+
+        self.summary_label = QLabel("No S3 calls recorded yet")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        button_row = QHBoxLayout()
+        self.reset_button = QPushButton("Reset"); self.reset_button.clicked.connect(self.reset_metrics)
+        self.export_button = QPushButton("Export JSON..."); self.export_button.clicked.connect(self.export_json)
+        button_row.addStretch()
+        button_row.addWidget(self.reset_button)
+        button_row.addWidget(self.export_button)
+        layout.addLayout(button_row)
+
+        self.tabs = QTabWidget()
+        self.api_table = self._make_table(API_COLUMN_TITLES)
+        self.operation_table = self._make_table(OPERATION_COLUMN_TITLES)
+        self.tabs.addTab(self.api_table, "S3 API Calls (endpoint)")
+        self.tabs.addTab(self.operation_table, "Operations (app)")
+        layout.addWidget(self.tabs)
+
+        self.setWidget(container)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+
+    @staticmethod
+    def _make_table(column_titles):
+        table = QTableWidget(0, len(column_titles))
+        table.setHorizontalHeaderLabels(column_titles)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.verticalHeader().hide()
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    @staticmethod
+    def _fill_table(table, rows, text_columns):
+        table.setRowCount(len(rows))
+        for row_index, values in enumerate(rows):
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if column not in text_columns: # Numbers right-aligned
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(row_index, column, item)
+
+    def refresh(self):
+        if not self.isVisible():
+            return # Collecting never stops; the tables are only rebuilt while someone is looking
+        snapshot = self.collector.snapshot()
+
+        api_rows = []
+        for entry in snapshot["api_calls"]:
+            latency = entry["latency"]
+            statuses = ", ".join(f"{status}: {count}" for status, count in sorted(entry["statuses"].items()))
+            api_rows.append([entry["op_type"], entry["api"], entry["calls"], entry["errors"], entry["retries"],
+                             _ms(latency["p50_ms"]), _ms(latency["p95_ms"]), _ms(latency["p99_ms"]), _ms(latency["max_ms"]),
+                             _ms(latency["avg_ms"]), format_size(entry["bytes_sent"]), format_size(entry["bytes_received"]), statuses])
+        self._fill_table(self.api_table, api_rows, text_columns=(0, 1, len(API_COLUMN_TITLES) - 1))
+
+        operation_rows = []
+        for entry in snapshot["operations"]:
+            queue_wait, run_time = entry["queue_wait"], entry["run_time"]
+            operation_rows.append([entry["op_type"], entry["count"], entry["failed"], entry["cancelled"],
+                                   _ms(queue_wait["p50_ms"]), _ms(queue_wait["p95_ms"]), _ms(run_time["p50_ms"]),
+                                   _ms(run_time["p95_ms"]), _ms(run_time["avg_ms"]), format_size(entry["bytes"])])
+        self._fill_table(self.operation_table, operation_rows, text_columns=(0,))
+
+        total_calls = sum(entry["calls"] for entry in snapshot["api_calls"])
+        if not total_calls and not snapshot["operations"]:
+            self.summary_label.setText("No S3 calls recorded yet")
+            return
+        total_errors = sum(entry["errors"] for entry in snapshot["api_calls"])
+        total_retries = sum(entry["retries"] for entry in snapshot["api_calls"])
+        endpoint_ms = sum(entry["latency"]["avg_ms"] * entry["latency"]["count"] for entry in snapshot["api_calls"])
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(snapshot["statuses"].items()))
+        self.summary_label.setText(
+            f"Last {format_duration(snapshot['collected_seconds'])}: {total_calls:,} S3 calls, {total_errors:,} errors, "
+            f"{total_retries:,} retries, {format_duration(endpoint_ms / 1000.0) or '0 ms'} waiting on the endpoint"
+            f"{' | HTTP: ' + statuses if statuses else ''}")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def reset_metrics(self):
+        self.collector.reset()
+        self.refresh()
+
+    def export_json(self):
+        default_name = f"s3_metrics_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Metrics", default_name, "JSON Files (*.json)")
+        if not file_path: return
+        try:
+            self.collector.export_json(file_path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Metrics", f"Could not write {file_path}:\n{e}")
@@ -1,6 +1,6 @@
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
-    QPushButton, QFormLayout, QLineEdit, QComboBox,
+    QPushButton, QFormLayout, QLineEdit, QComboBox, QSpinBox,
     QDialogButtonBox, QMessageBox, QLabel, QAbstractItemView, QInputDialog
 )
 from PyQt6.QtCore import Qt
@@ -24,6 +24,11 @@ AWS_REGIONS = [
     "eu-south-1", "eu-west-3", "eu-north-1", "me-south-1", "sa-east-1"
 ]
 
+# Defaults for the adaptive worker pool, mirrors OperationManager.DEFAULT_MIN/MAX_WORKER_THREADS
+DEFAULT_MIN_WORKERS = 2
+DEFAULT_MAX_WORKERS = 32
+MAX_RETRIES_USE_DEFAULTS = -1 # Spin box value meaning "per operation type defaults" (stored as max_retries None)
+
 # --- Application Data Paths ---
 def get_application_base_path():
     """ Get the base path for the application, accounting for PyInstaller. """
@@ -96,6 +101,18 @@ class ProfileManagerDialog(QDialog):
         self.endpoint_url_edit.setPlaceholderText("(Optional) e.g., http://localhost:9000")
         self.default_bucket_edit = QLineEdit()
         self.default_bucket_edit.setPlaceholderText("(Optional) e.g., my-startup-bucket")
+        # Bounds for the adaptive S3 worker pool (OperationManager grows/shrinks between them)
+        self.min_workers_spin = QSpinBox()
+        self.min_workers_spin.setRange(1, 256)
+        self.min_workers_spin.setValue(DEFAULT_MIN_WORKERS)
+        self.max_workers_spin = QSpinBox()
+        self.max_workers_spin.setRange(1, 256)
+        self.max_workers_spin.setValue(DEFAULT_MAX_WORKERS)
+        # Automatic retries of a failed operation (transient S3 / network errors only)
+        self.max_retries_spin = QSpinBox()
+        self.max_retries_spin.setRange(MAX_RETRIES_USE_DEFAULTS, 20)
+        self.max_retries_spin.setSpecialValueText("Default")
+        self.max_retries_spin.setValue(MAX_RETRIES_USE_DEFAULTS)
 
         self.details_form_layout.addRow("Profile Name:", self.profile_name_edit)
         self.details_form_layout.addRow("Access Key ID:", self.access_key_edit)
@@ -103,6 +120,9 @@ class ProfileManagerDialog(QDialog):
         self.details_form_layout.addRow("Default Region:", self.region_combo)
         self.details_form_layout.addRow("Endpoint URL:", self.endpoint_url_edit) 
         self.details_form_layout.addRow("Default S3 Bucket:", self.default_bucket_edit)
+        self.details_form_layout.addRow("Min Workers:", self.min_workers_spin)
+        self.details_form_layout.addRow("Max Workers:", self.max_workers_spin)
+        self.details_form_layout.addRow("Max Retries:", self.max_retries_spin)
 
         save_changes_button = QPushButton("Save Changes to Selected Profile")
         save_changes_button.clicked.connect(self.save_current_profile_details)
@@ -204,6 +224,10 @@ class ProfileManagerDialog(QDialog):
             
             self.endpoint_url_edit.setText(profile.get("endpoint_url", ""))
             self.default_bucket_edit.setText(profile.get("default_s3_bucket", ""))
+            self.min_workers_spin.setValue(profile.get("min_workers", DEFAULT_MIN_WORKERS))
+            self.max_workers_spin.setValue(profile.get("max_workers", DEFAULT_MAX_WORKERS))
+            max_retries = profile.get("max_retries")
+            self.max_retries_spin.setValue(MAX_RETRIES_USE_DEFAULTS if max_retries is None else max_retries)
         else:
             self.clear_details_form()
 
@@ -218,6 +242,10 @@ class ProfileManagerDialog(QDialog):
             self.endpoint_url_edit.clear() 
         if hasattr(self, 'default_bucket_edit'):
             self.default_bucket_edit.clear()
+        if hasattr(self, 'min_workers_spin'):
+            self.min_workers_spin.setValue(DEFAULT_MIN_WORKERS)
+            self.max_workers_spin.setValue(DEFAULT_MAX_WORKERS)
+            self.max_retries_spin.setValue(MAX_RETRIES_USE_DEFAULTS)
 
 
     def add_profile(self):
@@ -320,17 +348,28 @@ class ProfileManagerDialog(QDialog):
         if not region:
             QMessageBox.warning(self, "Input Error", "Default Region is required.")
             return
+        if self.min_workers_spin.value() > self.max_workers_spin.value():
+            QMessageBox.warning(self, "Input Error", "Min Workers cannot be greater than Max Workers.")
+            return
 
         self.profiles_data[profile_name] = {
+            **self.profiles_data.get(profile_name, {}), # Keep settings edited elsewhere
             "aws_access_key_id": access_key,
             "aws_secret_access_key": secret_key,
             "aws_default_region": region,
             "endpoint_url": endpoint_url,
-            "default_s3_bucket": self.default_bucket_edit.text().strip()
+            "default_s3_bucket": self.default_bucket_edit.text().strip(),
+            "min_workers": self.min_workers_spin.value(),
+            "max_workers": self.max_workers_spin.value(),
+            "max_retries": self._max_retries_from_form()
         }
         QMessageBox.information(self, "Profile Saved", f"Details for profile '{profile_name}' saved locally. Click OK to apply changes to the application.")
         self.populate_profiles_list() 
 
+    def _max_retries_from_form(self):
+        value = self.max_retries_spin.value()
+        return None if value == MAX_RETRIES_USE_DEFAULTS else value
+
     def get_profiles_data(self):
         # Called when OK is clicked on the main dialog
         # Ensure the currently displayed (and potentially unsaved) details are saved if a profile is selected
@@ -351,11 +390,18 @@ class ProfileManagerDialog(QDialog):
                     "aws_secret_access_key": self.secret_key_edit.text(),
                     "aws_default_region": self.region_combo.currentText().strip(),
                     "endpoint_url": self.endpoint_url_edit.text().strip(), 
-                    "default_s3_bucket": self.default_bucket_edit.text().strip()
+                    "default_s3_bucket": self.default_bucket_edit.text().strip(),
+                    "min_workers": self.min_workers_spin.value(),
+                    "max_workers": self.max_workers_spin.value(),
+                    "max_retries": self._max_retries_from_form()
                 }
                 
-                fields_to_compare = ["aws_access_key_id", "aws_secret_access_key", "aws_default_region", "endpoint_url", "default_s3_bucket"]
-                if any(stored_data.get(k) != form_data.get(k) for k in fields_to_compare):
+                fields_to_compare = ["aws_access_key_id", "aws_secret_access_key", "aws_default_region", "endpoint_url", "default_s3_bucket",
+                                     "max_retries"]
+                # Older profiles don't store worker bounds; compare against the defaults shown in the form
+                workers_changed = stored_data.get("min_workers", DEFAULT_MIN_WORKERS) != form_data["min_workers"] or \
+                                  stored_data.get("max_workers", DEFAULT_MAX_WORKERS) != form_data["max_workers"]
+                if workers_changed or any(stored_data.get(k) != form_data.get(k) for k in fields_to_compare):
                     reply = QMessageBox.question(self, "Unsaved Changes",
                                                  f"You have unsaved changes for profile '{current_profile_name_in_form}'. Save them now?",
                                                  QMessageBox.StandardButton.Save | QMessageBox.StandardButton.Discard | QMessageBox.StandardButton.Cancel,
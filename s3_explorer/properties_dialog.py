@@ -4,7 +4,9 @@ from PyQt6.QtWidgets import (
     QApplication
 )
 from PyQt6.QtCore import Qt
-from datetime import datetime
+from datetime import datetime, timezone
+
+from s3ops.S3Operation import S3Operation, S3OpType
 
 def format_datetime_for_display(dt_obj):
     if isinstance(dt_obj, datetime):
@@ -12,9 +14,10 @@ def format_datetime_for_display(dt_obj):
     return str(dt_obj)
 
 class PropertiesDialog(QDialog):
-    def __init__(self, s3_client, bucket_name, s3_key, is_folder, item_name, parent=None):
+    def __init__(self, s3_client, bucket_name, s3_key, is_folder, item_name, parent=None, operation_manager_ref=None):
         super().__init__(parent)
         self.s3_client = s3_client
+        self.operation_manager = operation_manager_ref # If set, HEAD goes through the interactive lane instead of blocking the GUI
         self.bucket_name = bucket_name
         self.s3_key = s3_key
         self.is_folder = is_folder
@@ -58,6 +61,18 @@ class PropertiesDialog(QDialog):
             general_layout.addRow("ETag:", self.etag_label)
             general_layout.addRow("Storage Class:", self.storage_class_label)
             general_layout.addRow("Server-Side Encryption:", self.encryption_label)
+        else:
+            # Recursive totals, from one background listing of everything below the folder (S3FolderSummaries)
+            self.size_label = QLineEdit("Calculating...")
+            self.size_label.setReadOnly(True)
+            self.object_count_label = QLineEdit("Calculating...")
+            self.object_count_label.setReadOnly(True)
+            self.last_modified_label = QLineEdit("Calculating...")
+            self.last_modified_label.setReadOnly(True)
+
+            general_layout.addRow("Size:", self.size_label)
+            general_layout.addRow("Objects:", self.object_count_label)
+            general_layout.addRow("Last Modified:", self.last_modified_label)
         
         self.tab_widget.addTab(general_tab, "General")
 
@@ -88,54 +103,104 @@ class PropertiesDialog(QDialog):
 
     def load_properties(self):
         if self.is_folder:
-            # For folders, most detailed properties aren't directly available from a single call
-            # We might show number of items or total size if we decide to calculate it (can be slow)
+            if not self.operation_manager:
+                for label in (self.size_label, self.object_count_label, self.last_modified_label):
+                    label.setText("Not available")
+                return
+            summary = self.operation_manager.request_folder_summary(self.bucket_name, self.s3_key, self, urgent=True)
+            if summary is not None:
+                self._apply_folder_summary(summary)
             return
 
         if not self.s3_client:
             self.size_label.setText("Error: S3 client not available")
             return
 
+        if self.operation_manager:
+            head_op = S3Operation(S3OpType.HEAD_OBJECT, self.bucket_name, key=self.s3_key,
+                                  callback_data={'properties_dialog_ref': self, 'include_acl': hasattr(self, 'acl_text_edit')})
+            self.operation_manager.enqueue_s3_operation(head_op)
+            return
+
         try:
             head = self.s3_client.head_object(Bucket=self.bucket_name, Key=self.s3_key)
-            
-            # Update General Tab
-            size_bytes = head.get('ContentLength', 0)
-            # Re-use format_size from main app if possible, or define locally
-            self.size_label.setText(f"{size_bytes} bytes ({self.format_bytes(size_bytes)})")
-            self.last_modified_label.setText(format_datetime_for_display(head.get('LastModified')))
-            self.etag_label.setText(head.get('ETag', '').strip('"'))
-            self.storage_class_label.setText(head.get('StorageClass', 'STANDARD'))
-            self.encryption_label.setText(head.get('ServerSideEncryption', 'None'))
-            
-            file_type_ext = self.s3_key.split('.')[-1] if '.' in self.s3_key else "Unknown"
-            mime_type = head.get('ContentType', 'application/octet-stream')
-            self.type_label.setText(f"File ({mime_type})")
-
-
-            # Load ACLs for Permissions Tab
+            acl, acl_error = None, None
             if hasattr(self, 'acl_text_edit'):
                 try:
                     acl = self.s3_client.get_object_acl(Bucket=self.bucket_name, Key=self.s3_key)
-                    acl_str = f"Owner: {acl['Owner']['DisplayName']} (ID: {acl['Owner']['ID']})\n\nGrants:\n"
-                    for grant in acl['Grants']:
-                        grantee = grant['Grantee']
-                        grantee_type = grantee['Type']
-                        grantee_id = grantee.get('ID', 'N/A')
-                        grantee_display = grantee.get('DisplayName') or grantee.get('URI', grantee_id)
-                        permission = grant['Permission']
-                        acl_str += f"  - Grantee: {grantee_display} ({grantee_type})\n"
-                        acl_str += f"    Permission: {permission}\n"
-                    self.acl_text_edit.setText(acl_str)
                 except Exception as e_acl:
-                    self.acl_text_edit.setText(f"Error loading ACLs: {e_acl}\n\nThis might be due to permissions (s3:GetObjectAcl required).")
-
+                    acl_error = str(e_acl)
+            self._apply_head_result(head, acl, acl_error)
         except Exception as e:
-            error_text = f"Error loading properties: {e}"
-            if hasattr(self, 'size_label'): self.size_label.setText(error_text)
-            if hasattr(self, 'last_modified_label'): self.last_modified_label.setText("")
-            # ... and for other fields
-            QApplication.instance().main_window.status_bar.showMessage(f"Error fetching properties: {e}", 5000)
+            self._show_load_error(e)
+
+    def on_head_object_finished(self, result, error_message):
+        # Called by OperationManager (GUI thread) when the queued HEAD_OBJECT completes
+        if error_message or not result:
+            self._show_load_error(error_message or "No result")
+            return
+        self._apply_head_result(result.get("head", {}), result.get("acl"), result.get("acl_error"))
+
+    def on_folder_summary_ready(self, bucket, summaries, error_message):
+        # Called by OperationManager (GUI thread) when the queued SUMMARIZE_PREFIX completes
+        folder_prefix = self.s3_key if self.s3_key.endswith('/') else self.s3_key + '/'
+        summary = summaries.get(folder_prefix)
+        if error_message or summary is None:
+            self._show_load_error(error_message or "No result")
+            self.object_count_label.setText("")
+            return
+        self._apply_folder_summary(summary)
+
+    def _apply_folder_summary(self, summary):
+        self.size_label.setText(f"{summary.total_bytes} bytes ({self.format_bytes(summary.total_bytes)})")
+        self.object_count_label.setText(f"{summary.object_count:,} (including subfolders)")
+        self.last_modified_label.setText(
+            format_datetime_for_display(datetime.fromtimestamp(summary.newest_mtime, timezone.utc))
+            if summary.newest_mtime is not None else "")
+
+    def done(self, result):
+        if self.is_folder and self.operation_manager: # Nobody to show the totals to; a summary still running is cached anyway
+            self.operation_manager.forget_folder_summary_requester(self)
+        super().done(result)
+
+    def _apply_head_result(self, head, acl, acl_error):
+        # Update General Tab
+        size_bytes = head.get('ContentLength', 0)
+        # Re-use format_size from main app if possible, or define locally
+        self.size_label.setText(f"{size_bytes} bytes ({self.format_bytes(size_bytes)})")
+        self.last_modified_label.setText(format_datetime_for_display(head.get('LastModified')))
+        self.etag_label.setText(head.get('ETag', '').strip('"'))
+        self.storage_class_label.setText(head.get('StorageClass', 'STANDARD'))
+        self.encryption_label.setText(head.get('ServerSideEncryption', 'None'))
+        
+        mime_type = head.get('ContentType', 'application/octet-stream')
+        self.type_label.setText(f"File ({mime_type})")
+
+        # Load ACLs for Permissions Tab
+        if hasattr(self, 'acl_text_edit'):
+            if acl_error or not acl:
+                self.acl_text_edit.setText(f"Error loading ACLs: {acl_error}\n\nThis might be due to permissions (s3:GetObjectAcl required).")
+                return
+            try:
+                acl_str = f"Owner: {acl['Owner']['DisplayName']} (ID: {acl['Owner']['ID']})\n\nGrants:\n"
+                for grant in acl['Grants']:
+                    grantee = grant['Grantee']
+                    grantee_type = grantee['Type']
+                    grantee_id = grantee.get('ID', 'N/A')
+                    grantee_display = grantee.get('DisplayName') or grantee.get('URI', grantee_id)
+                    permission = grant['Permission']
+                    acl_str += f"  - Grantee: {grantee_display} ({grantee_type})\n"
+                    acl_str += f"    Permission: {permission}\n"
+                self.acl_text_edit.setText(acl_str)
+            except Exception as e_acl:
+                self.acl_text_edit.setText(f"Error loading ACLs: {e_acl}\n\nThis might be due to permissions (s3:GetObjectAcl required).")
+
+    def _show_load_error(self, e):
+        error_text = f"Error loading properties: {e}"
+        if hasattr(self, 'size_label'): self.size_label.setText(error_text)
+        if hasattr(self, 'last_modified_label'): self.last_modified_label.setText("")
+        # ... and for other fields
+        QApplication.instance().main_window.status_bar.showMessage(f"Error fetching properties: {e}", 5000)
 
 
     def format_bytes(self, size_bytes): # Local copy for dialog independence
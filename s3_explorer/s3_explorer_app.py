@@ -40,11 +40,17 @@ from credentials_dialog import CredentialsDialog
 from profile_manager_dialog import ProfileManagerDialog
 from mount_config_dialog import MountConfigDialog
 from properties_dialog import PropertiesDialog 
+from transfers_panel import TransfersPanel
+from metrics_panel import MetricsPanel
+from search_panel import SearchPanel
+from bandwidth_dialog import BandwidthDialog
+from s3ops.S3RateLimiter import get_rate_limiter
+from s3ops.S3FileTypes import get_file_type_registry
 from help_menu.help_dialogs import show_keyboard_shortcuts, show_about_dialog
 
 from s3ops.S3Operation import S3Operation, S3OpType
 # S3OperationWorker is used by OperationManager
-from s3ops.S3TabContentWidget import S3TabContentWidget, COL_NAME, COL_TYPE, COL_SIZE, COL_MODIFIED, COL_S3_KEY, COL_IS_FOLDER
+from s3ops.S3TabContentWidget import S3TabContentWidget, COL_NAME, COL_TYPE, COL_SIZE, COL_MODIFIED, COL_S3_KEY, COL_IS_FOLDER, format_size
 from zip_worker import ZipFolderWorker
 from download_worker import DownloadFolderWorker
 
@@ -54,6 +60,8 @@ from handler.operation_handler import OperationManager
 from handler.favorites_handler import FavoritesManager
 from handler.temp_file_handler import TempFileManager
 from handler.mount_handler import MountManager
+from handler.journal_handler import OperationJournal
+from handler.search_index_handler import SearchIndex
 from handler.live_edit_handler import LiveEditFileChangeHandler
 from handler.sharable_link import generate_shareable_s3_link
 
@@ -134,16 +142,27 @@ class S3Explorer(QMainWindow):
         self.S3_TRASH_PREFIX = S3_TRASH_PREFIX
 
         self.settings = QSettings("MyCompany", "S3ExplorerApp_Tabbed_v3_1")
+        file_type_registry = get_file_type_registry()
+        file_type_registry.set_use_native_icons(self.settings.value("native_file_icons", False, type=bool))
+        file_type_registry.preload() # Icons for the first listing; the rest load as rows of their type are painted
         
         # Initialize Managers/Handlers
         # Order matters for dependencies
         self.profile_manager = ProfileManager(APP_DATA_DIR, parent=self)
         self.temp_file_manager = TempFileManager(parent=self)
-        self.operation_manager = OperationManager(parent_widget=self, temp_file_manager_ref=self.temp_file_manager)
+        self.operation_journal = OperationJournal(APP_DATA_DIR, parent=self)
+        if self.operation_journal.open():
+            self.operation_journal.purge_finished_batches()
+        self.search_index = SearchIndex(APP_DATA_DIR, profile_client_provider=self.profile_manager.get_client_for_profile, parent=self)
+        self.search_index.open() # Optional: without it searching finds nothing, everything else works
+        self.operation_manager = OperationManager(parent_widget=self, temp_file_manager_ref=self.temp_file_manager,
+                                                  journal_ref=self.operation_journal, search_index_ref=self.search_index,
+                                                  profile_client_provider=self.profile_manager.get_client_for_profile)
+        self.operation_manager.folder_summaries_enabled = self.settings.value("folder_sizes", True, type=bool)
         self.favorites_manager = FavoritesManager(APP_DATA_DIR, parent=self)
         self.mount_manager = MountManager(APP_DATA_DIR, parent=self)
 
-        self.s3_clipboard = None # {'type', 'source_bucket', 'keys', 'is_folder'}
+        self.s3_clipboard = None # {'type', 'source_bucket', 'keys', 'is_folder', 'source_profile'}
         self.tab_widget = None # UI element, initialized in init_ui
         self.add_fav_action_fixed = None # For fixed menu item
 
@@ -166,6 +185,7 @@ class S3Explorer(QMainWindow):
         self.profile_manager.s3_client_init_failed.connect(self.rebuild_favorites_menu)
 
         self.operation_manager.request_status_bar_message.connect(self.update_status_bar_message_slot)
+        self.operation_manager.concurrency_changed.connect(self.update_concurrency_status_label)
         # Connect to specific operation completion signals from OperationManager
         self.operation_manager.download_to_temp_op_completed.connect(self.on_op_mgr_download_to_temp_finished)
         self.operation_manager.upload_op_completed.connect(self.on_op_mgr_upload_finished)
@@ -173,9 +193,12 @@ class S3Explorer(QMainWindow):
         self.operation_manager.download_file_op_completed.connect(self.on_op_mgr_download_file_finished)
         self.operation_manager.create_folder_op_completed.connect(self.on_op_mgr_create_folder_finished)
         self.operation_manager.copy_object_op_completed.connect(self.on_op_mgr_copy_object_finished)
+        self.operation_manager.move_prefix_op_completed.connect(self.on_op_mgr_move_prefix_finished)
         self.operation_manager.list_op_completed.connect(self.on_op_mgr_list_op_completed) # For any global actions after list
 
         self.operation_manager.batch_processing_finished.connect(self.on_batch_operation_complete_from_op_mgr)
+        self.operation_manager.change_set_ready.connect(self.apply_change_set_to_views) # Open tabs patch their rows
+        self.operation_manager.batch_planning_error.connect(self.on_batch_planning_error)
         # self.operation_manager.batch_processing_update # If S3Explorer needs to react to individual batch item progress
 
         self.favorites_manager.favorites_updated.connect(self.rebuild_favorites_menu)
@@ -243,6 +266,17 @@ class S3Explorer(QMainWindow):
         if hasattr(self, 'status_bar'):
             self.status_bar.showMessage(message, timeout)
 
+    @pyqtSlot(int, float, float)
+    def update_concurrency_status_label(self, worker_count, ops_per_sec, bytes_per_sec):
+        if not hasattr(self, 'concurrency_status_label'): return
+        controller = self.operation_manager.concurrency_controller
+        text = f"Workers: {worker_count} ({controller.min_workers}-{controller.max_workers})"
+        if ops_per_sec > 0:
+            text += f" | {ops_per_sec:.1f} ops/s | {format_size(int(bytes_per_sec))}/s"
+        if controller.retries_in_last_window:
+            text += f" | {controller.retries_in_last_window} retries"
+        self.concurrency_status_label.setText(text)
+
     @pyqtSlot(object, str) # s3_client, profile_name
     def on_s3_client_initialized(self, s3_client_instance, profile_name):
         print(f"S3EXPLORER: S3 client initialized for profile '{profile_name}'.")
@@ -250,7 +284,10 @@ class S3Explorer(QMainWindow):
         self.update_status_bar_message_slot(f"Connected with profile: {profile_name}", 3000)
 
         # Update managers that depend on s3_client
-        self.operation_manager.set_s3_client(s3_client_instance)
+        active_profile_data = self.profile_manager.get_profile_data(profile_name) or {}
+        self.operation_manager.set_worker_pool_bounds(active_profile_data.get("min_workers"), active_profile_data.get("max_workers"))
+        self.operation_manager.set_max_retries(active_profile_data.get("max_retries"))
+        self.operation_manager.set_s3_client(s3_client_instance, profile_name)
         self.mount_manager.set_dependencies(s3_client_instance, 
                                             self.operation_manager.s3_operation_queue, # Pass queue ref
                                             self) # Pass main window ref
@@ -263,11 +300,48 @@ class S3Explorer(QMainWindow):
 
         if not self.modified_check_timer.isActive():
             self.modified_check_timer.start(30000) # Check every 30s for modified temp files
+        self.search_index.recrawl_due_buckets(profile_name) # Resumes interrupted crawls, refreshes old indexes
+        # Favorites open without waiting for S3 (low priority, after the default tab's own LIST)
+        self.operation_manager.listing_prefetcher.prefetch_many(
+            (favorite['bucket'], favorite.get('prefix', '').strip('/')) for favorite in self.favorites_manager.get_favorites())
 
         self.update_profile_combo_display()
         self.update_tab_widget_placeholder() # Ensure placeholder is removed
         self.update_navigation_buttons_state()
 
+        # Offer to resume batches a crash/forced quit left unfinished (after the window has settled)
+        QTimer.singleShot(0, lambda: self.offer_resume_unfinished_batches(profile_name))
+
+    def offer_resume_unfinished_batches(self, profile_name):
+        unfinished_batches = self.operation_journal.get_unfinished_batches(profile_name)
+        if not unfinished_batches: return
+
+        summary_lines = [f"- {b['op_type_display']}: {b['remaining']} of {b['total']} item(s) remaining"
+                         f"{' (listing was interrupted, re-run it for the rest)' if b['extra'].get('planning_incomplete') else ''}"
+                         for b in unfinished_batches[:10]]
+        if len(unfinished_batches) > 10: summary_lines.append(f"... and {len(unfinished_batches) - 10} more")
+        reply = QMessageBox.question(self, "Resume Unfinished Operations",
+                                     "The following operations did not finish last time:\n\n" + "\n".join(summary_lines) +
+                                     "\n\nResume them now? Items that already completed will be skipped.",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.Yes)
+        for batch in unfinished_batches:
+            batch_id = batch['batch_id']
+            if reply != QMessageBox.StandardButton.Yes:
+                self.operation_journal.record_batch_finished(batch_id, OperationJournal.BATCH_ABANDONED)
+                continue
+            pending_ops = self.operation_journal.load_pending_operations(batch_id)
+            if not pending_ops: # Everything was done, only the batch row was left open
+                self.operation_journal.record_batch_finished(batch_id, OperationJournal.BATCH_DONE)
+                continue
+            if batch['extra'].pop('planning_incomplete', False):
+                # The listing was interrupted: only what was listed is journaled, so never treat the batch as complete
+                batch['extra']['planning_error'] = "Listing was interrupted before the restart."
+            print(f"S3Explorer: Resuming batch '{batch_id}' with {len(pending_ops)} remaining operation(s).")
+            self.operation_manager.start_batch_operation(batch_id, batch['total'], f"{batch['op_type_display']} (resumed)",
+                                                         pending_ops, batch['extra'],
+                                                         already_completed=batch['total'] - len(pending_ops))
+
     @pyqtSlot(str, str) # profile_name, error_message
     def on_s3_client_init_failed(self, profile_name, error_message):
         print(f"S3EXPLORER: S3 client initialization FAILED for profile '{profile_name}'. Error: {error_message}")
@@ -378,6 +452,45 @@ class S3Explorer(QMainWindow):
         self.paste_action = QAction(QIcon.fromTheme("edit-paste", self.style().standardIcon(QStyle.StandardPixmap.SP_DialogApplyButton)), "&Paste to S3", self); self.paste_action.setShortcut(QKeySequence.StandardKey.Paste); self.paste_action.triggered.connect(self.handle_paste_s3_items); edit_menu.addAction(self.paste_action)
         self.update_edit_actions_state() 
 
+        # Transfers panel (dockable, hidden until opened from View > Transfers or restored from the saved window state)
+        self.transfers_panel = TransfersPanel(self.operation_manager, self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.transfers_panel)
+        self.transfers_panel.hide()
+        view_menu = menubar.addMenu("&View")
+        transfers_toggle_action = self.transfers_panel.toggleViewAction()
+        transfers_toggle_action.setShortcut(QKeySequence("Ctrl+J"))
+        view_menu.addAction(transfers_toggle_action)
+        # Debug / Metrics panel (request latency, retries and status codes collected by the botocore hooks)
+        self.metrics_panel = MetricsPanel(self)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.metrics_panel)
+        self.metrics_panel.hide()
+        metrics_toggle_action = self.metrics_panel.toggleViewAction()
+        metrics_toggle_action.setShortcut(QKeySequence("Ctrl+Shift+M"))
+        view_menu.addAction(metrics_toggle_action)
+        # Search panel (names from the local bucket index, filled by a background crawler)
+        self.search_panel = SearchPanel(self.search_index, self)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.search_panel)
+        self.search_panel.hide()
+        search_toggle_action = self.search_panel.toggleViewAction()
+        search_toggle_action.setShortcut(QKeySequence("Ctrl+F"))
+        view_menu.addAction(search_toggle_action)
+        view_menu.addSeparator()
+        load_all_items_action = QAction("Load All Items", self)
+        load_all_items_action.setShortcut(QKeySequence("Ctrl+Shift+L"))
+        load_all_items_action.triggered.connect(self.load_all_items_in_active_tab)
+        view_menu.addAction(load_all_items_action)
+        native_icons_action = QAction("Native File Icons", self)
+        native_icons_action.setCheckable(True)
+        native_icons_action.setChecked(get_file_type_registry().use_native_icons)
+        native_icons_action.toggled.connect(self.set_native_file_icons)
+        view_menu.addAction(native_icons_action)
+        folder_sizes_action = QAction("Folder Sizes", self)
+        folder_sizes_action.setCheckable(True)
+        folder_sizes_action.setChecked(self.operation_manager.folder_summaries_enabled)
+        folder_sizes_action.setToolTip("Total size and newest change of folders on screen (lists each folder recursively in the background)")
+        folder_sizes_action.toggled.connect(self.set_folder_sizes_enabled)
+        view_menu.addAction(folder_sizes_action)
+
         settings_menu = menubar.addMenu("&Settings")
         open_trash_action = QAction(QIcon.fromTheme("user-trash"), "Open S3 Trash", self)
         open_trash_action.triggered.connect(self.open_s3_trash_view)
@@ -388,6 +501,9 @@ class S3Explorer(QMainWindow):
         configure_mounts_action = QAction("Configure S3 Mounts...", self); 
         configure_mounts_action.triggered.connect(self.show_mount_config_dialog); 
         settings_menu.addAction(configure_mounts_action)
+        bandwidth_limits_action = QAction("Bandwidth Limits...", self)
+        bandwidth_limits_action.triggered.connect(self.show_bandwidth_dialog)
+        settings_menu.addAction(bandwidth_limits_action)
         check_update_action = QAction("Check for Updates", self)
         check_update_action.triggered.connect(lambda: self.check_for_updates(show_no_update_dialog=True))
         settings_menu.addAction(check_update_action)
@@ -467,6 +583,8 @@ class S3Explorer(QMainWindow):
 
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        self.concurrency_status_label = QLabel("Workers: -")
+        self.status_bar.addPermanentWidget(self.concurrency_status_label)
         self.update_status_bar_message_slot("Ready", 0)
         
         self.update_tab_widget_placeholder() # Initial placeholder if no client
@@ -531,6 +649,8 @@ class S3Explorer(QMainWindow):
                 widget_to_close.breadcrumb_bar_widget.setParent(None)
             if hasattr(widget_to_close, 'path_edit') and widget_to_close.path_edit.parent() == self.active_tab_nav_container:
                 widget_to_close.path_edit.setParent(None)
+            if isinstance(widget_to_close, S3TabContentWidget):
+                self.operation_manager.forget_folder_summary_requester(widget_to_close)
             widget_to_close.deleteLater()
 
         if self.tab_widget.count() == 0:
@@ -836,6 +956,7 @@ class S3Explorer(QMainWindow):
         self.webdav_thread = threading.Thread(
             target=start_webdav,
             args=(mount_path, access_key, secret_key, region, endpoint, bucket),
+            kwargs={"limiter": self.operation_manager.rate_limiter},
             daemon=True
         )
         self.webdav_thread.start()
@@ -867,11 +988,8 @@ class S3Explorer(QMainWindow):
         selected_indexes = active_tab.tree_view.selectionModel().selectedRows(COL_S3_KEY)
         if len(selected_indexes) == 1:
             row = selected_indexes[0].row()
-            s3_key_item = active_tab.model.item(row, COL_S3_KEY) # Get QStandardItem
-            is_folder_item = active_tab.model.item(row, COL_IS_FOLDER) # Get QStandardItem
-
-            if s3_key_item and is_folder_item and is_folder_item.text() == "0": # It's a file
-                current_selected_s3_key = s3_key_item.text()
+            if not active_tab.model.is_folder_at(row): # It's a file
+                current_selected_s3_key = active_tab.model.key_at(row)
                 if current_selected_s3_key == s3_key_changed:
                     # The S3 key of the currently selected file matches the key from the signal.
                     # Use the 'is_modified_from_signal' value directly.
@@ -908,11 +1026,8 @@ class S3Explorer(QMainWindow):
             selected_indexes = active_tab.tree_view.selectionModel().selectedRows(COL_S3_KEY)
             if len(selected_indexes) == 1:
                 row = selected_indexes[0].row()
-                s3_key_item = active_tab.model.item(row, COL_S3_KEY)
-                is_folder_item = active_tab.model.item(row, COL_IS_FOLDER)
-
-                if s3_key_item and is_folder_item and is_folder_item.text() == "0":
-                    s3_key = s3_key_item.text()
+                if not active_tab.model.is_folder_at(row):
+                    s3_key = active_tab.model.key_at(row)
                     file_data = self.temp_file_manager.get_temp_file_data(s3_key)
                     print(f"  Checking selected file for save state: {s3_key}, bucket: {active_tab.current_bucket}")
                     if file_data and file_data['s3_bucket'] == active_tab.current_bucket:
@@ -962,7 +1077,8 @@ class S3Explorer(QMainWindow):
             return
         keys, is_folder, _ = active_tab.get_selected_s3_items_info_tab()
         if keys:
-            self.s3_clipboard = {'type': 'copy', 'source_bucket': active_tab.current_bucket, 'keys': keys, 'is_folder': is_folder}
+            self.s3_clipboard = {'type': 'copy', 'source_bucket': active_tab.current_bucket, 'keys': keys, 'is_folder': is_folder,
+                                 'source_profile': self.profile_manager.get_active_profile_name()} # Survives a profile switch
             self.update_status_bar_message_slot(f"{len(keys)} item(s) copied to S3 clipboard.", 3000)
             self.update_edit_actions_state()
 
@@ -973,7 +1089,8 @@ class S3Explorer(QMainWindow):
             return
         keys, is_folder, _ = active_tab.get_selected_s3_items_info_tab()
         if keys:
-            self.s3_clipboard = {'type': 'cut', 'source_bucket': active_tab.current_bucket, 'keys': keys, 'is_folder': is_folder}
+            self.s3_clipboard = {'type': 'cut', 'source_bucket': active_tab.current_bucket, 'keys': keys, 'is_folder': is_folder,
+                                 'source_profile': self.profile_manager.get_active_profile_name()}
             self.update_status_bar_message_slot(f"{len(keys)} item(s) cut (for move).", 3000)
             self.update_edit_actions_state()
 
@@ -988,6 +1105,14 @@ class S3Explorer(QMainWindow):
         source_keys_clip = self.s3_clipboard['keys']
         source_is_folder_flags_clip = self.s3_clipboard['is_folder']
         operation_mode = self.s3_clipboard['type']
+        # Copied under another profile (e.g. MinIO -> AWS): list with that profile's client, workers stream the bytes across
+        source_profile_clip = self.s3_clipboard.get('source_profile')
+        if source_profile_clip == self.profile_manager.get_active_profile_name(): source_profile_clip = None
+        if source_profile_clip:
+            try:
+                s3_client = self.profile_manager.get_client_for_profile(source_profile_clip)
+            except ValueError as e:
+                QMessageBox.warning(self, "Paste Error", f"Cannot read from profile '{source_profile_clip}': {e}"); return
         
         dest_bucket_current_tab = active_tab.current_bucket
         dest_path_prefix_current_tab = active_tab.current_path + ('/' if active_tab.current_path and not active_tab.current_path.endswith('/') else '')
@@ -996,67 +1121,82 @@ class S3Explorer(QMainWindow):
         
         batch_op_type_str = "Copying" if operation_mode == 'copy' else "Moving"
         current_batch_id = f"{batch_op_type_str.lower()}_{time.time()}"
+        if source_profile_clip: batch_op_type_str += f" from profile '{source_profile_clip}'"
         
-        items_to_process_for_batch = []
-        try:
-            for i, top_src_full_key in enumerate(source_keys_clip):
-                top_src_is_folder = source_is_folder_flags_clip[i]
-                top_src_base_name = os.path.basename(top_src_full_key.rstrip('/'))
-
-                if top_src_is_folder:
-                    list_prefix = top_src_full_key if top_src_full_key.endswith('/') else top_src_full_key + '/'
-                    paginator = s3_client.get_paginator('list_objects_v2')
-                    all_objects_in_source_folder = []
-                    for page in paginator.paginate(Bucket=source_bucket_clip, Prefix=list_prefix):
-                        all_objects_in_source_folder.extend(obj['Key'] for obj in page.get('Contents', []))
-
-                    if not all_objects_in_source_folder: # Empty source folder
-                        dest_folder_key = dest_path_prefix_current_tab + top_src_base_name + '/'
-                        op = S3Operation(S3OpType.CREATE_FOLDER, dest_bucket_current_tab, key=dest_folder_key)
-                        items_to_process_for_batch.append(op)
-                    else:
-                        for src_obj_key in all_objects_in_source_folder:
-                            relative_path = src_obj_key[len(list_prefix):]
-                            dest_obj_key = dest_path_prefix_current_tab + top_src_base_name + '/' + relative_path
-                            if src_obj_key == dest_obj_key and source_bucket_clip == dest_bucket_current_tab: continue
-                            
-                            cb_data = {}
-                            if source_bucket_clip != dest_bucket_current_tab: cb_data["source_bucket_override"] = source_bucket_clip
-                            op = S3Operation(S3OpType.COPY_OBJECT, dest_bucket_current_tab, key=src_obj_key, new_key=dest_obj_key, 
-                                             is_part_of_move=(operation_mode == 'cut'),
-                                             original_source_key_for_move=src_obj_key if operation_mode == 'cut' else None,
-                                             callback_data=cb_data)
-                            items_to_process_for_batch.append(op)
-                else: # Single file
-                    dest_file_key = dest_path_prefix_current_tab + top_src_base_name
-                    if top_src_full_key == dest_file_key and source_bucket_clip == dest_bucket_current_tab: continue
-                    
-                    cb_data = {}
-                    if source_bucket_clip != dest_bucket_current_tab: cb_data["source_bucket_override"] = source_bucket_clip
-                    op = S3Operation(S3OpType.COPY_OBJECT, dest_bucket_current_tab, key=top_src_full_key, new_key=dest_file_key,
-                                     is_part_of_move=(operation_mode == 'cut'),
-                                     original_source_key_for_move=top_src_full_key if operation_mode == 'cut' else None,
-                                     callback_data=cb_data)
-                    items_to_process_for_batch.append(op)
-        except Exception as e:
-            QMessageBox.warning(self, "Paste Error", f"Could not prepare paste operation (e.g., list source folder '{top_src_full_key}'): {e}")
-            active_tab.tree_view.setEnabled(True)
-            return
-
-        if not items_to_process_for_batch:
-            QMessageBox.information(self, "Paste", "No items to paste.")
-            active_tab.tree_view.setEnabled(True)
-            return
-
         extra_batch_data = {
             'is_cut_operation': (operation_mode == 'cut'),
-            'original_top_level_sources_for_cut': list(zip(source_keys_clip, source_is_folder_flags_clip)) if operation_mode == 'cut' else [],
             'target_tab_ref': active_tab, 
             'target_bucket': dest_bucket_current_tab,
-            'source_bucket_for_cut_cleanup': source_bucket_clip if operation_mode == 'cut' else None
+            # Moved-from views (another profile's buckets are not shown in any tab)
+            'original_source_bucket_for_refresh': source_bucket_clip if operation_mode == 'cut' and not source_profile_clip else None
         }
-        self.operation_manager.start_batch_operation(current_batch_id, len(items_to_process_for_batch), 
-                                                     batch_op_type_str, items_to_process_for_batch, extra_batch_data)
+        # Source folders are listed page by page on a planner thread; copying starts with the first page
+        page_generator = self._iter_paste_operation_pages(s3_client, source_bucket_clip, source_keys_clip, source_is_folder_flags_clip,
+                                                          operation_mode, dest_bucket_current_tab, dest_path_prefix_current_tab,
+                                                          source_profile=source_profile_clip)
+        self.operation_manager.start_streaming_batch_operation(current_batch_id, batch_op_type_str, page_generator, extra_batch_data)
+
+    def _iter_paste_operation_pages(self, s3_client, source_bucket, source_keys, source_is_folder_flags, operation_mode,
+                                    dest_bucket, dest_path_prefix, source_profile=None):
+        """Yields the paste's COPY_OBJECT / CREATE_FOLDER / MOVE_PREFIX operations, one list per listing page (runs on an S3BatchPlanner thread).
+        With source_profile, s3_client is that profile's client and the copies stream between the two endpoints."""
+        same_endpoint_and_bucket = source_bucket == dest_bucket and not source_profile
+
+        def make_copy_op(src_key, dest_key, size=None):
+            cb_data = {}
+            if source_bucket != dest_bucket or source_profile: cb_data["source_bucket_override"] = source_bucket
+            if source_profile: cb_data["source_profile"] = source_profile # Worker streams get_object -> multipart upload
+            if size is not None: cb_data["source_size"] = size # Lets the worker pick multipart copy without a HEAD
+            return S3Operation(S3OpType.COPY_OBJECT, dest_bucket, key=src_key, new_key=dest_key,
+                               is_part_of_move=(operation_mode == 'cut'),
+                               original_source_key_for_move=src_key if operation_mode == 'cut' else None,
+                               callback_data=cb_data)
+
+        single_file_ops = []
+        for top_src_full_key, top_src_is_folder in zip(source_keys, source_is_folder_flags):
+            top_src_base_name = os.path.basename(top_src_full_key.rstrip('/'))
+
+            if top_src_is_folder and operation_mode == 'cut' and not source_profile: # MOVE_PREFIX is server-side, same endpoint only
+                # A cut folder is one MOVE_PREFIX: the worker lists, copies and bulk-deletes it (no listing here)
+                list_prefix = top_src_full_key if top_src_full_key.endswith('/') else top_src_full_key + '/'
+                dest_folder_key = dest_path_prefix + top_src_base_name + '/'
+                if list_prefix == dest_folder_key and source_bucket == dest_bucket: continue
+                cb_data = {'ui_source': 'paste_cut_folder'}
+                if source_bucket != dest_bucket: cb_data["source_bucket_override"] = source_bucket
+                yield [S3Operation(S3OpType.MOVE_PREFIX, dest_bucket, key=list_prefix, new_key=dest_folder_key, callback_data=cb_data)]
+            elif top_src_is_folder:
+                list_prefix = top_src_full_key if top_src_full_key.endswith('/') else top_src_full_key + '/'
+                paginator = s3_client.get_paginator('list_objects_v2')
+                source_folder_is_empty = True
+                for page in paginator.paginate(Bucket=source_bucket, Prefix=list_prefix):
+                    page_ops = []
+                    for obj in page.get('Contents', []):
+                        source_folder_is_empty = False
+                        src_obj_key = obj['Key']
+                        relative_path = src_obj_key[len(list_prefix):]
+                        dest_obj_key = dest_path_prefix + top_src_base_name + '/' + relative_path
+                        if src_obj_key == dest_obj_key and same_endpoint_and_bucket: continue
+                        page_ops.append(make_copy_op(src_obj_key, dest_obj_key, obj.get('Size')))
+                    yield page_ops
+
+                if source_folder_is_empty: # Empty source folder
+                    dest_folder_key = dest_path_prefix + top_src_base_name + '/'
+                    yield [S3Operation(S3OpType.CREATE_FOLDER, dest_bucket, key=dest_folder_key)]
+            else: # Single file
+                dest_file_key = dest_path_prefix + top_src_base_name
+                if top_src_full_key == dest_file_key and same_endpoint_and_bucket: continue
+                single_file_ops.append(make_copy_op(top_src_full_key, dest_file_key))
+                if len(single_file_ops) >= 1000:
+                    yield single_file_ops
+                    single_file_ops = []
+        yield single_file_ops
+
+    @pyqtSlot(str, str) # batch_id, error_message
+    def on_batch_planning_error(self, batch_id: str, error_message: str):
+        batch_data = self.operation_manager.get_active_batch_operation_data(batch_id) or {}
+        QMessageBox.warning(self, "Batch Listing Error",
+                            f"{batch_data.get('op_type_display', 'Operation')}: listing the source failed part way, "
+                            f"only the items listed so far are processed.\n\n{error_message}")
 
     @pyqtSlot(str) # batch_id
     def on_batch_operation_complete_from_op_mgr(self, batch_id: str):
@@ -1068,9 +1208,17 @@ class S3Explorer(QMainWindow):
         op_type_display = batch_data.get('op_type_display', "Operation") # Default display name
         completed_count = batch_data.get('completed', 0)
         failed_count = batch_data.get('failed', 0)
-        success_count = completed_count - failed_count
+        cancelled_count = batch_data.get('cancelled', 0)
+        success_count = completed_count - failed_count - cancelled_count
 
-        final_message = f"{op_type_display} complete. Successful: {success_count}, Failed: {failed_count}."
+        if cancelled_count:
+            final_message = f"{op_type_display} cancelled. Successful: {success_count}, Failed: {failed_count}, Cancelled: {cancelled_count}."
+        else:
+            final_message = f"{op_type_display} complete. Successful: {success_count}, Failed: {failed_count}."
+        if batch_data.get('retries'):
+            final_message += f" Retries: {batch_data['retries']}."
+        if batch_data.get('planning_error'):
+            final_message += " Listing the source did not finish, some items were not processed."
 
         target_tab_ref = batch_data.get('target_tab_ref') # Could be S3TabContentWidget or None
         
@@ -1081,50 +1229,11 @@ class S3Explorer(QMainWindow):
 
 
         # --- Specific logic for "cut" operations (paste after cut) ---
-        is_cut_operation = batch_data.get('is_cut_operation', False)
-        if is_cut_operation:
-            if failed_count == 0: # All items in the "cut" (which is a copy then delete) batch succeeded
-                original_top_sources = batch_data.get('original_top_level_sources_for_cut', [])
-                source_bucket_for_delete = batch_data.get('source_bucket_for_cut_cleanup')
-
-                if source_bucket_for_delete and original_top_sources:
-                    delete_ops_for_original_folders = []
-                    for orig_key, orig_is_folder in original_top_sources:
-                        if orig_is_folder: # Only original top-level FOLDERS need explicit DELETE_FOLDER here
-                                           # (individual files are deleted by worker if copy was part of move)
-                            folder_key_to_delete = orig_key if orig_key.endswith('/') else orig_key + '/'
-                            del_op = S3Operation(S3OpType.DELETE_FOLDER, source_bucket_for_delete, key=folder_key_to_delete,
-                                                 callback_data={"is_cleanup_delete": True, 
-                                                                "original_batch_id_for_cut": batch_id}) # Link back
-                            delete_ops_for_original_folders.append(del_op)
-                    
-                    if delete_ops_for_original_folders:
-                        cleanup_batch_id = f"cleanup_delete_after_cut_{time.time()}"
-                        cleanup_extra_data = {
-                            'target_tab_ref': target_tab_ref, # Pass along for UI updates after cleanup
-                            'original_source_bucket_for_refresh': source_bucket_for_delete,
-                            # Add any other context needed for when this cleanup batch finishes
-                        }
-                        print(f"S3Explorer: Cut operation successful, queueing cleanup batch '{cleanup_batch_id}' to delete original folders.")
-                        self.operation_manager.start_batch_operation(
-                            cleanup_batch_id, 
-                            len(delete_ops_for_original_folders),
-                            "Deleting original cut folders", 
-                            delete_ops_for_original_folders, 
-                            cleanup_extra_data
-                        )
-                        # Clear the S3 clipboard now that the primary move is done and cleanup is queued
-                        if self.s3_clipboard and self.s3_clipboard.get('type') == 'cut':
-                            self.s3_clipboard = None
-                            self.update_edit_actions_state()
-                        
-                        self.operation_manager.clear_batch_operation_data(batch_id) # Clear the original cut batch data
-                        return # IMPORTANT: Don't proceed further; wait for the cleanup batch to complete.
-            else: # Cut operation had failures
-                final_message += " Some items may not have been moved, and originals were not deleted."
-            
-            # Clear S3 clipboard for cut operations, regardless of success/failure of the main batch,
-            # if not already cleared (e.g., if no cleanup batch was started).
+        # Folders were moved by MOVE_PREFIX and files by COPY_OBJECT + delete, so nothing is left to clean up
+        if batch_data.get('is_cut_operation', False):
+            if failed_count or cancelled_count or batch_data.get('planning_error'):
+                final_message += " Some items may not have been moved; their originals were kept."
+            # Clear S3 clipboard for cut operations, regardless of success/failure of the batch
             if self.s3_clipboard and self.s3_clipboard.get('type') == 'cut':
                 self.s3_clipboard = None
                 self.update_edit_actions_state()
@@ -1133,39 +1242,11 @@ class S3Explorer(QMainWindow):
         self.update_status_bar_message_slot(final_message, 7000)
         self.operation_manager.clear_batch_operation_data(batch_id) # Clear the completed batch's data
 
-        # --- Refresh UI based on batch context ---
-        # For Drag-and-Drop or Paste operations, refresh the target tab
-        # batch_data would have 'target_bucket' and 'target_tab_ref'
-        # (and 'target_path_prefix' for drag-drop, though not explicitly used here for refresh,
-        # as populate_s3_view_tab uses tab's current_path)
-        if target_tab_ref and isinstance(target_tab_ref, S3TabContentWidget):
-            target_bucket_from_batch = batch_data.get('target_bucket')
-            if target_tab_ref.current_bucket == target_bucket_from_batch:
-                print(f"S3Explorer: Batch '{batch_id}' ({op_type_display}) complete. Refreshing target tab: "
-                      f"s3://{target_tab_ref.current_bucket}/{target_tab_ref.current_path}")
-                target_tab_ref.populate_s3_view_tab()
-            else:
-                print(f"S3Explorer: Batch '{batch_id}' ({op_type_display}) complete, but target tab's bucket "
-                      f"('{target_tab_ref.current_bucket}') differs from batch target ('{target_bucket_from_batch}'). "
-                      f"May need a broader refresh or specific handling.")
-                # Fallback: if target bucket from batch is known, refresh all views for it.
-                if target_bucket_from_batch:
-                    self.refresh_views_for_bucket(target_bucket_from_batch)
-
-        # For "cleanup_delete_after_cut" batches, refresh views of the source bucket from where items were deleted.
-        original_source_bucket_to_refresh = batch_data.get('original_source_bucket_for_refresh')
-        if original_source_bucket_to_refresh:
-            print(f"S3Explorer: Cleanup batch '{batch_id}' complete. Refreshing source bucket: '{original_source_bucket_to_refresh}'")
-            self.refresh_views_for_bucket(original_source_bucket_to_refresh)
-        
-        # For "move folder" batches (like trash/restore), refresh source and destination
-        source_prefix_moved = batch_data.get('source_prefix_moved')
-        destination_prefix_moved = batch_data.get('destination_prefix_moved')
-        target_bucket = batch_data.get('target_bucket') # Bucket is same for intra-bucket moves
-        if source_prefix_moved and target_bucket:
-            self.refresh_views_for_bucket_path(target_bucket, os.path.dirname(source_prefix_moved.strip('/')))
-        if destination_prefix_moved and target_bucket and destination_prefix_moved != source_prefix_moved:
-            self.refresh_views_for_bucket_path(target_bucket, os.path.dirname(destination_prefix_moved.strip('/')))
+        # --- Patch the views the batch changed (target folder, cut/move sources) from its change set ---
+        change_set = batch_data.get('change_set')
+        if change_set is not None:
+            print(f"S3Explorer: Batch '{batch_id}' ({op_type_display}) complete. Applying its changes to open views.")
+            self.apply_change_set_to_views(change_set)
 
 
     # --- Slots for OperationManager Signals (specific operation outcomes) ---
@@ -1188,7 +1269,6 @@ class S3Explorer(QMainWindow):
             QMessageBox.critical(self, "Delete Error", f"Failed to delete '{operation.key}':\n{error_message}")
         else:
             self.update_status_bar_message_slot(f"Item '{operation.key}' deleted successfully.", 3000)
-            self.refresh_views_for_bucket_path(operation.bucket, os.path.dirname(operation.key.strip('/')))
 
     # Slot for OperationManager's download_to_temp_op_completed
     @pyqtSlot(object, object, str) # S3Operation, result, error_message
@@ -1210,8 +1290,9 @@ class S3Explorer(QMainWindow):
             # --- Handling for 'live_edit_open' ---
             if error_message:
                 self.update_status_bar_message_slot(f"Open for edit failed for '{s3_key_operated_on}': {error_message}", 5000)
-                QMessageBox.critical(self, "S3 Download Error",
-                                     f"Could not download S3 file '{s3_key_operated_on}' for editing:\n{error_message}")
+                if not operation.is_cancelled():
+                    QMessageBox.critical(self, "S3 Download Error",
+                                         f"Could not download S3 file '{s3_key_operated_on}' for editing:\n{error_message}")
                 if intended_local_path and os.path.exists(intended_local_path): # Cleanup failed/partial download
                     try: os.remove(intended_local_path)
                     except OSError as e_rem: print(f"S3Explorer: Error cleaning up failed download {intended_local_path}: {e_rem}")
@@ -1297,7 +1378,9 @@ class S3Explorer(QMainWindow):
 
     @pyqtSlot(object, object, str)
     def on_op_mgr_download_file_finished(self, operation, result, error_message):
-        if error_message:
+        if error_message and operation.is_cancelled():
+            self.update_status_bar_message_slot(f"Download of {operation.key} cancelled.", 5000)
+        elif error_message:
             self.update_status_bar_message_slot(f"Download of {operation.key} failed: {error_message}", 5000)
             QMessageBox.critical(self, "Download Error",f"Download of {operation.key} failed:\n{error_message}")
         else:
@@ -1320,8 +1403,11 @@ class S3Explorer(QMainWindow):
         if error_message:
             # Generic error display for any upload failure
             error_display_key = os.path.basename(local_path_that_was_uploaded) or s3_key_involved
-            self.update_status_bar_message_slot(f"Upload of '{error_display_key}' FAILED: {error_message}", 7000)
-            QMessageBox.critical(self, "Upload Error", f"Upload of '{error_display_key}' failed:\n{error_message}")
+            if operation.is_cancelled():
+                self.update_status_bar_message_slot(f"Upload of '{error_display_key}' cancelled.", 5000)
+            else:
+                self.update_status_bar_message_slot(f"Upload of '{error_display_key}' FAILED: {error_message}", 7000)
+                QMessageBox.critical(self, "Upload Error", f"Upload of '{error_display_key}' failed:\n{error_message}")
 
             # If it was a live edit sync that failed, TempFileManager doesn't update mtimes,
             # so the file will likely still appear as modified and eligible for "Save Active File" or another sync attempt.
@@ -1335,8 +1421,7 @@ class S3Explorer(QMainWindow):
 
         if is_live_edit_sync:
             self.update_status_bar_message_slot(f"Auto-sync of '{display_name_for_success}' to S3 successful.", 4000)
-            # Refresh the view where this file might be visible
-            self.refresh_views_for_bucket_path(bucket_involved, os.path.dirname(s3_key_involved.strip('/')))
+            # Views showing the file are patched through OperationManager.change_set_ready
             
             # Notify TempFileManager about the successful upload to update its internal mtimes.
             # This will trigger temp_file_modified_status_changed -> on_temp_file_status_changed_update_save_action
@@ -1352,7 +1437,6 @@ class S3Explorer(QMainWindow):
 
         elif is_manual_temp_save:
             self.update_status_bar_message_slot(f"Saved '{display_name_for_success}' to S3.", 4000)
-            self.refresh_views_for_bucket_path(bucket_involved, os.path.dirname(s3_key_involved.strip('/')))
 
             # Notify TempFileManager for manual "Save Active File"
             self.temp_file_manager.handle_temp_file_upload_success(
@@ -1365,7 +1449,6 @@ class S3Explorer(QMainWindow):
 
         else: # Generic upload (e.g., "Save Local As S3...")
             self.update_status_bar_message_slot(f"File '{display_name_for_success}' uploaded successfully to s3://{bucket_involved}/{s3_key_involved}.", 5000)
-            self.refresh_views_for_bucket_path(bucket_involved, os.path.dirname(s3_key_involved.strip('/')))
             # No specific TempFileManager interaction needed for generic uploads unless they also become "opened" files.
 
         # Note: self.update_save_action_state() is now primarily triggered by the
@@ -1381,7 +1464,6 @@ class S3Explorer(QMainWindow):
             QMessageBox.critical(self, "Create Folder Error", f"Folder creation for '{operation.key}' failed:\n{error_message}")
         else:
             self.update_status_bar_message_slot(f"Folder '{operation.key}' created in {operation.bucket}.", 3000)
-            self.refresh_views_for_bucket_path(operation.bucket, os.path.dirname(operation.key.strip('/')))
 
     @pyqtSlot(object, object, str)
     def on_op_mgr_copy_object_finished(self, operation, result, error_message):
@@ -1393,12 +1475,19 @@ class S3Explorer(QMainWindow):
             if operation.is_part_of_move:
                 if result.get("original_deleted"):
                     msg = f"Moved '{result['source_key']}' to '{result['dest_key']}'."
-                    self.refresh_views_for_bucket_path(result['source_bucket'], os.path.dirname(result['source_key'].strip('/')))
                 else:
                     msg += f" Original NOT deleted from {result['source_bucket']}. Error: {result.get('original_delete_error', 'Unknown')}"
             
             self.update_status_bar_message_slot(msg, 5000)
-            self.refresh_views_for_bucket_path(result['dest_bucket'], os.path.dirname(result['dest_key'].strip('/')))
+
+    @pyqtSlot(object, object, str) # S3Operation, result, error_message
+    def on_op_mgr_move_prefix_finished(self, operation, result, error_message):
+        folder_name = os.path.basename((operation.key or "").rstrip('/'))
+        if error_message:
+            self.update_status_bar_message_slot(f"Moving folder '{folder_name}' failed: {error_message}", 7000)
+        else:
+            self.update_status_bar_message_slot(f"Moved folder '{folder_name}' ({result['moved_count']:,} object(s)) to '{result['dest_prefix']}'.", 5000)
+        # Source and destination views are patched from the change set (a failed move has them listed again)
 
     @pyqtSlot(str, str, str, bool) # local_path, s3_key_to_act_on, s3_bucket, is_potential_folder
     def handle_mount_deletion_confirmation(self, local_path_deleted: str, s3_key_to_act_on: str, s3_bucket: str, is_potential_folder: bool):
@@ -1472,105 +1561,20 @@ class S3Explorer(QMainWindow):
         Handles moving an S3 folder (and its contents) to the S3 trash.
         This involves listing objects, and queueing copy+delete operations.
         """
-        s3_client = self.profile_manager.get_s3_client()
-        if not s3_client:
+        if not self.profile_manager.get_s3_client():
             QMessageBox.warning(self, "S3 Error", "S3 client not available for folder move to trash.")
             return
 
         print(f"S3Explorer: Preparing to move folder '{source_folder_prefix}' to trash '{trash_dest_folder_prefix}' in bucket '{s3_bucket}'.")
-        
-        operations_to_queue = []
-        try:
-            paginator = s3_client.get_paginator('list_objects_v2')
-            # Ensure source_folder_prefix ends with a slash for correct listing
-            list_prefix = source_folder_prefix if source_folder_prefix.endswith('/') else source_folder_prefix + '/'
-            trash_dest_base = trash_dest_folder_prefix if trash_dest_folder_prefix.endswith('/') else trash_dest_folder_prefix + '/'
-
-            # 1. Add operation to create the main destination folder marker in trash (optional but good practice)
-            #    If the source folder was empty, this ensures the trash folder exists.
-            #    If it had contents, copy operations for files within it will implicitly create parent "folders".
-            # op_create_trash_folder_marker = S3Operation(S3OpType.CREATE_FOLDER, s3_bucket, key=trash_dest_base,
-            #                                             callback_data={'ui_source': 'move_to_trash_create_target_folder'})
-            # operations_to_queue.append(op_create_trash_folder_marker)
-
-
-            # 2. List and prepare move operations for all objects within the source folder
-            for page in paginator.paginate(Bucket=s3_bucket, Prefix=list_prefix):
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        source_obj_key = obj['Key']
-                        # Calculate relative path from the source folder's root
-                        relative_path_in_folder = source_obj_key[len(list_prefix):]
-                        dest_obj_key_in_trash = trash_dest_base + relative_path_in_folder
-
-                        print(f"  - Moving object: {source_obj_key} -> {dest_obj_key_in_trash}")
-                        move_op = S3Operation(
-                            S3OpType.COPY_OBJECT,
-                            bucket=s3_bucket, # Destination bucket for copy
-                            key=source_obj_key, # Source object key
-                            new_key=dest_obj_key_in_trash, # Destination key in trash
-                            is_part_of_move=True, # Worker will delete original source_obj_key
-                            original_source_key_for_move=source_obj_key,
-                            callback_data={'ui_source': 'mount_sync_move_item_to_trash'}
-                        )
-                        operations_to_queue.append(move_op)
-                
-                # Handle CommonPrefixes (subfolders) if you want to explicitly create empty subfolder markers in trash.
-                # Usually, copying files into paths like "trash/folder/subfolder/file.txt" implicitly creates the
-                # "folder" structure in S3. Explicit CREATE_FOLDER for subfolders is mostly for empty ones.
-                if 'CommonPrefixes' in page:
-                    for common_prefix in page.get('CommonPrefixes', []):
-                        source_subfolder_key = common_prefix.get('Prefix')
-                        relative_subfolder_path = source_subfolder_key[len(list_prefix):]
-                        dest_subfolder_key_in_trash = trash_dest_base + relative_subfolder_path
-                        print(f"  - Ensuring trash subfolder marker for: {dest_subfolder_key_in_trash}")
-                        op_create_trash_subfolder = S3Operation(S3OpType.CREATE_FOLDER, s3_bucket, key=dest_subfolder_key_in_trash,
-                                                               callback_data={'ui_source': 'move_to_trash_create_subfolder'})
-                        operations_to_queue.append(op_create_trash_subfolder)
-
-
-            if not operations_to_queue and not any(page.get('Contents') or page.get('CommonPrefixes') for page in paginator.paginate(Bucket=s3_bucket, Prefix=list_prefix)):
-                 # If the folder was completely empty, just create the marker in trash and delete original marker
-                 print(f"  - Source folder '{list_prefix}' appears empty. Creating marker in trash and deleting original marker.")
-                 op_create_trash_folder_marker = S3Operation(S3OpType.CREATE_FOLDER, s3_bucket, key=trash_dest_base,
-                                                            callback_data={'ui_source': 'move_to_trash_create_target_empty_folder'})
-                 operations_to_queue.append(op_create_trash_folder_marker)
-                 # The original empty folder still needs to be "deleted" (its marker removed)
-                 # The worker for DELETE_FOLDER is recursive, but for an empty marker it's simple.
-                 # It might be better to just delete the original *folder marker* after all contents (if any) are processed.
-                 # For now, we rely on the subsequent DELETE_FOLDER for the original source_folder_prefix if needed.
-                 # Let's add a DELETE_FOLDER for the original source folder prefix.
-                 # This is important because S3OpType.COPY_OBJECT with is_part_of_move=True only deletes the individual objects.
-                 op_delete_original_folder_marker = S3Operation(S3OpType.DELETE_FOLDER, s3_bucket, key=list_prefix,
-                                                               callback_data={'ui_source': 'move_to_trash_delete_original_empty_folder_marker'})
-                 operations_to_queue.append(op_delete_original_folder_marker)
-
-
-        except Exception as e:
-            QMessageBox.critical(self, "Move to Trash Error", f"Error preparing folder move to trash for '{source_folder_prefix}': {e}")
-            return
-
-        if operations_to_queue:
-            batch_id = f"move_folder_to_trash_{time.time()}"
-            self.operation_manager.start_batch_operation(
-                batch_id=batch_id,
-                total_items=len(operations_to_queue),
-                op_type_display=f"Moving folder '{os.path.basename(source_folder_prefix.strip('/'))}' to Trash",
-                operations_to_queue=operations_to_queue,
-                extra_batch_data={
-                    # 'target_tab_ref': self.get_active_tab_content(), # Optional, if refresh needed on this tab
-                    'target_bucket': s3_bucket, # For potential refresh on completion
-                    'source_prefix_moved': source_folder_prefix, # For logging or final cleanup
-                    'destination_prefix_moved': trash_dest_folder_prefix # To refresh trash view
-                }
-            )
-        else:
-            # This case (empty folder) should ideally be handled above by creating the trash marker and deleting original.
-            # If it still reaches here with no ops, it means something was unexpected.
-            print(f"S3Explorer: No operations queued for moving folder '{source_folder_prefix}' to trash. It might have been empty and already processed, or an error occurred.")
-            # Potentially refresh the view if the folder was expected to be non-empty
-            self.refresh_views_for_bucket_path(s3_bucket, os.path.dirname(source_folder_prefix.strip('/')))
-
+        self._start_move_prefix_batch(
+            s3_bucket, source_folder_prefix, trash_dest_folder_prefix,
+            f"Moving folder '{os.path.basename(source_folder_prefix.strip('/'))}' to Trash",
+            ui_source='mount_sync_move_folder_to_trash',
+            extra_batch_data={
+                # 'target_tab_ref': self.get_active_tab_content(), # Optional, if refresh needed on this tab
+                'target_bucket': s3_bucket, # For potential refresh on completion
+            }
+        )
 
     # You will also need to modify the "Delete" action from S3TabContentWidget's context menu
     # and any global "Delete" action to use this "move to trash" logic.
@@ -1728,21 +1732,6 @@ class S3Explorer(QMainWindow):
         else:
             self.update_status_bar_message_slot(f"Move to S3 Trash for '{name}' cancelled.", 3000)
 
-
-    # When on_batch_operation_complete_from_op_mgr is called for these "move to trash" batches,
-    # it should refresh the source view (where the item disappeared from)
-    # and potentially the trash view if you have one open.
-    # Modify on_batch_operation_complete_from_op_mgr:
-    # ...
-    # if target_tab_ref and isinstance(target_tab_ref, S3TabContentWidget):
-    #     # ... existing logic ...
-    #     target_tab_ref.populate_s3_view_tab() # Refresh the tab where user initiated delete
-    
-    # Also, if the batch was 'move_folder_to_trash_...'
-    # original_source_prefix_moved = batch_data.get('original_source_prefix_moved')
-    # if original_source_prefix_moved:
-    #    self.refresh_views_for_bucket_path(batch_data.get('target_bucket'), os.path.dirname(original_source_prefix_moved.strip('/')))
-
     def request_create_s3_folder(self, bucket_name: str, current_path_in_bucket: str, tab_ref: S3TabContentWidget):
         if not self.profile_manager.get_s3_client(): QMessageBox.warning(self, "Error", "S3 client not connected."); return
         folder_name_input, ok = QInputDialog.getText(self, "Create New S3 Folder", "Enter folder name:")
@@ -1759,7 +1748,8 @@ class S3Explorer(QMainWindow):
     def show_properties_dialog_from_tab(self, s3_key: str, item_name: str, is_folder: bool, bucket_name: str, tab_ref: S3TabContentWidget):
         s3_client = self.profile_manager.get_s3_client()
         if not s3_client: QMessageBox.warning(self, "Properties Error", "S3 client not available."); return
-        dialog = PropertiesDialog(s3_client, bucket_name, s3_key, is_folder, item_name, self)
+        dialog = PropertiesDialog(s3_client, bucket_name, s3_key, is_folder, item_name, self,
+                                  operation_manager_ref=self.operation_manager)
         dialog.exec()
 
     def handle_save_active_file(self): # Triggered by Save Action
@@ -1769,11 +1759,8 @@ class S3Explorer(QMainWindow):
         selected_indexes = active_tab.tree_view.selectionModel().selectedRows(COL_S3_KEY)
         if len(selected_indexes) == 1:
             row = selected_indexes[0].row()
-            s3_key_item = active_tab.model.item(row, COL_S3_KEY)
-            is_folder_item = active_tab.model.item(row, COL_IS_FOLDER)
-
-            if s3_key_item and is_folder_item and is_folder_item.text() == "0":
-                s3_key = s3_key_item.text()
+            if not active_tab.model.is_folder_at(row):
+                s3_key = active_tab.model.key_at(row)
                 # TempFileManager handles prompting and queuing upload if needed
                 self.check_modified_temp_files(force_check_s3_key=s3_key) 
                 return
@@ -1830,6 +1817,45 @@ class S3Explorer(QMainWindow):
             new_mount_configs = dialog.get_configured_mounts()
             self.mount_manager.update_mounted_paths(new_mount_configs)
 
+    def show_bandwidth_dialog(self):
+        profile_name = self.profile_manager.active_profile_name
+        profile_data = self.profile_manager.get_active_profile_data()
+        if not profile_name or profile_data is None:
+            QMessageBox.information(self, "Bandwidth Limits", "Select an AWS profile first.")
+            return
+        dialog = BandwidthDialog(profile_name, profile_data.get("rate_limits"), self)
+        if dialog.exec():
+            rate_limits = dialog.get_rate_limits()
+            profile_data["rate_limits"] = rate_limits
+            get_rate_limiter(profile_name).configure(rate_limits) # Live: waiting transfers pick up the new rates, no restart
+            self.profile_manager.save_aws_profiles()
+            self.update_status_bar_message_slot(f"Bandwidth limits updated for profile: {profile_name}", 3000)
+
+    def load_all_items_in_active_tab(self):
+        active_tab = self.get_active_tab_content()
+        if not active_tab: return
+        if not active_tab.has_partial_listing():
+            self.update_status_bar_message_slot("All items of this folder are already listed.", 3000)
+            return
+        active_tab.fetch_more_listing_rows(load_all=True)
+
+    def set_native_file_icons(self, enabled):
+        get_file_type_registry().set_use_native_icons(enabled)
+        self.settings.setValue("native_file_icons", enabled)
+        for i in range(self.tab_widget.count()):
+            tab = self.tab_widget.widget(i)
+            if isinstance(tab, S3TabContentWidget):
+                tab.tree_view.viewport().update() # Icons are looked up again on repaint
+
+    def set_folder_sizes_enabled(self, enabled):
+        self.operation_manager.folder_summaries_enabled = enabled
+        self.settings.setValue("folder_sizes", enabled)
+        for i in range(self.tab_widget.count()):
+            tab = self.tab_widget.widget(i)
+            if isinstance(tab, S3TabContentWidget):
+                if enabled: tab.refresh_folder_summaries()
+                else: self.operation_manager.forget_folder_summary_requester(tab)
+
     # --- Refreshing Views ---
     def refresh_views_for_bucket_path(self, bucket_name: str, path_in_bucket: str):
         if not self.tab_widget: return
@@ -1840,6 +1866,14 @@ class S3Explorer(QMainWindow):
                tab.current_path.strip('/') == normalized_path:
                 tab.populate_s3_view_tab()
     
+    def apply_change_set_to_views(self, change_set):
+        """S3ChangeSet of finished mutations: every tab patches the rows it shows (or lists again if it has to)."""
+        if not self.tab_widget: return
+        for i in range(self.tab_widget.count()):
+            tab = self.tab_widget.widget(i)
+            if isinstance(tab, S3TabContentWidget):
+                tab.apply_change_set(change_set)
+
     def refresh_views_for_bucket(self, bucket_name: str):
         if not self.tab_widget: return
         for i in range(self.tab_widget.count()):
@@ -2091,6 +2125,8 @@ class S3Explorer(QMainWindow):
 
         self.mount_manager.stop_watchdog_observers(clear_runtime_objects=True)
         self.operation_manager.stop_all_s3_workers() # Stop S3 workers
+        self.operation_journal.close() # Unfinished batches stay 'active' and are offered for resume next start
+        self.search_index.close() # Running crawls resume from their continuation token next start
         self.temp_file_manager.cleanup_all_temp_files() # Clean up temp files
 
         self.save_settings()
@@ -2181,85 +2217,31 @@ class S3Explorer(QMainWindow):
         Generic helper to move an S3 folder (and its contents) from one prefix to another.
         Used for "move to trash" and "restore from trash".
         """
-        s3_client = self.profile_manager.get_s3_client()
-        if not s3_client:
+        if not self.profile_manager.get_s3_client():
             QMessageBox.warning(self, "S3 Error", f"S3 client not available for {op_display_name}.")
             return
 
         print(f"S3Explorer: Batch move folder from '{source_folder_prefix}' to '{dest_folder_prefix}' in bucket '{s3_bucket}'.")
         
-        operations_to_queue = []
-        source_list_prefix = source_folder_prefix if source_folder_prefix.endswith('/') else source_folder_prefix + '/'
-        dest_base_prefix = dest_folder_prefix if dest_folder_prefix.endswith('/') else dest_folder_prefix + '/'
-        
         active_tab_for_refresh = self.get_active_tab_content() # For refresh after completion
+        self._start_move_prefix_batch(
+            s3_bucket, source_folder_prefix, dest_folder_prefix, op_display_name,
+            ui_source=op_display_name.lower().replace(" ", "_"),
+            extra_batch_data={
+                'target_tab_ref': active_tab_for_refresh, 
+                'target_bucket': s3_bucket,
+            }
+        )
 
-        try:
-            paginator = s3_client.get_paginator('list_objects_v2')
-            
-            # Handle contents
-            for page in paginator.paginate(Bucket=s3_bucket, Prefix=source_list_prefix):
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        source_obj_key = obj['Key']
-                        relative_path_in_folder = source_obj_key[len(source_list_prefix):]
-                        dest_obj_key = dest_base_prefix + relative_path_in_folder
-                        move_op = S3Operation(S3OpType.COPY_OBJECT, bucket=s3_bucket, key=source_obj_key,
-                                              new_key=dest_obj_key, is_part_of_move=True,
-                                              original_source_key_for_move=source_obj_key,
-                                              callback_data={'ui_source': op_display_name.lower().replace(" ", "_") + "_item"})
-                        operations_to_queue.append(move_op)
-                
-                # Handle subfolder markers explicitly to ensure empty subfolders are "moved"
-                if 'CommonPrefixes' in page:
-                    for common_prefix in page.get('CommonPrefixes', []):
-                        source_subfolder_key = common_prefix.get('Prefix')
-                        relative_subfolder_path = source_subfolder_key[len(source_list_prefix):]
-                        dest_subfolder_key = dest_base_prefix + relative_subfolder_path
-                        op_create_dest_subfolder = S3Operation(S3OpType.CREATE_FOLDER, s3_bucket, key=dest_subfolder_key,
-                                                              callback_data={'ui_source': op_display_name.lower().replace(" ", "_") + "_create_subfolder"})
-                        operations_to_queue.append(op_create_dest_subfolder)
-            
-            # After all contents are moved (copied + original objects deleted by worker),
-            # the original source_folder_prefix might still have empty subfolder markers
-            # or its own marker if it was empty to begin with.
-            # A final DELETE_FOLDER on the original source_folder_prefix will clean these up.
-            # This is important because S3OpType.COPY_OBJECT with is_part_of_move=True only deletes individual files.
-            if not operations_to_queue and not any(page.get('Contents') or page.get('CommonPrefixes') for page in paginator.paginate(Bucket=s3_bucket, Prefix=source_list_prefix)):
-                 # If the source folder was completely empty, still create marker at destination and delete source marker
-                 print(f"  - Source folder '{source_list_prefix}' is empty. Creating marker at '{dest_base_prefix}' and deleting original marker.")
-                 op_create_dest_marker = S3Operation(S3OpType.CREATE_FOLDER, s3_bucket, key=dest_base_prefix,
-                                                     callback_data={'ui_source': op_display_name.lower().replace(" ", "_") + "_create_empty_folder_marker"})
-                 operations_to_queue.append(op_create_dest_marker)
-
-            op_delete_original_folder_structure = S3Operation(S3OpType.DELETE_FOLDER, s3_bucket, key=source_list_prefix,
-                                                              callback_data={'ui_source': op_display_name.lower().replace(" ", "_") + "_delete_original_folder_structure"})
-            operations_to_queue.append(op_delete_original_folder_structure)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Folder Operation Error", f"Error preparing {op_display_name} for '{source_folder_prefix}': {e}")
-            return
+    def _start_move_prefix_batch(self, s3_bucket: str, source_folder_prefix: str, dest_folder_prefix: str, op_display_name: str,
+                                 ui_source: str, extra_batch_data=None):
+        """Queues a folder move as one MOVE_PREFIX operation in a (journaled, resumable) batch of one.
+        The worker lists, copies, verifies and bulk-deletes the folder itself (S3PrefixMover)."""
+        batch_id = f"{op_display_name.lower().replace(' ', '_')}_{time.time()}"
+        move_op = S3Operation(S3OpType.MOVE_PREFIX, s3_bucket, key=source_folder_prefix, new_key=dest_folder_prefix,
+                              callback_data={'ui_source': ui_source})
+        self.operation_manager.start_batch_operation(batch_id, 1, op_display_name, [move_op], extra_batch_data)
 
-        if operations_to_queue:
-            batch_id = f"{op_display_name.lower().replace(' ', '_')}_{time.time()}"
-            self.operation_manager.start_batch_operation(
-                batch_id=batch_id,
-                total_items=len(operations_to_queue),
-                op_type_display=op_display_name,
-                operations_to_queue=operations_to_queue,
-                extra_batch_data={
-                    'target_tab_ref': active_tab_for_refresh, 
-                    'target_bucket': s3_bucket, 
-                    'source_prefix_moved': source_folder_prefix, # For refreshing original location
-                    'destination_prefix_moved': dest_folder_prefix # For refreshing destination (e.g., trash)
-                }
-            )
-        else:
-            print(f"S3Explorer: No operations queued for {op_display_name} on '{source_folder_prefix}'. It might have been empty or an error occurred.")
-            # Refresh relevant views if needed
-            self.refresh_views_for_bucket_path(s3_bucket, os.path.dirname(source_folder_prefix.strip('/')))
-            if dest_folder_prefix != source_folder_prefix: # If it was a move, refresh dest too
-                self.refresh_views_for_bucket_path(s3_bucket, os.path.dirname(dest_folder_prefix.strip('/')))
     def request_download_folder_as_zip(self, s3_key: str, name: str, bucket_name: str, tab_ref):
         if not self.profile_manager.get_s3_client():
             QMessageBox.warning(self, "Error", "S3 client not connected.")
@@ -2333,7 +2315,8 @@ class S3Explorer(QMainWindow):
 
         self.download_progress.show()
 
-        self.download_worker = DownloadFolderWorker(s3_client, bucket_name, s3_key, local_folder_path)
+        self.download_worker = DownloadFolderWorker(s3_client, bucket_name, s3_key, local_folder_path,
+                                                    rate_limiter=self.operation_manager.rate_limiter)
 
         def update_download_progress(current, total, key):
             elapsed = time.time() - self.download_start_time
@@ -2349,7 +2332,6 @@ class S3Explorer(QMainWindow):
                 f"Current File: {os.path.basename(key)}\n"
                 f"Estimated time remaining: {eta_str}"
             )
-            QApplication.processEvents()
 
         def on_download_finished(local_path):
             self.download_progress.close()
@@ -2441,7 +2423,6 @@ class S3Explorer(QMainWindow):
                 self.zip_progress.setLabelText(
                     f"Zipping folder...\n{current}/{total} ({percent}%)\nEstimated time left: {eta}"
                 )
-                QApplication.processEvents()
 
             def on_zip_finished(path):
                 self.zip_progress.close()
@@ -0,0 +1,71 @@
+import threading
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+# --- S3BatchPlanner (lists the source of a batch off the GUI thread, one page at a time) ---
+# A big paste / trash / restore used to paginate the whole prefix on the GUI thread and
+# build every S3Operation up front. The planner instead runs a generator that yields one
+# list of operations per listing page; each page is handed to OperationManager (queued
+# signal) and enqueued right away, so the first copies start after one page of latency.
+# At most max_in_flight planned-but-unfinished operations exist per batch: the planner
+# blocks before listing further while the workers catch up, which keeps memory flat.
+class S3BatchPlanner(QThread):
+    operations_planned = pyqtSignal(str, list)   # batch_id, [S3Operation] (one listing page)
+    planning_finished = pyqtSignal(str, int, str) # batch_id, planned_count, error_message ("" = success)
+
+    MAX_IN_FLIGHT = 5000
+
+    def __init__(self, batch_id, page_generator, cancel_token, max_in_flight=MAX_IN_FLIGHT, parent=None):
+        super().__init__(parent)
+        self.batch_id = batch_id
+        self.page_generator = page_generator # Yields lists of S3Operation
+        self.cancel_token = cancel_token     # The batch's CancellationToken
+        self.max_in_flight = max_in_flight
+        self.extra_batch_data = {} # Owner's context for the batch (OperationManager journals it when planning ends)
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._is_running = True
+
+    def stop(self):
+        """Stops planning without cancelling the batch (app shutdown; the journal keeps it resumable)."""
+        with self._condition:
+            self._is_running = False
+            self._condition.notify_all()
+
+    def note_finished(self, count=1):
+        """Called by OperationManager as planned operations finish; frees room in the window."""
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - count)
+            self._condition.notify_all()
+
+    def _should_stop(self):
+        return not self._is_running or self.cancel_token.is_cancelled()
+
+    def _wait_for_window(self, page_size):
+        with self._condition:
+            # A page larger than the window is still let through once everything before it finished
+            while self._in_flight and self._in_flight + page_size > self.max_in_flight and not self._should_stop():
+                self._condition.wait(0.2) # Timeout so a cancel (token, no notify) is seen promptly
+
+    def run(self):
+        planned_count = 0
+        error_message = ""
+        try:
+            for page_operations in self.page_generator:
+                if self._should_stop(): break
+                if not page_operations: continue
+                self._wait_for_window(len(page_operations))
+                if self._should_stop(): break
+                with self._condition:
+                    self._in_flight += len(page_operations)
+                planned_count += len(page_operations)
+                self.operations_planned.emit(self.batch_id, page_operations)
+        except Exception as e:
+            error_message = str(e) or e.__class__.__name__
+            print(f"BATCH_PLANNER: Listing for batch '{self.batch_id}' failed after {planned_count} operation(s): {error_message}")
+        finally:
+            self.page_generator.close()
+        if not self._is_running and not error_message:
+            error_message = "Listing was stopped before it finished."
+        print(f"BATCH_PLANNER: Batch '{self.batch_id}' planned {planned_count} operation(s).")
+        self.planning_finished.emit(self.batch_id, planned_count, error_message)
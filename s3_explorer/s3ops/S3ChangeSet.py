@@ -0,0 +1,120 @@
+from s3ops.S3Operation import S3Operation, S3OpType
+from s3ops.S3ListingCache import parent_prefix
+
+
+def _as_prefix(key):
+    return key if not key or key.endswith('/') else key + '/'
+
+
+# --- S3ChangeSet (what finished mutations did to the bucket, for patching open views) ---
+# OperationManager records every finished mutating operation into one: a change set per single
+# operation, one per batch (accumulated until the batch completes). Open tabs apply it to the rows
+# they show instead of listing the folder again; changes_for_listing() answers "what happened
+# to the listing of this prefix". Later records win over earlier ones for the same key, and a
+# removed prefix takes everything recorded below it with it. Failed mutations are recorded as
+# "relist": the state of their folder is unknown, the tab lists it again.
+class S3ChangeSet:
+    RECORDED_OP_TYPES = {S3OpType.UPLOAD_FILE, S3OpType.CREATE_FOLDER, S3OpType.DELETE_OBJECT, S3OpType.DELETE_FOLDER,
+                         S3OpType.COPY_OBJECT, S3OpType.MOVE_PREFIX}
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.upserted = {}            # (bucket, key) -> Contents-like dict ({'Key', 'Size', 'LastModified', 'ETag'}); folders: key ends in '/'
+        self.removed = set()          # (bucket, key)
+        self.removed_prefixes = set() # (bucket, prefix): the folder and everything below it is gone
+        self.relist_prefixes = set()  # (bucket, prefix) whose listing may have changed in unknown ways
+
+    # --- Recording ---
+    def add_object(self, bucket, key, size=None, last_modified=None, etag=None):
+        self.removed.discard((bucket, key))
+        self.upserted[(bucket, key)] = {'Key': key, 'Size': size, 'LastModified': last_modified, 'ETag': etag}
+
+    def add_folder(self, bucket, prefix):
+        prefix = _as_prefix(prefix)
+        self.removed.discard((bucket, prefix))
+        self.upserted[(bucket, prefix)] = {'Key': prefix}
+
+    def remove_object(self, bucket, key):
+        self.upserted.pop((bucket, key), None)
+        self.removed.add((bucket, key))
+
+    def remove_prefix(self, bucket, prefix):
+        prefix = _as_prefix(prefix)
+        for upserted_key in [k for k in self.upserted if k[0] == bucket and k[1].startswith(prefix)]:
+            del self.upserted[upserted_key]
+        self.removed_prefixes.add((bucket, prefix))
+
+    def needs_relist(self, bucket, prefix):
+        self.relist_prefixes.add((bucket, _as_prefix(prefix)))
+
+    def record_operation(self, operation: S3Operation, result, error_message):
+        if operation.started_at is None: return # Dropped from the queue before it ran: nothing changed
+        op_type, bucket, key = operation.op_type, operation.bucket, operation.key or ""
+        if op_type == S3OpType.UPLOAD_FILE:
+            if not error_message and isinstance(result, dict): # A failed / cancelled upload leaves the old object (or none)
+                self.add_object(bucket, key, result.get("size"), result.get("last_modified"), result.get("etag"))
+        elif op_type == S3OpType.CREATE_FOLDER:
+            if not error_message:
+                self.add_folder(bucket, key)
+        elif op_type == S3OpType.DELETE_OBJECT:
+            if not error_message: self.remove_object(bucket, key)
+        elif op_type == S3OpType.DELETE_FOLDER:
+            if not error_message: self.remove_prefix(bucket, key)
+            else:
+                self.needs_relist(bucket, parent_prefix(key)) # It ran: some of it may be gone
+        elif op_type == S3OpType.COPY_OBJECT and operation.new_key:
+            if error_message or not isinstance(result, dict): return # Copies are all or nothing
+            self.add_object(bucket, operation.new_key, result.get("size"), result.get("last_modified"), result.get("etag"))
+            if operation.is_part_of_move and result.get("original_deleted") and not result.get("source_profile"):
+                self.remove_object(result.get("source_bucket", bucket), operation.original_source_key_for_move or key)
+        elif op_type == S3OpType.MOVE_PREFIX and operation.new_key:
+            source_bucket = operation.callback_data.get("source_bucket_override", bucket)
+            if error_message: # Objects may be on both sides
+                self.needs_relist(source_bucket, parent_prefix(key))
+                self.needs_relist(bucket, parent_prefix(operation.new_key))
+                return
+            self.remove_prefix(source_bucket, key)
+            self.add_folder(bucket, operation.new_key)
+
+    def is_empty(self):
+        return not (self.upserted or self.removed or self.removed_prefixes or self.relist_prefixes)
+
+    # --- Reading (tabs) ---
+    def changes_for_listing(self, bucket, prefix):
+        """(upserts, removed_keys, relist) for the delimiter listing of prefix: upserts maps row key -> Contents-like
+        dict (files) or None (folders), removed_keys are row keys that disappear. relist is True when the listing
+        cannot be patched: the folder itself was removed or moved, a failed mutation left it in an unknown state,
+        or something was removed deeper down and the subfolder row above it may be gone with it."""
+        prefix = _as_prefix(prefix)
+        if (bucket, prefix) in self.relist_prefixes:
+            return {}, set(), True
+        removed_keys = set()
+        emptied_folders = set() # Subfolder rows of this listing that lost something below them
+        for removed_bucket, removed_prefix in self.removed_prefixes:
+            if removed_bucket != bucket: continue
+            if prefix.startswith(removed_prefix):
+                return {}, set(), True
+            if parent_prefix(removed_prefix) == prefix:
+                removed_keys.add(removed_prefix)
+            elif removed_prefix.startswith(prefix):
+                emptied_folders.add(removed_prefix[:removed_prefix.find('/', len(prefix)) + 1])
+        for removed_bucket, removed_key in self.removed:
+            if removed_bucket != bucket or removed_key == prefix or not removed_key.startswith(prefix): continue
+            if parent_prefix(removed_key) == prefix:
+                if removed_key.endswith('/'):
+                    return {}, set(), True # A folder marker went away; whether the folder did depends on what else is in it
+                removed_keys.add(removed_key)
+            else:
+                emptied_folders.add(removed_key[:removed_key.find('/', len(prefix)) + 1])
+        upserts = {}
+        for (upserted_bucket, upserted_key), listed_object in self.upserted.items():
+            if upserted_bucket != bucket or upserted_key == prefix or not upserted_key.startswith(prefix): continue
+            cut = upserted_key.find('/', len(prefix))
+            if cut < 0:
+                upserts[upserted_key] = listed_object # File directly in this folder
+            else:
+                upserts[upserted_key[:cut + 1]] = None # A folder of this listing (now) has something in it
+        if emptied_folders.difference(upserts):
+            return {}, set(), True # Only S3 knows whether those folders still have anything in them
+        removed_keys.difference_update(upserts)
+        return upserts, removed_keys, False
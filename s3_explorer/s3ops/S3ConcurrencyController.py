@@ -0,0 +1,119 @@
+import threading
+import time
+
+
+# --- S3ConcurrencyController (AIMD sizing for the S3OperationWorker pool) ---
+# Every finished operation is reported (bytes moved, error code).
+# OperationManager calls evaluate() periodically from the GUI thread and resizes
+# the pool to the returned target:
+#   - any throttling / timeout seen in the window  -> multiplicative decrease
+#   - backlog waiting and throughput still growing -> additive increase
+#   - otherwise                                    -> hold
+class S3ConcurrencyController:
+    # Error codes S3 (and S3 compatible endpoints) use to say "slow down"
+    THROTTLING_ERROR_CODES = {
+        "SlowDown", "503", "ServiceUnavailable", "Throttling", "ThrottlingException",
+        "RequestLimitExceeded", "TooManyRequests", "429", "RequestTimeout", "Timeout",
+    }
+
+    ADDITIVE_INCREASE = 1
+    MULTIPLICATIVE_DECREASE = 0.5
+    MIN_GAIN_TO_KEEP_GROWING = 0.05 # Last increase must have improved throughput by >= 5%
+
+    def __init__(self, min_workers=2, max_workers=32, initial_workers=4):
+        self._lock = threading.Lock()
+        self.min_workers = 1
+        self.max_workers = 1
+        self.set_bounds(min_workers, max_workers)
+        self.target_workers = self._clamp(initial_workers)
+
+        self._window_started_at = time.monotonic()
+        self._window_ops = 0
+        self._window_bytes = 0
+        self._window_throttled = 0
+        self._window_retries = 0
+
+        self._last_ops_per_sec = 0.0
+        self._last_bytes_per_sec = 0.0
+        self._last_decision = "hold"
+        self.ops_per_sec = 0.0
+        self.bytes_per_sec = 0.0
+        self.retries_in_last_window = 0
+
+    def _clamp(self, value):
+        return max(self.min_workers, min(self.max_workers, int(value)))
+
+    def set_bounds(self, min_workers, max_workers):
+        with self._lock:
+            self.min_workers = max(1, int(min_workers or 1))
+            self.max_workers = max(self.min_workers, int(max_workers or self.min_workers))
+            if hasattr(self, 'target_workers'):
+                self.target_workers = self._clamp(self.target_workers)
+
+    @classmethod
+    def is_throttling_error(cls, error_code):
+        return bool(error_code) and str(error_code) in cls.THROTTLING_ERROR_CODES
+
+    def record_operation(self, bytes_transferred=0, error_code=None):
+        """Called for every operation a worker ran (any thread); coalesced duplicates are not samples."""
+        with self._lock:
+            self._window_ops += 1
+            self._window_bytes += max(0, int(bytes_transferred or 0))
+            if self.is_throttling_error(error_code):
+                self._window_throttled += 1
+
+    def record_retry(self, error_code=None):
+        """Called when a worker retries an attempt; a retried throttle must still slow the pool down."""
+        with self._lock:
+            self._window_retries += 1
+            if self.is_throttling_error(error_code):
+                self._window_throttled += 1
+
+    def evaluate(self, pending_count):
+        """Closes the current measurement window and returns the new target worker count."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = max(0.001, now - self._window_started_at)
+            ops_per_sec = self._window_ops / elapsed
+            bytes_per_sec = self._window_bytes / elapsed
+            throttled = self._window_throttled
+
+            if throttled:
+                new_target = self._clamp(self.target_workers * self.MULTIPLICATIVE_DECREASE)
+                self._last_decision = "decrease"
+            elif pending_count > 0 and self._window_ops > 0:
+                if self._last_decision == "increase" and not self._throughput_improved(ops_per_sec, bytes_per_sec):
+                    # More workers did not buy more throughput (endpoint or local link is saturated)
+                    new_target = self.target_workers
+                    self._last_decision = "hold"
+                else:
+                    new_target = self._clamp(self.target_workers + self.ADDITIVE_INCREASE)
+                    self._last_decision = "increase" if new_target > self.target_workers else "hold"
+            elif pending_count == 0 and self._window_ops == 0:
+                # Idle: drift back towards the floor so idle profiles don't hold many threads
+                new_target = self._clamp(self.target_workers - self.ADDITIVE_INCREASE)
+                self._last_decision = "idle"
+            else:
+                new_target = self.target_workers
+                self._last_decision = "hold"
+
+            self.ops_per_sec = ops_per_sec
+            self.bytes_per_sec = bytes_per_sec
+            self.retries_in_last_window = self._window_retries
+            self._last_ops_per_sec = ops_per_sec
+            self._last_bytes_per_sec = bytes_per_sec
+            self.target_workers = new_target
+
+            self._window_started_at = now
+            self._window_ops = 0
+            self._window_bytes = 0
+            self._window_throttled = 0
+            self._window_retries = 0
+            return new_target, throttled
+
+    def _throughput_improved(self, ops_per_sec, bytes_per_sec):
+        def gained(new, old):
+            if old <= 0: return new > 0
+            return (new - old) / old >= self.MIN_GAIN_TO_KEEP_GROWING
+        # Small objects are bound by ops/sec, large ones by bytes/sec; either improving counts
+        return gained(ops_per_sec, self._last_ops_per_sec) or gained(bytes_per_sec, self._last_bytes_per_sec)
@@ -0,0 +1,146 @@
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+
+from s3ops.S3MultipartCopier import S3MultipartCopier
+from s3ops.S3Metrics import bind_op_type
+
+
+class ChecksumMismatch(Exception):
+    """Raised when the bytes that arrived at the destination do not match what was read from the source."""
+
+
+# --- S3CrossProfileCopier (COPY_OBJECT between two clients / endpoints, e.g. MinIO -> AWS) ---
+# Server-side copy only works within one endpoint and one set of credentials. Across profiles
+# the source is read with ranged get_object calls on the source client and each range is
+# written straight into a multipart upload on the destination client; nothing touches disk.
+#   - memory is bounded: every part in flight holds one buffer slot, and the slots are shared by
+#     all copies in the process (MAX_BUFFERED_PARTS * PART_SIZE bytes at most)
+#   - every ranged GET is pinned to the source ETag (IfMatch), so a source overwritten mid-copy fails
+#   - every part is sent with its Content-MD5 (the destination rejects a corrupted part), and the
+#     completed object's ETag is checked against the MD5s computed here
+#   - small objects (one part) are a single get_object + put_object, verified the same way
+# Content type, user metadata and the standard headers are carried over; encryption settings are
+# not (keys/KMS ids of the source endpoint mean nothing at the destination).
+class S3CrossProfileCopier:
+    PART_SIZE = 16 * 1024 * 1024
+    MAX_PARALLEL_PARTS = 4       # Per object
+    MAX_BUFFERED_PARTS = 12      # Process wide (~192 MB), shared by all workers
+    READ_CHUNK_SIZE = 256 * 1024 # Progress / cancel / bandwidth granularity while reading a part
+
+    PRESERVED_HEADERS = ("ContentType", "CacheControl", "ContentDisposition", "ContentEncoding", "ContentLanguage", "Expires")
+
+    _buffer_slots = threading.BoundedSemaphore(MAX_BUFFERED_PARTS)
+
+    @staticmethod
+    def _plain_md5_etag(etag):
+        """The ETag as an MD5 hex string if it is one (single-part, non-KMS objects), else None."""
+        etag = (etag or "").strip('"')
+        return etag.lower() if len(etag) == 32 and '-' not in etag else None
+
+    def copy(self, source_s3, dest_s3, operation, source_bucket, source_key, dest_bucket, dest_key,
+             progress_tracker=None, rate_limiter=None):
+        """Streams source (on source_s3) to destination (on dest_s3).
+        Returns {'strategy': 'stream', 'etag': ETag of the new object, 'parts': part count}."""
+        head = source_s3.head_object(Bucket=source_bucket, Key=source_key)
+        size = int(head.get('ContentLength', 0))
+        create_params = {name: head[name] for name in self.PRESERVED_HEADERS if head.get(name)}
+        if head.get('Metadata'): create_params['Metadata'] = head['Metadata']
+
+        operation.bytes_transferred = 0
+        if progress_tracker: progress_tracker.start_transfer(operation, size, "copy")
+        progress_lock = threading.Lock()
+
+        def read_range(first_byte=None, last_byte=None):
+            """Reads one range of the source into memory; returns (bytes, md5 digest)."""
+            get_params = {'Bucket': source_bucket, 'Key': source_key, 'IfMatch': head['ETag']}
+            if first_byte is not None: get_params['Range'] = f"bytes={first_byte}-{last_byte}"
+            body = source_s3.get_object(**get_params)['Body']
+            buffer, md5 = bytearray(), hashlib.md5()
+            try:
+                for chunk in iter(lambda: body.read(self.READ_CHUNK_SIZE), b""):
+                    if rate_limiter: rate_limiter.consume_bytes(len(chunk), operation.is_cancelled)
+                    operation.raise_if_cancelled()
+                    buffer += chunk
+                    md5.update(chunk)
+                    with progress_lock:
+                        operation.bytes_transferred += len(chunk)
+            finally:
+                body.close()
+            return bytes(buffer), md5.digest()
+
+        try:
+            if size <= self.PART_SIZE:
+                with self._buffer_slots:
+                    data, digest = read_range()
+                    response = dest_s3.put_object(Bucket=dest_bucket, Key=dest_key, Body=data,
+                                                  ContentMD5=base64.b64encode(digest).decode(), **create_params)
+                self._verify(dest_s3, dest_bucket, dest_key, response.get('ETag'), digest.hex(), head, size)
+                return {"strategy": "stream", "etag": response.get('ETag'), "parts": 1}
+            return self._multipart_stream(dest_s3, operation, head, size, create_params, dest_bucket, dest_key, read_range)
+        finally:
+            if progress_tracker: progress_tracker.finish_transfer(operation)
+
+    def _multipart_stream(self, dest_s3, operation, head, size, create_params, dest_bucket, dest_key, read_range):
+        part_size = max(self.PART_SIZE, -(-size // S3MultipartCopier.MAX_PARTS))
+        ranges = [(i + 1, start, min(start + part_size, size) - 1) for i, start in enumerate(range(0, size, part_size))]
+        upload_id = dest_s3.create_multipart_upload(Bucket=dest_bucket, Key=dest_key, **create_params)['UploadId']
+        print(f"CROSS_PROFILE_COPY: '{dest_key}': {size} bytes in {len(ranges)} part(s), upload {upload_id}")
+
+        def copy_part(part_number, first_byte, last_byte):
+            with self._buffer_slots: # Blocks while the process already holds MAX_BUFFERED_PARTS parts
+                operation.raise_if_cancelled()
+                data, digest = read_range(first_byte, last_byte)
+                response = dest_s3.upload_part(Bucket=dest_bucket, Key=dest_key, UploadId=upload_id, PartNumber=part_number,
+                                               Body=data, ContentMD5=base64.b64encode(digest).decode())
+            part_etag = self._plain_md5_etag(response['ETag'])
+            if part_etag and part_etag != digest.hex():
+                raise ChecksumMismatch(f"part {part_number} of '{dest_key}' arrived with ETag {part_etag}, expected {digest.hex()}")
+            return {'PartNumber': part_number, 'ETag': response['ETag'], 'digest': digest}
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_PARTS, len(ranges)),
+                                    thread_name_prefix="S3CrossProfileCopy") as executor:
+                futures = [executor.submit(bind_op_type(copy_part), *part_range) for part_range in ranges]
+                done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in not_done: future.cancel()
+                parts = sorted((future.result() for future in futures if future in done), key=lambda p: p['PartNumber'])
+            response = dest_s3.complete_multipart_upload(
+                Bucket=dest_bucket, Key=dest_key, UploadId=upload_id,
+                MultipartUpload={'Parts': [{'PartNumber': p['PartNumber'], 'ETag': p['ETag']} for p in parts]})
+        except BaseException:
+            try:
+                dest_s3.abort_multipart_upload(Bucket=dest_bucket, Key=dest_key, UploadId=upload_id)
+                print(f"CROSS_PROFILE_COPY: Aborted upload {upload_id} for '{dest_key}'.")
+            except Exception as e_abort:
+                print(f"CROSS_PROFILE_COPY: Could not abort upload {upload_id} for '{dest_key}': {e_abort}")
+            raise
+
+        # Multipart ETag = MD5 of the concatenated part MD5s + "-<part count>"
+        expected_etag = f"{hashlib.md5(b''.join(p['digest'] for p in parts)).hexdigest()}-{len(parts)}"
+        self._verify(dest_s3, dest_bucket, dest_key, response.get('ETag'), expected_etag, head, size)
+        return {"strategy": "stream", "etag": response.get('ETag'), "parts": len(parts)}
+
+    def _verify(self, dest_s3, dest_bucket, dest_key, dest_etag, expected_etag, source_head, size):
+        """Checks the new object against the checksums computed while streaming; deletes it on mismatch."""
+        problem = None
+        source_md5 = self._plain_md5_etag(source_head.get('ETag'))
+        dest_etag = (dest_etag or "").strip('"').lower()
+        if '-' in expected_etag: # Multipart: comparable when the destination returned a multipart ETag
+            comparable_dest_etag = dest_etag if '-' in dest_etag else None
+        else:
+            comparable_dest_etag = self._plain_md5_etag(dest_etag)
+        if source_md5 and '-' not in expected_etag and source_md5 != expected_etag:
+            problem = f"read {expected_etag} from the source, whose ETag is {source_md5}"
+        elif comparable_dest_etag and comparable_dest_etag != expected_etag:
+            problem = f"destination ETag {comparable_dest_etag} != expected {expected_etag}"
+        elif not comparable_dest_etag: # e.g. SSE-KMS ETags are not MD5s: fall back to the size
+            dest_size = int(dest_s3.head_object(Bucket=dest_bucket, Key=dest_key).get('ContentLength', -1))
+            if dest_size != size: problem = f"destination size {dest_size} != source size {size}"
+        if problem:
+            try:
+                dest_s3.delete_object(Bucket=dest_bucket, Key=dest_key)
+            except Exception as e_delete:
+                print(f"CROSS_PROFILE_COPY: Could not remove unverified copy '{dest_key}': {e_delete}")
+            raise ChecksumMismatch(f"Checksum verification failed for '{dest_key}': {problem}")
@@ -0,0 +1,231 @@
+import threading
+import time
+from botocore.exceptions import ClientError
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from s3ops.S3Operation import S3Operation, CANCELLED_ERROR_MESSAGE
+from s3ops.S3Metrics import set_current_op_type
+
+
+# --- S3DeleteAggregator (groups single-key deletes into delete_objects calls) ---
+# S3OperationWorker hands over DELETE_OBJECT operations, and the "delete original" step
+# of COPY_OBJECT moves, instead of calling delete_object itself. Keys are buffered per
+# bucket and sent as one delete_objects request once FLUSH_MAX_KEYS are waiting or the
+# oldest key has waited FLUSH_WINDOW_SECONDS. Per-key results from the response are
+# routed back to each originating S3Operation via operation_finished (same signature
+# as S3OperationWorker.operation_finished). Keys that fail with a retryable error wait out
+# the retry backoff in _retry_entries; only their bucket pauses, the others keep flushing.
+class S3DeleteAggregator(QThread):
+    operation_finished = pyqtSignal(S3Operation, object, str)
+
+    FLUSH_MAX_KEYS = 1000       # delete_objects hard limit
+    FLUSH_WINDOW_SECONDS = 0.2  # Short enough to be invisible for a single interactive delete
+
+    def __init__(self, op_queue, parent=None):
+        super().__init__(parent)
+        self.op_queue = op_queue # S3OperationScheduler, for in-flight bookkeeping
+        self.s3_client_ref = None
+        self.retry_policy = None # S3RetryPolicy; failed/throttled keys are re-buffered after its backoff
+        self.concurrency_controller = None
+        self._is_running = True
+        self._cond = threading.Condition()
+        self._buffers = {}          # bucket -> list of pending entries
+        self._buffer_started_at = {} # bucket -> time.monotonic() of the oldest entry
+        self._retry_entries = {}     # bucket -> entries waiting out a retry backoff
+        self._retry_due = {}         # bucket -> time.monotonic() when they go back in front of the buffer
+
+    def set_s3_client(self, client):
+        self.s3_client_ref = client
+
+    def stop(self):
+        with self._cond:
+            self._is_running = False
+            self._cond.notify_all()
+
+    def submit_delete(self, operation: S3Operation):
+        """DELETE_OBJECT: result True on success (like the direct delete_object path). False if stopped."""
+        return self._add_entry(operation.bucket, {"operation": operation, "key": operation.key, "move_result": None})
+
+    def submit_move_delete(self, operation: S3Operation, source_bucket, key_to_delete, copy_result: dict):
+        """COPY_OBJECT with is_part_of_move: copy already succeeded, delete the original and report in copy_result."""
+        return self._add_entry(source_bucket, {"operation": operation, "key": key_to_delete, "move_result": copy_result})
+
+    def _add_entry(self, bucket, entry):
+        with self._cond:
+            if not self._is_running:
+                return False # Shutting down; the worker deletes the key itself
+            bucket_entries = self._buffers.setdefault(bucket, [])
+            if not bucket_entries:
+                self._buffer_started_at[bucket] = time.monotonic()
+            bucket_entries.append(entry)
+            self._cond.notify_all()
+            return True
+
+    def _retry_later(self, bucket, entries, delay, error_code, error_text):
+        # Called on the aggregator thread; the flush loop puts the keys back in front of the buffer once due,
+        # other buckets keep flushing meanwhile
+        with self._cond:
+            if not self._is_running: # Shutting down: no backoff left to wait out
+                stopped = True
+            else:
+                stopped = False
+                self._retry_entries[bucket] = self._retry_entries.get(bucket, []) + entries
+                self._retry_due[bucket] = max(self._retry_due.get(bucket, 0.0), time.monotonic() + delay)
+                self._cond.notify_all()
+        if stopped:
+            for entry in entries:
+                entry["operation"].error_code = error_code
+                self._finish_entry(entry, False, error_text)
+            return
+        for entry in entries:
+            entry["operation"].auto_retry_count += 1
+            entry["operation"].retry_count += 1
+            if self.concurrency_controller is not None:
+                self.concurrency_controller.record_retry(error_code)
+        print(f"DELETE_AGGREGATOR: Retrying {len(entries)} delete(s) on '{bucket}' in {delay:.2f}s ({error_code}).")
+
+    def _release_due_retries(self, now, release_all=False):
+        # Under self._cond. Returns the seconds until the next backoff ends (None: nothing waiting)
+        for bucket in [b for b, due in self._retry_due.items() if release_all or due <= now]:
+            del self._retry_due[bucket]
+            self._buffers[bucket] = self._retry_entries.pop(bucket) + self._buffers.get(bucket, [])
+            self._buffer_started_at[bucket] = now - self.FLUSH_WINDOW_SECONDS # Due right away
+        return min(self._retry_due.values()) - now if self._retry_due else None
+
+    def _retry_delay(self, entries, retryable, retry_after=None):
+        if self.retry_policy is None or not retryable: return None
+        # One budget unit per delete_objects call; the first op stands in for the whole group
+        return self.retry_policy.next_delay(entries[0]["operation"], retryable=True, retry_after=retry_after)
+
+    def pending_count(self):
+        with self._cond:
+            return sum(len(entries) for entries in self._buffers.values()) \
+                + sum(len(entries) for entries in self._retry_entries.values())
+
+    def _take_ready_batches(self, flush_all=False):
+        # Returns [(bucket, entries)] that are full or have waited long enough; buckets in a retry backoff wait it out
+        ready = []
+        now = time.monotonic()
+        for bucket in list(self._buffers.keys()):
+            if bucket in self._retry_due and not flush_all: continue
+            entries = self._buffers[bucket]
+            while len(entries) >= self.FLUSH_MAX_KEYS:
+                ready.append((bucket, entries[:self.FLUSH_MAX_KEYS]))
+                entries = entries[self.FLUSH_MAX_KEYS:]
+                self._buffer_started_at[bucket] = now
+            if entries and (flush_all or now - self._buffer_started_at[bucket] >= self.FLUSH_WINDOW_SECONDS):
+                ready.append((bucket, entries))
+                entries = []
+            if entries:
+                self._buffers[bucket] = entries
+            else:
+                self._buffers.pop(bucket, None)
+                self._buffer_started_at.pop(bucket, None)
+        return ready
+
+    def run(self):
+        set_current_op_type("DELETE_BATCHED") # Metrics: the aggregated delete_objects calls of DELETE_OBJECT / moves
+        while True:
+            with self._cond:
+                next_retry_in = self._release_due_retries(time.monotonic(), release_all=not self._is_running)
+                ready = self._take_ready_batches(flush_all=not self._is_running)
+                if not ready:
+                    if not self._is_running:
+                        break
+                    wait_seconds = self.FLUSH_WINDOW_SECONDS / 2
+                    if next_retry_in is not None: # Submits and stop() notify; otherwise wake when the first backoff ends
+                        wait_seconds = min(wait_seconds, next_retry_in) if self._buffers else next_retry_in
+                    self._cond.wait(max(wait_seconds, 0.001))
+                    continue
+            for bucket, entries in ready:
+                self._flush_bucket(bucket, entries)
+
+    def _flush_bucket(self, bucket, entries):
+        s3 = self.s3_client_ref
+        # A cancelled plain delete is simply not sent; move deletes still run so the move completes
+        live_entries = []
+        for entry in entries:
+            if entry["move_result"] is None and entry["operation"].is_cancelled():
+                entry["operation"].error_code = "Cancelled"
+                self._finish_entry(entry, False, CANCELLED_ERROR_MESSAGE)
+            else:
+                live_entries.append(entry)
+        if not live_entries: return
+
+        entries_by_key = {}
+        for entry in live_entries: # Same key twice in one request is rejected by some endpoints
+            entries_by_key.setdefault(entry["key"], []).append(entry)
+
+        print(f"DELETE_AGGREGATOR: delete_objects on '{bucket}' for {len(entries_by_key)} key(s) ({len(live_entries)} operation(s)).")
+        if s3 is None:
+            for entry in live_entries:
+                self._finish_entry(entry, False, "S3 client not available in delete aggregator.")
+            return
+
+        try:
+            response = s3.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': k} for k in entries_by_key], 'Quiet': False})
+        except ClientError as e:
+            s3_error_code = e.response.get('Error', {}).get('Code', 'UnknownS3Error')
+            http_status = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+            error_code = "503" if http_status == 503 and s3_error_code == 'UnknownS3Error' else s3_error_code
+            error_text = f"S3 Error ({s3_error_code}) during bulk delete: {e.response.get('Error', {}).get('Message', str(e))}"
+            if self.retry_policy is not None:
+                retryable, retry_after = self.retry_policy.classify(e)
+                delay = self._retry_delay(live_entries, retryable, retry_after)
+                if delay is not None:
+                    self._retry_later(bucket, live_entries, delay, error_code, error_text)
+                    return
+            for entry in live_entries:
+                entry["operation"].error_code = error_code
+                self._finish_entry(entry, False, error_text)
+            return
+        except Exception as e_general:
+            for entry in live_entries:
+                self._finish_entry(entry, False, f"Unexpected error during bulk delete: {e_general}")
+            return
+
+        deleted_keys = {d.get('Key') for d in response.get('Deleted', [])}
+        errors_by_key = {err.get('Key'): err for err in response.get('Errors', [])}
+
+        # Per-key transient failures (InternalError, SlowDown...) go round again instead of failing their ops
+        retryable_entries = [entry for key, key_entries in entries_by_key.items()
+                             if key not in deleted_keys and self.retry_policy is not None
+                             and self.retry_policy.is_retryable_error_code(errors_by_key.get(key, {}).get('Code'))
+                             for entry in key_entries]
+        retry_delay = self._retry_delay(retryable_entries, True) if retryable_entries else None
+        retried_keys = {entry["key"] for entry in retryable_entries} if retry_delay is not None else set()
+
+        for key, key_entries in entries_by_key.items():
+            if key in deleted_keys:
+                for entry in key_entries: self._finish_entry(entry, True, "")
+            elif key in retried_keys:
+                continue
+            else:
+                err = errors_by_key.get(key, {})
+                error_text = f"S3 Error ({err.get('Code', 'Unknown')}) deleting '{key}': {err.get('Message', 'No result returned for key')}"
+                for entry in key_entries:
+                    entry["operation"].error_code = err.get('Code')
+                    self._finish_entry(entry, False, error_text)
+
+        if retried_keys:
+            first_error = errors_by_key.get(next(iter(retried_keys)), {})
+            error_text = f"S3 Error ({first_error.get('Code', 'Unknown')}) during bulk delete: {first_error.get('Message', '')}"
+            self._retry_later(bucket, retryable_entries, retry_delay, first_error.get('Code'), error_text)
+
+    def _finish_entry(self, entry, deleted_ok, error_text):
+        operation = entry["operation"]
+        move_result = entry["move_result"]
+        if move_result is not None:
+            # The copy itself succeeded; a failed delete is reported in the result, like the old inline path
+            move_result["original_deleted"] = deleted_ok
+            if not deleted_ok:
+                move_result["original_delete_error"] = error_text
+                print(f"DELETE_AGGREGATOR: Failed to delete original '{entry['key']}' after move: {error_text}")
+            result, error_msg = move_result, ""
+        else:
+            result, error_msg = (True, "") if deleted_ok else (None, error_text)
+
+        operation.finished_at = time.monotonic()
+        if self.op_queue is not None:
+            self.op_queue.mark_finished(operation)
+        self.operation_finished.emit(operation, result, error_msg)
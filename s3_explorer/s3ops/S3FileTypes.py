@@ -0,0 +1,102 @@
+import os
+
+from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import QFileInfo, QSize
+from PyQt6.QtWidgets import QFileIconProvider
+
+ICONS_DIR = "icons"
+DEFAULT_ICON_FILE = "default.png"
+ICON_FILE_EXTENSIONS = {
+    "pdf.png": (".pdf",),
+    "text.png": (".txt", ".log", ".md"),
+    "image.png": (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"),
+    "archive.png": (".zip", ".tar", ".gz", ".rar"),
+    "excel.png": (".csv", ".xls", ".xlsx"),
+    "code.png": (".py", ".js", ".java", ".cpp"),
+    "word.png": (".doc", ".docx"),
+}
+EXTENSION_ICON_FILES = {ext: icon_file for icon_file, extensions in ICON_FILE_EXTENSIONS.items() for ext in extensions}
+PRELOADED_ICON_FILES = (DEFAULT_ICON_FILE,) # What a first screen shows besides folders (those use the style's icon)
+PRELOAD_ICON_SIZE = QSize(16, 16)
+
+
+# --- S3FileTypeRegistry (shared by all listing models, GUI thread only) ---
+# Every distinct lower-cased extension gets a small integer type id the first time a key with it is seen;
+# models store that id per row, so population is one dict lookup per row and painting one list index.
+# Icons are loaded once per icon file, when a row of that type is first painted; optionally the OS's
+# native icon for the extension (QFileIconProvider) is used, falling back to the bundled one.
+class S3FileTypeRegistry:
+    def __init__(self, icons_dir=ICONS_DIR):
+        self.icons_dir = icons_dir
+        self.use_native_icons = False
+        self._icon_provider = None
+        self._type_id_by_extension = {}
+        self._extensions = [] # type id -> extension ('' for none)
+        self._labels = []     # type id -> Type column text
+        self._icons = []      # type id -> QIcon, None until first painted
+        self._bundled_icons = {} # icon file -> QIcon
+
+    def type_id_for_key(self, key):
+        ext = os.path.splitext(key)[1].lower()
+        type_id = self._type_id_by_extension.get(ext)
+        if type_id is None:
+            type_id = self._type_id_by_extension[ext] = len(self._labels)
+            self._extensions.append(ext)
+            self._labels.append(ext[1:].upper() if ext else "File")
+            self._icons.append(None)
+        return type_id
+
+    def label(self, type_id):
+        return self._labels[type_id]
+
+    def icon(self, type_id):
+        icon = self._icons[type_id]
+        if icon is None:
+            icon = self._icons[type_id] = self._load_icon(self._extensions[type_id])
+        return icon
+
+    def set_use_native_icons(self, enabled):
+        if enabled == self.use_native_icons: return
+        self.use_native_icons = enabled
+        self._icons = [None] * len(self._icons) # Reloaded from the other source as rows repaint
+
+    def preload(self):
+        """Decodes the icons a first screen needs now instead of during its first paint."""
+        for icon_file in PRELOADED_ICON_FILES:
+            self._bundled_icon(icon_file).pixmap(PRELOAD_ICON_SIZE)
+
+    def _load_icon(self, ext):
+        if self.use_native_icons and ext:
+            if self._icon_provider is None:
+                self._icon_provider = QFileIconProvider()
+            native_icon = self._icon_provider.icon(QFileInfo(f"file{ext}")) # Looked up by suffix; the file need not exist
+            if not native_icon.isNull():
+                return native_icon
+        return self._bundled_icon(EXTENSION_ICON_FILES.get(ext, DEFAULT_ICON_FILE))
+
+    def _bundled_icon(self, icon_file):
+        icon = self._bundled_icons.get(icon_file)
+        if icon is None:
+            icon = self._bundled_icons[icon_file] = QIcon(os.path.join(self.icons_dir, icon_file))
+        return icon
+
+
+_file_type_registry = None
+
+def get_file_type_registry():
+    """The process-wide registry; created on first use, after the QApplication exists."""
+    global _file_type_registry
+    if _file_type_registry is None:
+        _file_type_registry = S3FileTypeRegistry()
+    return _file_type_registry
+
+
+# --- Helper Functions ---
+def get_file_type(key):
+    if key.endswith('/'): return "Folder"
+    registry = get_file_type_registry()
+    return registry.label(registry.type_id_for_key(key))
+
+def get_icon_for_file(filename):
+    registry = get_file_type_registry()
+    return registry.icon(registry.type_id_for_key(filename))
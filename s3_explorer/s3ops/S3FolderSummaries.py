@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+from s3ops.S3ListingCache import parent_prefix
+
+
+class FolderSummary:
+    """Recursive totals of one prefix: bytes and object count of everything below it, newest LastModified (epoch)."""
+    __slots__ = ("total_bytes", "object_count", "newest_mtime")
+
+    def __init__(self, total_bytes=0, object_count=0, newest_mtime=None):
+        self.total_bytes = total_bytes
+        self.object_count = object_count
+        self.newest_mtime = newest_mtime
+
+    def add_object(self, size, mtime):
+        self.total_bytes += size or 0
+        self.object_count += 1
+        if mtime is not None and (self.newest_mtime is None or mtime > self.newest_mtime):
+            self.newest_mtime = mtime
+
+
+def summarize_listed_objects(summaries, root_prefix, listed_objects):
+    """Adds one flat list_objects_v2 page under root_prefix to summaries (prefix -> FolderSummary).
+    Every object counts towards root_prefix and each subfolder between it and the object, so one
+    recursive listing yields the totals of the whole subtree. Folder marker objects only create their folder."""
+    for obj in listed_objects:
+        key = obj['Key']
+        is_marker = key.endswith('/')
+        modified_time = obj.get('LastModified')
+        mtime = modified_time.timestamp() if modified_time else None
+        folder, cut = root_prefix, len(root_prefix) - 1
+        while True:
+            summary = summaries.get(folder)
+            if summary is None:
+                summary = summaries[folder] = FolderSummary()
+            if not is_marker:
+                summary.add_object(obj.get('Size'), mtime)
+            cut = key.find('/', cut + 1)
+            if cut < 0: break
+            folder = key[:cut + 1]
+    return summaries
+
+
+# --- S3FolderSummaryCache (recursive folder totals shared by all tabs, owned by OperationManager) ---
+# Keyed by (profile, bucket, prefix). One SUMMARIZE_PREFIX operation stores the totals of the prefix
+# it listed and of every subfolder below it, so opening a summarized folder shows its children's
+# sizes without listing again. A mutation drops the totals of every ancestor of the key it touched
+# (they all include it); folder deletes and prefix moves also drop the subtree. Entries expire after
+# MAX_AGE_SECONDS because other clients change buckets too. Bounded by entry count, LRU eviction.
+class S3FolderSummaryCache:
+    MAX_ENTRIES = 100_000
+    MAX_AGE_SECONDS = 900.0
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or self.MAX_ENTRIES
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # (profile, bucket, prefix) -> (FolderSummary, monotonic stored_at)
+        self._invalidated_at = {}     # (profile, bucket, prefix) -> monotonic time of the last invalidation
+
+    def get(self, profile, bucket, prefix):
+        cache_key = (profile, bucket, prefix)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None: return None
+            if time.monotonic() - entry[1] > self.MAX_AGE_SECONDS:
+                del self._entries[cache_key]
+                return None
+            self._entries.move_to_end(cache_key)
+            return entry[0]
+
+    def put_subtree(self, profile, bucket, summaries, listed_at=None):
+        """Stores the result of one recursive listing; prefixes invalidated after listed_at are skipped (stale totals)."""
+        now = time.monotonic()
+        with self._lock:
+            for prefix, summary in summaries.items():
+                cache_key = (profile, bucket, prefix)
+                invalidated_at = self._invalidated_at.get(cache_key)
+                if listed_at is not None and invalidated_at is not None and invalidated_at >= listed_at:
+                    continue
+                self._entries.pop(cache_key, None)
+                self._entries[cache_key] = (summary, now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _forget(self, cache_key, now):
+        self._entries.pop(cache_key, None)
+        self._invalidated_at[cache_key] = now
+
+    def invalidate_key(self, profile, bucket, key):
+        """key was written or deleted: every folder above it has different totals now."""
+        now = time.monotonic()
+        with self._lock:
+            prefix = parent_prefix(key)
+            while True:
+                self._forget((profile, bucket, prefix), now)
+                if not prefix: break
+                prefix = parent_prefix(prefix)
+            if len(self._invalidated_at) > 10 * self.max_entries: # Only in-flight summaries care about old invalidations
+                cutoff = now - self.MAX_AGE_SECONDS
+                self._invalidated_at = {k: t for k, t in self._invalidated_at.items() if t >= cutoff}
+
+    def drop_subtree(self, profile, bucket, prefix):
+        now = time.monotonic()
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == profile and k[1] == bucket and k[2].startswith(prefix)]:
+                self._forget(cache_key, now)
+            self._invalidated_at[(profile, bucket, prefix)] = now
+
+    def clear(self, profile=None):
+        with self._lock:
+            for cache_key in [k for k in self._entries if profile is None or k[0] == profile]:
+                del self._entries[cache_key]
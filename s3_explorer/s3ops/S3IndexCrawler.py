@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+
+
+def parent_folder_keys(key):
+    """'a/b/c.txt' -> ['a/', 'a/b/']; folders never show up as keys of a flat listing, only inside them."""
+    folder_keys = []
+    cut = key.find('/')
+    while 0 <= cut < len(key) - 1:
+        folder_keys.append(key[:cut + 1])
+        cut = key.find('/', cut + 1)
+    return folder_keys
+
+
+def object_name(key):
+    return os.path.basename(key.rstrip('/'))
+
+
+# --- S3IndexCrawler (fills the search index of one bucket, one listing page per transaction) ---
+# A flat list_objects_v2 (no delimiter) walks every prefix of the bucket at 1000 keys per request.
+# Each page is upserted with the crawl's generation and committed together with the continuation
+# token, so a crawl interrupted by shutdown resumes where it stopped. Rows of earlier generations
+# left over when the walk completes are objects that disappeared; they are deleted in chunks.
+# Only one page of keys (plus its parent folders) is ever held in memory, whatever the bucket size.
+class S3IndexCrawler(QThread):
+    crawl_progress = pyqtSignal(int, int)     # bucket_id, rows indexed so far in this crawl
+    crawl_finished = pyqtSignal(int, int, str) # bucket_id, object count, error_message ("" = success)
+
+    PAGE_SIZE = 1000
+    DELETE_CHUNK_ROWS = 10000
+
+    def __init__(self, db_path, bucket_id, bucket, s3_client, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.bucket_id = bucket_id
+        self.bucket = bucket
+        self.s3_client = s3_client
+        self._is_running = True
+
+    def stop(self):
+        """Stops after the current page; the committed continuation token lets the next start resume."""
+        self._is_running = False
+
+    def run(self):
+        error_message = ""
+        object_count = 0
+        conn = None
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            generation, continuation_token = self._begin_crawl(conn)
+            indexed_rows = 0
+            while self._is_running:
+                list_kwargs = {"Bucket": self.bucket, "MaxKeys": self.PAGE_SIZE}
+                if continuation_token:
+                    list_kwargs["ContinuationToken"] = continuation_token
+                page = self.s3_client.list_objects_v2(**list_kwargs)
+                continuation_token = page.get('NextContinuationToken') if page.get('IsTruncated') else None
+                indexed_rows += self._store_page(conn, page.get('Contents', []), generation, continuation_token)
+                self.crawl_progress.emit(self.bucket_id, indexed_rows)
+                if continuation_token is None:
+                    object_count = self._finish_crawl(conn, generation)
+                    break
+            if not self._is_running and continuation_token is not None:
+                error_message = "Crawl was stopped before it finished."
+        except Exception as e:
+            error_message = str(e) or e.__class__.__name__
+            print(f"INDEX_CRAWLER: Crawl of s3://{self.bucket} failed: {error_message}")
+        finally:
+            if conn is not None:
+                conn.close()
+        print(f"INDEX_CRAWLER: Crawl of s3://{self.bucket} ended ({object_count} objects, error: '{error_message}').")
+        self.crawl_finished.emit(self.bucket_id, object_count, error_message)
+
+    def _begin_crawl(self, conn):
+        generation, resume_token = conn.execute(
+            "SELECT crawl_generation, resume_token FROM indexed_buckets WHERE id = ?", (self.bucket_id,)).fetchone()
+        if resume_token:
+            print(f"INDEX_CRAWLER: Resuming crawl of s3://{self.bucket} (generation {generation}).")
+            return generation, resume_token
+        generation += 1
+        conn.execute("UPDATE indexed_buckets SET crawl_generation = ?, last_crawl_started = ? WHERE id = ?",
+                     (generation, time.time(), self.bucket_id))
+        conn.commit()
+        return generation, None
+
+    def _store_page(self, conn, listed_objects, generation, continuation_token):
+        rows = []
+        folder_keys = set()
+        for obj in listed_objects:
+            key = obj['Key']
+            folder_keys.update(parent_folder_keys(key))
+            if key.endswith('/'):
+                folder_keys.add(key) # Folder marker object
+                continue
+            modified_time = obj.get('LastModified')
+            rows.append((self.bucket_id, key, object_name(key), obj.get('Size'),
+                         modified_time.timestamp() if modified_time else None, 0, generation))
+        rows.extend((self.bucket_id, folder_key, object_name(folder_key), None, None, 1, generation) for folder_key in folder_keys)
+        with conn:
+            upsert_objects(conn, rows)
+            conn.execute("UPDATE indexed_buckets SET resume_token = ? WHERE id = ?", (continuation_token, self.bucket_id))
+        return len(rows)
+
+    def _finish_crawl(self, conn, generation):
+        while self._is_running: # Leftovers of older generations are gone from S3
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM objects WHERE id IN (SELECT id FROM objects WHERE bucket_id = ? AND generation < ? LIMIT ?)",
+                    (self.bucket_id, generation, self.DELETE_CHUNK_ROWS)).rowcount
+            if deleted < self.DELETE_CHUNK_ROWS: break
+        object_count = conn.execute("SELECT COUNT(*) FROM objects WHERE bucket_id = ?", (self.bucket_id,)).fetchone()[0]
+        with conn:
+            conn.execute("UPDATE indexed_buckets SET resume_token = NULL, last_crawl_finished = ?, object_count = ? WHERE id = ?",
+                         (time.time(), object_count, self.bucket_id))
+        return object_count
+
+
+def upsert_objects(conn, rows):
+    """rows: (bucket_id, key, name, size, mtime, is_folder, generation). The name never changes for a key,
+    so the update leaves the full-text index alone."""
+    conn.executemany(
+        "INSERT INTO objects (bucket_id, key, name, size, mtime, is_folder, generation) VALUES (?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(bucket_id, key) DO UPDATE SET size = excluded.size, mtime = excluded.mtime, "
+        "is_folder = excluded.is_folder, generation = excluded.generation", rows)
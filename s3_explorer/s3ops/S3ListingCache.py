@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def parent_prefix(key):
+    """'a/b/c.txt' -> 'a/b/', 'a/b/' -> 'a/', 'a' or 'a/' -> '' (bucket root)."""
+    stripped = key.rstrip('/')
+    cut = stripped.rfind('/')
+    return stripped[:cut + 1] if cut >= 0 else ""
+
+
+class _ListingEntry:
+    __slots__ = ("folders", "files", "folder_set", "stored_at", "stale", "row_count")
+
+    def __init__(self, folders, files, stale=False):
+        self.folders = folders
+        self.files = files
+        self.folder_set = frozenset(folders) # Invalidation asks "does this listing show that subfolder?" per mutated key
+        self.stored_at = time.monotonic()
+        self.stale = stale # Invalidated by a mutation (or listed while one happened): show, but always revalidate
+        self.row_count = len(folders) + len(files)
+
+    def age_seconds(self):
+        return time.monotonic() - self.stored_at
+
+    def is_fresh(self):
+        return not self.stale and self.age_seconds() < S3ListingCache.FRESH_SECONDS
+
+    def result(self):
+        """Same shape as the LIST worker result, so tabs render cached and fresh listings the same way."""
+        return {"folders": self.folders, "files": self.files, "from_cache": True}
+
+
+# --- S3ListingCache (delimiter listings shared by all tabs, owned by OperationManager) ---
+# Keyed by (profile, bucket, prefix). Tabs show a cached listing immediately and, unless it is
+# younger than FRESH_SECONDS and nothing invalidated it, revalidate with a LIST in the background
+# (stale-while-revalidate); the fresh rows are diff-applied onto the view.
+#   - bounded by the total number of rows (folders + files) over all prefixes, LRU eviction
+#   - mutations finished by OperationManager invalidate only the listings they change: the parent
+#     prefix of the key, plus ancestors whose subfolder appears / disappears; prefix moves and folder
+#     deletes drop the whole subtree
+#   - a LIST that was running while a mutation invalidated its prefix is stored as stale, so the
+#     pre-mutation rows are never treated as fresh
+# Entries older than MAX_STALE_SECONDS are not shown at all (the tab lists from scratch).
+class S3ListingCache:
+    MAX_TOTAL_ROWS = 200_000
+    FRESH_SECONDS = 30.0
+    MAX_STALE_SECONDS = 3600.0
+    INVALIDATION_MEMORY_SECONDS = 600.0 # How long an invalidation can still mark an in-flight LIST stale
+
+    def __init__(self, max_total_rows=None):
+        self.max_total_rows = max_total_rows or self.MAX_TOTAL_ROWS
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # (profile, bucket, prefix) -> _ListingEntry, least recently used first
+        self._total_rows = 0
+        self._invalidated_at = {}     # (profile, bucket, prefix) -> monotonic time of the last invalidation
+        self.hits = 0
+        self.misses = 0
+
+    # --- Reads ---
+    def get(self, profile, bucket, prefix):
+        """The cached entry (moved to most recently used), or None when missing / too old to show."""
+        cache_key = (profile, bucket, prefix)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry.age_seconds() > self.MAX_STALE_SECONDS:
+                self._remove(cache_key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry
+
+    def peek(self, profile, bucket, prefix):
+        """Like get() but without touching the LRU order or the hit counters (invalidation checks)."""
+        with self._lock:
+            return self._entries.get((profile, bucket, prefix))
+
+    def stats(self):
+        with self._lock:
+            return {"prefixes": len(self._entries), "rows": self._total_rows, "max_rows": self.max_total_rows,
+                    "hits": self.hits, "misses": self.misses}
+
+    # --- Writes ---
+    def put(self, profile, bucket, prefix, result, listed_at=None):
+        """Stores a LIST result ({'folders', 'files'}); listed_at is when the LIST started (time.monotonic())."""
+        cache_key = (profile, bucket, prefix)
+        folders, files = list(result.get("folders", [])), list(result.get("files", []))
+        if len(folders) + len(files) > self.max_total_rows:
+            print(f"LISTING_CACHE: Not caching s3://{bucket}/{prefix}: {len(folders) + len(files)} rows exceed the cache size.")
+            return
+        with self._lock:
+            invalidated_at = self._invalidated_at.get(cache_key)
+            stale = listed_at is not None and invalidated_at is not None and invalidated_at >= listed_at
+            self._remove(cache_key)
+            entry = _ListingEntry(folders, files, stale=stale)
+            self._entries[cache_key] = entry
+            self._total_rows += entry.row_count
+            while self._total_rows > self.max_total_rows and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, cache_key):
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._total_rows -= entry.row_count
+
+    def _mark_stale(self, cache_key, now):
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            entry.stale = True
+        self._invalidated_at[cache_key] = now
+        if len(self._invalidated_at) > 10_000: # Only in-flight LISTs care about old invalidations
+            cutoff = now - self.INVALIDATION_MEMORY_SECONDS
+            self._invalidated_at = {k: t for k, t in self._invalidated_at.items() if t >= cutoff}
+        return entry
+
+    # --- Invalidation (OperationManager, after mutating operations) ---
+    def invalidate_prefix(self, profile, bucket, prefix):
+        with self._lock:
+            self._mark_stale((profile, bucket, prefix), time.monotonic())
+
+    def invalidate_key(self, profile, bucket, key, removed=False):
+        """key (object or folder marker) was written (removed=False) or deleted (removed=True).
+        Marks its parent listing stale, and each ancestor whose subfolder list may have changed with it."""
+        now = time.monotonic()
+        with self._lock:
+            child, prefix = key, parent_prefix(key)
+            while True:
+                entry = self._mark_stale((profile, bucket, prefix), now)
+                if not prefix: return
+                if removed:
+                    # The folder disappears from its parent only if this was the last thing in it (unknown = assume so)
+                    ripples = entry is None or (all(folder == child for folder in entry.folders) and
+                                                all(obj.get('Key') == child for obj in entry.files))
+                else:
+                    # A write creates the folder in its parent's listing unless the parent already shows it
+                    parent_entry = self._entries.get((profile, bucket, parent_prefix(prefix)))
+                    ripples = parent_entry is None or prefix not in parent_entry.folder_set
+                if not ripples: return
+                child, prefix = prefix, parent_prefix(prefix)
+
+    def drop_subtree(self, profile, bucket, prefix):
+        """Forgets prefix and every listing below it (folder deleted, moved away or replaced)."""
+        now = time.monotonic()
+        with self._lock:
+            doomed = [k for k in self._entries if k[0] == profile and k[1] == bucket and k[2].startswith(prefix)]
+            for cache_key in doomed:
+                self._remove(cache_key)
+                self._invalidated_at[cache_key] = now
+            self._invalidated_at[(profile, bucket, prefix)] = now
+        if doomed:
+            print(f"LISTING_CACHE: Dropped {len(doomed)} cached listing(s) under s3://{bucket}/{prefix}")
+
+    def clear(self, profile=None):
+        with self._lock:
+            for cache_key in [k for k in self._entries if profile is None or k[0] == profile]:
+                self._remove(cache_key)
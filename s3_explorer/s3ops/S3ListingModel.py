@@ -0,0 +1,262 @@
+import os
+import sys
+import time
+from array import array
+
+from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from s3ops.S3FileTypes import get_file_type_registry, get_file_type, get_icon_for_file # Helpers re-exported for existing importers
+
+# --- Helper Functions ---
+def format_size(size_bytes):
+    if size_bytes is None: return ""
+    if size_bytes == 0: return "0 B"
+    size_name = ("B", "KB", "MB", "GB", "TB")
+    i = 0
+    power = 1024 # Use 1024 for binary prefixes
+    while size_bytes >= power and i < len(size_name) - 1:
+        size_bytes /= float(power)
+        i += 1
+    return f"{size_bytes:.2f} {size_name[i]}"
+
+
+# --- Constants for TreeView Model Columns ---
+COL_NAME, COL_TYPE, COL_SIZE, COL_MODIFIED, COL_S3_KEY, COL_IS_FOLDER = range(6)
+LISTING_COLUMN_TITLES = ["Name", "Type", "Size", "Last Modified", "S3 Key", "Is Folder"]
+
+FLAG_FOLDER = 0x01
+UNKNOWN_SIZE = -1    # Folders (CommonPrefixes carry no size) and entries listed without one
+UNKNOWN_MTIME = -1.0
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1 # Raw sort key of a cell: bytes and epoch as numbers, not the display strings
+
+
+def listing_signature(listed_object):
+    """(size, epoch mtime, ETag) of a list_objects_v2 Contents entry; a row is rebuilt only when this changes."""
+    modified_time = listed_object.get('LastModified')
+    return (listed_object.get('Size'), modified_time.timestamp() if modified_time else None, listed_object.get('ETag'))
+
+
+class S3ListingModel(QAbstractTableModel):
+    """Flat table of one folder listing in columnar storage: one interned key string, one int64 size, one
+    float64 epoch, one ETag reference, a file type id and one flags byte per row. Display strings are made in
+    data(), only for the rows a view actually paints; labels and icons come from the shared file type registry.
+    Rows are stored in arrival order; sorting only permutes _order (view row -> storage row), like a sort proxy
+    would, so no column is copied and row numbers of the public accessors are always view rows."""
+    COMPACT_DEAD_RATIO = 1.0 # Removed rows stay in storage until there are this many per live row
+
+    def __init__(self, folder_icon=None, parent=None):
+        super().__init__(parent)
+        self.folder_icon = folder_icon if folder_icon is not None else QIcon()
+        self.file_types = get_file_type_registry()
+        self._keys = []
+        self._sizes = array('q')
+        self._mtimes = array('d')
+        self._etags = []
+        self._type_ids = array('I')
+        self._flags = bytearray()
+        self._order = array('I')  # view row -> storage row
+        self._dead_rows = 0       # Storage rows no longer in _order (removed), reclaimed by _compact()
+        self._folder_counts = {} # folder key -> recursive object count, for folders whose totals are known
+        self.more_available = False     # The listing is partial: S3 has more keys after the last row
+        self.fetch_more_handler = None  # Called by fetchMore(); the tab lists the next page from its continuation token
+
+    # --- Feeding ---
+    def clear(self):
+        self.more_available = False
+        self._folder_counts = {}
+        if not self._keys: return
+        self.beginResetModel()
+        self._keys, self._etags = [], []
+        self._sizes, self._mtimes, self._type_ids, self._flags = array('q'), array('d'), array('I'), bytearray()
+        self._order, self._dead_rows = array('I'), 0
+        self.endResetModel()
+
+    def append_rows(self, rows):
+        """rows: (key, signature, is_folder) tuples, signature as from listing_signature() (None for folders).
+        They go to the end of the view; the tab re-sorts afterwards."""
+        rows = rows if isinstance(rows, list) else list(rows)
+        if not rows: return
+        first_row = len(self._order)
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(rows) - 1)
+        for key, signature, is_folder in rows:
+            self._append_row(key, signature, is_folder)
+        self.endInsertRows()
+
+    def replace_row(self, row, key, signature, is_folder):
+        self._store_row(self._order[row], key, signature, is_folder)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(LISTING_COLUMN_TITLES) - 1))
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or count <= 0 or row < 0 or row + count > len(self._order):
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        del self._order[row:row + count]
+        self._dead_rows += count
+        if self._dead_rows > self.COMPACT_DEAD_RATIO * len(self._order):
+            self._compact()
+        self.endRemoveRows()
+        return True
+
+    def set_folder_summary(self, row, summary):
+        """Recursive totals (S3FolderSummaries.FolderSummary) of a folder row: shown and sorted on in Size / Last Modified."""
+        stored = self._order[row]
+        key = self._keys[stored]
+        newest_mtime = UNKNOWN_MTIME if summary.newest_mtime is None else summary.newest_mtime
+        if self._folder_counts.get(key) == summary.object_count and self._sizes[stored] == summary.total_bytes \
+                and self._mtimes[stored] == newest_mtime:
+            return
+        self._folder_counts[key] = summary.object_count
+        self._sizes[stored] = summary.total_bytes
+        self._mtimes[stored] = newest_mtime
+        self.dataChanged.emit(self.index(row, COL_SIZE), self.index(row, COL_MODIFIED))
+
+    def _append_row(self, key, signature, is_folder):
+        self._keys.append(None); self._etags.append(None)
+        self._sizes.append(UNKNOWN_SIZE); self._mtimes.append(UNKNOWN_MTIME); self._type_ids.append(0); self._flags.append(0)
+        self._order.append(len(self._keys) - 1)
+        self._store_row(len(self._keys) - 1, key, signature, is_folder)
+
+    def _store_row(self, stored, key, signature, is_folder):
+        size, mtime, etag = signature if signature is not None else (None, None, None)
+        self._keys[stored] = sys.intern(key)
+        self._sizes[stored] = UNKNOWN_SIZE if size is None else size
+        self._mtimes[stored] = UNKNOWN_MTIME if mtime is None else mtime
+        self._etags[stored] = etag
+        self._type_ids[stored] = 0 if is_folder else self.file_types.type_id_for_key(key)
+        self._flags[stored] = FLAG_FOLDER if is_folder else 0
+
+    def _compact(self):
+        # Storage in view order without the removed rows; view rows do not move
+        order = self._order
+        self._keys = list(map(self._keys.__getitem__, order))
+        self._sizes = array('q', map(self._sizes.__getitem__, order))
+        self._mtimes = array('d', map(self._mtimes.__getitem__, order))
+        self._etags = list(map(self._etags.__getitem__, order))
+        self._type_ids = array('I', map(self._type_ids.__getitem__, order))
+        self._flags = bytearray(map(self._flags.__getitem__, order))
+        self._order, self._dead_rows = array('I', range(len(order))), 0
+
+    # --- Row accessors (use these instead of reading cells; rows are view rows) ---
+    def key_at(self, row):
+        return self._keys[self._order[row]]
+
+    def is_folder_at(self, row):
+        return bool(self._flags[self._order[row]] & FLAG_FOLDER)
+
+    def name_at(self, row):
+        return self._stored_name(self._order[row])
+
+    def type_label_at(self, row):
+        stored = self._order[row]
+        return "Folder" if self._flags[stored] & FLAG_FOLDER else self.file_types.label(self._type_ids[stored])
+
+    def size_at(self, row):
+        size = self._sizes[self._order[row]]
+        return None if size == UNKNOWN_SIZE else size
+
+    def mtime_at(self, row):
+        mtime = self._mtimes[self._order[row]]
+        return None if mtime == UNKNOWN_MTIME else mtime
+
+    def signature_at(self, row):
+        if self._flags[self._order[row]] & FLAG_FOLDER: return None
+        return (self.size_at(row), self.mtime_at(row), self._etags[self._order[row]])
+
+    def sort_key_at(self, row, column):
+        """What sort() orders a cell by (SORT_ROLE): bytes and epoch as numbers, unknown ones -1 (first)."""
+        stored = self._order[row]
+        if column == COL_SIZE: return self._sizes[stored]
+        if column == COL_MODIFIED: return self._mtimes[stored]
+        if column == COL_TYPE: return self.type_label_at(row)
+        if column == COL_S3_KEY: return self._keys[stored]
+        if column == COL_IS_FOLDER: return self._flags[stored] & FLAG_FOLDER
+        return self._stored_name(stored)
+
+    def _stored_name(self, stored):
+        key = self._keys[stored]
+        return os.path.basename(key.rstrip('/') if self._flags[stored] & FLAG_FOLDER else key)
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(LISTING_COLUMN_TITLES)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return LISTING_COLUMN_TITLES[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        row, column = index.row(), index.column()
+        stored = self._order[row]
+        is_folder = self._flags[stored] & FLAG_FOLDER
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == COL_NAME: return self._stored_name(stored)
+            if column == COL_TYPE: return self.type_label_at(row)
+            if column == COL_SIZE: return format_size(self.size_at(row)) # Folders: blank until their totals are known
+            if column == COL_MODIFIED:
+                mtime = self.mtime_at(row)
+                # LastModified is UTC; shown as listed, like the datetime strftime this replaced
+                return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(mtime)) if mtime is not None else ""
+            if column == COL_S3_KEY: return self._keys[stored]
+            if column == COL_IS_FOLDER: return "1" if is_folder else "0"
+        elif role == SORT_ROLE:
+            return self.sort_key_at(row, column)
+        elif role == Qt.ItemDataRole.ToolTipRole and column == COL_SIZE and is_folder:
+            object_count = self._folder_counts.get(self._keys[stored])
+            if object_count is not None:
+                return f"{object_count:,} objects, {self.size_at(row):,} bytes (including subfolders)"
+        elif role == Qt.ItemDataRole.DecorationRole and column == COL_NAME:
+            return self.folder_icon if is_folder else self.file_types.icon(self._type_ids[stored])
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.more_available
+
+    def fetchMore(self, parent=QModelIndex()):
+        # Views call this whenever they are scrolled to the end; the handler ignores calls while a page is on its way
+        if not parent.isValid() and self.more_available and self.fetch_more_handler is not None:
+            self.fetch_more_handler()
+
+    def _group_sort_key(self, column, stored_rows, folders):
+        # Indexed by storage row and read through a C-level __getitem__: no Python call per comparison
+        if column == COL_SIZE: return self._sizes.__getitem__
+        if column == COL_MODIFIED: return self._mtimes.__getitem__
+        if column == COL_S3_KEY or (column == COL_NAME and not folders):
+            return self._keys.__getitem__ # Files of one listing share its prefix: key order is name order
+        if column == COL_NAME:
+            return {stored: self._stored_name(stored) for stored in stored_rows}.__getitem__
+        if column == COL_TYPE and not folders:
+            labels = {type_id: self.file_types.label(type_id) for type_id in set(self._type_ids)}
+            rank_of = {type_id: rank for rank, type_id in enumerate(sorted(labels, key=labels.__getitem__))}
+            return [rank_of[type_id] for type_id in self._type_ids].__getitem__
+        return None # Types of folders, Is Folder: the grouping already is the order
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Folders first in either direction, each group ordered by SORT_ROLE; ties keep their previous order.
+        Only the view order changes; persistent indexes (selection, current item) follow their rows."""
+        if len(self._order) < 2: return
+        old_order, flags = self._order, self._flags
+        new_order = []
+        for folders, stored_rows in ((True, [stored for stored in old_order if flags[stored] & FLAG_FOLDER]),
+                                     (False, [stored for stored in old_order if not flags[stored] & FLAG_FOLDER])):
+            sort_key = self._group_sort_key(column, stored_rows, folders)
+            if sort_key is not None:
+                stored_rows.sort(key=sort_key, reverse=(order == Qt.SortOrder.DescendingOrder))
+            new_order.extend(stored_rows)
+
+        self.layoutAboutToBeChanged.emit()
+        self._order = array('I', new_order)
+        old_indexes = self.persistentIndexList()
+        if old_indexes:
+            view_row_of = [0] * len(self._keys)
+            for new_row, stored in enumerate(new_order):
+                view_row_of[stored] = new_row
+            self.changePersistentIndexList(old_indexes, [self.index(view_row_of[old_order[index.row()]], index.column())
+                                                         for index in old_indexes])
+        self.layoutChanged.emit()
@@ -0,0 +1,98 @@
+import time
+from collections import deque
+
+from s3ops.S3Operation import S3Operation, S3OpType
+from s3ops.S3OperationScheduler import S3OperationScheduler
+
+
+# --- S3ListingPrefetcher (warms the shared listing cache ahead of navigation, owned by OperationManager) ---
+# Tabs hand it the first subfolders of a folder they just showed and folders the mouse rests on;
+# the app hands it the favorites at startup. Each becomes a one-page LIST in the bulk lane, so it
+# never competes with browsing; a folder that fits one page lands in S3ListingCache and the next
+# navigation into it shows rows without waiting for S3 (and skips the LIST while the entry is fresh).
+#   - folders with a fresh cached listing, or already being prefetched, are skipped
+#   - at most MAX_RUNNING prefetches are queued at once; the rest wait here, hover hints first
+#   - each profile may spend BUDGET_REQUESTS LISTs per BUDGET_WINDOW_SECONDS on prefetching
+#   - nothing is prefetched while transfers run or a batch is active; waiting hints are dropped
+class S3ListingPrefetcher:
+    MAX_RUNNING = 2
+    MAX_WAITING = 32 # Hints past this are dropped; a hover hint still goes to the front
+    BUDGET_REQUESTS = 120
+    BUDGET_WINDOW_SECONDS = 600.0
+    BULK_TRANSFER_OP_TYPES = {S3OpType.UPLOAD_FILE, S3OpType.DOWNLOAD_FILE, S3OpType.COPY_OBJECT,
+                              S3OpType.MOVE_PREFIX, S3OpType.DELETE_OBJECT, S3OpType.DELETE_FOLDER}
+
+    def __init__(self, operation_manager):
+        self.operation_manager = operation_manager
+        self._waiting = deque() # (bucket, prefix), next to start on the left
+        self._running = {}      # (profile, bucket, prefix) -> prefetch LIST in the queue
+        self._spent_at = {}     # profile -> deque of time.monotonic() of prefetch LISTs within the budget window
+
+    def prefetch(self, bucket, prefix, urgent=False):
+        """Hint that s3://bucket/prefix is likely to be opened next; urgent (hover) jumps the waiting hints."""
+        if not bucket: return
+        prefix = prefix if not prefix or prefix.endswith('/') else prefix + '/'
+        target = (bucket, prefix)
+        if target in self._waiting:
+            if not urgent: return
+            self._waiting.remove(target)
+        if urgent: self._waiting.appendleft(target)
+        else: self._waiting.append(target)
+        while len(self._waiting) > self.MAX_WAITING:
+            self._waiting.pop()
+        self._start_waiting()
+
+    def prefetch_many(self, targets):
+        for bucket, prefix in targets:
+            self.prefetch(bucket, prefix)
+
+    def reset(self):
+        """Client / profile changed: hints and running prefetches of the previous one are forgotten."""
+        self._waiting.clear()
+        self._running = {}
+
+    def on_prefetch_finished(self, operation: S3Operation):
+        # OperationManager has already stored a complete listing in the cache
+        self._running.pop((operation.callback_data.get('profile_name'), operation.bucket, operation.key), None)
+        self._start_waiting()
+
+    def _bulk_transfers_running(self):
+        if self.operation_manager.active_batch_operations:
+            return True
+        return any(op.op_type in self.BULK_TRANSFER_OP_TYPES
+                   for op in self.operation_manager.s3_operation_queue.get_in_flight_operations())
+
+    def _spend_budget(self, profile):
+        now = time.monotonic()
+        spent_at = self._spent_at.setdefault(profile, deque())
+        while spent_at and now - spent_at[0] > self.BUDGET_WINDOW_SECONDS:
+            spent_at.popleft()
+        if len(spent_at) >= self.BUDGET_REQUESTS:
+            return False
+        spent_at.append(now)
+        return True
+
+    def _start_waiting(self):
+        op_mgr = self.operation_manager
+        if not op_mgr.s3_client or not self._waiting:
+            return
+        if self._bulk_transfers_running():
+            print(f"PREFETCH: Transfers running, dropping {len(self._waiting)} prefetch hint(s).")
+            self._waiting.clear()
+            return
+        profile = op_mgr.active_profile_name
+        while self._waiting and len(self._running) < self.MAX_RUNNING:
+            bucket, prefix = self._waiting.popleft()
+            running_key = (profile, bucket, prefix)
+            cached_listing = op_mgr.listing_cache.peek(profile, bucket, prefix)
+            if running_key in self._running or (cached_listing is not None and cached_listing.is_fresh()):
+                continue
+            if not self._spend_budget(profile):
+                print(f"PREFETCH: Request budget of profile '{profile}' used up, dropping {len(self._waiting) + 1} hint(s).")
+                self._waiting.clear()
+                return
+            # One page, like a tab's first screen: folders that fit are cached complete, larger ones are not cached at all
+            list_op = S3Operation(S3OpType.LIST, bucket, key=prefix, callback_data={
+                'prefetch': True, 'priority': S3OperationScheduler.LANE_BULK, 'page_limit': 1, 'profile_name': profile})
+            self._running[running_key] = list_op
+            op_mgr.enqueue_s3_operation(list_op)
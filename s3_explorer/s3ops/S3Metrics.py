@@ -0,0 +1,295 @@
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+# --- S3 request metrics (botocore event hooks) ---
+# Answers "is it the endpoint or the app?" with numbers instead of prints. The collector is
+# attached to every boto3 client ProfileManager creates and records, per (op type, API call):
+#   before-parameter-build  which op type the call belongs to
+#   before-call   request start (registered after the rate limiter, so limiter waits are excluded)
+#   request-created  one HTTP attempt (emitted again for every retry); bytes sent
+#   needs-retry   outcome of each attempt: HTTP status or exception name
+#   after-call    latency of the whole call incl. botocore retries, RetryAttempts, bytes received
+#   after-call-error  calls that ended in an exception (connection errors, timeouts)
+# "op type" is the S3OpType the calling thread is working on (set_current_op_type, set by the
+# worker); pool threads inherit it through bind_op_type, and calls made on s3transfer's own
+# threads are matched by bucket/key (attribute_object_calls). OperationManager adds the app side:
+# time each operation waited in the queue and ran in a worker (record_operation).
+# Everything is aggregated in memory (fixed histogram buckets), so the overhead per call is a
+# few dict updates under one lock.
+
+UNATTRIBUTED_OP_TYPE = "other" # Calls made outside a worker operation (browsing helpers, WebDAV, mounts...)
+
+_thread_context = threading.local()
+
+
+def set_current_op_type(op_type_name):
+    """Tags the S3 calls this thread makes from now on (None = unattributed)."""
+    _thread_context.op_type = op_type_name
+
+
+def current_op_type():
+    return getattr(_thread_context, "op_type", None) or UNATTRIBUTED_OP_TYPE
+
+
+def bind_op_type(fn):
+    """Wraps fn so that, run on a pool thread, its S3 calls are attributed to the submitting thread's op type."""
+    op_type_name = current_op_type()
+    def bound(*args, **kwargs):
+        previous = getattr(_thread_context, "op_type", None)
+        _thread_context.op_type = op_type_name
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _thread_context.op_type = previous
+    return bound
+
+
+@contextmanager
+def attribute_object_calls(bucket, key):
+    """Calls on bucket/key from any thread (upload_file / download_file parts) count as the current op type."""
+    _metrics_collector.set_key_op_type(bucket, key, current_op_type())
+    try:
+        yield
+    finally:
+        _metrics_collector.set_key_op_type(bucket, key, None)
+
+
+class LatencyHistogram:
+    # Upper bounds in milliseconds; the last bucket catches everything slower
+    BUCKET_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        index = next((i for i, bound in enumerate(self.BUCKET_BOUNDS_MS) if ms <= bound), len(self.BUCKET_BOUNDS_MS))
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples (max for the overflow bucket)."""
+        if not self.count: return 0.0
+        threshold = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= threshold:
+                return float(min(self.BUCKET_BOUNDS_MS[i], self.max_ms)) if i < len(self.BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50), "p95_ms": self.percentile(0.95), "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 2),
+            "buckets": {(f"<={bound}" if i < len(self.BUCKET_BOUNDS_MS) else f">{self.BUCKET_BOUNDS_MS[-1]}"): count
+                        for i, (bound, count) in enumerate(zip(self.BUCKET_BOUNDS_MS + (None,), self.counts)) if count},
+        }
+
+
+def _request_body_size(request):
+    # Flexible-checksum uploads are aws-chunked: the payload size is in X-Amz-Decoded-Content-Length
+    for header in ('X-Amz-Decoded-Content-Length', 'Content-Length'):
+        try:
+            value = request.headers.get(header)
+            if value: return int(value)
+        except (TypeError, ValueError):
+            pass
+    body = request.body
+    if body is None: return 0
+    if isinstance(body, str): return len(body.encode('utf-8'))
+    if isinstance(body, (bytes, bytearray)): return len(body)
+    try: # File-like: what is left from the current position (botocore rewinds it for retries)
+        position = body.tell()
+        size = body.seek(0, 2) - position
+        body.seek(position)
+        return max(size, 0)
+    except (AttributeError, OSError, ValueError):
+        return 0
+
+
+class _ApiCallStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.calls = 0
+        self.errors = 0        # Calls that failed after botocore's retries (HTTP >= 300 or exception)
+        self.attempts = 0      # HTTP attempts (calls + botocore retries)
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.statuses = Counter() # Per attempt: "200", "503", "ReadTimeoutError"...
+
+
+class _OperationStats:
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.bytes = 0
+        self.queue_wait = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+
+
+class S3MetricsCollector:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._attached_client_ids = set()
+        self._key_op_types = {} # (bucket, key) -> op type for calls made on threads without a context
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._api_stats = {}       # (op_type, api_name) -> _ApiCallStats
+            self._operation_stats = {} # op_type -> _OperationStats
+            self._started_at = time.time()
+
+    # --- botocore hooks ---
+    def attach_to_client(self, client):
+        if id(client) in self._attached_client_ids: return
+        self._attached_client_ids.add(id(client))
+        events = client.meta.events
+        events.register('before-parameter-build.s3', self._on_before_parameter_build)
+        events.register('before-call.s3', self._on_before_call)
+        events.register('request-created.s3', self._on_request_created)
+        events.register('needs-retry.s3', self._on_needs_retry)
+        events.register('after-call.s3', self._on_after_call)
+        events.register('after-call-error.s3', self._on_after_call_error)
+
+    def _stats_for(self, context, api_name):
+        key = (context.get("metrics_op_type", UNATTRIBUTED_OP_TYPE), api_name)
+        stats = self._api_stats.get(key)
+        if stats is None:
+            stats = self._api_stats[key] = _ApiCallStats()
+        return stats
+
+    def set_key_op_type(self, bucket, key, op_type_name):
+        with self._lock:
+            if op_type_name is None: self._key_op_types.pop((bucket, key), None)
+            else: self._key_op_types[(bucket, key)] = op_type_name
+
+    def _on_before_parameter_build(self, params=None, context=None, **kwargs):
+        if context is None: return
+        op_type_name = getattr(_thread_context, "op_type", None)
+        if op_type_name is None and params and self._key_op_types:
+            op_type_name = self._key_op_types.get((params.get('Bucket'), params.get('Key')))
+        context["metrics_op_type"] = op_type_name or UNATTRIBUTED_OP_TYPE
+
+    def _on_before_call(self, model=None, context=None, **kwargs):
+        if context is not None and model is not None:
+            context.setdefault("metrics_op_type", current_op_type())
+            context["metrics_api_name"] = model.name
+            context["metrics_started"] = time.monotonic()
+        return None # before-call is emitted until a handler returns a response; never short-circuit it
+
+    def _on_request_created(self, request=None, **kwargs):
+        # The AWSRequest of one attempt, before it is prepared: no Content-Length header yet for plain bodies
+        context = getattr(request, "context", None)
+        if not context or "metrics_started" not in context: return
+        sent = _request_body_size(request)
+        with self._lock:
+            stats = self._stats_for(context, context["metrics_api_name"])
+            stats.attempts += 1
+            stats.bytes_sent += sent
+
+    def _on_needs_retry(self, response=None, operation=None, caught_exception=None, request_dict=None, **kwargs):
+        context = (request_dict or {}).get("context") or {}
+        if "metrics_started" not in context or operation is None: return None
+        if caught_exception is not None:
+            status = caught_exception.__class__.__name__
+        elif response is not None:
+            status = str(response[0].status_code)
+        else:
+            return None
+        with self._lock:
+            self._stats_for(context, operation.name).statuses[status] += 1
+        return None # None = no opinion; botocore's own retry handler decides
+
+    def _on_after_call(self, http_response=None, parsed=None, model=None, context=None, **kwargs):
+        if not context or "metrics_started" not in context or model is None: return
+        elapsed_ms = (time.monotonic() - context["metrics_started"]) * 1000
+        try:
+            received = int(http_response.headers.get('Content-Length') or 0) if http_response is not None else 0
+        except (TypeError, ValueError):
+            received = 0
+        retries = ((parsed or {}).get('ResponseMetadata') or {}).get('RetryAttempts', 0) or 0
+        with self._lock:
+            stats = self._stats_for(context, model.name)
+            stats.calls += 1
+            stats.retries += retries
+            stats.bytes_received += received
+            stats.latency.add(elapsed_ms)
+            if http_response is not None and http_response.status_code >= 300:
+                stats.errors += 1
+
+    def _on_after_call_error(self, exception=None, context=None, **kwargs):
+        if not context or "metrics_started" not in context: return
+        elapsed_ms = (time.monotonic() - context["metrics_started"]) * 1000
+        with self._lock:
+            stats = self._stats_for(context, context["metrics_api_name"])
+            stats.calls += 1
+            stats.errors += 1
+            stats.latency.add(elapsed_ms)
+
+    # --- App side (OperationManager) ---
+    def record_operation(self, operation):
+        """Queue wait and run time of a finished S3Operation (uses its enqueued/started/finished timestamps)."""
+        op_type_name = operation.op_type.name
+        with self._lock:
+            stats = self._operation_stats.get(op_type_name)
+            if stats is None:
+                stats = self._operation_stats[op_type_name] = _OperationStats()
+            stats.count += 1
+            stats.bytes += operation.bytes_transferred or 0
+            if operation.is_cancelled(): stats.cancelled += 1
+            elif operation.last_error: stats.failed += 1
+            if operation.enqueued_at is not None and operation.started_at is not None:
+                stats.queue_wait.add(max(0.0, operation.started_at - operation.enqueued_at) * 1000)
+            if operation.started_at is not None and operation.finished_at is not None:
+                stats.run_time.add(max(0.0, operation.finished_at - operation.started_at) * 1000)
+
+    # --- Reading ---
+    def snapshot(self):
+        """Plain dict of everything collected (what the Debug / Metrics panel shows and the JSON export writes)."""
+        with self._lock:
+            api_calls = []
+            for (op_type_name, api_name), stats in sorted(self._api_stats.items()):
+                api_calls.append({
+                    "op_type": op_type_name, "api": api_name,
+                    "calls": stats.calls, "errors": stats.errors, "attempts": stats.attempts, "retries": stats.retries,
+                    "bytes_sent": stats.bytes_sent, "bytes_received": stats.bytes_received,
+                    "statuses": dict(stats.statuses), "latency": stats.latency.to_dict(),
+                })
+            operations = []
+            for op_type_name, stats in sorted(self._operation_stats.items()):
+                operations.append({
+                    "op_type": op_type_name, "count": stats.count, "failed": stats.failed, "cancelled": stats.cancelled,
+                    "bytes": stats.bytes, "queue_wait": stats.queue_wait.to_dict(), "run_time": stats.run_time.to_dict(),
+                })
+            statuses = Counter()
+            for stats in self._api_stats.values(): statuses.update(stats.statuses)
+            return {
+                "collected_since": self._started_at, "collected_seconds": round(time.time() - self._started_at, 1),
+                "api_calls": api_calls, "operations": operations, "statuses": dict(statuses),
+            }
+
+    def export_json(self, file_path):
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+_metrics_collector = S3MetricsCollector()
+
+
+def get_metrics_collector():
+    """The process-wide collector (all profiles, GUI workers, folder downloads and the WebDAV server)."""
+    return _metrics_collector
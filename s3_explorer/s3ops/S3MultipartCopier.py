@@ -0,0 +1,104 @@
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+
+from botocore.exceptions import ClientError
+
+from s3ops.S3Metrics import bind_op_type
+
+
+# --- S3MultipartCopier (server-side copy for COPY_OBJECT, multipart above a threshold) ---
+# copy_object is a single request: it is refused above 5 GB and copies multi-GB objects
+# serially. Above MULTIPART_THRESHOLD the copy becomes create_multipart_upload +
+# upload_part_copy (byte ranges, several in parallel) + complete_multipart_upload.
+#   - content type, user metadata and the other standard headers are read with one HEAD and
+#     set on the new upload (multipart copies do not carry them over by themselves)
+#   - every part is pinned to the source ETag, so a source overwritten mid-copy fails the copy
+#   - each finished part adds its size to operation.bytes_transferred (sampled by the GUI)
+#   - cancel/failure aborts the multipart upload so no orphaned parts are billed
+# Nothing is downloaded; the bytes never pass through this machine.
+class S3MultipartCopier:
+    MULTIPART_THRESHOLD = 256 * 1024 * 1024 # Smaller objects: one copy_object (no extra HEAD)
+    PART_SIZE = 64 * 1024 * 1024
+    MAX_PARTS = 10000
+    MAX_PARALLEL_PARTS = 8
+
+    # HEAD response field -> create_multipart_upload parameter
+    PRESERVED_HEADERS = ("ContentType", "CacheControl", "ContentDisposition", "ContentEncoding", "ContentLanguage",
+                         "Expires", "WebsiteRedirectLocation", "ServerSideEncryption", "SSEKMSKeyId")
+
+    @classmethod
+    def part_ranges(cls, size):
+        """[(part_number, first_byte, last_byte)] covering size bytes in at most MAX_PARTS parts."""
+        part_size = max(cls.PART_SIZE, math.ceil(size / cls.MAX_PARTS))
+        return [(i + 1, start, min(start + part_size, size) - 1) for i, start in enumerate(range(0, size, part_size))]
+
+    @staticmethod
+    def _is_too_large_for_single_copy(client_error):
+        error = client_error.response.get('Error', {})
+        return error.get('Code') == 'InvalidRequest' and 'larger than the maximum allowable size' in error.get('Message', '')
+
+    def copy(self, s3, operation, source_bucket, source_key, dest_bucket, dest_key, source_size=None, progress_tracker=None):
+        """Copies source to destination server-side.
+        Returns {'strategy': 'single' | 'multipart', 'etag': ETag of the new object}."""
+        copy_source = {'Bucket': source_bucket, 'Key': source_key}
+        if source_size is None or source_size < self.MULTIPART_THRESHOLD:
+            try:
+                response = s3.copy_object(CopySource=copy_source, Bucket=dest_bucket, Key=dest_key)
+                return {"strategy": "single", "etag": response.get('CopyObjectResult', {}).get('ETag')}
+            except ClientError as e:
+                # Size unknown to the caller (e.g. mount renames) and the object turned out to be > 5 GB
+                if source_size is not None or not self._is_too_large_for_single_copy(e):
+                    raise
+                print(f"MULTIPART_COPY: '{source_key}' is too large for copy_object, switching to multipart copy.")
+        etag = self._multipart_copy(s3, operation, copy_source, dest_bucket, dest_key, progress_tracker)
+        return {"strategy": "multipart", "etag": etag}
+
+    def _multipart_copy(self, s3, operation, copy_source, dest_bucket, dest_key, progress_tracker):
+        head = s3.head_object(Bucket=copy_source['Bucket'], Key=copy_source['Key'])
+        size = int(head.get('ContentLength', 0))
+        if size < 1:
+            response = s3.copy_object(CopySource=copy_source, Bucket=dest_bucket, Key=dest_key)
+            return response.get('CopyObjectResult', {}).get('ETag')
+
+        create_params = {name: head[name] for name in self.PRESERVED_HEADERS if head.get(name)}
+        if head.get('Metadata'): create_params['Metadata'] = head['Metadata']
+        if head.get('StorageClass'): create_params['StorageClass'] = head['StorageClass'] # HEAD omits it for STANDARD
+        upload_id = s3.create_multipart_upload(Bucket=dest_bucket, Key=dest_key, **create_params)['UploadId']
+
+        ranges = self.part_ranges(size)
+        print(f"MULTIPART_COPY: '{copy_source['Key']}' -> '{dest_key}': {size} bytes in {len(ranges)} part(s), upload {upload_id}")
+        progress_lock = threading.Lock()
+        operation.bytes_transferred = 0
+        if progress_tracker: progress_tracker.start_transfer(operation, size, "copy")
+
+        def copy_part(part_number, first_byte, last_byte):
+            operation.raise_if_cancelled() # Parts not started yet are skipped after a cancel
+            response = s3.upload_part_copy(
+                Bucket=dest_bucket, Key=dest_key, UploadId=upload_id, PartNumber=part_number,
+                CopySource=copy_source, CopySourceRange=f"bytes={first_byte}-{last_byte}",
+                CopySourceIfMatch=head['ETag'],
+            )
+            with progress_lock:
+                operation.bytes_transferred += last_byte - first_byte + 1
+            return {'PartNumber': part_number, 'ETag': response['CopyPartResult']['ETag']}
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_PARALLEL_PARTS, len(ranges)),
+                                    thread_name_prefix="S3MultipartCopy") as executor:
+                futures = [executor.submit(bind_op_type(copy_part), *part_range) for part_range in ranges]
+                done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in not_done: future.cancel()
+                parts = [future.result() for future in futures if future in done] # Re-raises the first failure
+            response = s3.complete_multipart_upload(Bucket=dest_bucket, Key=dest_key, UploadId=upload_id,
+                                                    MultipartUpload={'Parts': sorted(parts, key=lambda p: p['PartNumber'])})
+            return response.get('ETag')
+        except BaseException:
+            try:
+                s3.abort_multipart_upload(Bucket=dest_bucket, Key=dest_key, UploadId=upload_id)
+                print(f"MULTIPART_COPY: Aborted upload {upload_id} for '{dest_key}'.")
+            except Exception as e_abort:
+                print(f"MULTIPART_COPY: Could not abort upload {upload_id} for '{dest_key}': {e_abort}")
+            raise
+        finally:
+            if progress_tracker: progress_tracker.finish_transfer(operation)
@@ -1,3 +1,4 @@
+import threading
 import uuid
 from enum import Enum
 
@@ -12,6 +13,30 @@ class S3OpType(Enum):
     UPLOAD_FILE = "upload_file"
     CREATE_FOLDER = "create_folder"
     COPY_OBJECT = "copy_object"
+    HEAD_OBJECT = "head_object"
+    MOVE_PREFIX = "move_prefix" # key = source prefix, new_key = destination prefix (see S3PrefixMover)
+    SUMMARIZE_PREFIX = "summarize_prefix" # key = folder prefix; recursive size / count / newest mtime (S3FolderSummaries)
+
+
+# --- Cancellation ---
+CANCELLED_ERROR_MESSAGE = "Cancelled by user"
+
+
+class OperationCancelled(Exception):
+    """Raised inside a worker (e.g. from a transfer progress callback) to abort a cancelled operation."""
+    pass
+
+
+class CancellationToken:
+    # Thin wrapper over threading.Event; one per operation and one per batch (shared by its operations)
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_cancelled(self):
+        return self._event.is_set()
 
 
 class S3Operation:
@@ -29,5 +54,28 @@ class S3Operation:
         self.original_source_key_for_move = original_source_key_for_move
         self.callback_data = callback_data if callback_data else {} # Ensure it's a dict
 
+        # Filled in by S3OperationWorker, read by OperationManager for pool sizing / stats
+        self.started_at = None      # time.monotonic() when a worker picked it up
+        self.finished_at = None
+        self.bytes_transferred = 0
+        self.error_code = None      # S3 error code ("SlowDown", "503"...) or "Timeout"
+        self.enqueued_at = None     # Set by OperationManager.enqueue_s3_operation
+        self.last_error = ""        # Error message of the latest finish ("" = succeeded), shown in the Transfers panel
+        self.retry_count = 0        # Times this op was attempted again after failing (automatic + manual)
+        self.auto_retry_count = 0   # Automatic retries in the current run, capped by S3RetryPolicy
+
+        self.coalesced_operations = [] # Duplicate ops merged into this one by S3OperationScheduler
+
+        self.cancel_token = CancellationToken()
+        self.batch_cancel_token = None # Set by OperationManager.start_batch_operation
+
+    def is_cancelled(self):
+        return self.cancel_token.is_cancelled() or \
+               (self.batch_cancel_token is not None and self.batch_cancel_token.is_cancelled())
+
+    def raise_if_cancelled(self):
+        if self.is_cancelled():
+            raise OperationCancelled(f"{self.op_type.name} on '{self.key or self.new_key}' cancelled")
+
     def __repr__(self):
         return f"<S3Operation {self.op_type.value} on s3://{self.bucket}/{self.key or self.new_key or ''}>"
@@ -0,0 +1,270 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from s3ops.S3Operation import S3Operation, S3OpType
+
+
+# --- S3OperationScheduler (lane based replacement for the single FIFO queue.Queue) ---
+# Keeps the queue.Queue surface (put, put_nowait, get, task_done, empty, qsize) so
+# MountManager / S3SyncEventHandler can keep calling .put() on the reference they hold.
+# Operations are routed to an "interactive" lane (browsing, opening files, properties)
+# or a "bulk" lane (uploads, copies, deletes...). Workers always drain the interactive
+# lane first, and reserved workers only ever take interactive work, so navigation never
+# waits behind a long running transfer.
+#
+# Redundant work is coalesced on put(), keyed by (op_type, bucket, key):
+#   - LIST of a prefix that is already queued -> rides along on the queued one
+#   - UPLOAD_FILE of a key that is already queued -> newest replaces it (same queue slot)
+#   - UPLOAD_FILE of a key that is being uploaded right now -> deferred until that one finishes
+# Ops merged into another are kept in primary.coalesced_operations; OperationManager
+# finishes them with the primary's result so every caller still gets its callback.
+class S3OperationScheduler:
+    LANE_INTERACTIVE = "interactive"
+    LANE_BULK = "bulk"
+    LANES_IN_PRIORITY_ORDER = (LANE_INTERACTIVE, LANE_BULK)
+
+    INTERACTIVE_OP_TYPES = {S3OpType.LIST, S3OpType.HEAD_OBJECT, S3OpType.DOWNLOAD_TO_TEMP}
+    COALESCED_OP_TYPES = {S3OpType.LIST, S3OpType.UPLOAD_FILE}
+
+    def __init__(self):
+        self._lanes = {lane: deque() for lane in self.LANES_IN_PRIORITY_ORDER}
+        self._pending_sentinels = 0 # None sentinels are handed out before any real work
+        self._unfinished_tasks = 0
+        self._in_flight = {} # operation.id -> S3Operation currently held by a worker
+        self._pending_by_key = {}   # coalesce key -> queued S3Operation
+        self._in_flight_by_key = {} # coalesce key -> running UPLOAD_FILE
+        self._deferred_by_key = {}  # coalesce key -> UPLOAD_FILE waiting for the running one to finish
+        self._cond = threading.Condition()
+        self._all_tasks_done = threading.Condition(self._cond)
+
+    def lane_for_operation(self, operation: S3Operation):
+        # Callers can force a lane via callback_data['priority'] (e.g. a bulk LIST used for planning)
+        requested_lane = operation.callback_data.get('priority')
+        if requested_lane in self._lanes:
+            return requested_lane
+        if operation.op_type in self.INTERACTIVE_OP_TYPES:
+            return self.LANE_INTERACTIVE
+        return self.LANE_BULK
+
+    @staticmethod
+    def coalesce_key(operation: S3Operation):
+        if operation.op_type not in S3OperationScheduler.COALESCED_OP_TYPES:
+            return None
+        if operation.callback_data.get("batch_id"):
+            return None # Batch items are counted one by one by OperationManager, never merge them
+        key = operation.key or ''
+        if operation.op_type == S3OpType.LIST:
+            if key and not key.endswith('/'):
+                key += '/' # Same normalisation the worker applies to the prefix
+            # Only identical LISTs merge: a fetchMore page or a "load all" from a token is different work
+            return (operation.op_type, operation.bucket, key,
+                    operation.callback_data.get('continuation_token'), operation.callback_data.get('page_limit'))
+        return (operation.op_type, operation.bucket, key)
+
+    def put(self, operation, block=True, timeout=None): # block/timeout kept for queue.Queue compatibility (unbounded)
+        with self._cond:
+            if operation is None: # Sentinel
+                self._pending_sentinels += 1
+            elif not self._coalesce_locked(operation):
+                self._append_locked(operation)
+            else:
+                return # Merged into an existing op, nothing new for the workers
+            self._unfinished_tasks += 1
+            self._cond.notify_all()
+
+    def _append_locked(self, operation):
+        self._lanes[self.lane_for_operation(operation)].append(operation)
+        op_key = self.coalesce_key(operation)
+        if op_key is not None:
+            self._pending_by_key[op_key] = operation
+
+    def _coalesce_locked(self, operation):
+        """Returns True if operation was merged into a queued/running one and must not be queued itself."""
+        op_key = self.coalesce_key(operation)
+        if op_key is None:
+            return False
+
+        queued_op = self._pending_by_key.get(op_key)
+        if operation.op_type == S3OpType.LIST:
+            # Only merge with a LIST that has not started yet; a running one may predate a change
+            if queued_op is None:
+                return False
+            queued_op.coalesced_operations.append(operation)
+            if operation.callback_data.get('stream_pages'): # The merged tab waits on pages too
+                queued_op.callback_data['stream_pages'] = True
+            queued_lane, wanted_lane = self.lane_for_operation(queued_op), self.lane_for_operation(operation)
+            if self.LANES_IN_PRIORITY_ORDER.index(wanted_lane) < self.LANES_IN_PRIORITY_ORDER.index(queued_lane):
+                # A tab navigated into a folder that was only being prefetched: the merged LIST moves up to its lane
+                self._lanes[queued_lane].remove(queued_op)
+                queued_op.callback_data['priority'] = wanted_lane
+                self._lanes[wanted_lane].append(queued_op)
+            print(f"SCHEDULER: LIST s3://{operation.bucket}/{op_key[2]} merged into queued op {queued_op.id}")
+            return True
+
+        # UPLOAD_FILE
+        if op_key in self._in_flight_by_key:
+            previously_deferred = self._deferred_by_key.get(op_key)
+            if previously_deferred is not None:
+                operation.coalesced_operations.append(previously_deferred)
+                operation.coalesced_operations.extend(previously_deferred.coalesced_operations)
+                previously_deferred.coalesced_operations = []
+            self._deferred_by_key[op_key] = operation
+            print(f"SCHEDULER: Upload of s3://{operation.bucket}/{operation.key} deferred until the running one finishes")
+            return True
+
+        if queued_op is not None:
+            lane_items = self._lanes[self.lane_for_operation(queued_op)]
+            lane_items[lane_items.index(queued_op)] = operation # Newest upload takes the older one's place
+            operation.coalesced_operations.append(queued_op)
+            operation.coalesced_operations.extend(queued_op.coalesced_operations)
+            queued_op.coalesced_operations = []
+            self._pending_by_key[op_key] = operation
+            print(f"SCHEDULER: Queued upload of s3://{operation.bucket}/{operation.key} replaced by newer one")
+            return True
+        return False
+
+    def put_nowait(self, operation):
+        self.put(operation, block=False)
+
+    def _pop_next_locked(self, lanes):
+        if self._pending_sentinels > 0:
+            self._pending_sentinels -= 1
+            return True, None
+        for lane in self.LANES_IN_PRIORITY_ORDER:
+            if lane in lanes and self._lanes[lane]:
+                operation = self._lanes[lane].popleft()
+                op_key = self.coalesce_key(operation)
+                if op_key is not None and self._pending_by_key.get(op_key) is operation:
+                    del self._pending_by_key[op_key]
+                return True, operation
+        return False, None
+
+    def get(self, block=True, timeout=None, lanes=None):
+        """Returns the next operation (or None sentinel) from the allowed lanes, highest priority first."""
+        allowed_lanes = lanes or self.LANES_IN_PRIORITY_ORDER
+        with self._cond:
+            found, operation = self._pop_next_locked(allowed_lanes)
+            if found: return operation
+            if not block: raise queue.Empty
+
+            deadline = (time.monotonic() + timeout) if timeout is not None else None
+            while True:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0: raise queue.Empty
+                self._cond.wait(remaining)
+                found, operation = self._pop_next_locked(allowed_lanes)
+                if found: return operation
+
+    def get_nowait(self, lanes=None):
+        return self.get(block=False, lanes=lanes)
+
+    def task_done(self):
+        with self._cond:
+            if self._unfinished_tasks <= 0:
+                raise ValueError('task_done() called too many times')
+            self._unfinished_tasks -= 1
+            if self._unfinished_tasks == 0:
+                self._all_tasks_done.notify_all()
+
+    def join(self):
+        with self._all_tasks_done:
+            while self._unfinished_tasks:
+                self._all_tasks_done.wait()
+
+    def mark_started(self, operation: S3Operation):
+        with self._cond:
+            self._in_flight[operation.id] = operation
+            op_key = self.coalesce_key(operation)
+            if op_key is not None and operation.op_type == S3OpType.UPLOAD_FILE:
+                self._in_flight_by_key[op_key] = operation
+
+    def mark_finished(self, operation: S3Operation):
+        with self._cond:
+            self._in_flight.pop(operation.id, None)
+            op_key = self.coalesce_key(operation)
+            if op_key is not None and self._in_flight_by_key.get(op_key) is operation:
+                del self._in_flight_by_key[op_key]
+                deferred_op = self._deferred_by_key.pop(op_key, None)
+                if deferred_op is not None: # Upload that arrived while this one was running
+                    if not self._coalesce_locked(deferred_op):
+                        self._append_locked(deferred_op)
+                        self._unfinished_tasks += 1
+                        self._cond.notify_all()
+
+    def get_in_flight_operations(self):
+        with self._cond:
+            return list(self._in_flight.values())
+
+    def get_pending_operations(self):
+        with self._cond:
+            return [op for lane in self.LANES_IN_PRIORITY_ORDER for op in self._lanes[lane]] + \
+                   list(self._deferred_by_key.values())
+
+    def remove_pending(self, predicate):
+        """Removes (and returns) every queued or deferred operation for which predicate(op) is True."""
+        removed = []
+        removed_from_lanes = 0
+        with self._cond:
+            for lane, lane_items in self._lanes.items():
+                kept = deque()
+                for op in lane_items:
+                    (removed if predicate(op) else kept).append(op)
+                self._lanes[lane] = kept
+            removed_from_lanes = len(removed)
+            for op_key, op in list(self._deferred_by_key.items()):
+                if predicate(op):
+                    removed.append(op)
+                    del self._deferred_by_key[op_key]
+            for op in removed:
+                op_key = self.coalesce_key(op)
+                if op_key is not None and self._pending_by_key.get(op_key) is op:
+                    del self._pending_by_key[op_key]
+            self._unfinished_tasks -= removed_from_lanes
+            if self._unfinished_tasks <= 0:
+                self._unfinished_tasks = 0
+                self._all_tasks_done.notify_all()
+        return removed
+
+    def move_to_lane(self, predicate, lane, to_front=False):
+        """Re-routes queued operations matching predicate to lane (Transfers panel "Run Next" / "Run Later")."""
+        moved = []
+        with self._cond:
+            for lane_name, lane_items in self._lanes.items():
+                kept = deque()
+                for op in lane_items:
+                    (moved if predicate(op) else kept).append(op)
+                self._lanes[lane_name] = kept
+            for op in moved:
+                op.callback_data['priority'] = lane # Sticks if the op is paused/retried later
+            if to_front:
+                self._lanes[lane].extendleft(reversed(moved))
+            else:
+                self._lanes[lane].extend(moved)
+            if moved: self._cond.notify_all()
+        return len(moved)
+
+    def discard_sentinels(self):
+        # Leftover sentinels from a previous stop would immediately kill freshly started workers
+        with self._cond:
+            self._unfinished_tasks -= self._pending_sentinels
+            self._pending_sentinels = 0
+            if self._unfinished_tasks <= 0:
+                self._unfinished_tasks = 0
+                self._all_tasks_done.notify_all()
+
+    def qsize(self, lane=None):
+        with self._cond:
+            if lane is not None:
+                return len(self._lanes.get(lane, ()))
+            return sum(len(lane_items) for lane_items in self._lanes.values())
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def get_lane_sizes(self):
+        with self._cond:
+            return {lane: len(lane_items) for lane, lane_items in self._lanes.items()}
@@ -1,22 +1,40 @@
 import os
 import queue
-from s3ops.S3Operation import S3Operation, S3OpType
-from botocore.exceptions import ClientError, ReadTimeoutError, ConnectTimeoutError
+import time
+from datetime import datetime, timezone, timedelta
+from s3ops.S3Operation import S3Operation, S3OpType, OperationCancelled, CANCELLED_ERROR_MESSAGE
+from s3ops.S3MultipartCopier import S3MultipartCopier
+from s3ops.S3PrefixMover import S3PrefixMover
+from s3ops.S3CrossProfileCopier import S3CrossProfileCopier
+from s3ops.S3FolderSummaries import FolderSummary, summarize_listed_objects
+from s3ops.S3Metrics import set_current_op_type, attribute_object_calls
+from botocore.exceptions import ClientError, ReadTimeoutError, ConnectTimeoutError, EndpointConnectionError, ConnectionClosedError
 from PyQt6.QtCore import QThread, pyqtSignal
 
 
 # --- S3OperationWorker Thread (processes the queue) ---
 class S3OperationWorker(QThread):
     operation_finished = pyqtSignal(S3Operation, object, str)
+    list_page_ready = pyqtSignal(S3Operation, object) # LIST with callback_data['stream_pages']: {'folders', 'files', ...} of one page
     # operation_progress = pyqtSignal(S3Operation, int, int)
     # single_item_processed_in_batch = pyqtSignal(str, str) # batch_id, message
 
-    def __init__(self, op_queue, main_app_signals=None, parent=None): # Add main_app_signals
+    def __init__(self, op_queue, main_app_signals=None, parent=None, lanes=None): # Add main_app_signals
         super().__init__(parent)
         self.s3_client_ref = None
-        self.op_queue = op_queue
+        self.op_queue = op_queue # S3OperationScheduler
         self._is_running = True
         self.main_app_signals = main_app_signals # Store reference
+        self.lanes = lanes # None = all lanes (interactive first); reserved workers only get the interactive lane
+        self.delete_aggregator = None # S3DeleteAggregator; when set, single-key deletes are batched through it
+        self.progress_tracker = None # S3ProgressTracker; progress is written there and sampled by the GUI, never signalled per chunk
+        self.retry_policy = None # S3RetryPolicy; None = fail on the first error
+        self.concurrency_controller = None # S3ConcurrencyController; told about every retry so AIMD still sees throttling
+        self.rate_limiter = None # S3RateLimiter; transfer callbacks spend bytes/sec tokens (requests/sec is hooked into the client)
+        self.multipart_copier = S3MultipartCopier() # COPY_OBJECT: copy_object, or parallel upload_part_copy for large objects
+        self.journal = None # OperationJournal; MOVE_PREFIX checkpoints its progress there
+        self.profile_client_provider = None # callable(profile_name) -> client; COPY_OBJECT with callback_data['source_profile']
+        self.cross_profile_copier = S3CrossProfileCopier() # Streams get_object -> multipart upload between two clients
 
     def stop(self):
         self._is_running = False
@@ -24,58 +42,35 @@ class S3OperationWorker(QThread):
     def set_s3_client(self, client):
         self.s3_client_ref = client
 
-    def _emit_progress_via_main_app(self, operation, bytes_transferred, total_bytes, dialog_type):
-        signal_key = "request_download_progress_dialog_update"
-        if self.main_app_signals:
-            label_prefix = ""
-            item_display_name = os.path.basename((operation.key or operation.new_key or "item").rstrip('/'))
-            
-            if dialog_type == "download":
-                label_prefix = f"Downloading {item_display_name}"
-                percent = (bytes_transferred / total_bytes) * 100 if total_bytes > 0 else 0
-                label_text = f"{label_prefix} ({percent:.0f}%)" if total_bytes > 0 else f"{label_prefix}..."
-                self.main_app_signals[signal_key].emit(
-                        label_text, bytes_transferred, total_bytes, True
-                    )
-            elif dialog_type == "upload":
-                signal_key = "request_upload_progress_dialog_update"
-                label_prefix = f"Uploading {item_display_name}"
-                percent = (bytes_transferred / total_bytes) * 100 if total_bytes > 0 else 0
-                label_text = f"{label_prefix} ({percent:.0f}%)" if total_bytes > 0 else f"{label_prefix}..."
-                self.main_app_signals[signal_key].emit(
-                        label_text, bytes_transferred, total_bytes, True
-                    )
-
-    def _emit_single_item_processed_via_main_app(self, batch_id, message): # message like "Processing item_name..."
-        if self.main_app_signals:
-            signal_key = "request_batch_progress_dialog_update"
-            if signal_key in self.main_app_signals:
-                # The worker should not know about batch_info['completed'] or batch_info['total'].
-                # It only provides a label update.
-                # OperationManager is responsible for the numeric progress of the batch.
-                # We pass 0, 0 for current/total here, assuming the OperationManager
-                # will update these correctly when it gets operation_finished for this item.
-                # Or, a convention could be -1 to indicate "only update label".
-                # For simplicity, let's ensure the dialog is shown with the new message.
-                # The actual numeric progress is handled by OperationManager upon operation_finished.
-                try:
-                    self.main_app_signals[signal_key].emit(
-                        message, # The new label text, e.g., "Processing: some_file.txt"
-                        -2,      # Special value to indicate "keep current value" or "OpMgr will set value"
-                        -2,      # Special value to indicate "keep current total" or "OpMgr will set total"
-                        True     # Ensure dialog is visible
-                    )
-                    print(f"WORKER: Emitted batch progress label update: {message}")
-                except Exception as e:
-                    print(f"WORKER: Error emitting batch progress label update signal: {e}")
-
-            else:
-                print(f"WORKER: Signal key '{signal_key}' not found for batch progress label update.")
+    def _abort_multipart_uploads_for_key(self, s3, bucket, key, initiated_after):
+        # s3transfer aborts its multipart upload when a callback raises, this is a best-effort sweep
+        # for anything it left behind (e.g. abort call itself failed) so no orphaned parts are billed.
+        try:
+            response = s3.list_multipart_uploads(Bucket=bucket, Prefix=key)
+            for upload in response.get('Uploads', []):
+                if upload.get('Key') == key and upload.get('Initiated') and upload['Initiated'] >= initiated_after:
+                    s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload['UploadId'])
+                    print(f"WORKER: Aborted leftover multipart upload {upload['UploadId']} for cancelled upload of '{key}'")
+        except Exception as e_abort:
+            print(f"WORKER: Could not check/abort multipart uploads for '{key}': {e_abort}")
+
+    def _wait_before_retry(self, operation, exception, error_msg):
+        """True if the failed attempt should be repeated (after the backoff, which has already been waited out)."""
+        if self.retry_policy is None: return False
+        delay = self.retry_policy.next_delay(operation, exception)
+        if delay is None: return False
+        operation.auto_retry_count += 1
+        operation.retry_count += 1
+        if self.concurrency_controller is not None:
+            self.concurrency_controller.record_retry(operation.error_code)
+        print(f"WORKER: Retry {operation.auto_retry_count} of {operation.op_type.name} on '{operation.key or operation.new_key}' "
+              f"in {delay:.2f}s after: {error_msg}")
+        return self.retry_policy.wait(operation, delay) # False if cancelled while backing off -> report the failure
 
     def run(self):
         while self._is_running:
             try:
-                operation: S3Operation = self.op_queue.get(timeout=0.5)
+                operation: S3Operation = self.op_queue.get(timeout=0.5, lanes=self.lanes)
             except queue.Empty:
                 continue
 
@@ -91,210 +86,323 @@ class S3OperationWorker(QThread):
                 continue
 
             s3 = self.s3_client_ref
-            result = None
-            error_msg = ""
+            handed_off = False # True once the delete aggregator owns finishing this operation
+            self.op_queue.mark_started(operation)
+            started_wallclock = datetime.now(timezone.utc) - timedelta(seconds=5) # Margin for clock skew with the endpoint
+            operation.started_at = time.monotonic()
             
-            op_type = operation.op_type # Get op_type early for dialog hiding logic
-            dialog_type_for_hiding = None
-            if op_type == S3OpType.DOWNLOAD_TO_TEMP or op_type == S3OpType.DOWNLOAD_FILE:
-                dialog_type_for_hiding = "download"
-            elif op_type == S3OpType.UPLOAD_FILE:
-                dialog_type_for_hiding = "upload"
+            op_type = operation.op_type
+            set_current_op_type(op_type.name) # S3 calls below are counted under this op type (Debug / Metrics panel)
 
-            try:
-                # These are assigned within the try block if needed by specific ops
-                bucket = operation.bucket
-                key = operation.key
-                new_key = operation.new_key
-                local_path = operation.local_path
-
-                # Update batch dialog label if this item is part of a batch
-                if operation.callback_data.get("batch_id"):
-                    item_name_for_batch_label = os.path.basename((key or new_key or "item").rstrip('/'))
-                    self._emit_single_item_processed_via_main_app(
-                        operation.callback_data.get("batch_id"),
-                        f"Processing: {item_name_for_batch_label}..."
-                    )
-
-                if op_type == S3OpType.LIST:
-                    paginator = s3.get_paginator('list_objects_v2')
-                    folders, files = [], []
-                    # For LIST, 'key' is the prefix. Ensure it's correctly formatted.
-                    prefix_to_list = key if key is not None else '' # Default to empty string if key is None
-                    if prefix_to_list and not prefix_to_list.endswith('/'):
-                        prefix_to_list += '/'
+            while True: # One pass per attempt; S3RetryPolicy decides whether a failure gets another one
+                result = None
+                error_msg = ""
+                operation.bytes_transferred = 0
+                operation.error_code = None
+                try:
+                    # These are assigned within the try block if needed by specific ops
+                    bucket = operation.bucket
+                    key = operation.key
+                    new_key = operation.new_key
+                    local_path = operation.local_path
+
+                    operation.raise_if_cancelled() # Cancelled while it was waiting in the queue
+
+                    # Batch dialog label shows the item being worked on (picked up by the GUI's next progress sample)
+                    if operation.callback_data.get("batch_id") and self.progress_tracker:
+                        self.progress_tracker.note_batch_item(operation.callback_data.get("batch_id"),
+                                                              os.path.basename((key or new_key or "item").rstrip('/')))
+
+                    if op_type == S3OpType.LIST:
+                        folders, files = [], []
+                        # For LIST, 'key' is the prefix. Ensure it's correctly formatted.
+                        prefix_to_list = key if key is not None else '' # Default to empty string if key is None
+                        if prefix_to_list and not prefix_to_list.endswith('/'):
+                            prefix_to_list += '/'
                     
-                    for page in paginator.paginate(Bucket=bucket, Prefix=prefix_to_list, Delimiter='/'):
-                        folders.extend(common_prefix.get('Prefix') for common_prefix in page.get('CommonPrefixes', []))
-                        # Exclude the prefix itself if it appears as a "file" (common for folder markers)
-                        files.extend(obj for obj in page.get('Contents', []) if obj.get('Key') != prefix_to_list)
-                    result = {"folders": folders, "files": files, "requested_prefix": prefix_to_list}
+                        stream_pages = operation.callback_data.get('stream_pages', False)
+                        # Paged by hand instead of with the paginator: a tab may resume from a continuation token and
+                        # stop after page_limit pages (fetchMore), leaving the rest of a huge prefix unlisted
+                        continuation_token = operation.callback_data.get('continuation_token')
+                        page_limit = operation.callback_data.get('page_limit') # None: list to the end
+                        page_number = 0
+                        while True:
+                            operation.raise_if_cancelled() # Tab navigated away: stop paging
+                            list_kwargs = {"Bucket": bucket, "Prefix": prefix_to_list, "Delimiter": '/'}
+                            if continuation_token:
+                                list_kwargs["ContinuationToken"] = continuation_token
+                            page = s3.list_objects_v2(**list_kwargs)
+                            page_folders = [common_prefix.get('Prefix') for common_prefix in page.get('CommonPrefixes', [])]
+                            # Exclude the prefix itself if it appears as a "file" (common for folder markers)
+                            page_files = [obj for obj in page.get('Contents', []) if obj.get('Key') != prefix_to_list]
+                            folders.extend(page_folders)
+                            files.extend(page_files)
+                            if stream_pages and (page_folders or page_files):
+                                # The tab appends these rows now; the full listing still comes with operation_finished (cache, final diff)
+                                self.list_page_ready.emit(operation, {"folders": page_folders, "files": page_files,
+                                                                      "requested_prefix": prefix_to_list, "page_number": page_number})
+                            continuation_token = page.get('NextContinuationToken') if page.get('IsTruncated') else None
+                            page_number += 1
+                            if continuation_token is None or (page_limit and page_number >= page_limit):
+                                break
+                        # next_continuation_token set: the listing is partial, the tab can fetch more from there
+                        result = {"folders": folders, "files": files, "requested_prefix": prefix_to_list,
+                                  "next_continuation_token": continuation_token,
+                                  "continued_from": operation.callback_data.get('continuation_token')}
                 
-                elif op_type == S3OpType.DELETE_OBJECT:
-                    s3.delete_object(Bucket=bucket, Key=key)
-                    result = True
+                    elif op_type == S3OpType.SUMMARIZE_PREFIX:
+                        # Flat (no delimiter) walk of everything below the prefix; only per-folder totals are kept,
+                        # one entry per subfolder, never the keys themselves
+                        prefix_to_summarize = key if not key or key.endswith('/') else key + '/'
+                        summaries = {prefix_to_summarize: FolderSummary()} # An empty folder still gets (zero) totals
+                        paginator = s3.get_paginator('list_objects_v2')
+                        for page in paginator.paginate(Bucket=bucket, Prefix=prefix_to_summarize):
+                            operation.raise_if_cancelled()
+                            summarize_listed_objects(summaries, prefix_to_summarize, page.get('Contents', []))
+                        result = {"requested_prefix": prefix_to_summarize, "summaries": summaries}
+
+                    elif op_type == S3OpType.HEAD_OBJECT:
+                        head = s3.head_object(Bucket=bucket, Key=key)
+                        result = {"s3_key": key, "s3_bucket": bucket, "head": head}
+                        if operation.callback_data.get("include_acl"):
+                            # ACL is optional (needs s3:GetObjectAcl), never fail the HEAD because of it
+                            try:
+                                result["acl"] = s3.get_object_acl(Bucket=bucket, Key=key)
+                            except Exception as e_acl:
+                                result["acl_error"] = str(e_acl)
+
+                    elif op_type == S3OpType.DELETE_OBJECT:
+                        if self.delete_aggregator is not None and self.delete_aggregator.submit_delete(operation):
+                            handed_off = True # Emitted by the aggregator after delete_objects
+                        else:
+                            s3.delete_object(Bucket=bucket, Key=key)
+                            result = True
                 
-                elif op_type == S3OpType.DELETE_FOLDER:
-                    paginator = s3.get_paginator('list_objects_v2')
-                    list_prefix_for_delete = key if key.endswith('/') else key + '/'
-                    objects_to_delete = []
-                    for page in paginator.paginate(Bucket=bucket, Prefix=list_prefix_for_delete):
-                        if page.get('Contents'):
-                            for obj_content in page.get('Contents'):
-                                objects_to_delete.append({'Key': obj_content['Key']})
+                    elif op_type == S3OpType.DELETE_FOLDER:
+                        paginator = s3.get_paginator('list_objects_v2')
+                        list_prefix_for_delete = key if key.endswith('/') else key + '/'
+                        objects_to_delete = []
+                        for page in paginator.paginate(Bucket=bucket, Prefix=list_prefix_for_delete):
+                            if page.get('Contents'):
+                                for obj_content in page.get('Contents'):
+                                    objects_to_delete.append({'Key': obj_content['Key']})
                     
-                    deleted_count = 0
-                    if objects_to_delete:
-                        # S3 delete_objects can take up to 1000 keys at a time
-                        for i in range(0, len(objects_to_delete), 1000):
-                            chunk_to_delete = {'Objects': objects_to_delete[i:i+1000]}
-                            delete_response = s3.delete_objects(Bucket=bucket, Delete=chunk_to_delete)
-                            deleted_count += len(delete_response.get('Deleted', []))
-                            if delete_response.get('Errors'):
-                                # Handle partial deletion errors if necessary
-                                error_msg += f" Errors during multi-delete: {delete_response.get('Errors')};"
+                        deleted_count = 0
+                        if objects_to_delete:
+                            # S3 delete_objects can take up to 1000 keys at a time
+                            for i in range(0, len(objects_to_delete), 1000):
+                                operation.raise_if_cancelled()
+                                chunk_to_delete = {'Objects': objects_to_delete[i:i+1000]}
+                                delete_response = s3.delete_objects(Bucket=bucket, Delete=chunk_to_delete)
+                                deleted_count += len(delete_response.get('Deleted', []))
+                                if delete_response.get('Errors'):
+                                    # Handle partial deletion errors if necessary
+                                    error_msg += f" Errors during multi-delete: {delete_response.get('Errors')};"
                     
-                    # Some S3 providers might still have an explicit folder object even if empty after contents are deleted.
-                    # Attempt to delete the folder marker itself. This is often harmless if it doesn't exist.
-                    try:
-                        # Check if the folder marker object itself exists (if it wasn't part of Contents)
-                        # s3.head_object(Bucket=bucket, Key=list_prefix_for_delete) # This check might be redundant
-                        s3.delete_object(Bucket=bucket, Key=list_prefix_for_delete)
-                        # If it was an explicit object and deleted, you could count it.
-                    except ClientError as ce:
-                        if ce.response['Error']['Code'] != '404' and ce.response['Error']['Code'] != 'NoSuchKey': # Ignore if not found
-                            error_msg += f" Error deleting folder marker {list_prefix_for_delete}: {ce};"
-                        # else: print(f"Folder marker {list_prefix_for_delete} not found or already deleted.")
+                        # Some S3 providers might still have an explicit folder object even if empty after contents are deleted.
+                        # Attempt to delete the folder marker itself. This is often harmless if it doesn't exist.
+                        try:
+                            # Check if the folder marker object itself exists (if it wasn't part of Contents)
+                            # s3.head_object(Bucket=bucket, Key=list_prefix_for_delete) # This check might be redundant
+                            s3.delete_object(Bucket=bucket, Key=list_prefix_for_delete)
+                            # If it was an explicit object and deleted, you could count it.
+                        except ClientError as ce:
+                            if ce.response['Error']['Code'] != '404' and ce.response['Error']['Code'] != 'NoSuchKey': # Ignore if not found
+                                error_msg += f" Error deleting folder marker {list_prefix_for_delete}: {ce};"
+                            # else: print(f"Folder marker {list_prefix_for_delete} not found or already deleted.")
                     
-                    result = {"deleted_count": deleted_count, "key": list_prefix_for_delete}
+                        result = {"deleted_count": deleted_count, "key": list_prefix_for_delete}
 
 
-                elif op_type == S3OpType.DOWNLOAD_TO_TEMP or op_type == S3OpType.DOWNLOAD_FILE:
-                    total_size = 0 # Default to 0 if head_object fails
-                    try:
-                        head = s3.head_object(Bucket=bucket, Key=key)
-                        total_size = int(head.get('ContentLength', 0))
-                    except Exception as e_head:
-                        print(f"Worker: Could not get ContentLength for {key}: {e_head}. Progress may be indeterminate.")
-                    
-                    bytes_done = 0
-                    # Initial progress emit (even if indeterminate)
-                    self._emit_progress_via_main_app(operation, bytes_done, total_size, "download")
-
-                    def progress_cb(chunk_size):
-                        nonlocal bytes_done
-                        bytes_done += chunk_size
-                        self._emit_progress_via_main_app(operation, bytes_done, total_size, "download")
+                    elif op_type == S3OpType.DOWNLOAD_TO_TEMP or op_type == S3OpType.DOWNLOAD_FILE:
+                        total_size = 0 # Default to 0 if head_object fails
+                        try:
+                            head = s3.head_object(Bucket=bucket, Key=key)
+                            total_size = int(head.get('ContentLength', 0))
+                        except Exception as e_head:
+                            print(f"Worker: Could not get ContentLength for {key}: {e_head}. Progress may be indeterminate.")
                     
-                    target_path = local_path 
-                    if op_type == S3OpType.DOWNLOAD_FILE: 
-                        # Ensure destination directory exists for explicit downloads
-                        dest_dir = os.path.dirname(target_path)
-                        if dest_dir: # Only create if dirname is not empty (i.e., not root)
-                            os.makedirs(dest_dir, exist_ok=True)
-
-                    s3.download_file(bucket, key, target_path, Callback=progress_cb)
-                    if op_type == S3OpType.DOWNLOAD_TO_TEMP:
-                        result = {"s3_key": key, "temp_path": target_path, "s3_bucket": bucket}
-                    else: # DOWNLOAD_FILE
-                        result = {"s3_key": key, "local_path": target_path, "s3_bucket": bucket}
-
-
-                elif op_type == S3OpType.UPLOAD_FILE:
-                    if not os.path.exists(local_path):
-                        # This error will be caught by the FileNotFoundError handler below
-                        raise FileNotFoundError(f"Local file for upload does not exist: {local_path}")
+                        bytes_done = 0
+                        if self.progress_tracker: self.progress_tracker.start_transfer(operation, total_size, "download")
+
+                        rate_limiter = self.rate_limiter
+
+                        def progress_cb(chunk_size):
+                            nonlocal bytes_done
+                            if rate_limiter: rate_limiter.consume_bytes(chunk_size, operation.is_cancelled) # Blocks while over the bandwidth limit
+                            operation.raise_if_cancelled() # Aborts the transfer between chunks
+                            bytes_done += chunk_size
+                            operation.bytes_transferred = bytes_done # Sampled by the GUI timer, no signal per chunk
                     
-                    total_size = os.path.getsize(local_path) 
-                    bytes_done = 0
-                    # Initial progress emit
-                    self._emit_progress_via_main_app(operation, bytes_done, total_size, "upload")
-
-                    def progress_cb(chunk_size):
-                        nonlocal bytes_done
-                        bytes_done += chunk_size
-                        self._emit_progress_via_main_app(operation, bytes_done, total_size, "upload")
+                        target_path = local_path 
+                        if op_type == S3OpType.DOWNLOAD_FILE: 
+                            # Ensure destination directory exists for explicit downloads
+                            dest_dir = os.path.dirname(target_path)
+                            if dest_dir: # Only create if dirname is not empty (i.e., not root)
+                                os.makedirs(dest_dir, exist_ok=True)
+
+                        with attribute_object_calls(bucket, key): # s3transfer's part threads count as this op type
+                            s3.download_file(bucket, key, target_path, Callback=progress_cb)
+                        if op_type == S3OpType.DOWNLOAD_TO_TEMP:
+                            result = {"s3_key": key, "temp_path": target_path, "s3_bucket": bucket}
+                        else: # DOWNLOAD_FILE
+                            result = {"s3_key": key, "local_path": target_path, "s3_bucket": bucket}
+
+
+                    elif op_type == S3OpType.UPLOAD_FILE:
+                        if not os.path.exists(local_path):
+                            # This error will be caught by the FileNotFoundError handler below
+                            raise FileNotFoundError(f"Local file for upload does not exist: {local_path}")
                     
-                    s3.upload_file(local_path, bucket, key, Callback=progress_cb)
-                    result = {"s3_key": key, "local_path": local_path, "s3_bucket": bucket}
-                    # Specific network/client errors are caught in the outer try-except
-
-                elif op_type == S3OpType.CREATE_FOLDER:
-                    folder_key_to_create = key if key.endswith('/') else key + '/'
-                    s3.put_object(Bucket=bucket, Key=folder_key_to_create, Body='') # Explicit empty body for folder
-                    result = {"s3_key": folder_key_to_create, "s3_bucket": bucket}
-
-                elif op_type == S3OpType.COPY_OBJECT:
-                    # For COPY_OBJECT:
-                    # operation.key is the SOURCE key
-                    # operation.bucket is the DESTINATION bucket
-                    # operation.new_key is the DESTINATION key
-                    source_key_for_copy = operation.key
-                    dest_bucket_for_copy = operation.bucket
-                    dest_key_for_copy = operation.new_key
-
-                    # Determine the source bucket
-                    if "source_bucket_override" in operation.callback_data:
-                        source_bucket_for_copy = operation.callback_data["source_bucket_override"]
-                    else:
-                        # If no override, assume source bucket is same as destination
-                        # This depends on how S3Operation was constructed by the caller.
-                        source_bucket_for_copy = dest_bucket_for_copy
+                        total_size = os.path.getsize(local_path) 
+                        bytes_done = 0
+                        if self.progress_tracker: self.progress_tracker.start_transfer(operation, total_size, "upload")
+
+                        rate_limiter = self.rate_limiter
+
+                        def progress_cb(chunk_size):
+                            nonlocal bytes_done
+                            if rate_limiter: rate_limiter.consume_bytes(chunk_size, operation.is_cancelled) # Blocks while over the bandwidth limit
+                            operation.raise_if_cancelled() # Aborts the transfer between chunks
+                            bytes_done += chunk_size
+                            operation.bytes_transferred = bytes_done # Sampled by the GUI timer, no signal per chunk
                     
-                    copy_source_dict = {'Bucket': source_bucket_for_copy, 'Key': source_key_for_copy}
-                    s3.copy_object(CopySource=copy_source_dict, Bucket=dest_bucket_for_copy, Key=dest_key_for_copy)
+                        with attribute_object_calls(bucket, key):
+                            s3.upload_file(local_path, bucket, key, Callback=progress_cb)
+                        # size / last_modified describe the new row for open views (S3ChangeSet); upload_file returns no ETag
+                        result = {"s3_key": key, "local_path": local_path, "s3_bucket": bucket,
+                                  "size": total_size, "last_modified": datetime.now(timezone.utc)}
+                        # Specific network/client errors are caught in the outer try-except
+
+                    elif op_type == S3OpType.CREATE_FOLDER:
+                        folder_key_to_create = key if key.endswith('/') else key + '/'
+                        s3.put_object(Bucket=bucket, Key=folder_key_to_create, Body='') # Explicit empty body for folder
+                        result = {"s3_key": folder_key_to_create, "s3_bucket": bucket}
+
+                    elif op_type == S3OpType.COPY_OBJECT:
+                        # For COPY_OBJECT:
+                        # operation.key is the SOURCE key
+                        # operation.bucket is the DESTINATION bucket
+                        # operation.new_key is the DESTINATION key
+                        source_key_for_copy = operation.key
+                        dest_bucket_for_copy = operation.bucket
+                        dest_key_for_copy = operation.new_key
+
+                        # Determine the source bucket
+                        if "source_bucket_override" in operation.callback_data:
+                            source_bucket_for_copy = operation.callback_data["source_bucket_override"]
+                        else:
+                            # If no override, assume source bucket is same as destination
+                            # This depends on how S3Operation was constructed by the caller.
+                            source_bucket_for_copy = dest_bucket_for_copy
                     
-                    result_data = {
-                        "source_key": source_key_for_copy, "dest_key": dest_key_for_copy,
-                        "source_bucket": source_bucket_for_copy, "dest_bucket": dest_bucket_for_copy,
-                        "original_deleted": False # Default
-                    }
-
-                    if operation.is_part_of_move:
-                        key_to_delete_after_move = operation.original_source_key_for_move or source_key_for_copy
-                        if key_to_delete_after_move: # Ensure there's something to delete
-                            try:
-                                s3.delete_object(Bucket=source_bucket_for_copy, Key=key_to_delete_after_move)
-                                result_data["original_deleted"] = True
-                            except Exception as del_e:
-                                print(f"S3OpWorker: Failed to delete original '{key_to_delete_after_move}' from '{source_bucket_for_copy}' after move: {del_e}")
-                                result_data["original_deleted"] = False # Explicitly set even if default
-                                result_data["original_delete_error"] = str(del_e)
+                        source_profile = operation.callback_data.get("source_profile")
+                        if source_profile:
+                            # Source lives on another profile/endpoint: no server-side copy possible, stream it through memory
+                            if self.profile_client_provider is None:
+                                raise ValueError(f"No client for source profile '{source_profile}'.")
+                            source_s3 = self.profile_client_provider(source_profile)
+                            copy_result = self.cross_profile_copier.copy(
+                                source_s3, s3, operation, source_bucket_for_copy, source_key_for_copy, dest_bucket_for_copy, dest_key_for_copy,
+                                progress_tracker=self.progress_tracker, rate_limiter=self.rate_limiter)
                         else:
-                             print(f"S3OpWorker: Warning - part of move but no original_source_key_for_move and source key was None for deletion.")
-                    result = result_data
-                else:
-                    error_msg = f"Unknown S3 operation type: {op_type}"
-
-            except ClientError as e: # Catch specific boto3 client errors
-                # Attempt to get a more user-friendly message from the error response
-                s3_error_code = e.response.get('Error', {}).get('Code', 'UnknownS3Error')
-                s3_error_message = e.response.get('Error', {}).get('Message', str(e))
-                error_msg = f"S3 Error ({s3_error_code}) for {operation.op_type.name} on '{key or new_key}': {s3_error_message}"
-                print(f"Worker ClientError: {error_msg} | Full error: {e}") # Log full error for debugging
-            except FileNotFoundError as e_fnf:
-                 error_msg = f"File not found for {operation.op_type.name} on '{local_path or key}': {e_fnf}"
-            except (ReadTimeoutError, ConnectTimeoutError) as net_err: # Catch specific network errors
-                error_msg = f"Network timeout during {operation.op_type.name} of '{key or local_path}': {net_err}"
-            except Exception as e_general: # Catch any other unexpected errors
-                error_msg = f"Unexpected error during {operation.op_type.name} on '{key or new_key or local_path}': {str(e_general)}"
-                # For critical unexpected errors, you might want to log the full traceback
-                import traceback
-                print(f"Worker General Exception Traceback for op {operation.id}:\n{traceback.format_exc()}")
-            
-            finally: # Ensure dialog is hidden if it was shown for this operation
-                if dialog_type_for_hiding and self.main_app_signals:
-                    signal_key_to_hide = None
-                    if dialog_type_for_hiding == "download":
-                        signal_key_to_hide = "request_download_progress_dialog_update"
-                    elif dialog_type_for_hiding == "upload":
-                        signal_key_to_hide = "request_upload_progress_dialog_update"
+                            source_s3 = s3
+                            # "source_size" is set by callers that listed the source; large objects are copied in parallel parts
+                            copy_result = self.multipart_copier.copy(
+                                s3, operation, source_bucket_for_copy, source_key_for_copy, dest_bucket_for_copy, dest_key_for_copy,
+                                source_size=operation.callback_data.get("source_size"), progress_tracker=self.progress_tracker)
                     
-                    if signal_key_to_hide and signal_key_to_hide in self.main_app_signals:
-                        try:
-                            self.main_app_signals[signal_key_to_hide].emit("", 0, 0, False) # False to hide
-                        except Exception as e_hide:
-                             print(f"WORKER: Error emitting hide signal for {signal_key_to_hide}: {e_hide}")
+                        result_data = {
+                            "source_key": source_key_for_copy, "dest_key": dest_key_for_copy,
+                            "source_bucket": source_bucket_for_copy, "dest_bucket": dest_bucket_for_copy,
+                            "copy_strategy": copy_result["strategy"], "source_profile": source_profile,
+                            "etag": copy_result.get("etag"), "size": operation.callback_data.get("source_size"),
+                            "last_modified": datetime.now(timezone.utc),
+                            "original_deleted": False # Default
+                        }
+
+                        if operation.is_part_of_move:
+                            key_to_delete_after_move = operation.original_source_key_for_move or source_key_for_copy
+                            # The aggregator deletes with the active client, so cross-profile moves delete directly
+                            if key_to_delete_after_move and source_s3 is s3 and self.delete_aggregator is not None and \
+                                    self.delete_aggregator.submit_move_delete(operation, source_bucket_for_copy, key_to_delete_after_move, result_data):
+                                handed_off = True
+                            elif key_to_delete_after_move: # Ensure there's something to delete
+                                try:
+                                    source_s3.delete_object(Bucket=source_bucket_for_copy, Key=key_to_delete_after_move)
+                                    result_data["original_deleted"] = True
+                                except Exception as del_e:
+                                    print(f"S3OpWorker: Failed to delete original '{key_to_delete_after_move}' from '{source_bucket_for_copy}' after move: {del_e}")
+                                    result_data["original_deleted"] = False # Explicitly set even if default
+                                    result_data["original_delete_error"] = str(del_e)
+                            else:
+                                 print(f"S3OpWorker: Warning - part of move but no original_source_key_for_move and source key was None for deletion.")
+                        result = result_data
+
+                    elif op_type == S3OpType.MOVE_PREFIX:
+                        # operation.key is the SOURCE prefix, operation.new_key the DESTINATION prefix (in operation.bucket)
+                        source_bucket_for_move = operation.callback_data.get("source_bucket_override", bucket)
+                        signals = self.main_app_signals
+                        mover = S3PrefixMover(
+                            s3, self.multipart_copier, retry_policy=self.retry_policy, progress_tracker=self.progress_tracker,
+                            status_callback=(lambda message: signals['request_status_bar_message'].emit(message, 3000)) if signals else None,
+                            checkpoint_callback=self.journal.record_operation_checkpoint if self.journal else None,
+                            concurrency_controller=self.concurrency_controller)
+                        result = mover.move(operation, source_bucket_for_move, key, bucket, new_key)
+                        if result["failed_count"]:
+                            # Failed objects stay at the source; retrying the operation picks up exactly those
+                            error_msg = (f"{result['failed_count']} object(s) of '{key}' could not be moved "
+                                         f"({result['moved_count']} moved). First error: {result['failures'][0] if result['failures'] else 'unknown'}")
+                    else:
+                        error_msg = f"Unknown S3 operation type: {op_type}"
+
+                except OperationCancelled as e_cancel:
+                    error_msg = CANCELLED_ERROR_MESSAGE
+                    operation.error_code = "Cancelled"
+                    print(f"WORKER: {e_cancel}")
+                except ClientError as e: # Catch specific boto3 client errors
+                    # Attempt to get a more user-friendly message from the error response
+                    s3_error_code = e.response.get('Error', {}).get('Code', 'UnknownS3Error')
+                    s3_error_message = e.response.get('Error', {}).get('Message', str(e))
+                    http_status = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+                    operation.error_code = "503" if http_status == 503 and s3_error_code == 'UnknownS3Error' else s3_error_code
+                    error_msg = f"S3 Error ({s3_error_code}) for {operation.op_type.name} on '{key or new_key}': {s3_error_message}"
+                    print(f"Worker ClientError: {error_msg} | Full error: {e}") # Log full error for debugging
+                    if self._wait_before_retry(operation, e, error_msg):
+                        continue
+                except FileNotFoundError as e_fnf:
+                     error_msg = f"File not found for {operation.op_type.name} on '{local_path or key}': {e_fnf}"
+                except (ReadTimeoutError, ConnectTimeoutError) as net_err: # Catch specific network errors
+                    error_msg = f"Network timeout during {operation.op_type.name} of '{key or local_path}': {net_err}"
+                    operation.error_code = "Timeout"
+                    if self._wait_before_retry(operation, net_err, error_msg):
+                        continue
+                except (EndpointConnectionError, ConnectionClosedError) as conn_err: # Dropped/refused connection
+                    error_msg = f"Connection error during {operation.op_type.name} of '{key or local_path}': {conn_err}"
+                    operation.error_code = "ConnectionError"
+                    if self._wait_before_retry(operation, conn_err, error_msg):
+                        continue
+                except Exception as e_general: # Catch any other unexpected errors
+                    if operation.is_cancelled(): # Transfer manager may wrap the OperationCancelled raised in a callback
+                        error_msg = CANCELLED_ERROR_MESSAGE
+                        operation.error_code = "Cancelled"
+                    else:
+                        error_msg = f"Unexpected error during {operation.op_type.name} on '{key or new_key or local_path}': {str(e_general)}"
+                        # For critical unexpected errors, you might want to log the full traceback
+                        import traceback
+                        print(f"Worker General Exception Traceback for op {operation.id}:\n{traceback.format_exc()}")
             
-            self.operation_finished.emit(operation, result, error_msg)
+                finally: # Transfer leaves the progress dialogs on the next GUI sample
+                    if self.progress_tracker:
+                        self.progress_tracker.finish_transfer(operation)
+                break
+
+            if operation.error_code == "Cancelled" and op_type == S3OpType.UPLOAD_FILE:
+                self._abort_multipart_uploads_for_key(s3, operation.bucket, operation.key, started_wallclock)
+
+            set_current_op_type(None)
+            if not handed_off:
+                operation.finished_at = time.monotonic()
+                self.op_queue.mark_finished(operation)
+                self.operation_finished.emit(operation, result, error_msg)
             self.op_queue.task_done()
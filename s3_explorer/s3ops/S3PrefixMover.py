@@ -0,0 +1,261 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from botocore.exceptions import ClientError, ReadTimeoutError, ConnectTimeoutError, EndpointConnectionError, ConnectionClosedError
+
+from s3ops.S3Operation import S3Operation, S3OpType, OperationCancelled, CANCELLED_ERROR_MESSAGE
+from s3ops.S3Metrics import bind_op_type
+
+
+# --- S3PrefixMover (runs one MOVE_PREFIX operation: folder rename / move / trash / restore) ---
+# The whole move is planned and executed here instead of every caller listing the folder
+# and queueing one COPY_OBJECT per key:
+#   1. listing is parallel: one delimiter listing finds the first level of subfolders, each
+#      of which is then listed recursively on its own thread (pages stream into a bounded queue)
+#   2. objects are copied by a pool of up to COPY_CONCURRENCY threads (large ones via multipart copy);
+#      copy slots are shared by every move in the process, so trashing many folders at once still
+#      keeps at most MAX_COPY_SLOTS copies (MAX_LARGE_COPY_SLOTS multipart ones) in flight
+#   3. every copy is verified (ETag from the copy response, else a HEAD comparing the size);
+#      failed copies are retried on S3RetryPolicy's backoff and throttles reported to the AIMD controller
+#   4. only verified sources are deleted, with delete_objects in batches of up to 1000 keys
+# Sources disappear as they are moved, so re-running the same operation (retry, or resume
+# after a crash) simply continues with what is left; the counters are checkpointed into
+# operation.callback_data["move_checkpoint"] (and the journal) so totals carry over too.
+class S3PrefixMover:
+    LIST_PARALLELISM = 4
+    LIST_QUEUE_PAGES = 8       # Listing runs at most this many pages ahead of the copies
+    COPY_CONCURRENCY = 32      # Per move
+    MAX_COPY_SLOTS = 32        # Process wide: copies in flight across all MOVE_PREFIX operations
+    MAX_LARGE_COPY_SLOTS = 4   # Process wide: multipart copies, each running up to S3MultipartCopier.MAX_PARALLEL_PARTS parts
+    SLOT_WAIT_SECONDS = 0.2    # Re-check cancel at least this often while waiting for a slot
+    DELETE_BATCH_SIZE = 1000   # delete_objects limit
+    REPORT_INTERVAL_SECONDS = 2.0
+    MAX_REPORTED_FAILURES = 20
+
+    _copy_slots = threading.BoundedSemaphore(MAX_COPY_SLOTS)
+    _large_copy_slots = threading.BoundedSemaphore(MAX_LARGE_COPY_SLOTS)
+
+    def __init__(self, s3_client, multipart_copier, retry_policy=None, progress_tracker=None,
+                 status_callback=None, checkpoint_callback=None, concurrency_controller=None):
+        self.s3 = s3_client
+        self.copier = multipart_copier
+        self.retry_policy = retry_policy
+        self.concurrency_controller = concurrency_controller # S3ConcurrencyController; told about every retried copy
+        self.progress_tracker = progress_tracker
+        self.status_callback = status_callback         # callable(message) for the status bar
+        self.checkpoint_callback = checkpoint_callback # callable(operation), e.g. OperationJournal.record_operation_checkpoint
+
+    # --- Listing ---
+    def _iter_listing_pages(self, bucket, prefix, stop_event):
+        """Yields lists of listed objects ('Contents' entries) under prefix, several subfolders at a time."""
+        paginator = self.s3.get_paginator('list_objects_v2')
+        subfolder_prefixes = []
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter='/'):
+            if page.get('Contents'): yield page['Contents'] # Objects directly in the folder (incl. its marker)
+            subfolder_prefixes.extend(common_prefix['Prefix'] for common_prefix in page.get('CommonPrefixes', []))
+        if not subfolder_prefixes: return
+
+        pages = queue.Queue(maxsize=self.LIST_QUEUE_PAGES)
+
+        def list_subfolder(subfolder_prefix):
+            for page in self.s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=subfolder_prefix):
+                if not page.get('Contents'): continue
+                while not stop_event.is_set():
+                    try:
+                        pages.put(page['Contents'], timeout=0.2)
+                        break
+                    except queue.Full:
+                        continue
+                if stop_event.is_set(): return
+
+        with ThreadPoolExecutor(max_workers=self.LIST_PARALLELISM, thread_name_prefix="S3PrefixMoveList") as executor:
+            try:
+                remaining = {executor.submit(bind_op_type(list_subfolder), p) for p in subfolder_prefixes}
+                while remaining or not pages.empty():
+                    try:
+                        yield pages.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                    finished = {future for future in remaining if future.done()}
+                    for future in finished: future.result() # Re-raises a listing error
+                    remaining -= finished
+            finally:
+                stop_event.set() # Unblocks listing threads when the consumer stops early
+
+    # --- Copy slots (shared by all movers) ---
+    def _is_large(self, obj):
+        return (obj.get('Size') or 0) >= self.copier.MULTIPART_THRESHOLD
+
+    def _acquire_slots(self, operation, obj):
+        """Blocks until the object may be copied; False if the operation was cancelled meanwhile."""
+        slots = [self._large_copy_slots, self._copy_slots] if self._is_large(obj) else [self._copy_slots]
+        for taken, slot in enumerate(slots): # Always in this order, so two movers cannot deadlock
+            while not slot.acquire(timeout=self.SLOT_WAIT_SECONDS):
+                if operation.is_cancelled():
+                    for held in slots[:taken]: held.release()
+                    return False
+        return True
+
+    def _release_slots(self, obj):
+        self._copy_slots.release()
+        if self._is_large(obj): self._large_copy_slots.release()
+
+    # --- Copy + verify (pool threads) ---
+    @staticmethod
+    def _error_code(exception):
+        # Same codes the worker stores in operation.error_code
+        if isinstance(exception, ClientError):
+            s3_error_code = exception.response.get('Error', {}).get('Code', 'UnknownS3Error')
+            http_status = exception.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+            return "503" if http_status == 503 and s3_error_code == 'UnknownS3Error' else s3_error_code
+        if isinstance(exception, (ReadTimeoutError, ConnectTimeoutError)): return "Timeout"
+        if isinstance(exception, (EndpointConnectionError, ConnectionClosedError)): return "ConnectionError"
+        return None
+
+    def _copy_and_verify(self, operation, obj, source_bucket, dest_bucket, dest_key):
+        """Returns None when the copy is verified, else an error message. Never raises.
+        The caller holds the object's copy slots; they are released here."""
+        try:
+            return self._copy_and_verify_with_retries(operation, obj, source_bucket, dest_bucket, dest_key)
+        finally:
+            self._release_slots(obj)
+
+    def _copy_and_verify_with_retries(self, operation, obj, source_bucket, dest_bucket, dest_key):
+        source_key = obj['Key']
+        # Child op: carries the cancel tokens for the copier without touching the MOVE_PREFIX op's byte counter;
+        # it also counts the object's retries, which spend the batch's retry budget like any COPY_OBJECT
+        child = S3Operation(S3OpType.COPY_OBJECT, dest_bucket, key=source_key, new_key=dest_key,
+                            callback_data={"batch_id": operation.callback_data.get("batch_id")})
+        child.cancel_token = operation.cancel_token
+        child.batch_cancel_token = operation.batch_cancel_token
+        while True:
+            if operation.is_cancelled(): return CANCELLED_ERROR_MESSAGE
+            try:
+                copy_result = self.copier.copy(self.s3, child, source_bucket, source_key, dest_bucket, dest_key,
+                                               source_size=obj.get('Size'))
+                if copy_result["etag"] and copy_result["etag"] == obj.get('ETag'):
+                    return None
+                # ETags differ for multipart sources/copies: fall back to comparing sizes
+                head = self.s3.head_object(Bucket=dest_bucket, Key=dest_key)
+                if int(head.get('ContentLength', -1)) == int(obj.get('Size', -2)):
+                    return None
+                return f"copy of '{source_key}' could not be verified (size {head.get('ContentLength')} != {obj.get('Size')})"
+            except OperationCancelled:
+                return CANCELLED_ERROR_MESSAGE
+            except Exception as e:
+                error = f"'{source_key}': {e}"
+                if self.retry_policy is None: return error
+                retryable, retry_after = self.retry_policy.classify(e)
+                delay = self.retry_policy.next_delay(child, retryable=True, retry_after=retry_after) if retryable else None
+                if delay is None: return error
+                child.auto_retry_count += 1
+                child.error_code = self._error_code(e)
+                if self.concurrency_controller is not None:
+                    self.concurrency_controller.record_retry(child.error_code)
+                if not self.retry_policy.wait(child, delay): return CANCELLED_ERROR_MESSAGE
+
+    def _delete_sources(self, source_bucket, keys, stats, failures):
+        for i in range(0, len(keys), self.DELETE_BATCH_SIZE):
+            chunk = keys[i:i + self.DELETE_BATCH_SIZE]
+            try:
+                response = self.s3.delete_objects(Bucket=source_bucket, Delete={'Objects': [{'Key': k} for k in chunk], 'Quiet': True})
+            except Exception as e:
+                stats["failed"] += len(chunk)
+                failures.append(f"deleting {len(chunk)} moved source(s): {e}")
+                continue
+            errors = response.get('Errors', [])
+            stats["moved"] += len(chunk) - len(errors)
+            stats["failed"] += len(errors)
+            for error in errors:
+                failures.append(f"deleting source '{error.get('Key')}': {error.get('Code')} {error.get('Message', '')}")
+
+    # --- Entry point (worker thread) ---
+    def move(self, operation, source_bucket, source_prefix, dest_bucket, dest_prefix):
+        source_prefix = source_prefix if source_prefix.endswith('/') else source_prefix + '/'
+        dest_prefix = dest_prefix if dest_prefix.endswith('/') else dest_prefix + '/'
+        if source_bucket == dest_bucket and dest_prefix.startswith(source_prefix):
+            raise ValueError(f"Cannot move '{source_prefix}' into itself ('{dest_prefix}').")
+
+        checkpoint = operation.callback_data.get("move_checkpoint") or {}
+        stats = {"moved": checkpoint.get("moved", 0), "failed": 0, "bytes": checkpoint.get("bytes", 0)}
+        failures = []
+        verified_sources = [] # Copied + verified, not deleted yet
+        operation.bytes_transferred = stats["bytes"]
+        if self.progress_tracker: self.progress_tracker.start_transfer(operation, 0, "copy") # Total unknown while listing
+        folder_name = os.path.basename(source_prefix.rstrip('/')) or source_prefix
+        print(f"PREFIX_MOVER: Moving s3://{source_bucket}/{source_prefix} -> s3://{dest_bucket}/{dest_prefix}"
+              f"{' (resuming after ' + str(stats['moved']) + ' moved)' if checkpoint else ''}")
+
+        stop_event = threading.Event()
+        pending = set()
+        last_report = time.monotonic()
+
+        def collect(done_futures):
+            for future in done_futures:
+                obj, error = future.source_object, future.result()
+                if error is None:
+                    verified_sources.append(obj['Key'])
+                    stats["bytes"] += obj.get('Size', 0)
+                    operation.bytes_transferred = stats["bytes"]
+                elif error != CANCELLED_ERROR_MESSAGE:
+                    stats["failed"] += 1
+                    failures.append(error)
+
+        def report(force=False):
+            nonlocal last_report
+            if len(verified_sources) >= self.DELETE_BATCH_SIZE or (force and verified_sources):
+                self._delete_sources(source_bucket, verified_sources, stats, failures)
+                verified_sources.clear()
+            now = time.monotonic()
+            if not force and now - last_report < self.REPORT_INTERVAL_SECONDS: return
+            last_report = now
+            operation.callback_data["move_checkpoint"] = {"moved": stats["moved"], "bytes": stats["bytes"]}
+            if self.checkpoint_callback: self.checkpoint_callback(operation)
+            if self.status_callback: self.status_callback(f"Moving '{folder_name}': {stats['moved']:,} object(s) moved")
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.COPY_CONCURRENCY, thread_name_prefix="S3PrefixMoveCopy") as executor:
+                copy_and_verify = bind_op_type(self._copy_and_verify) # Pool threads' S3 calls count as MOVE_PREFIX
+                def submit(obj):
+                    # Waiting here (not in a pool thread) keeps idle moves from holding idle threads
+                    if not self._acquire_slots(operation, obj): return
+                    dest_key = dest_prefix + obj['Key'][len(source_prefix):]
+                    try:
+                        future = executor.submit(copy_and_verify, operation, obj, source_bucket, dest_bucket, dest_key)
+                    except BaseException:
+                        self._release_slots(obj)
+                        raise
+                    future.source_object = obj
+                    pending.add(future)
+
+                try:
+                    for page_objects in self._iter_listing_pages(source_bucket, source_prefix, stop_event):
+                        for obj in page_objects:
+                            if operation.is_cancelled(): break
+                            while len(pending) >= self.COPY_CONCURRENCY * 2: # Bounded: listing waits for copies
+                                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                                pending.difference_update(done)
+                                collect(done)
+                            submit(obj)
+                        report()
+                        if operation.is_cancelled(): break
+                finally:
+                    # Let in-flight copies finish so their (verified) sources are still deleted
+                    done, _ = wait(pending)
+                    pending.clear()
+                    collect(done)
+        finally:
+            report(force=True)
+            if self.progress_tracker: self.progress_tracker.finish_transfer(operation)
+
+        operation.raise_if_cancelled()
+        print(f"PREFIX_MOVER: Done '{source_prefix}' -> '{dest_prefix}': {stats['moved']} moved, {stats['failed']} failed.")
+        return {
+            "source_bucket": source_bucket, "source_prefix": source_prefix,
+            "dest_bucket": dest_bucket, "dest_prefix": dest_prefix,
+            "moved_count": stats["moved"], "failed_count": stats["failed"], "bytes": stats["bytes"],
+            "failures": failures[:self.MAX_REPORTED_FAILURES],
+        }
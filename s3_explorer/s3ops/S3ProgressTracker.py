@@ -0,0 +1,113 @@
+import threading
+import time
+
+
+# --- S3ProgressTracker (shared progress state, sampled by the GUI) ---
+# Workers never signal the GUI per s3transfer chunk. They register a transfer once,
+# then only bump operation.bytes_transferred from the callback. OperationManager
+# calls sample() from a ~10 Hz QTimer on the GUI thread, which turns the raw byte
+# counters into smoothed rates (EWMA) and ETAs, per operation and per batch.
+class S3ProgressTracker:
+    EWMA_ALPHA = 0.3 # Weight of the newest sample; ~1 s of memory at 10 Hz
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._transfers = {}     # operation.id -> transfer state dict (see start_transfer)
+        self._batches = {}       # batch_id -> batch state dict (see start_batch)
+        self._batch_item_names = {} # batch_id -> name of the item a worker most recently picked up
+
+    @staticmethod
+    def _ewma(previous, sample, alpha):
+        return sample if previous is None else alpha * sample + (1 - alpha) * previous
+
+    @staticmethod
+    def eta_seconds(remaining, rate):
+        if rate is None or rate <= 0 or remaining <= 0: return None
+        return remaining / rate
+
+    # --- Worker side (any thread) ---
+    def start_transfer(self, operation, total_bytes, kind):
+        """kind is 'download' or 'upload' (picks the dialog the GUI shows it in), or 'copy' (server-side, no dialog)."""
+        with self._lock:
+            self._transfers[operation.id] = {
+                "operation": operation, "kind": kind, "total_bytes": max(0, int(total_bytes or 0)),
+                "started_at": time.monotonic(), "last_bytes": 0, "last_sampled_at": None, "rate": None,
+            }
+
+    def finish_transfer(self, operation):
+        with self._lock:
+            self._transfers.pop(operation.id, None)
+
+    def note_batch_item(self, batch_id, item_name):
+        # Only the latest name matters; the GUI shows it on the next sample
+        self._batch_item_names[batch_id] = item_name
+
+    # --- GUI side ---
+    def start_batch(self, batch_id, total_items, already_completed=0):
+        with self._lock:
+            self._batches[batch_id] = {
+                "total": total_items, "completed": already_completed, "last_completed": already_completed,
+                "bytes": 0, "last_bytes": 0, "last_sampled_at": None, "items_rate": None, "bytes_rate": None,
+            }
+
+    def set_batch_total(self, batch_id, total_items):
+        # Streaming batches grow while their source is still being listed
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is not None: batch["total"] = total_items
+
+    def record_batch_item_finished(self, batch_id, completed_count, bytes_transferred=0):
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None: return
+            batch["completed"] = completed_count
+            batch["bytes"] += max(0, int(bytes_transferred or 0))
+
+    def finish_batch(self, batch_id):
+        with self._lock:
+            self._batches.pop(batch_id, None)
+        self._batch_item_names.pop(batch_id, None)
+
+    def sample(self):
+        """Advances rates/ETAs; returns {'transfers': [...], 'batches': {batch_id: {...}}} snapshots."""
+        now = time.monotonic()
+        transfers, batches = [], {}
+        with self._lock:
+            for transfer in self._transfers.values():
+                operation = transfer["operation"]
+                done = operation.bytes_transferred
+                if transfer["last_sampled_at"] is not None:
+                    dt = now - transfer["last_sampled_at"]
+                    if dt > 0:
+                        transfer["rate"] = self._ewma(transfer["rate"], (done - transfer["last_bytes"]) / dt, self.EWMA_ALPHA)
+                transfer["last_sampled_at"] = now
+                transfer["last_bytes"] = done
+                transfers.append({
+                    "operation": operation, "kind": transfer["kind"], "bytes_done": done,
+                    "total_bytes": transfer["total_bytes"], "rate": transfer["rate"],
+                    "eta": self.eta_seconds(transfer["total_bytes"] - done, transfer["rate"]),
+                })
+
+            in_flight_bytes_by_batch = {}
+            for transfer in self._transfers.values():
+                batch_id = transfer["operation"].callback_data.get("batch_id")
+                if batch_id in self._batches:
+                    in_flight_bytes_by_batch[batch_id] = in_flight_bytes_by_batch.get(batch_id, 0) + transfer["operation"].bytes_transferred
+
+            for batch_id, batch in self._batches.items():
+                batch_bytes = batch["bytes"] + in_flight_bytes_by_batch.get(batch_id, 0)
+                if batch["last_sampled_at"] is not None:
+                    dt = now - batch["last_sampled_at"]
+                    if dt > 0:
+                        batch["items_rate"] = self._ewma(batch["items_rate"], (batch["completed"] - batch["last_completed"]) / dt, self.EWMA_ALPHA)
+                        batch["bytes_rate"] = self._ewma(batch["bytes_rate"], (batch_bytes - batch["last_bytes"]) / dt, self.EWMA_ALPHA)
+                batch["last_sampled_at"] = now
+                batch["last_completed"] = batch["completed"]
+                batch["last_bytes"] = batch_bytes
+                batches[batch_id] = {
+                    "completed": batch["completed"], "total": batch["total"], "bytes": batch_bytes,
+                    "items_rate": batch["items_rate"], "bytes_rate": batch["bytes_rate"],
+                    "eta": self.eta_seconds(batch["total"] - batch["completed"], batch["items_rate"]),
+                    "item_name": self._batch_item_names.get(batch_id),
+                }
+        return {"transfers": transfers, "batches": batches}
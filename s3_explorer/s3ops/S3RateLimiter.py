@@ -0,0 +1,173 @@
+import threading
+import time
+from datetime import datetime
+
+
+# --- Token buckets for requests/sec and bytes/sec (shared by everything talking to one profile) ---
+# One S3RateLimiter per profile (get_rate_limiter). It is attached to every boto3 client
+# created for that profile (before-call hook = one request token per API call) and
+# transfer callbacks (upload_file / download_file / WebDAV streams) spend byte tokens,
+# which blocks the transfer thread just long enough to keep the average under the limit.
+# Limits can change at any time (Bandwidth Limits dialog, or a schedule window starting);
+# waiting threads pick up the new rate on their next wake-up, nothing needs a restart.
+class TokenBucket:
+    MAX_WAIT_SLICE_SECONDS = 0.25 # Re-check rate/cancel at least this often while waiting
+
+    def __init__(self, rate=0, burst_seconds=1.0):
+        self._lock = threading.Lock()
+        self._rate = 0.0  # tokens/sec; 0 = unlimited
+        self._burst_seconds = burst_seconds
+        self._tokens = 0.0
+        self._updated_at = time.monotonic()
+        self.set_rate(rate)
+
+    @property
+    def rate(self):
+        return self._rate
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill_locked()
+            self._rate = max(0.0, float(rate or 0))
+            self._tokens = min(self._tokens, self._capacity_locked()) if self._rate else 0.0
+
+    def _capacity_locked(self):
+        return max(1.0, self._rate * self._burst_seconds)
+
+    def _refill_locked(self):
+        now = time.monotonic()
+        if self._rate:
+            self._tokens = min(self._capacity_locked(), self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def acquire(self, amount=1, is_cancelled=None):
+        """Blocks until amount tokens were spent. Returns False if is_cancelled() became true while waiting."""
+        remaining = float(amount)
+        while remaining > 0:
+            with self._lock:
+                if not self._rate:
+                    return True # Unlimited (possibly switched off while we were waiting)
+                self._refill_locked()
+                # Take what is there; amounts larger than the burst are paid off in instalments
+                taken = min(remaining, self._tokens)
+                self._tokens -= taken
+                remaining -= taken
+                wait_seconds = min(self.MAX_WAIT_SLICE_SECONDS, remaining / self._rate) if remaining > 0 else 0
+            if wait_seconds > 0:
+                if is_cancelled is not None and is_cancelled():
+                    return False
+                time.sleep(wait_seconds)
+        return True
+
+
+class S3RateLimiter:
+    """requests/sec + bytes/sec limits for one profile, with optional time-of-day schedule windows.
+
+    Settings dict (stored in the profile as "rate_limits"):
+        {"requests_per_sec": 0, "bytes_per_sec": 0,            # 0 = unlimited
+         "schedules": [{"start": "09:00", "end": "18:00",      # local time, end may be past midnight
+                        "requests_per_sec": 0, "bytes_per_sec": 10485760}]}
+    The first schedule window containing the current time overrides the base limits.
+    """
+
+    SCHEDULE_CHECK_SECONDS = 30
+
+    def __init__(self, name=""):
+        self.name = name
+        self.request_bucket = TokenBucket()
+        self.bytes_bucket = TokenBucket()
+        self._settings = {}
+        self._lock = threading.Lock()
+        self._active_window = None
+        self._next_schedule_check = 0.0
+        self._attached_client_ids = set()
+
+    # --- Configuration ---
+    def configure(self, settings):
+        with self._lock:
+            self._settings = dict(settings or {})
+            self._next_schedule_check = 0.0
+        self._apply_schedule(force=True)
+
+    def get_settings(self):
+        with self._lock:
+            return dict(self._settings)
+
+    @staticmethod
+    def _minutes(hhmm):
+        hours, minutes = str(hhmm).strip().split(":")
+        return int(hours) * 60 + int(minutes)
+
+    @classmethod
+    def window_contains(cls, window, now_minutes):
+        try:
+            start, end = cls._minutes(window["start"]), cls._minutes(window["end"])
+        except (KeyError, ValueError):
+            return False
+        if start <= end:
+            return start <= now_minutes < end
+        return now_minutes >= start or now_minutes < end # e.g. 22:00-06:00
+
+    def _apply_schedule(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now < self._next_schedule_check:
+                return
+            self._next_schedule_check = now + self.SCHEDULE_CHECK_SECONDS
+            local_now = datetime.now()
+            now_minutes = local_now.hour * 60 + local_now.minute
+            active_window = next((w for w in self._settings.get("schedules", []) if self.window_contains(w, now_minutes)), None)
+            limits = active_window if active_window is not None else self._settings
+            if not force and active_window == self._active_window:
+                return
+            self._active_window = active_window
+        self.request_bucket.set_rate(limits.get("requests_per_sec", 0))
+        self.bytes_bucket.set_rate(limits.get("bytes_per_sec", 0))
+        print(f"RATE_LIMITER[{self.name}]: requests/sec={self.request_bucket.rate or 'unlimited'}, "
+              f"bytes/sec={self.bytes_bucket.rate or 'unlimited'}"
+              f"{' (schedule ' + active_window.get('start', '') + '-' + active_window.get('end', '') + ')' if active_window else ''}")
+
+    def current_limits(self):
+        """(requests_per_sec, bytes_per_sec) in force right now; 0 = unlimited."""
+        self._apply_schedule()
+        return self.request_bucket.rate, self.bytes_bucket.rate
+
+    # --- Spending ---
+    def acquire_request(self, is_cancelled=None):
+        self._apply_schedule()
+        return self.request_bucket.acquire(1, is_cancelled)
+
+    def consume_bytes(self, byte_count, is_cancelled=None):
+        self._apply_schedule()
+        if byte_count <= 0: return True
+        return self.bytes_bucket.acquire(byte_count, is_cancelled)
+
+    def attach_to_client(self, client):
+        """Every API call made with client spends one request token first."""
+        if id(client) in self._attached_client_ids: return
+        self._attached_client_ids.add(id(client))
+        client.meta.events.register('before-call.s3', self._on_before_call)
+
+    def _on_before_call(self, **kwargs):
+        self.acquire_request()
+
+    def wrap_callback(self, callback=None, is_cancelled=None):
+        """Callback for boto3 transfer methods that throttles bandwidth, then calls the original callback."""
+        def throttled_callback(byte_count):
+            self.consume_bytes(byte_count, is_cancelled)
+            if callback is not None:
+                callback(byte_count)
+        return throttled_callback
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(profile_key):
+    """Shared limiter for a profile (GUI workers, folder downloads and the WebDAV server all use the same one)."""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(profile_key)
+        if limiter is None:
+            limiter = _rate_limiters[profile_key] = S3RateLimiter(str(profile_key))
+        return limiter
@@ -0,0 +1,140 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+from botocore.exceptions import (
+    ClientError, ReadTimeoutError, ConnectTimeoutError, EndpointConnectionError, ConnectionClosedError
+)
+
+from s3ops.S3Operation import S3OpType
+
+
+# --- S3RetryPolicy (operation level retries on top of botocore's own HTTP retries) ---
+# botocore already retries a single request a few times; this layer retries the whole
+# operation (e.g. a full upload_file or copy) when what is left over is still transient.
+#   - errors are classified retryable / not retryable (NoSuchKey, AccessDenied... never are)
+#   - delay = uniform(0, min(max_delay, base_delay * 2**attempt))  ("full jitter")
+#   - a Retry-After header, when the endpoint sends one, is a lower bound for the delay
+#   - retries are capped per operation (by op type) and per batch (shared budget), so
+#     a sick endpoint fails a big batch quickly instead of retrying every item
+class S3RetryPolicy:
+    RETRYABLE_ERROR_CODES = {
+        "SlowDown", "503", "500", "502", "504", "ServiceUnavailable", "InternalError",
+        "Throttling", "ThrottlingException", "RequestLimitExceeded", "TooManyRequests", "429",
+        "RequestTimeout", "RequestTimeTooSkewed", "Timeout", "ConnectionError",
+    }
+    RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+
+    # op type -> (max_retries, base_delay_seconds, max_delay_seconds)
+    # Interactive ops retry briefly (the user is waiting); bulk ops can afford to wait out a throttle.
+    DEFAULT_SETTINGS = {
+        S3OpType.LIST: (3, 0.2, 3.0),
+        S3OpType.HEAD_OBJECT: (2, 0.2, 2.0),
+        S3OpType.DOWNLOAD_TO_TEMP: (3, 0.5, 10.0),
+        S3OpType.DOWNLOAD_FILE: (5, 1.0, 30.0),
+        S3OpType.UPLOAD_FILE: (5, 1.0, 30.0),
+        S3OpType.COPY_OBJECT: (5, 0.5, 20.0),
+        S3OpType.DELETE_OBJECT: (5, 0.5, 20.0),
+        S3OpType.DELETE_FOLDER: (5, 0.5, 20.0),
+        S3OpType.CREATE_FOLDER: (3, 0.5, 10.0),
+        S3OpType.MOVE_PREFIX: (3, 2.0, 30.0), # A retry re-lists and continues with whatever is left
+        S3OpType.SUMMARIZE_PREFIX: (3, 1.0, 20.0),
+    }
+    FALLBACK_SETTINGS = (3, 0.5, 10.0)
+
+    BATCH_RETRY_BUDGET_MIN = 100        # Every batch may retry at least this many times in total
+    BATCH_RETRY_BUDGET_FRACTION = 0.05  # ... or 5% of its items, whichever is larger
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._max_retries_override = None # Per-profile "max_retries" (applies to every op type)
+        self._batch_budgets = {}          # batch_id -> retries left
+        self.total_retries = 0
+
+    def set_max_retries(self, max_retries):
+        with self._lock:
+            self._max_retries_override = None if max_retries is None else max(0, int(max_retries))
+
+    def settings_for(self, op_type):
+        max_retries, base_delay, max_delay = self.DEFAULT_SETTINGS.get(op_type, self.FALLBACK_SETTINGS)
+        if self._max_retries_override is not None:
+            max_retries = self._max_retries_override
+        return max_retries, base_delay, max_delay
+
+    # --- Batch budgets (OperationManager) ---
+    def register_batch(self, batch_id, total_items):
+        with self._lock:
+            self._batch_budgets[batch_id] = max(self.BATCH_RETRY_BUDGET_MIN, int(total_items * self.BATCH_RETRY_BUDGET_FRACTION))
+
+    def extend_batch(self, batch_id, added_items):
+        # Streaming batches: the budget grows with the items listed so far
+        with self._lock:
+            if batch_id in self._batch_budgets:
+                self._batch_budgets[batch_id] += int(added_items * self.BATCH_RETRY_BUDGET_FRACTION)
+
+    def unregister_batch(self, batch_id):
+        with self._lock:
+            self._batch_budgets.pop(batch_id, None)
+
+    # --- Classification ---
+    @staticmethod
+    def _retry_after_seconds(headers):
+        value = (headers or {}).get("retry-after")
+        if not value: return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try: # HTTP-date form
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def classify(self, exception):
+        """Returns (retryable, retry_after_seconds or None)."""
+        if isinstance(exception, (ReadTimeoutError, ConnectTimeoutError, EndpointConnectionError, ConnectionClosedError)):
+            return True, None
+        if isinstance(exception, ClientError):
+            error_code = exception.response.get('Error', {}).get('Code', '')
+            metadata = exception.response.get('ResponseMetadata', {})
+            retryable = error_code in self.RETRYABLE_ERROR_CODES or metadata.get('HTTPStatusCode') in self.RETRYABLE_HTTP_STATUSES
+            return retryable, self._retry_after_seconds(metadata.get('HTTPHeaders'))
+        return False, None
+
+    def is_retryable_error_code(self, error_code):
+        return bool(error_code) and str(error_code) in self.RETRYABLE_ERROR_CODES
+
+    # --- Decision ---
+    def next_delay(self, operation, exception=None, retry_after=None, retryable=None):
+        """Returns the seconds to wait before the next attempt, or None if the operation must fail now.
+        Consumes one unit of the operation's batch budget when it says retry."""
+        if retryable is None:
+            retryable, retry_after = self.classify(exception)
+        if not retryable or operation.is_cancelled():
+            return None
+        max_retries, base_delay, max_delay = self.settings_for(operation.op_type)
+        if operation.auto_retry_count >= max_retries:
+            return None
+        batch_id = operation.callback_data.get("batch_id")
+        with self._lock:
+            if batch_id in self._batch_budgets:
+                if self._batch_budgets[batch_id] <= 0:
+                    return None # Batch budget spent: the endpoint is not recovering, stop hammering it
+                self._batch_budgets[batch_id] -= 1
+            self.total_retries += 1
+        delay = random.uniform(0, min(max_delay, base_delay * (2 ** operation.auto_retry_count)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, max_delay * 2))
+        return delay
+
+    @staticmethod
+    def wait(operation, delay):
+        """Sleeps for delay seconds, returning early (False) if the operation is cancelled meanwhile."""
+        deadline = time.monotonic() + delay
+        while True:
+            if operation.is_cancelled(): return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: return True
+            time.sleep(min(0.1, remaining))
@@ -314,19 +314,15 @@ class S3SyncEventHandler(FileSystemEventHandler, QObject): # Inherit QObject for
                 self.mount_manager.add_ignore_path_to_specific_handler(self.local_mount_path, dest_path_norm, duration=3.0) # Dest longer
 
             if event.is_directory:
-                # Moving directories in S3 (preserving contents) is complex.
-                # It involves listing all objects under s3_key_old, copying each to s3_key_new structure,
-                # then deleting all original objects and the original folder marker.
-                # This is a batch operation. S3OperationWorker doesn't handle batch directory moves itself.
-                # For now, we can only signal a high-level intent or simplify.
-                print(f"S3SyncEH ({self.local_mount_path}): Complex S3 folder move from '{s3_key_old}' to '{s3_key_new}'. This requires batch operations not directly handled by worker's single COPY_OBJECT for dirs.")
-                self.status_message_requested.emit(f"Dir Move: '{s3_key_old}' to '{s3_key_new}' (complex S3 op, placeholder)", 5000)
-                # Placeholder: create new folder marker, delete old one (DELETE_FOLDER is recursive)
-                # This won't preserve contents unless OperationManager expands DELETE_FOLDER + COPY_OBJECTs
-                op_create = S3Operation(S3OpType.CREATE_FOLDER, self.s3_bucket, key=s3_key_new)
-                self.s3_op_queue.put(op_create)
-                op_delete_old_folder = S3Operation(S3OpType.DELETE_FOLDER, self.s3_bucket, key=s3_key_old)
-                self.s3_op_queue.put(op_delete_old_folder)
+                # One MOVE_PREFIX: the worker lists, copies (contents preserved) and bulk-deletes the old folder
+                print(f"S3SyncEH ({self.local_mount_path}): Queueing S3 folder move from '{s3_key_old}' to '{s3_key_new}'.")
+                move_folder_op = S3Operation(
+                    S3OpType.MOVE_PREFIX, self.s3_bucket,
+                    key=s3_key_old,  # Source prefix
+                    new_key=s3_key_new, # Destination prefix
+                    callback_data={'ui_source': 'watchdog_move_folder'}
+                )
+                self.s3_op_queue.put(move_folder_op)
             else: # File move
                 move_op = S3Operation(
                     S3OpType.COPY_OBJECT, self.s3_bucket,
@@ -7,50 +7,24 @@ from PyQt6.QtWidgets import (
     QPushButton, QHBoxLayout, QVBoxLayout, QWidget,
     QMessageBox, QHeaderView, QLabel, QMenu, QStyle, QAbstractItemView, QProgressDialog
 )
-from PyQt6.QtGui import QStandardItemModel, QStandardItem, QIcon, QAction
-from PyQt6.QtCore import Qt, QModelIndex, pyqtSignal, QUrl, QTimer
+from PyQt6.QtGui import QIcon, QAction
+from PyQt6.QtCore import Qt, QModelIndex, QPoint, pyqtSignal, QUrl, QTimer
 
 from s3ops.S3Operation import S3Operation, S3OpType
 
-# --- Helper Functions ---
-def format_size(size_bytes):
-    if size_bytes is None: return ""
-    if size_bytes == 0: return "0 B"
-    size_name = ("B", "KB", "MB", "GB", "TB")
-    i = 0
-    power = 1024 # Use 1024 for binary prefixes
-    while size_bytes >= power and i < len(size_name) - 1:
-        size_bytes /= float(power)
-        i += 1
-    return f"{size_bytes:.2f} {size_name[i]}"
-
-def get_file_type(key):
-    if key.endswith('/'): return "Folder"
-    _, ext = os.path.splitext(key)
-    return ext[1:].upper() if ext else "File"
-
-def get_icon_for_file(filename):
-    ext = os.path.splitext(filename)[1].lower()
-    if ext == ".pdf":
-        return QIcon("icons/pdf.png")
-    elif ext in [".txt", ".log", ".md"]:
-        return QIcon("icons/text.png")
-    elif ext in [".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp"]:
-        return QIcon("icons/image.png")
-    elif ext in [".zip", ".tar", ".gz", ".rar"]:
-        return QIcon("icons/archive.png")
-    elif ext in [".csv", ".xls", ".xlsx"]:
-        return QIcon("icons/excel.png")
-    elif ext in [".py", ".js", ".java", ".cpp"]:
-        return QIcon("icons/code.png")
-    elif ext in [".doc",".docx"]:
-        return QIcon("icons/word.png")
-    else:
-        return QIcon("icons/default.png")
-
-
-# --- Constants for TreeView Model Columns ---
-COL_NAME, COL_TYPE, COL_SIZE, COL_MODIFIED, COL_S3_KEY, COL_IS_FOLDER = range(6)
+# Row helpers and column constants live with the model; re-exported for existing importers
+from s3ops.S3ListingModel import (
+    S3ListingModel, listing_signature, format_size, get_file_type, get_icon_for_file,
+    COL_NAME, COL_TYPE, COL_SIZE, COL_MODIFIED, COL_S3_KEY, COL_IS_FOLDER
+)
+
+STREAM_REFRESH_INTERVAL_MS = 300 # Re-sort / count update while LIST pages stream in
+LIST_PAGES_PER_FETCH = 1 # list_objects_v2 pages (up to 1000 keys each) per first screen / fetchMore
+LOAD_ALL_SORT_COLUMNS = (COL_SIZE, COL_MODIFIED) # Sorting a partial listing by these would be misleading
+FOLDER_SUMMARY_DELAY_MS = 250 # Folder totals are looked up once scrolling / listing settles
+PREFETCH_CHILD_FOLDERS = 5 # Subfolders at the top of a freshly shown folder are listed ahead (S3ListingPrefetcher)
+PREFETCH_SCAN_ROWS = 2000 # ... looked for among this many top rows (folders sort first; streamed pages arrive unsorted)
+HOVER_PREFETCH_DELAY_MS = 400 # The mouse rests this long on a folder before it is listed ahead
 
 class S3TabContentWidget(QWidget):
     currentS3PathChanged = pyqtSignal(str, str) # bucket, path_in_bucket
@@ -69,6 +43,12 @@ class S3TabContentWidget(QWidget):
         self.is_loading = False
         self.has_loaded_once = False # New flag
         self._processing_list_finish = False
+        self._pending_list_op = None       # The LIST this tab waits for; results of any other LIST are ignored
+        self._fetch_more_op = None         # Continuation LIST (next page or "load all") of the partial listing shown
+        self._next_continuation_token = None # Set while the view shows only the first part of a large folder
+        self._listed_through_key = None    # ... and the last key that part covers
+        self._displayed_list_target = None # (bucket, prefix) the model rows belong to (diff-apply only onto the same folder)
+        self._relist_when_listed = False   # A change set arrived while a LIST was running; that LIST may predate it
 
         self.current_bucket = initial_bucket
         self.current_path = initial_path_in_bucket.strip('/') # Path within the bucket
@@ -106,10 +86,31 @@ class S3TabContentWidget(QWidget):
         self.path_edit = QLineEdit()
         self.path_edit.returnPressed.connect(self.handle_path_edited_tab)
 
+        # Streamed LIST pages are appended as they arrive; this timer re-sorts and updates the count in between
+        self._streamed_row_keys = set()
+        self._stream_refresh_timer = QTimer(self)
+        self._stream_refresh_timer.setSingleShot(True)
+        self._stream_refresh_timer.setInterval(STREAM_REFRESH_INTERVAL_MS)
+        self._stream_refresh_timer.timeout.connect(self._refresh_streamed_rows)
+
+        # Folder rows on screen get recursive totals (View > Folder Sizes), requested at most once per listing shown
+        self._requested_folder_summaries = set()
+        self._folder_summary_timer = QTimer(self)
+        self._folder_summary_timer.setSingleShot(True)
+        self._folder_summary_timer.setInterval(FOLDER_SUMMARY_DELAY_MS)
+        self._folder_summary_timer.timeout.connect(self._fill_visible_folder_summaries)
+
+        # Folder under the mouse is prefetched once the pointer rests on it
+        self._hovered_folder_key = None
+        self._hover_prefetch_timer = QTimer(self)
+        self._hover_prefetch_timer.setSingleShot(True)
+        self._hover_prefetch_timer.setInterval(HOVER_PREFETCH_DELAY_MS)
+        self._hover_prefetch_timer.timeout.connect(self._prefetch_hovered_folder)
+
         # TreeView setup
         self.tree_view = QTreeView()
-        self.model = QStandardItemModel()
-        self.model.setHorizontalHeaderLabels(["Name", "Type", "Size", "Last Modified", "S3 Key", "Is Folder"])
+        self.model = S3ListingModel(self.main_window.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon), self)
+        self.model.fetch_more_handler = self.fetch_more_listing_rows
         self.tree_view.setModel(self.model)
         self.tree_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.tree_view.customContextMenuRequested.connect(self.show_context_menu_tab)
@@ -122,6 +123,13 @@ class S3TabContentWidget(QWidget):
         self.tree_view.header().setSectionResizeMode(COL_NAME, QHeaderView.ResizeMode.Stretch)
         self.tree_view.setColumnHidden(COL_S3_KEY, True)
         self.tree_view.setColumnHidden(COL_IS_FOLDER, True)
+        self.tree_view.header().sortIndicatorChanged.connect(self._on_sort_indicator_changed)
+        self.tree_view.verticalScrollBar().valueChanged.connect(lambda _: self._folder_summary_timer.start())
+        self.tree_view.setMouseTracking(True) # Needed for 'entered'
+        self.tree_view.entered.connect(self._on_item_hovered)
+        self.tree_view.viewportEntered.connect(self._hover_prefetch_timer.stop)
+        self.model.rowsInserted.connect(lambda *_: self._folder_summary_timer.start())
+        self.model.layoutChanged.connect(lambda *_: self._folder_summary_timer.start())
 
         # Connect selection changes to main window's global action updaters
         if self.main_window and self.model.rowCount() > 0 : 
@@ -212,9 +220,9 @@ class S3TabContentWidget(QWidget):
         
         self.main_window.update_navigation_buttons_state() # Main window updates global nav buttons
         self.update_breadcrumbs_tab()
-        self.populate_s3_view_tab()
+        self.populate_s3_view_tab(allow_fresh_cache=True) # Back/forward/up into a recently listed folder costs no LIST
 
-    def populate_s3_view_tab(self):
+    def populate_s3_view_tab(self, allow_fresh_cache=False):
         #vvv ADD THIS BLOCK vvv
         import inspect
         stack = inspect.stack()
@@ -225,20 +233,6 @@ class S3TabContentWidget(QWidget):
         print(f"POPULATE_S3_VIEW_TAB called from: {caller_filename} -> {caller_function}() line {caller_lineno} | For path: '{self.current_path}'")
         # ^^^ END ADDED BLOCK ^^^
 
-        if self.is_loading:
-            print(f"  TAB POPULATE VIEW ({self.current_path}): Already loading, bailing.")
-            return
-        print(f"  TAB POPULATE VIEW ({self.current_path}): Setting is_loading=True")
-        self.is_loading = True
-        
-        self.model.removeRows(0, self.model.rowCount())
-        self.main_window.status_bar.showMessage(f"Loading: s3://{self.current_bucket}/{self.current_path} ...")
-        self.tree_view.setEnabled(False)
-
-        prefix_to_list = self.current_path
-        if prefix_to_list and not prefix_to_list.endswith('/'):
-            prefix_to_list += '/'
-        
         # This print is already good:
         # print(f"TAB POPULATE VIEW: current_bucket='{self.current_bucket}', current_path='{self.current_path}', effective prefix_to_list='{prefix_to_list}'")
         if not self.operation_manager: # Ensure op_manager is available
@@ -247,75 +241,382 @@ class S3TabContentWidget(QWidget):
             self.tree_view.setEnabled(True)
             return
 
-        list_op = S3Operation(S3OpType.LIST, self.current_bucket, key=prefix_to_list,
-                            callback_data={'tab_widget_ref': self})
+        list_target = self._current_list_target()
+        bucket_to_list, prefix_to_list = list_target
+        location = f"s3://{self.current_bucket}/{self.current_path}"
+
+        if self._displayed_list_target != list_target: # Totals of the folder left behind are no longer needed
+            self.operation_manager.forget_folder_summary_requester(self)
+        self._requested_folder_summaries = set() # A refresh asks again for totals a mutation invalidated
+
+        pending_list_op = self._pending_list_op
+        if pending_list_op is not None and (pending_list_op.bucket, pending_list_op.key) != list_target:
+            # Navigated away while the previous folder was still paging in: stop listing it
+            self._pending_list_op = None # Cleared first: a dropped queued op reports back synchronously
+            self.is_loading = False
+            self._stream_refresh_timer.stop()
+            self.operation_manager.abandon_list_operation(pending_list_op)
+        self._abandon_fetch_more() # The rows it would add belong to a listing that is replaced below
+
+        # Stale-while-revalidate: rows from the shared listing cache right away, the LIST below diff-applies changes.
+        # Navigation (allow_fresh_cache) skips the LIST for listings younger than the cache TTL that nothing invalidated;
+        # Refresh and batch completions always revalidate.
+        cached_listing = self.operation_manager.listing_cache.get(self.operation_manager.active_profile_name, bucket_to_list, prefix_to_list)
+        if cached_listing is not None:
+            self._set_continuation_token(None) # Cached listings are complete
+            self._apply_listing(list_target, cached_listing.result())
+            self.has_loaded_once = True
+            self.tree_view.setEnabled(True)
+            if allow_fresh_cache and cached_listing.is_fresh():
+                self.main_window.status_bar.showMessage(f"Listed {self.model.rowCount()} items in {location} (cached)", 3000)
+                self._prefetch_child_folders()
+                return
+
+        if self.is_loading and self._pending_list_op is not None:
+            print(f"  TAB POPULATE VIEW ({self.current_path}): Already loading, bailing.")
+            return
+        print(f"  TAB POPULATE VIEW ({self.current_path}): Setting is_loading=True")
+        self.is_loading = True
+
+        if cached_listing is None and self._displayed_list_target == list_target and self.model.rowCount():
+            # Refreshing a folder shown in part (fetchMore pages are never cached): the rows stay, the first page is
+            # diff-applied over the keys it covers and the rows past it are revalidated as the user scrolls on
+            self.main_window.status_bar.showMessage(f"Refreshing: {location} ...")
+            callback_data = {'tab_widget_ref': self, 'page_limit': LIST_PAGES_PER_FETCH}
+        elif cached_listing is None:
+            # Nothing to show yet: only the first page is listed, the rest is fetched as the user scrolls (fetchMore)
+            self.model.clear()
+            self._displayed_list_target = None
+            self._set_continuation_token(None)
+            self.main_window.status_bar.showMessage(f"Loading: {location} ...")
+            callback_data = {'tab_widget_ref': self, 'page_limit': LIST_PAGES_PER_FETCH}
+        else:
+            # Revalidating a complete cached listing: the diff needs all of it
+            self.main_window.status_bar.showMessage(f"Refreshing: {location} ...")
+            callback_data = {'tab_widget_ref': self}
+
+        list_op = S3Operation(S3OpType.LIST, bucket_to_list, key=prefix_to_list, callback_data=callback_data)
+        self._pending_list_op = list_op
+        self._relist_when_listed = False # This LIST starts after every change set seen so far
         self.operation_manager.enqueue_s3_operation(list_op)
 
-    def on_s3_list_finished_tab(self, result, error_message):
+    def _current_list_target(self):
+        """(bucket, prefix as listed) for the folder this tab shows; the listing cache and LIST results use the same form."""
+        prefix_to_list = self.current_path
+        if prefix_to_list and not prefix_to_list.endswith('/'):
+            prefix_to_list += '/'
+        return (self.current_bucket, prefix_to_list)
+
+    def on_s3_list_finished_tab(self, result, error_message, operation=None):
         s3_trash_prefix_to_hide = getattr(self.main_window, 'S3_TRASH_PREFIX', 'Trash/')
         if self._processing_list_finish:
             print(f"  RE-ENTRANT CALL DETECTED FOR on_s3_list_finished_tab ({self.current_path}). IGNORING.")
             return
+
+        if operation is not None and operation is self._fetch_more_op:
+            self._on_fetch_more_finished(operation, result, error_message)
+            return
+        # The user may have navigated on while this LIST ran; its rows are in the listing cache, not for this view
+        if operation is not None and operation is not self._pending_list_op:
+            print(f"  TAB LIST FINISHED: s3://{operation.bucket}/{operation.key} is no longer shown ({self.current_path}). Ignoring.")
+            return
         self._processing_list_finish = True
 
         print(f"TAB LIST FINISHED ({self.current_path}): Setting is_loading=False, has_loaded_once=True")
         self.is_loading = False
+        self._pending_list_op = None
+        self._stream_refresh_timer.stop()
         self.has_loaded_once = True
         print(f"  Error Message: '{error_message}'")
         if result:
-            print(f"  Result contains 'folders': {result.get('folders')}")
+            print(f"  Result contains 'folders': {len(result.get('folders', []))} folder entries")
             print(f"  Result contains 'files': {len(result.get('files', []))} file entries")
         else:
             print(f"  Result object is None.")
 
         self.tree_view.setEnabled(True)
-        if error_message:
-            QMessageBox.critical(self, "S3 List Error", f"Failed to list objects in tab: {error_message}")
-            self.main_window.status_bar.showMessage(f"Error listing in tab: {error_message}", 5000)
+        try:
+            if error_message:
+                QMessageBox.critical(self, "S3 List Error", f"Failed to list objects in tab: {error_message}")
+                self.main_window.status_bar.showMessage(f"Error listing in tab: {error_message}", 5000)
+                return
+            if result is None: # Should be caught by error_message generally
+                self.main_window.status_bar.showMessage("Error listing in tab: No result data.", 5000)
+                return
+
+            # Applies a revalidated cached view; after streaming all rows are already there and the diff changes nothing
+            self._apply_listing(self._current_list_target(), result, trash_prefix_to_hide=s3_trash_prefix_to_hide)
+            self._streamed_row_keys = set()
+            self._set_continuation_token(result.get("next_continuation_token"), self._last_listed_key(result))
+            if self._next_continuation_token is None:
+                self.main_window.status_bar.showMessage(f"Listed {len(result.get('folders', [])) + len(result.get('files', []))} items in s3://{self.current_bucket}/{self.current_path}", 3000)
+            else:
+                self._show_partial_listing_status()
+            self._prefetch_child_folders()
+            print(f"  Model populated with {self.model.rowCount()} rows after list finish.")
+        finally:
+            self._processing_list_finish = False # Clear guard at the end
+        if self._relist_when_listed:
+            self._relist_when_listed = False
+            QTimer.singleShot(0, self.populate_s3_view_tab)
+        print(f"--- END TAB LIST FINISHED ({self.current_path}) ---\n")
+
+    def on_s3_list_page_tab(self, page, operation):
+        """One streamed LIST page: its rows are appended right away; sorting and the count follow on a short timer."""
+        if operation is not self._pending_list_op and operation is not self._fetch_more_op:
+            return # Page of a folder this tab has left
+        list_target = self._current_list_target()
+        if self._displayed_list_target != list_target:
+            self.model.clear()
+            self._displayed_list_target = list_target
+            self._streamed_row_keys = set()
+        new_rows = []
+        for key, (signature, is_folder) in self._listing_row_specs(page).items():
+            if key in self._streamed_row_keys: continue # Page repeated by a retried LIST
+            self._streamed_row_keys.add(key)
+            new_rows.append((key, signature, is_folder))
+        self.model.append_rows(new_rows) # One insert per page
+        self.has_loaded_once = True
+        if not self._stream_refresh_timer.isActive():
+            self._stream_refresh_timer.start()
+
+    def _refresh_streamed_rows(self):
+        # Re-sorting per page would cost O(n log n) each time on big folders; a few times a second is plenty
+        header = self.tree_view.header()
+        self.tree_view.sortByColumn(header.sortIndicatorSection(), header.sortIndicatorOrder())
+        if self.is_loading or self._fetch_more_op is not None:
+            self.main_window.status_bar.showMessage(
+                f"Loading: s3://{self.current_bucket}/{self.current_path} ... {self.model.rowCount():,} items so far")
+
+    # --- Partial listings (fetchMore) ---
+    def fetch_more_listing_rows(self, load_all=False):
+        """Lists the next page after the rows shown (the model's fetchMore), or with load_all everything that is left."""
+        if self._next_continuation_token is None or self._pending_list_op is not None:
             return
-        if result is None: # Should be caught by error_message generally
-            self.main_window.status_bar.showMessage("Error listing in tab: No result data.", 5000)
+        if self._fetch_more_op is not None:
+            if not load_all or self._fetch_more_op.callback_data.get('page_limit') is None:
+                return # That page (or the full load) is already on its way
+            self._abandon_fetch_more() # Upgrade to "load all" from the same token
+        bucket_to_list, prefix_to_list = self._current_list_target()
+        listed_through_key = self._listed_through_key
+        self._fetch_more_op = S3Operation(S3OpType.LIST, bucket_to_list, key=prefix_to_list, callback_data={
+            'tab_widget_ref': self, 'continuation_token': self._next_continuation_token,
+            'page_limit': None if load_all else LIST_PAGES_PER_FETCH,
+            'stream_pages': load_all, # A full load of a huge folder streams in like a first visit did
+            'listed_after_key': listed_through_key})
+        # Rows past the token are already shown when a refresh re-listed only the first page: streamed pages skip them
+        self._streamed_row_keys = set() if listed_through_key is None else \
+            {key for key in map(self.model.key_at, range(self.model.rowCount())) if key > listed_through_key}
+        if load_all:
+            self.main_window.status_bar.showMessage(f"Loading all items in s3://{self.current_bucket}/{self.current_path} ...")
+        self.operation_manager.enqueue_s3_operation(self._fetch_more_op)
+
+    def _on_fetch_more_finished(self, operation, result, error_message):
+        self._fetch_more_op = None
+        self._stream_refresh_timer.stop()
+        if error_message or result is None:
+            # The rows shown stay; scrolling to the end again retries from the same token
+            self.main_window.status_bar.showMessage(f"Error listing more items: {error_message or 'No result data.'}", 5000)
+            return
+        # Diff-applied over the keys after the token: streamed pages are already in the model, a single fetched
+        # page is appended, and rows kept past a refreshed first page are updated or removed
+        self._apply_listing(self._current_list_target(), result, after_key=operation.callback_data.get('listed_after_key'))
+        self._streamed_row_keys = set()
+        self._set_continuation_token(result.get("next_continuation_token"), self._last_listed_key(result))
+        if self._next_continuation_token is None:
+            self.main_window.status_bar.showMessage(f"Listed {self.model.rowCount():,} items in s3://{self.current_bucket}/{self.current_path}", 3000)
+        else:
+            self._show_partial_listing_status()
+
+    def _abandon_fetch_more(self):
+        fetch_more_op, self._fetch_more_op = self._fetch_more_op, None # Cleared first: a dropped queued op reports back synchronously
+        if fetch_more_op is not None:
+            self._stream_refresh_timer.stop()
+            self.operation_manager.abandon_list_operation(fetch_more_op)
+
+    def _set_continuation_token(self, continuation_token, listed_through_key=None):
+        """listed_through_key: last key of the listing the token continues (rows after it were not revalidated)."""
+        self._next_continuation_token = continuation_token
+        self._listed_through_key = listed_through_key if continuation_token is not None else None
+        self.model.more_available = continuation_token is not None
+
+    @staticmethod
+    def _last_listed_key(result):
+        # A continuation resumes after the last key or common prefix returned; S3 lists both in one key order
+        last_folder = result["folders"][-1] if result.get("folders") else ""
+        last_file = result["files"][-1]['Key'] if result.get("files") else ""
+        return max(last_folder, last_file)
+
+    def has_partial_listing(self):
+        return self._next_continuation_token is not None
+
+    def _show_partial_listing_status(self):
+        # list_objects_v2 gives no total, only that more keys follow
+        self.main_window.status_bar.showMessage(
+            f"Showing {self.model.rowCount():,} items in s3://{self.current_bucket}/{self.current_path}, more available "
+            f"(scroll down, or View > Load All Items)")
+
+    def _on_sort_indicator_changed(self, section, order):
+        if section in LOAD_ALL_SORT_COLUMNS and self.has_partial_listing():
+            self.fetch_more_listing_rows(load_all=True) # Largest / newest must be among all keys, not the first pages
+
+    # --- Prefetching likely next folders ---
+    def _prefetch_child_folders(self):
+        """The first subfolders in view order are the likeliest next clicks; their listings are warmed in the background."""
+        child_folders = []
+        for row in range(min(self.model.rowCount(), PREFETCH_SCAN_ROWS)):
+            if self.model.is_folder_at(row):
+                child_folders.append((self.current_bucket, self.model.key_at(row)))
+                if len(child_folders) >= PREFETCH_CHILD_FOLDERS: break
+        self.operation_manager.listing_prefetcher.prefetch_many(child_folders)
+
+    def _on_item_hovered(self, index: QModelIndex):
+        if not index.isValid() or not self.model.is_folder_at(index.row()):
+            self._hover_prefetch_timer.stop()
+            return
+        self._hovered_folder_key = self.model.key_at(index.row())
+        self._hover_prefetch_timer.start()
+
+    def _prefetch_hovered_folder(self):
+        if self._hovered_folder_key:
+            self.operation_manager.listing_prefetcher.prefetch(self.current_bucket, self._hovered_folder_key, urgent=True)
+
+    # --- Recursive folder totals ---
+    def _fill_visible_folder_summaries(self):
+        """Folder rows on screen get their totals from the summary cache, or one queued SUMMARIZE_PREFIX each."""
+        row_count = self.model.rowCount()
+        if not row_count or not self.operation_manager: return
+        first_index = self.tree_view.indexAt(QPoint(0, 0))
+        last_index = self.tree_view.indexAt(QPoint(0, self.tree_view.viewport().height() - 1))
+        first_row = first_index.row() if first_index.isValid() else 0
+        last_row = last_index.row() if last_index.isValid() else row_count - 1
+        for row in range(first_row, last_row + 1):
+            if not self.model.is_folder_at(row): continue
+            folder_key = self.model.key_at(row)
+            summary = self.operation_manager.cached_folder_summary(self.current_bucket, folder_key)
+            if summary is not None:
+                self.model.set_folder_summary(row, summary)
+            elif folder_key not in self._requested_folder_summaries:
+                self._requested_folder_summaries.add(folder_key)
+                self.operation_manager.request_folder_summary(self.current_bucket, folder_key, self)
+
+    def on_folder_summary_ready(self, bucket, summaries, error_message):
+        # Called by OperationManager; the totals are in its cache now (subfolders included), visible rows pick them up
+        if error_message:
+            print(f"TAB FOLDER SUMMARY ({self.current_path}): {error_message}")
+        if bucket == self.current_bucket and summaries:
+            self._folder_summary_timer.start()
+
+    def refresh_folder_summaries(self):
+        self._requested_folder_summaries = set()
+        self._folder_summary_timer.start()
+
+    # --- Model rows ---
+    def _listing_row_specs(self, result, trash_prefix_to_hide=None):
+        """key -> (signature, is_folder) for every row a listing shows, in listing order.
+        The signature (size, epoch mtime, ETag) tells the diff whether an existing row needs new values."""
+        if trash_prefix_to_hide is None:
+            trash_prefix_to_hide = getattr(self.main_window, 'S3_TRASH_PREFIX', 'Trash/')
+        row_specs = {}
+        for folder_key_full in result.get("folders", []): # folder_key_full is like "prefix/path/folder/"
+            if not self.current_path and folder_key_full == trash_prefix_to_hide:
+                continue # Trash folder is reached through its own view, not listed at the bucket root
+            if not os.path.basename(folder_key_full.rstrip('/')): continue # Should not happen with CommonPrefixes
+            row_specs[folder_key_full] = (None, True)
+        for obj in result.get("files", []):
+            file_key_full = obj['Key'] # This is the full S3 key
+            if not os.path.basename(file_key_full): continue # Skip if the key itself represents the current folder prefix being listed
+            row_specs[file_key_full] = (listing_signature(obj), False)
+        return row_specs
+
+    def _apply_listing(self, list_target, result, trash_prefix_to_hide=None, after_key=None):
+        """Shows result in the view. A listing of the folder already on screen (cache revalidation, refresh after
+        a batch) is diff-applied: only added / removed / changed rows are touched, so selection and scroll stay.
+        A partial listing (continuation token left, or continuing after after_key) only covers its own key range;
+        rows outside it are left alone."""
+        row_specs = self._listing_row_specs(result, trash_prefix_to_hide)
+        through_key = self._last_listed_key(result) if result.get("next_continuation_token") else None
+        header = self.tree_view.header()
+        sort_column, sort_order = header.sortIndicatorSection(), header.sortIndicatorOrder()
+
+        if self._displayed_list_target != list_target:
+            self.model.clear()
+            self.model.append_rows([(key, signature, is_folder) for key, (signature, is_folder) in row_specs.items()])
+            self._displayed_list_target = list_target
+            self.tree_view.sortByColumn(sort_column, sort_order)
             return
 
-        folders = result.get("folders", [])
-        files = result.get("files", [])
-
-        for folder_key_full in sorted(folders): # folder_key_full is like "prefix/path/folder/"
-            if not self.current_path and folder_key_full == s3_trash_prefix_to_hide:
-                print(f"S3TabContentWidget: Hiding trash folder '{folder_key_full}' from view.")
+        shown_keys, rows_to_remove, changed_rows = set(), [], 0
+        for row in range(self.model.rowCount()):
+            key = self.model.key_at(row)
+            if (after_key is not None and key <= after_key) or (through_key is not None and key > through_key):
                 continue
-            folder_name = os.path.basename(folder_key_full.rstrip('/'))
-            if not folder_name: continue # Should not happen with CommonPrefixes
-
-            name_item = QStandardItem(self.main_window.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon), folder_name)
-            type_item = QStandardItem("Folder")
-            size_item = QStandardItem("") # Folders don't have size from list_objects_v2 CommonPrefixes
-            modified_item = QStandardItem("") # Same for modified
-            s3_key_item = QStandardItem(folder_key_full) # Store the full S3 key (prefix) for the folder
-            is_folder_item = QStandardItem("1")
-            self.model.appendRow([name_item, type_item, size_item, modified_item, s3_key_item, is_folder_item])
-
-        for obj in sorted(files, key=lambda x: x['Key']):
-            file_key_full = obj['Key'] # This is the full S3 key
-            file_name = os.path.basename(file_key_full)
-            if not file_name: continue # Skip if the key itself represents the current folder prefix being listed
-
-            icon = get_icon_for_file(file_name)
-            name_item = QStandardItem(icon, file_name)
-            type_item = QStandardItem(get_file_type(file_key_full))
-            size_item = QStandardItem(format_size(obj.get('Size')))
-            modified_time = obj.get('LastModified')
-            modified_str = modified_time.strftime('%Y-%m-%d %H:%M:%S') if modified_time else ""
-            modified_item = QStandardItem(modified_str)
-            s3_key_item = QStandardItem(file_key_full) # Store full S3 key
-            is_folder_item = QStandardItem("0")
-            self.model.appendRow([name_item, type_item, size_item, modified_item, s3_key_item, is_folder_item])
-        
-        self.main_window.status_bar.showMessage(f"Listed {len(folders) + len(files)} items in s3://{self.current_bucket}/{self.current_path}", 3000)
-        self.tree_view.sortByColumn(COL_NAME, Qt.SortOrder.AscendingOrder) # Ensure sort is applied
-        print(f"  Model populated with {self.model.rowCount()} rows after list finish.")
-        self._processing_list_finish = False # Clear guard at the end
-        print(f"--- END TAB LIST FINISHED ({self.current_path}) ---\n")
+            row_spec = row_specs.get(key)
+            if row_spec is None or key in shown_keys: # Gone (or a duplicate row)
+                rows_to_remove.append(row)
+                continue
+            shown_keys.add(key)
+            if self.model.signature_at(row) != row_spec[0]:
+                self.model.replace_row(row, key, *row_spec)
+                changed_rows += 1
+
+        removed_rows = len(rows_to_remove)
+        self._remove_model_rows(rows_to_remove)
+
+        added_keys = [key for key in row_specs if key not in shown_keys]
+        self.model.append_rows([(key, *row_specs[key]) for key in added_keys])
+        if added_keys or changed_rows:
+            self.tree_view.sortByColumn(sort_column, sort_order)
+        print(f"  TAB DIFF ({self.current_path}): {len(added_keys)} added, {removed_rows} removed, {changed_rows} changed")
+
+    def _remove_model_rows(self, rows_ascending):
+        """Removes bottom-up, one removeRows call per contiguous run (consumes the list)."""
+        while rows_ascending:
+            last_row = rows_ascending.pop()
+            first_row = last_row
+            while rows_ascending and rows_ascending[-1] == first_row - 1:
+                first_row = rows_ascending.pop()
+            self.model.removeRows(first_row, last_row - first_row + 1)
+
+    def apply_change_set(self, change_set):
+        """Patches the rows shown with what finished mutations did (S3ChangeSet) instead of listing the folder again;
+        rows are replaced, removed and appended in place, so selection and scroll position stay."""
+        if not self.operation_manager or change_set.profile != self.operation_manager.active_profile_name:
+            return
+        list_target = self._current_list_target()
+        upserts, removed_keys, relist = change_set.changes_for_listing(*list_target)
+        if not (upserts or removed_keys or relist):
+            return
+        if self._pending_list_op is not None: # Its rows may be from before these changes
+            self._relist_when_listed = True
+            return
+        if relist or self._displayed_list_target != list_target:
+            self.populate_s3_view_tab()
+            return
+
+        trash_prefix_to_hide = getattr(self.main_window, 'S3_TRASH_PREFIX', 'Trash/')
+        row_of = {self.model.key_at(row): row for row in range(self.model.rowCount())}
+        # Keys past the last one listed of a partial listing arrive with fetchMore; adding them now would duplicate them
+        last_listed_key = max(row_of) if self.has_partial_listing() and row_of else None
+        changed_rows, new_rows = 0, []
+        for key, listed_object in upserts.items():
+            if not self.current_path and key == trash_prefix_to_hide: continue
+            is_folder = listed_object is None
+            signature = None if is_folder else listing_signature(listed_object)
+            row = row_of.get(key)
+            if row is not None:
+                if self.model.signature_at(row) != signature:
+                    self.model.replace_row(row, key, signature, is_folder)
+                    changed_rows += 1
+            elif last_listed_key is None or key < last_listed_key:
+                new_rows.append((key, signature, is_folder))
+        self._remove_model_rows(sorted(row_of[key] for key in removed_keys if key in row_of))
+        self.model.append_rows(new_rows)
+        if new_rows or changed_rows:
+            header = self.tree_view.header()
+            self.tree_view.sortByColumn(header.sortIndicatorSection(), header.sortIndicatorOrder())
+        self.refresh_folder_summaries() # Totals of folders that changed were invalidated with the listing cache
+        print(f"  TAB CHANGE SET ({self.current_path}): {len(new_rows)} added, {len(removed_keys)} removed, {changed_rows} changed")
 
     def go_back_tab(self):
         if self.history_index > 0:
@@ -353,15 +654,11 @@ class S3TabContentWidget(QWidget):
             return
 
         row = index.row()
-        s3_key_item = self.model.item(row, COL_S3_KEY)
-        name_item = self.model.item(row, COL_NAME)
-        is_folder_qitem = self.model.item(row, COL_IS_FOLDER)
-
-        if not (name_item and s3_key_item and is_folder_qitem):
-            print(f"S3TabContentWidget: Critical model items missing for activated row {row}.")
+        if row >= self.model.rowCount():
+            print(f"S3TabContentWidget: Activated row {row} is no longer in the model.")
             return
 
-        current_s3_key_from_model = s3_key_item.text()
+        current_s3_key_from_model = self.model.key_at(row)
         current_time = time.time()
 
         # Debounce: if the same item was activated very recently, ignore.
@@ -377,14 +674,13 @@ class S3TabContentWidget(QWidget):
         print(f"\n--- S3TabContentWidget: ITEM ACTIVATED (Double-click or Enter) ---")
         print(f"  Row: {row}")
 
-        item_name = name_item.text()
+        item_name = self.model.name_at(row)
         # s3_key is already current_s3_key_from_model
-        is_folder_text_value = is_folder_qitem.text()
-        is_folder = (is_folder_text_value == "1")
+        is_folder = self.model.is_folder_at(row)
 
         print(f"  Item Name: '{item_name}'")
         print(f"  S3 Key (from model): '{current_s3_key_from_model}'")
-        print(f"  Is Folder: {is_folder} (from text: '{is_folder_text_value}')")
+        print(f"  Is Folder: {is_folder}")
         print(f"  Current Tab Bucket: '{self.current_bucket}', Current Tab Path: '{self.current_path}'")
 
         if is_folder:
@@ -422,11 +718,10 @@ class S3TabContentWidget(QWidget):
             selected_rows.add(index.row())
         
         for row in sorted(list(selected_rows)): # Process in model order
-            s3_key_item = self.model.item(row, COL_S3_KEY)
-            if s3_key_item: # Check item exists
-                selected_keys.append(s3_key_item.text())
-                selected_is_folder.append(self.model.item(row, COL_IS_FOLDER).text() == "1")
-                selected_names.append(self.model.item(row, COL_NAME).text())
+            if row < self.model.rowCount(): # Check row exists
+                selected_keys.append(self.model.key_at(row))
+                selected_is_folder.append(self.model.is_folder_at(row))
+                selected_names.append(self.model.name_at(row))
         return selected_keys, selected_is_folder, selected_names
 
     def show_context_menu_tab(self, position):
@@ -438,9 +733,9 @@ class S3TabContentWidget(QWidget):
         index_at_pos = self.tree_view.indexAt(position)
         current_row = index_at_pos.row() if index_at_pos.isValid() else indexes[0].row()
 
-        s3_key = self.model.item(current_row, COL_S3_KEY).text()
-        name = self.model.item(current_row, COL_NAME).text()
-        is_folder = self.model.item(current_row, COL_IS_FOLDER).text() == "1"
+        s3_key = self.model.key_at(current_row)
+        name = self.model.name_at(current_row)
+        is_folder = self.model.is_folder_at(current_row)
         
         menu = QMenu(self)
         style = self.main_window.style()
@@ -0,0 +1,211 @@
+import time
+
+from PyQt6.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QTableView, QLabel, QLineEdit,
+    QPushButton, QComboBox, QAbstractItemView, QHeaderView
+)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+
+from s3ops.S3TabContentWidget import format_size
+from s3ops.S3IndexCrawler import object_name
+
+# --- Column indices for the search results table ---
+RCOL_NAME = 0
+RCOL_LOCATION = 1
+RCOL_SIZE = 2
+RCOL_MODIFIED = 3
+RESULT_COLUMN_TITLES = ["Name", "Location", "Size", "Last Modified"]
+
+SCOPE_CURRENT_BUCKET = "current"
+SCOPE_ALL_BUCKETS = "all"
+
+
+class SearchResultsModel(QAbstractTableModel):
+    """Rows are the dicts SearchIndex.search() returns; replaced as a whole per query."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._results = []
+
+    def set_results(self, results):
+        self.beginResetModel()
+        self._results = results
+        self.endResetModel()
+
+    def result_at(self, row):
+        if 0 <= row < len(self._results):
+            return self._results[row]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._results)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(RESULT_COLUMN_TITLES)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return RESULT_COLUMN_TITLES[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        result = self._results[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == RCOL_NAME: return object_name(result['key']) + ('/' if result['is_folder'] else '')
+            if column == RCOL_LOCATION:
+                key = result['key'].rstrip('/')
+                return f"s3://{result['bucket']}/{key[:key.rfind('/') + 1]}"
+            if column == RCOL_SIZE: return "" if result['is_folder'] else format_size(result['size'])
+            if column == RCOL_MODIFIED:
+                return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(result['mtime'])) if result['mtime'] else ""
+        elif role == Qt.ItemDataRole.ToolTipRole and column == RCOL_NAME:
+            return f"s3://{result['bucket']}/{result['key']}"
+        return None
+
+
+class SearchPanel(QDockWidget):
+    """Name search over the local bucket index (View > Search). Results open in a new S3 tab."""
+
+    QUERY_DELAY_MS = 150 # Typing pauses this long before a query runs
+    STATUS_REFRESH_INTERVAL_MS = 1000
+
+    def __init__(self, search_index, main_window):
+        super().__init__("Search", main_window)
+        self.setObjectName("SearchDock") # Needed for QMainWindow.saveState/restoreState
+        self.search_index = search_index
+        self.main_window = main_window
+        self.model = SearchResultsModel(self)
+
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(4, 4, 4, 4)
+
+        search_row = QHBoxLayout()
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Search names in indexed buckets...")
+        self.query_edit.setClearButtonEnabled(True)
+        self.query_edit.textChanged.connect(lambda _: self.query_timer.start())
+        self.query_edit.returnPressed.connect(self.run_query)
+        self.scope_combo = QComboBox()
+        self.scope_combo.addItem("Current Bucket", SCOPE_CURRENT_BUCKET)
+        self.scope_combo.addItem("All Indexed Buckets", SCOPE_ALL_BUCKETS)
+        self.scope_combo.currentIndexChanged.connect(lambda _: self.run_query())
+        search_row.addWidget(self.query_edit)
+        search_row.addWidget(self.scope_combo)
+        layout.addLayout(search_row)
+
+        index_row = QHBoxLayout()
+        self.index_status_label = QLabel("")
+        self.index_status_label.setWordWrap(True)
+        self.index_button = QPushButton("Index This Bucket"); self.index_button.clicked.connect(self.toggle_current_bucket_index)
+        self.recrawl_button = QPushButton("Re-crawl"); self.recrawl_button.clicked.connect(self.recrawl_current_bucket)
+        index_row.addWidget(self.index_status_label, 1)
+        index_row.addWidget(self.recrawl_button)
+        index_row.addWidget(self.index_button)
+        layout.addLayout(index_row)
+
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_view.setWordWrap(False)
+        self.table_view.verticalHeader().hide()
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        self.table_view.setColumnWidth(RCOL_NAME, 240)
+        self.table_view.setColumnWidth(RCOL_LOCATION, 320)
+        self.table_view.activated.connect(self.open_result)
+        layout.addWidget(self.table_view)
+
+        self.setWidget(container)
+
+        self.query_timer = QTimer(self)
+        self.query_timer.setSingleShot(True)
+        self.query_timer.setInterval(self.QUERY_DELAY_MS)
+        self.query_timer.timeout.connect(self.run_query)
+        # Crawl progress arrives per listing page; the label is redrawn at most once a second
+        self.status_timer = QTimer(self)
+        self.status_timer.setInterval(self.STATUS_REFRESH_INTERVAL_MS)
+        self.status_timer.timeout.connect(self.update_index_status)
+        self.status_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_index_status()
+        self.query_edit.setFocus()
+
+    def _current_location(self):
+        """(profile_name, bucket) of the active tab, or (profile_name, None)."""
+        profile_name = self.main_window.profile_manager.get_active_profile_name()
+        active_tab = self.main_window.get_active_tab_content()
+        return profile_name, active_tab.current_bucket if active_tab else None
+
+    # --- Searching ---
+    def run_query(self):
+        self.query_timer.stop()
+        profile_name, bucket = self._current_location()
+        if not profile_name:
+            self.model.set_results([])
+            return
+        scope_bucket = bucket if self.scope_combo.currentData() == SCOPE_CURRENT_BUCKET else None
+        if self.scope_combo.currentData() == SCOPE_CURRENT_BUCKET and not bucket:
+            self.model.set_results([])
+            return
+        started = time.perf_counter()
+        results = self.search_index.search(profile_name, self.query_edit.text(), bucket=scope_bucket)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.model.set_results(results)
+        if self.query_edit.text().strip():
+            more = "+" if len(results) >= self.search_index.DEFAULT_RESULT_LIMIT else ""
+            self.main_window.status_bar.showMessage(f"Search: {len(results)}{more} match(es) in {elapsed_ms:.0f} ms", 3000)
+
+    def open_result(self, index: QModelIndex):
+        result = self.model.result_at(index.row())
+        if result is None: return
+        key = result['key'].rstrip('/')
+        # A folder opens itself, an object opens the folder that holds it
+        path_to_open = key if result['is_folder'] else key[:key.rfind('/') + 1].rstrip('/')
+        self.main_window.add_new_s3_tab(bucket_to_open=result['bucket'], path_to_open=path_to_open)
+
+    # --- Index of the current bucket ---
+    def update_index_status(self):
+        if not self.isVisible(): return
+        profile_name, bucket = self._current_location()
+        status = self.search_index.bucket_status(profile_name, bucket) if profile_name and bucket else None
+        self.index_button.setEnabled(bool(profile_name and bucket))
+        self.recrawl_button.setEnabled(status is not None and not status['crawling'])
+        if not bucket:
+            self.index_status_label.setText("Open a bucket to index it for search.")
+            self.index_button.setText("Index This Bucket")
+            return
+        if status is None:
+            self.index_status_label.setText(f"s3://{bucket} is not indexed.")
+            self.index_button.setText("Index This Bucket")
+            return
+        self.index_button.setText("Remove Index")
+        if status['crawling']:
+            text = f"s3://{bucket}: crawling, {status['crawl_progress']:,} entries this pass"
+        elif status['last_crawl_finished']:
+            finished = time.strftime('%Y-%m-%d %H:%M', time.localtime(status['last_crawl_finished']))
+            text = f"s3://{bucket}: {status['object_count']:,} entries, crawled {finished}"
+        else:
+            text = f"s3://{bucket}: first crawl not finished yet"
+        self.index_status_label.setText(text)
+
+    def toggle_current_bucket_index(self):
+        profile_name, bucket = self._current_location()
+        if not (profile_name and bucket): return
+        if self.search_index.is_bucket_indexed(profile_name, bucket):
+            self.search_index.remove_bucket(profile_name, bucket)
+        else:
+            self.search_index.add_bucket(profile_name, bucket)
+        self.update_index_status()
+
+    def recrawl_current_bucket(self):
+        profile_name, bucket = self._current_location()
+        if profile_name and bucket:
+            self.search_index.start_crawl(profile_name, bucket)
+            self.update_index_status()
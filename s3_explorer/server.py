@@ -15,6 +15,8 @@ from wsgidav.dav_error import DAVError, HTTP_NOT_FOUND, HTTP_FORBIDDEN, HTTP_CON
 from cheroot import wsgi
 from wsgidav import util
 
+from s3ops.S3Metrics import get_metrics_collector
+
 # --- Logging ---
 logging.basicConfig(level=logging.DEBUG)  # Changed to DEBUG for better diagnostics
 logger = logging.getLogger("S3WebDAV")
@@ -33,8 +35,15 @@ _dir_cache_lock = threading.Lock()
 # These are passed at runtime
 s3 = None
 bucket = None
+rate_limiter = None # S3RateLimiter of the profile the server was started with (optional)
+GET_CHUNK_SIZE = 256 * 1024
 
 # --- Helpers ---
+def _throttled_callback(callback):
+    if rate_limiter is None:
+        return callback
+    return rate_limiter.wrap_callback(callback)
+
 def get_cached_head(key):
     with _head_cache_lock:
         if key in _head_cache:
@@ -150,7 +159,7 @@ class UploadingFileWrapper:
                         read_file,
                         bucket,
                         self._key,
-                        Callback=lambda bytes_transferred: logger.debug(f"Upload progress for {self._key}: {bytes_transferred} bytes")
+                        Callback=_throttled_callback(lambda bytes_transferred: logger.debug(f"Upload progress for {self._key}: {bytes_transferred} bytes"))
                     )
                     self._write_complete = True
                     logger.info(f"Successfully uploaded {self._key} ({file_size} bytes)")
@@ -372,7 +381,15 @@ class S3Resource(DAVNonCollection):
         logger.debug(f"S3Resource.get_content: Fetching content from S3 for '{self.key}'")
         try:
             response = s3.get_object(Bucket=bucket, Key=self.key)
-            return BytesIO(response["Body"].read())
+            if rate_limiter is None:
+                return BytesIO(response["Body"].read())
+            # Read in chunks so the bandwidth limit applies to WebDAV reads too
+            content = BytesIO()
+            for chunk in response["Body"].iter_chunks(GET_CHUNK_SIZE):
+                rate_limiter.consume_bytes(len(chunk))
+                content.write(chunk)
+            content.seek(0)
+            return content
         except ClientError as e:
             if e.response["Error"]["Code"] == "NoSuchKey":
                 logger.debug(f"S3Resource.get_content: Key '{self.key}' not found")
@@ -450,8 +467,8 @@ class S3Resource(DAVNonCollection):
         return name
 
 # --- Server Lifecycle ---
-def start_webdav(mount_path, aws_access_key, aws_secret_key, region, endpoint, bucket_name, host="localhost", port=8080):
-    global CACHE_FOLDER, server, s3, bucket
+def start_webdav(mount_path, aws_access_key, aws_secret_key, region, endpoint, bucket_name, host="localhost", port=8080, limiter=None):
+    global CACHE_FOLDER, server, s3, bucket, rate_limiter
     logger.info(f"start_webdav: Starting WebDAV server with mount_path: {mount_path}, bucket: {bucket_name}, endpoint: {endpoint}")
     CACHE_FOLDER = mount_path
     os.makedirs(CACHE_FOLDER, exist_ok=True)
@@ -464,6 +481,10 @@ def start_webdav(mount_path, aws_access_key, aws_secret_key, region, endpoint, b
         endpoint_url=endpoint,
     )
     bucket = bucket_name
+    rate_limiter = limiter
+    if rate_limiter is not None:
+        rate_limiter.attach_to_client(s3) # Shares the profile's requests/sec budget with the explorer
+    get_metrics_collector().attach_to_client(s3) # After the limiter: measured latency excludes throttling waits
 
     try:
         s3.head_bucket(Bucket=bucket)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules import each other as top-level packages (from s3ops.X import ...), like the app does when run from s3_explorer/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
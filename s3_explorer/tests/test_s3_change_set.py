@@ -0,0 +1,83 @@
+import time
+
+from s3ops.S3ChangeSet import S3ChangeSet
+from s3ops.S3Operation import S3Operation, S3OpType
+
+
+def _ran(op_type, bucket, key, new_key=None, **kwargs):
+    operation = S3Operation(op_type, bucket, key=key, new_key=new_key, **kwargs)
+    operation.started_at = time.monotonic()
+    return operation
+
+
+def test_upload_becomes_file_row_and_folder_row_above():
+    change_set = S3ChangeSet("default")
+    change_set.record_operation(_ran(S3OpType.UPLOAD_FILE, "bucket", "a/b/new.txt"),
+                                {"size": 10, "last_modified": None, "etag": '"e"'}, "")
+
+    upserts, removed_keys, relist = change_set.changes_for_listing("bucket", "a/b/")
+    assert not relist and not removed_keys
+    assert upserts["a/b/new.txt"]["Size"] == 10
+
+    upserts, removed_keys, relist = change_set.changes_for_listing("bucket", "a/")
+    assert (upserts, removed_keys, relist) == ({"a/b/": None}, set(), False)
+
+
+def test_delete_in_listed_folder_removes_row():
+    change_set = S3ChangeSet("default")
+    change_set.record_operation(_ran(S3OpType.DELETE_OBJECT, "bucket", "a/x.txt"), True, "")
+
+    assert change_set.changes_for_listing("bucket", "a/") == ({}, {"a/x.txt"}, False)
+    assert change_set.changes_for_listing("other", "a/") == ({}, set(), False)
+
+
+def test_delete_deeper_down_relists_ancestor_listing():
+    # a/b/x may have been the last key under a/b/: the a/ listing cannot tell whether its a/b/ row is still there
+    change_set = S3ChangeSet("default")
+    change_set.record_operation(_ran(S3OpType.DELETE_OBJECT, "bucket", "a/b/x"), True, "")
+
+    assert change_set.changes_for_listing("bucket", "a/b/") == ({}, {"a/b/x"}, False)
+    assert change_set.changes_for_listing("bucket", "a/")[2] is True
+    assert change_set.changes_for_listing("bucket", "")[2] is True
+    assert change_set.changes_for_listing("bucket", "c/") == ({}, set(), False)
+
+
+def test_deeper_delete_with_write_in_same_folder_patches():
+    change_set = S3ChangeSet("default")
+    change_set.record_operation(_ran(S3OpType.DELETE_OBJECT, "bucket", "a/b/x"), True, "")
+    change_set.record_operation(_ran(S3OpType.CREATE_FOLDER, "bucket", "a/b/sub/"), None, "")
+
+    assert change_set.changes_for_listing("bucket", "a/") == ({"a/b/": None}, set(), False)
+
+
+def test_folder_delete_removes_row_and_relists_inside_and_above():
+    change_set = S3ChangeSet("default")
+    change_set.record_operation(_ran(S3OpType.DELETE_FOLDER, "bucket", "a/b/"), None, "")
+
+    assert change_set.changes_for_listing("bucket", "a/") == ({}, {"a/b/"}, False)
+    assert change_set.changes_for_listing("bucket", "a/b/c/")[2] is True # The open folder itself is gone
+    assert change_set.changes_for_listing("bucket", "")[2] is True       # a/ may be empty now
+
+
+def test_move_prefix_within_folder():
+    change_set = S3ChangeSet("default")
+    change_set.record_operation(_ran(S3OpType.MOVE_PREFIX, "bucket", "a/old/", new_key="a/new/"), None, "")
+
+    assert change_set.changes_for_listing("bucket", "a/") == ({"a/new/": None}, {"a/old/"}, False)
+    assert change_set.changes_for_listing("bucket", "") == ({"a/": None}, set(), False)
+
+
+def test_later_record_wins_and_failures_relist():
+    change_set = S3ChangeSet("default")
+    change_set.record_operation(_ran(S3OpType.UPLOAD_FILE, "bucket", "a/f"), {"size": 1}, "")
+    change_set.record_operation(_ran(S3OpType.DELETE_OBJECT, "bucket", "a/f"), True, "")
+    assert change_set.changes_for_listing("bucket", "a/") == ({}, {"a/f"}, False)
+
+    change_set.record_operation(_ran(S3OpType.DELETE_FOLDER, "bucket", "a/b/"), None, "AccessDenied")
+    assert change_set.changes_for_listing("bucket", "a/")[2] is True
+
+
+def test_operations_that_never_ran_are_not_recorded():
+    change_set = S3ChangeSet("default")
+    change_set.record_operation(S3Operation(S3OpType.DELETE_OBJECT, "bucket", key="a/f"), True, "")
+    assert change_set.is_empty()
@@ -0,0 +1,76 @@
+import pytest
+
+from s3ops import S3ConcurrencyController as controller_module
+from s3ops.S3ConcurrencyController import S3ConcurrencyController
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(controller_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _window(controller, clock, ops, pending=10, bytes_per_op=0, error_code=None):
+    for _ in range(ops):
+        controller.record_operation(bytes_per_op, error_code)
+    clock[0] += 1.0
+    return controller.evaluate(pending)
+
+
+def test_backlog_grows_additively(clock):
+    controller = S3ConcurrencyController(min_workers=2, max_workers=32, initial_workers=4)
+    assert _window(controller, clock, ops=10) == (5, 0)
+    assert _window(controller, clock, ops=20) == (6, 0)
+
+
+def test_growth_stops_when_throughput_flattens(clock):
+    controller = S3ConcurrencyController(initial_workers=4)
+    _window(controller, clock, ops=10)
+    assert _window(controller, clock, ops=10) == (5, 0) # No gain from the last increase: hold
+    assert _window(controller, clock, ops=10) == (6, 0) # After a hold, probe again
+
+
+def test_bytes_gain_counts_for_large_objects(clock):
+    controller = S3ConcurrencyController(initial_workers=4)
+    _window(controller, clock, ops=2, bytes_per_op=100)
+    assert _window(controller, clock, ops=2, bytes_per_op=200) == (6, 0)
+
+
+def test_throttling_halves_the_pool(clock):
+    controller = S3ConcurrencyController(min_workers=2, initial_workers=16)
+    assert _window(controller, clock, ops=5, error_code="SlowDown") == (8, 5)
+    assert _window(controller, clock, ops=1, error_code="503") == (4, 1)
+    assert _window(controller, clock, ops=1, error_code="503") == (2, 1)
+    assert _window(controller, clock, ops=1, error_code="503") == (2, 1) # Floor
+
+
+def test_retried_throttle_still_decreases(clock):
+    controller = S3ConcurrencyController(initial_workers=8)
+    controller.record_retry("Throttling")
+    controller.record_operation(0, None)
+    clock[0] += 1.0
+    assert controller.evaluate(10) == (4, 1)
+    assert controller.retries_in_last_window == 1
+
+
+def test_idle_drifts_to_floor_and_growth_caps_at_max(clock):
+    controller = S3ConcurrencyController(min_workers=2, max_workers=5, initial_workers=4)
+    assert _window(controller, clock, ops=0, pending=0) == (3, 0)
+    assert _window(controller, clock, ops=0, pending=0) == (2, 0)
+    assert _window(controller, clock, ops=0, pending=0) == (2, 0)
+    for ops in (10, 20, 40, 80, 160):
+        target, _ = _window(controller, clock, ops=ops)
+    assert target == 5
+
+
+def test_non_throttling_errors_are_ignored():
+    assert not S3ConcurrencyController.is_throttling_error("AccessDenied")
+    assert not S3ConcurrencyController.is_throttling_error(None)
+    assert S3ConcurrencyController.is_throttling_error(503)
+
+
+def test_set_bounds_clamps_current_target():
+    controller = S3ConcurrencyController(min_workers=2, max_workers=32, initial_workers=20)
+    controller.set_bounds(1, 8)
+    assert controller.target_workers == 8
@@ -0,0 +1,138 @@
+import base64
+import hashlib
+import io
+
+import pytest
+
+botocore_session = pytest.importorskip("botocore.session")
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from s3ops.S3CrossProfileCopier import S3CrossProfileCopier, ChecksumMismatch
+from s3ops.S3Operation import S3Operation, S3OpType
+
+
+class _SmallPartCopier(S3CrossProfileCopier):
+    # Tiny parts, one at a time, so the stubbed responses are consumed in order
+    PART_SIZE = 4
+    MAX_PARALLEL_PARTS = 1
+
+
+def _stubbed_client():
+    client = botocore_session.get_session().create_client(
+        's3', region_name='us-east-1', aws_access_key_id='test', aws_secret_access_key='test')
+    return client, Stubber(client)
+
+
+def _md5(data):
+    return hashlib.md5(data).digest()
+
+
+def _content_md5(data):
+    return base64.b64encode(_md5(data)).decode()
+
+
+def _operation():
+    return S3Operation(S3OpType.COPY_OBJECT, 'dst', key='src.bin', new_key='copy.bin')
+
+
+def _stub_head(source_stubber, data, etag):
+    source_stubber.add_response('head_object', {'ContentLength': len(data), 'ETag': etag, 'ContentType': 'text/plain'},
+                                {'Bucket': 'src', 'Key': 'src.bin'})
+
+
+def _stub_get(source_stubber, data, etag, byte_range=None):
+    params = {'Bucket': 'src', 'Key': 'src.bin', 'IfMatch': etag}
+    if byte_range: params['Range'] = f"bytes={byte_range[0]}-{byte_range[1]}"
+    chunk = data[byte_range[0]:byte_range[1] + 1] if byte_range else data
+    source_stubber.add_response('get_object', {'Body': StreamingBody(io.BytesIO(chunk), len(chunk))}, params)
+
+
+def _copy(source, dest):
+    return _SmallPartCopier().copy(source, dest, _operation(), 'src', 'src.bin', 'dst', 'copy.bin')
+
+
+def test_multipart_parts_are_pinned_to_the_source_etag_and_carry_their_md5():
+    data, etag = b"0123456789", '"multipart-source-1"'
+    (source, source_stubber), (dest, dest_stubber) = _stubbed_client(), _stubbed_client()
+    _stub_head(source_stubber, data, etag)
+    dest_stubber.add_response('create_multipart_upload', {'UploadId': 'up-1'},
+                              {'Bucket': 'dst', 'Key': 'copy.bin', 'ContentType': 'text/plain'})
+    parts = [(1, 0, 3), (2, 4, 7), (3, 8, 9)]
+    for part_number, first_byte, last_byte in parts:
+        chunk = data[first_byte:last_byte + 1]
+        _stub_get(source_stubber, data, etag, (first_byte, last_byte))
+        dest_stubber.add_response('upload_part', {'ETag': f'"{_md5(chunk).hex()}"'}, {
+            'Bucket': 'dst', 'Key': 'copy.bin', 'UploadId': 'up-1', 'PartNumber': part_number,
+            'Body': chunk, 'ContentMD5': _content_md5(chunk)})
+    expected_etag = hashlib.md5(b"".join(_md5(data[f:l + 1]) for _, f, l in parts)).hexdigest() + "-3"
+    dest_stubber.add_response('complete_multipart_upload', {'ETag': f'"{expected_etag}"'}, {
+        'Bucket': 'dst', 'Key': 'copy.bin', 'UploadId': 'up-1',
+        'MultipartUpload': {'Parts': [{'PartNumber': n, 'ETag': f'"{_md5(data[f:l + 1]).hex()}"'} for n, f, l in parts]}})
+
+    with source_stubber, dest_stubber:
+        result = _copy(source, dest)
+
+    assert result == {"strategy": "stream", "etag": f'"{expected_etag}"', "parts": 3}
+    source_stubber.assert_no_pending_responses()
+    dest_stubber.assert_no_pending_responses()
+
+
+def test_failed_part_aborts_the_multipart_upload():
+    data, etag = b"01234567", '"multipart-source-1"'
+    (source, source_stubber), (dest, dest_stubber) = _stubbed_client(), _stubbed_client()
+    _stub_head(source_stubber, data, etag)
+    dest_stubber.add_response('create_multipart_upload', {'UploadId': 'up-1'})
+    _stub_get(source_stubber, data, etag, (0, 3))
+    dest_stubber.add_response('upload_part', {'ETag': f'"{_md5(data[:4]).hex()}"'})
+    _stub_get(source_stubber, data, etag, (4, 7))
+    dest_stubber.add_client_error('upload_part', service_error_code='InternalError', http_status_code=500)
+    dest_stubber.add_response('abort_multipart_upload', {}, {'Bucket': 'dst', 'Key': 'copy.bin', 'UploadId': 'up-1'})
+
+    with source_stubber, dest_stubber, pytest.raises(ClientError):
+        _copy(source, dest)
+    dest_stubber.assert_no_pending_responses()
+
+
+def test_single_part_put_carries_its_md5():
+    data = b"abc"
+    etag = f'"{_md5(data).hex()}"'
+    (source, source_stubber), (dest, dest_stubber) = _stubbed_client(), _stubbed_client()
+    _stub_head(source_stubber, data, etag)
+    _stub_get(source_stubber, data, etag)
+    dest_stubber.add_response('put_object', {'ETag': etag}, {
+        'Bucket': 'dst', 'Key': 'copy.bin', 'Body': data, 'ContentMD5': _content_md5(data), 'ContentType': 'text/plain'})
+
+    with source_stubber, dest_stubber:
+        assert _copy(source, dest) == {"strategy": "stream", "etag": etag, "parts": 1}
+    dest_stubber.assert_no_pending_responses()
+
+
+@pytest.mark.parametrize("dest_size, verified", [(3, True), (2, False)])
+def test_verify_falls_back_to_the_size_for_non_md5_etags(dest_size, verified):
+    copier, data = S3CrossProfileCopier(), b"abc"
+    dest, dest_stubber = _stubbed_client()
+    dest_stubber.add_response('head_object', {'ContentLength': dest_size}, {'Bucket': 'dst', 'Key': 'copy.bin'})
+    if not verified:
+        dest_stubber.add_response('delete_object', {}, {'Bucket': 'dst', 'Key': 'copy.bin'})
+
+    with dest_stubber:
+        # SSE-KMS: neither ETag is the MD5 of the bytes
+        verify = lambda: copier._verify(dest, 'dst', 'copy.bin', '"kms-etag"', _md5(data).hex(), {'ETag': '"kms-source"'}, 3)
+        if verified:
+            verify()
+        else:
+            with pytest.raises(ChecksumMismatch, match="size"):
+                verify()
+    dest_stubber.assert_no_pending_responses()
+
+
+def test_verify_rejects_and_removes_a_copy_with_another_md5():
+    copier, data = S3CrossProfileCopier(), b"abc"
+    dest, dest_stubber = _stubbed_client()
+    dest_stubber.add_response('delete_object', {}, {'Bucket': 'dst', 'Key': 'copy.bin'})
+
+    with dest_stubber, pytest.raises(ChecksumMismatch, match="destination ETag"):
+        copier._verify(dest, 'dst', 'copy.bin', f'"{_md5(b"abd").hex()}"', _md5(data).hex(), {'ETag': '"kms-source"'}, 3)
+    dest_stubber.assert_no_pending_responses()
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from s3ops import S3FolderSummaries as summaries_module
+from s3ops.S3FolderSummaries import FolderSummary, S3FolderSummaryCache, summarize_listed_objects
+
+
+def _obj(key, size, day):
+    return {"Key": key, "Size": size, "LastModified": datetime(2024, 1, day, tzinfo=timezone.utc)}
+
+
+def _totals(summaries):
+    return {prefix: (s.total_bytes, s.object_count) for prefix, s in summaries.items()}
+
+
+def test_objects_count_towards_every_folder_above_them():
+    summaries = summarize_listed_objects({}, "data/", [
+        _obj("data/a.bin", 10, 1),
+        _obj("data/logs/", 0, 2), # Folder marker: creates the folder, counts nothing
+        _obj("data/logs/2024/b.log", 5, 3),
+        _obj("data/logs/c.log", 1, 2),
+    ])
+    assert _totals(summaries) == {"data/": (16, 3), "data/logs/": (6, 2), "data/logs/2024/": (5, 1)}
+    assert summaries["data/logs/"].newest_mtime == datetime(2024, 1, 3, tzinfo=timezone.utc).timestamp()
+
+
+def test_pages_accumulate():
+    summaries = summarize_listed_objects({}, "", [_obj("x/a", 1, 1)])
+    summarize_listed_objects(summaries, "", [_obj("x/b", 2, 1), _obj("top", 4, 1)])
+    assert _totals(summaries) == {"": (7, 3), "x/": (3, 2)}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(summaries_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_invalidate_key_drops_all_ancestors_only(clock):
+    cache = S3FolderSummaryCache()
+    cache.put_subtree("p", "b", {"": FolderSummary(9, 3), "a/": FolderSummary(5, 2),
+                                 "a/b/": FolderSummary(1, 1), "z/": FolderSummary(4, 1)})
+    cache.invalidate_key("p", "b", "a/b/file")
+    assert cache.get("p", "b", "") is None
+    assert cache.get("p", "b", "a/") is None
+    assert cache.get("p", "b", "a/b/") is None
+    assert cache.get("p", "b", "z/").total_bytes == 4
+
+
+def test_summary_listed_before_an_invalidation_is_not_stored(clock):
+    cache = S3FolderSummaryCache()
+    listed_at = clock[0]
+    clock[0] += 1
+    cache.invalidate_key("p", "b", "a/new")
+    cache.put_subtree("p", "b", {"a/": FolderSummary(1, 1), "z/": FolderSummary(2, 1)}, listed_at=listed_at)
+    assert cache.get("p", "b", "a/") is None
+    assert cache.get("p", "b", "z/") is not None
+
+
+def test_entries_expire_and_evict_lru(clock):
+    cache = S3FolderSummaryCache(max_entries=2)
+    cache.put_subtree("p", "b", {"a/": FolderSummary(), "b/": FolderSummary()})
+    cache.get("p", "b", "a/")
+    cache.put_subtree("p", "b", {"c/": FolderSummary()})
+    assert cache.get("p", "b", "b/") is None
+    assert cache.get("p", "b", "a/") is not None
+    clock[0] += S3FolderSummaryCache.MAX_AGE_SECONDS + 1
+    assert cache.get("p", "b", "c/") is None
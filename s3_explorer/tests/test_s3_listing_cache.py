@@ -0,0 +1,107 @@
+import pytest
+
+from s3ops import S3ListingCache as listing_cache_module
+from s3ops.S3ListingCache import S3ListingCache, parent_prefix
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = _Clock()
+    monkeypatch.setattr(listing_cache_module.time, "monotonic", fake_clock)
+    return fake_clock
+
+
+def _listing(folders=(), files=()):
+    return {"folders": list(folders), "files": [{'Key': key} for key in files]}
+
+
+@pytest.mark.parametrize("key, parent", [("a/b/c.txt", "a/b/"), ("a/b/", "a/"), ("a", ""), ("a/", "")])
+def test_parent_prefix(key, parent):
+    assert parent_prefix(key) == parent
+
+
+def test_fresh_then_stale_by_age_then_dropped(clock):
+    cache = S3ListingCache()
+    cache.put("p", "bucket", "a/", _listing(files=["a/f"]), listed_at=clock.now)
+    assert cache.get("p", "bucket", "a/").is_fresh()
+
+    clock.now += S3ListingCache.FRESH_SECONDS + 1
+    entry = cache.get("p", "bucket", "a/")
+    assert entry is not None and not entry.is_fresh() # Still shown, but revalidated
+
+    clock.now += S3ListingCache.MAX_STALE_SECONDS
+    assert cache.get("p", "bucket", "a/") is None
+    assert cache.stats()["rows"] == 0
+
+
+def test_write_invalidates_parent_and_ripples_to_ancestors_not_showing_the_folder(clock):
+    cache = S3ListingCache()
+    cache.put("p", "bucket", "", _listing(folders=["a/"]))
+    cache.put("p", "bucket", "a/", _listing(files=["a/old"]))
+    cache.put("p", "bucket", "a/new/", _listing())
+
+    cache.invalidate_key("p", "bucket", "a/new/f.txt")
+    assert not cache.get("p", "bucket", "a/new/").is_fresh()
+    assert not cache.get("p", "bucket", "a/").is_fresh() # a/new/ appears in it
+    assert cache.get("p", "bucket", "").is_fresh()       # Already shows a/
+
+
+def test_delete_ripples_only_when_folder_may_be_empty(clock):
+    cache = S3ListingCache()
+    cache.put("p", "bucket", "", _listing(folders=["a/"]))
+    cache.put("p", "bucket", "a/", _listing(files=["a/x", "a/y"]))
+    cache.invalidate_key("p", "bucket", "a/x", removed=True)
+    assert not cache.get("p", "bucket", "a/").is_fresh()
+    assert cache.get("p", "bucket", "").is_fresh() # a/ still has a/y
+
+    cache.put("p", "bucket", "b/", _listing(files=["b/only"]))
+    cache.put("p", "bucket", "", _listing(folders=["a/", "b/"]))
+    cache.invalidate_key("p", "bucket", "b/only", removed=True)
+    assert not cache.get("p", "bucket", "").is_fresh() # b/ is gone from the root listing
+
+
+def test_list_running_across_an_invalidation_is_stored_stale(clock):
+    cache = S3ListingCache()
+    listed_at = clock.now
+    clock.now += 1
+    cache.invalidate_prefix("p", "bucket", "a/")
+    clock.now += 1
+    cache.put("p", "bucket", "a/", _listing(files=["a/f"]), listed_at=listed_at)
+    assert not cache.get("p", "bucket", "a/").is_fresh()
+
+    cache.put("p", "bucket", "a/", _listing(files=["a/f"]), listed_at=clock.now) # Started after it
+    assert cache.get("p", "bucket", "a/").is_fresh()
+
+
+def test_drop_subtree_and_profiles_are_separate(clock):
+    cache = S3ListingCache()
+    for prefix in ("a/", "a/b/", "ab/"):
+        cache.put("p", "bucket", prefix, _listing())
+    cache.put("other", "bucket", "a/", _listing())
+
+    cache.drop_subtree("p", "bucket", "a/")
+    assert cache.peek("p", "bucket", "a/") is None and cache.peek("p", "bucket", "a/b/") is None
+    assert cache.peek("p", "bucket", "ab/") is not None
+    assert cache.peek("other", "bucket", "a/") is not None
+
+
+def test_lru_eviction_by_total_rows(clock):
+    cache = S3ListingCache(max_total_rows=4)
+    cache.put("p", "bucket", "a/", _listing(files=["a/1", "a/2"]))
+    cache.put("p", "bucket", "b/", _listing(files=["b/1", "b/2"]))
+    cache.get("p", "bucket", "a/") # a/ becomes most recently used
+    cache.put("p", "bucket", "c/", _listing(files=["c/1"]))
+
+    assert cache.peek("p", "bucket", "b/") is None
+    assert cache.peek("p", "bucket", "a/") is not None and cache.peek("p", "bucket", "c/") is not None
+    assert cache.stats()["rows"] == 3
+    cache.put("p", "bucket", "huge/", _listing(files=[f"huge/{i}" for i in range(5)]))
+    assert cache.peek("p", "bucket", "huge/") is None # Larger than the whole cache: not stored
@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+from PyQt6.QtCore import Qt, QPersistentModelIndex
+
+from s3ops.S3ListingModel import (
+    S3ListingModel, SORT_ROLE, COL_NAME, COL_SIZE, COL_MODIFIED, COL_S3_KEY,
+)
+
+ASCENDING, DESCENDING = Qt.SortOrder.AscendingOrder, Qt.SortOrder.DescendingOrder
+
+
+def _model(rows):
+    """rows: (key, size, mtime) for files, (key, None, None) for folders (key ends with '/')."""
+    model = S3ListingModel()
+    model.append_rows([(key, None if key.endswith('/') else (size, mtime, f'"{key}"'), key.endswith('/'))
+                       for key, size, mtime in rows])
+    return model
+
+
+def _names(model):
+    return [model.name_at(row) for row in range(model.rowCount())]
+
+
+LISTING = [
+    ("data/b.txt", 10 * 1024 * 1024, 300.0),
+    ("data/zeta/", None, None),
+    ("data/a.txt", 9 * 1024, 100.0),
+    ("data/alpha/", None, None),
+    ("data/c.txt", 500, 200.0),
+]
+
+
+def test_size_sorts_on_bytes_not_display_strings():
+    model = _model(LISTING)
+    model.sort(COL_SIZE, ASCENDING)
+    assert _names(model) == ["zeta", "alpha", "c.txt", "a.txt", "b.txt"]
+    assert model.data(model.index(4, COL_SIZE), SORT_ROLE) == 10 * 1024 * 1024
+
+
+def test_folders_stay_first_in_both_directions():
+    model = _model(LISTING)
+    model.sort(COL_NAME, ASCENDING)
+    assert _names(model) == ["alpha", "zeta", "a.txt", "b.txt", "c.txt"]
+    model.sort(COL_NAME, DESCENDING)
+    assert _names(model) == ["zeta", "alpha", "c.txt", "b.txt", "a.txt"]
+    model.sort(COL_MODIFIED, DESCENDING)
+    assert _names(model)[2:] == ["b.txt", "c.txt", "a.txt"]
+
+
+def test_accessors_and_edits_follow_the_view_order():
+    model = _model(LISTING)
+    model.sort(COL_S3_KEY, DESCENDING)
+    assert model.key_at(2) == "data/c.txt"
+    assert model.signature_at(2) == (500, 200.0, '"data/c.txt"')
+    model.replace_row(2, "data/c.txt", (600, 250.0, '"new"'), False)
+    assert model.size_at(2) == 600
+    assert model.removeRows(0, 2)
+    assert _names(model) == ["c.txt", "b.txt", "a.txt"]
+    model.sort(COL_SIZE, ASCENDING)
+    assert _names(model) == ["c.txt", "a.txt", "b.txt"]
+
+
+def test_persistent_indexes_follow_their_rows():
+    model = _model(LISTING)
+    selected = QPersistentModelIndex(model.index(0, COL_NAME)) # data/b.txt in arrival order
+    model.sort(COL_SIZE, ASCENDING)
+    assert selected.row() == 4
+    model.sort(COL_NAME, ASCENDING)
+    assert selected.row() == 3
+    assert model.key_at(selected.row()) == "data/b.txt"
+
+
+def test_removed_rows_are_compacted_without_moving_view_rows():
+    model = _model([(f"data/{index:03d}.bin", index, float(index)) for index in range(10)])
+    model.sort(COL_SIZE, DESCENDING)
+    model.removeRows(0, 6)
+    assert [model.size_at(row) for row in range(model.rowCount())] == [3, 2, 1, 0]
+    assert len(model._keys) == 4 # More removed than live rows: storage was rebuilt
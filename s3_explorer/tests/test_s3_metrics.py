@@ -0,0 +1,82 @@
+import io
+
+import pytest
+
+botocore_session = pytest.importorskip("botocore.session")
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+
+from s3ops.S3Metrics import S3MetricsCollector, set_current_op_type
+
+
+class _RawBody:
+    def __init__(self, data=b""):
+        self._data = io.BytesIO(data)
+
+    def stream(self, **kwargs):
+        yield self._data.read()
+
+
+class _HttpStub:
+    """Answers before-send in place of the HTTP layer: one status per attempt, the last one repeated."""
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.sent = 0
+
+    def __call__(self, request, **kwargs):
+        status = self.statuses[min(self.sent, len(self.statuses) - 1)]
+        self.sent += 1
+        return AWSResponse(request.url, status, {'Content-Length': '0'}, _RawBody())
+
+
+def _client(collector, http_stub, max_attempts=3):
+    session = botocore_session.get_session()
+    client = session.create_client(
+        's3', region_name='us-east-1', aws_access_key_id='test', aws_secret_access_key='test',
+        config=Config(retries={'max_attempts': max_attempts, 'mode': 'standard'}))
+    collector.attach_to_client(client) # Before the stub, like ProfileManager attaches it to real clients
+    client.meta.events.register('before-send.s3', http_stub)
+    return client
+
+
+def _api_entry(collector, api_name):
+    entries = [entry for entry in collector.snapshot()["api_calls"] if entry["api"] == api_name]
+    assert len(entries) == 1
+    return entries[0]
+
+
+def test_put_object_counts_attempt_and_bytes_sent():
+    collector = S3MetricsCollector()
+    client = _client(collector, _HttpStub([200]))
+    set_current_op_type("UPLOAD_FILE")
+    try:
+        client.put_object(Bucket='bucket', Key='a/file.bin', Body=b"x" * 1234)
+    finally:
+        set_current_op_type(None)
+
+    entry = _api_entry(collector, "PutObject")
+    assert entry["op_type"] == "UPLOAD_FILE"
+    assert entry["calls"] == 1
+    assert entry["attempts"] == 1
+    assert entry["bytes_sent"] == 1234
+    assert entry["statuses"] == {"200": 1}
+
+
+def test_put_object_file_body_is_measured():
+    collector = S3MetricsCollector()
+    client = _client(collector, _HttpStub([200]))
+    client.put_object(Bucket='bucket', Key='a/file.bin', Body=io.BytesIO(b"y" * 4096))
+
+    assert _api_entry(collector, "PutObject")["bytes_sent"] == 4096
+
+
+def test_retried_call_counts_every_attempt():
+    collector = S3MetricsCollector()
+    client = _client(collector, _HttpStub([503, 503, 200]), max_attempts=3)
+    client.head_bucket(Bucket='bucket')
+
+    entry = _api_entry(collector, "HeadBucket")
+    assert entry["calls"] == 1
+    assert entry["attempts"] == 3
+    assert entry["retries"] == 2
+    assert entry["statuses"] == {"503": 2, "200": 1}
@@ -0,0 +1,105 @@
+import pytest
+
+botocore_session = pytest.importorskip("botocore.session")
+from botocore.stub import Stubber
+
+from s3ops.S3MultipartCopier import S3MultipartCopier
+from s3ops.S3Operation import S3Operation, S3OpType
+
+MB = 1024 * 1024
+
+
+def _assert_contiguous(ranges, size):
+    assert ranges[0][1] == 0 and ranges[-1][2] == size - 1
+    assert [part_number for part_number, _, _ in ranges] == list(range(1, len(ranges) + 1))
+    for (_, _, last_byte), (_, next_first_byte, _) in zip(ranges, ranges[1:]):
+        assert next_first_byte == last_byte + 1
+
+
+@pytest.mark.parametrize("size", [1, S3MultipartCopier.PART_SIZE - 1, S3MultipartCopier.PART_SIZE,
+                                  S3MultipartCopier.PART_SIZE + 1, 5 * 1024 * MB + 7])
+def test_part_ranges_cover_every_byte_once(size):
+    ranges = S3MultipartCopier.part_ranges(size)
+    _assert_contiguous(ranges, size)
+    assert all(last_byte - first_byte + 1 <= S3MultipartCopier.PART_SIZE for _, first_byte, last_byte in ranges)
+
+
+def test_part_ranges_grow_parts_to_stay_under_max_parts():
+    size = S3MultipartCopier.MAX_PARTS * S3MultipartCopier.PART_SIZE * 3 + 5 # Far above 10000 default-sized parts
+    ranges = S3MultipartCopier.part_ranges(size)
+    _assert_contiguous(ranges, size)
+    assert len(ranges) <= S3MultipartCopier.MAX_PARTS
+
+
+def test_part_ranges_of_empty_object():
+    assert S3MultipartCopier.part_ranges(0) == []
+
+
+class _SerialCopier(S3MultipartCopier):
+    # Parts one at a time, so the stubbed responses are consumed in order
+    MULTIPART_THRESHOLD = 100
+    PART_SIZE = 100
+    MAX_PARALLEL_PARTS = 1
+
+
+def _stubbed_client():
+    client = botocore_session.get_session().create_client(
+        's3', region_name='us-east-1', aws_access_key_id='test', aws_secret_access_key='test')
+    return client, Stubber(client)
+
+
+def _stub_head_and_create(stubber, size):
+    stubber.add_response('head_object', {'ContentLength': size, 'ETag': '"source"', 'ContentType': 'text/plain'},
+                         {'Bucket': 'src', 'Key': 'big.bin'})
+    stubber.add_response('create_multipart_upload', {'UploadId': 'upload-1'},
+                         {'Bucket': 'dst', 'Key': 'copy.bin', 'ContentType': 'text/plain'})
+
+
+def _part_params(part_number, byte_range):
+    return {'Bucket': 'dst', 'Key': 'copy.bin', 'UploadId': 'upload-1', 'PartNumber': part_number,
+            'CopySource': {'Bucket': 'src', 'Key': 'big.bin'}, 'CopySourceRange': f"bytes={byte_range}",
+            'CopySourceIfMatch': '"source"'}
+
+
+def test_multipart_copy_copies_ranges_and_completes():
+    client, stubber = _stubbed_client()
+    _stub_head_and_create(stubber, 250)
+    for part_number, byte_range in ((1, "0-99"), (2, "100-199"), (3, "200-249")):
+        stubber.add_response('upload_part_copy', {'CopyPartResult': {'ETag': f'"part{part_number}"'}},
+                             _part_params(part_number, byte_range))
+    stubber.add_response('complete_multipart_upload', {'ETag': '"final"'}, {
+        'Bucket': 'dst', 'Key': 'copy.bin', 'UploadId': 'upload-1',
+        'MultipartUpload': {'Parts': [{'PartNumber': n, 'ETag': f'"part{n}"'} for n in (1, 2, 3)]}})
+    operation = S3Operation(S3OpType.COPY_OBJECT, 'src', key='big.bin', new_key='copy.bin')
+
+    with stubber:
+        result = _SerialCopier().copy(client, operation, 'src', 'big.bin', 'dst', 'copy.bin', source_size=250)
+
+    assert result == {"strategy": "multipart", "etag": '"final"'}
+    assert operation.bytes_transferred == 250
+    stubber.assert_no_pending_responses()
+
+
+def test_failed_part_aborts_the_upload():
+    client, stubber = _stubbed_client()
+    _stub_head_and_create(stubber, 150)
+    stubber.add_response('upload_part_copy', {'CopyPartResult': {'ETag': '"part1"'}}, _part_params(1, "0-99"))
+    stubber.add_client_error('upload_part_copy', 'PreconditionFailed', http_status_code=412,
+                             expected_params=_part_params(2, "100-149"))
+    stubber.add_response('abort_multipart_upload', {}, {'Bucket': 'dst', 'Key': 'copy.bin', 'UploadId': 'upload-1'})
+    operation = S3Operation(S3OpType.COPY_OBJECT, 'src', key='big.bin', new_key='copy.bin')
+
+    with stubber, pytest.raises(Exception, match="PreconditionFailed"):
+        _SerialCopier().copy(client, operation, 'src', 'big.bin', 'dst', 'copy.bin', source_size=150)
+    stubber.assert_no_pending_responses()
+
+
+def test_small_object_uses_single_copy():
+    client, stubber = _stubbed_client()
+    stubber.add_response('copy_object', {'CopyObjectResult': {'ETag': '"single"'}},
+                         {'CopySource': {'Bucket': 'src', 'Key': 'small.bin'}, 'Bucket': 'dst', 'Key': 'copy.bin'})
+    operation = S3Operation(S3OpType.COPY_OBJECT, 'src', key='small.bin', new_key='copy.bin')
+
+    with stubber:
+        result = _SerialCopier().copy(client, operation, 'src', 'small.bin', 'dst', 'copy.bin', source_size=50)
+    assert result == {"strategy": "single", "etag": '"single"'}
@@ -0,0 +1,154 @@
+import queue
+
+import pytest
+
+from s3ops.S3Operation import S3Operation, S3OpType
+from s3ops.S3OperationScheduler import S3OperationScheduler
+
+
+def _op(op_type, key="a/", bucket="bucket", **callback_data):
+    return S3Operation(op_type, bucket, key=key, callback_data=callback_data)
+
+
+def _drain(scheduler, lanes=None):
+    operations = []
+    while True:
+        try:
+            operations.append(scheduler.get_nowait(lanes=lanes))
+        except queue.Empty:
+            return operations
+
+
+def test_interactive_lane_is_drained_first():
+    scheduler = S3OperationScheduler()
+    upload = _op(S3OpType.UPLOAD_FILE, "a/f1")
+    delete = _op(S3OpType.DELETE_OBJECT, "a/f2")
+    listing = _op(S3OpType.LIST, "a/")
+    head = _op(S3OpType.HEAD_OBJECT, "a/f3")
+    for operation in (upload, delete, listing, head):
+        scheduler.put(operation)
+
+    assert scheduler.get_lane_sizes() == {S3OperationScheduler.LANE_INTERACTIVE: 2, S3OperationScheduler.LANE_BULK: 2}
+    assert _drain(scheduler) == [listing, head, upload, delete]
+
+
+def test_reserved_workers_only_take_interactive_work():
+    scheduler = S3OperationScheduler()
+    scheduler.put(_op(S3OpType.UPLOAD_FILE, "a/f1"))
+    with pytest.raises(queue.Empty):
+        scheduler.get(timeout=0.01, lanes=(S3OperationScheduler.LANE_INTERACTIVE,))
+    assert scheduler.qsize() == 1
+
+
+def test_priority_in_callback_data_overrides_lane():
+    scheduler = S3OperationScheduler()
+    planning_list = _op(S3OpType.LIST, "big/", priority=S3OperationScheduler.LANE_BULK)
+    upload = _op(S3OpType.UPLOAD_FILE, "a/f1")
+    scheduler.put(upload)
+    scheduler.put(planning_list)
+    assert scheduler.qsize(S3OperationScheduler.LANE_BULK) == 2
+    assert _drain(scheduler) == [upload, planning_list]
+
+
+def test_sentinels_come_before_work():
+    scheduler = S3OperationScheduler()
+    listing = _op(S3OpType.LIST)
+    scheduler.put(listing)
+    scheduler.put_nowait(None)
+    assert _drain(scheduler) == [None, listing]
+
+
+def test_move_to_lane_front_runs_next():
+    scheduler = S3OperationScheduler()
+    first, second = _op(S3OpType.UPLOAD_FILE, "a/f1"), _op(S3OpType.UPLOAD_FILE, "a/f2")
+    scheduler.put(first)
+    scheduler.put(second)
+    moved = scheduler.move_to_lane(lambda op: op is second, S3OperationScheduler.LANE_INTERACTIVE, to_front=True)
+    assert moved == 1
+    assert second.callback_data['priority'] == S3OperationScheduler.LANE_INTERACTIVE
+    assert _drain(scheduler) == [second, first]
+
+
+def test_remove_pending_settles_unfinished_tasks():
+    scheduler = S3OperationScheduler()
+    keep, drop = _op(S3OpType.UPLOAD_FILE, "a/keep"), _op(S3OpType.UPLOAD_FILE, "a/drop")
+    scheduler.put(keep)
+    scheduler.put(drop)
+    assert scheduler.remove_pending(lambda op: op is drop) == [drop]
+    assert scheduler.get_nowait() is keep
+    scheduler.task_done()
+    scheduler.join() # Returns at once: nothing unfinished is left
+
+
+def test_identical_lists_coalesce_into_queued_one():
+    scheduler = S3OperationScheduler()
+    first, duplicate = _op(S3OpType.LIST, "a"), _op(S3OpType.LIST, "a/")
+    scheduler.put(first)
+    scheduler.put(duplicate)
+    assert _drain(scheduler) == [first]
+    assert first.coalesced_operations == [duplicate]
+
+
+def test_fetch_more_list_does_not_coalesce_with_first_page():
+    scheduler = S3OperationScheduler()
+    first_page = _op(S3OpType.LIST, "a/", page_limit=1)
+    next_page = _op(S3OpType.LIST, "a/", page_limit=1, continuation_token="token")
+    scheduler.put(first_page)
+    scheduler.put(next_page)
+    assert _drain(scheduler) == [first_page, next_page]
+
+
+def test_list_merged_from_interactive_promotes_queued_bulk_list():
+    scheduler = S3OperationScheduler()
+    upload = _op(S3OpType.UPLOAD_FILE, "a/f1")
+    prefetch = _op(S3OpType.LIST, "a/", priority=S3OperationScheduler.LANE_BULK)
+    tab_list = _op(S3OpType.LIST, "a/")
+    scheduler.put(upload)
+    scheduler.put(prefetch)
+    scheduler.put(tab_list)
+    assert _drain(scheduler) == [prefetch, upload]
+    assert prefetch.coalesced_operations == [tab_list]
+
+
+def test_running_list_is_not_joined():
+    scheduler = S3OperationScheduler()
+    running = _op(S3OpType.LIST, "a/")
+    scheduler.put(running)
+    assert scheduler.get_nowait() is running
+    scheduler.mark_started(running)
+    later = _op(S3OpType.LIST, "a/")
+    scheduler.put(later) # May see changes the running LIST predates
+    assert _drain(scheduler) == [later]
+
+
+def test_newer_upload_replaces_queued_one_in_place():
+    scheduler = S3OperationScheduler()
+    older, other, newer = _op(S3OpType.UPLOAD_FILE, "a/f"), _op(S3OpType.UPLOAD_FILE, "a/g"), _op(S3OpType.UPLOAD_FILE, "a/f")
+    for operation in (older, other, newer):
+        scheduler.put(operation)
+    assert _drain(scheduler) == [newer, other]
+    assert newer.coalesced_operations == [older]
+
+
+def test_upload_of_running_key_waits_for_it():
+    scheduler = S3OperationScheduler()
+    running = _op(S3OpType.UPLOAD_FILE, "a/f")
+    scheduler.put(running)
+    scheduler.mark_started(scheduler.get_nowait())
+    deferred, newest = _op(S3OpType.UPLOAD_FILE, "a/f"), _op(S3OpType.UPLOAD_FILE, "a/f")
+    scheduler.put(deferred)
+    scheduler.put(newest)
+    assert _drain(scheduler) == []
+    assert scheduler.get_pending_operations() == [newest]
+
+    scheduler.mark_finished(running)
+    assert _drain(scheduler) == [newest]
+    assert newest.coalesced_operations == [deferred]
+
+
+def test_batch_items_never_coalesce():
+    scheduler = S3OperationScheduler()
+    first, second = _op(S3OpType.UPLOAD_FILE, "a/f", batch_id="b1"), _op(S3OpType.UPLOAD_FILE, "a/f", batch_id="b1")
+    scheduler.put(first)
+    scheduler.put(second)
+    assert _drain(scheduler) == [first, second]
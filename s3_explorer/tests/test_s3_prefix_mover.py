@@ -0,0 +1,140 @@
+import pytest
+
+botocore_session = pytest.importorskip("botocore.session")
+from botocore.stub import Stubber
+
+from s3ops import S3RetryPolicy as retry_policy_module
+from s3ops.S3ConcurrencyController import S3ConcurrencyController
+from s3ops.S3MultipartCopier import S3MultipartCopier
+from s3ops.S3Operation import S3Operation, S3OpType
+from s3ops.S3PrefixMover import S3PrefixMover
+from s3ops.S3RetryPolicy import S3RetryPolicy
+
+
+class _SerialMover(S3PrefixMover):
+    # One copy at a time, so the stubbed responses are consumed in order
+    COPY_CONCURRENCY = 1
+
+
+def _stubbed_client():
+    client = botocore_session.get_session().create_client(
+        's3', region_name='us-east-1', aws_access_key_id='test', aws_secret_access_key='test')
+    return client, Stubber(client)
+
+
+def _operation():
+    return S3Operation(S3OpType.MOVE_PREFIX, 'b', key='data/', new_key='trash/data/')
+
+
+def _stub_listing(stubber, objects):
+    stubber.add_response('list_objects_v2', {'Contents': [{'Key': key, 'Size': size, 'ETag': etag} for key, size, etag in objects]},
+                         {'Bucket': 'b', 'Prefix': 'data/', 'Delimiter': '/'})
+
+
+def _copy_params(key):
+    return {'CopySource': {'Bucket': 'b', 'Key': f'data/{key}'}, 'Bucket': 'b', 'Key': f'trash/data/{key}'}
+
+
+def _stub_delete(client, stubber):
+    """Returns the list the deleted source keys are collected into (sorted: copies finish in any order)."""
+    deleted = []
+    def record(params, **kwargs):
+        assert params['Bucket'] == 'b' and params['Delete']['Quiet']
+        deleted.extend(sorted(obj['Key'] for obj in params['Delete']['Objects']))
+    client.meta.events.register('before-parameter-build.s3.DeleteObjects', record)
+    stubber.add_response('delete_objects', {})
+    return deleted
+
+
+def test_sources_are_deleted_after_their_copy_is_verified():
+    client, stubber = _stubbed_client()
+    _stub_listing(stubber, [('data/a.txt', 3, '"ea"'), ('data/b.txt', 5, '"eb"')])
+    stubber.add_response('copy_object', {'CopyObjectResult': {'ETag': '"ea"'}}, _copy_params('a.txt'))
+    # ETag differs (e.g. multipart source): verified by comparing the size instead
+    stubber.add_response('copy_object', {'CopyObjectResult': {'ETag': '"other"'}}, _copy_params('b.txt'))
+    stubber.add_response('head_object', {'ContentLength': 5}, {'Bucket': 'b', 'Key': 'trash/data/b.txt'})
+    deleted = _stub_delete(client, stubber)
+
+    with stubber:
+        result = _SerialMover(client, S3MultipartCopier()).move(_operation(), 'b', 'data', 'b', 'trash/data')
+
+    assert (result["moved_count"], result["failed_count"], result["bytes"]) == (2, 0, 8)
+    assert deleted == ['data/a.txt', 'data/b.txt']
+    stubber.assert_no_pending_responses()
+
+
+def test_failed_verification_keeps_the_source():
+    client, stubber = _stubbed_client()
+    _stub_listing(stubber, [('data/a.txt', 3, '"ea"'), ('data/b.txt', 5, '"eb"')])
+    stubber.add_response('copy_object', {'CopyObjectResult': {'ETag': '"ea"'}}, _copy_params('a.txt'))
+    stubber.add_response('copy_object', {'CopyObjectResult': {'ETag': '"other"'}}, _copy_params('b.txt'))
+    stubber.add_response('head_object', {'ContentLength': 4}, {'Bucket': 'b', 'Key': 'trash/data/b.txt'})
+    deleted = _stub_delete(client, stubber) # Only the verified copy's source goes
+
+    with stubber:
+        result = _SerialMover(client, S3MultipartCopier()).move(_operation(), 'b', 'data/', 'b', 'trash/data/')
+
+    assert (result["moved_count"], result["failed_count"]) == (1, 1)
+    assert "could not be verified" in result["failures"][0]
+    assert deleted == ['data/a.txt']
+    stubber.assert_no_pending_responses()
+
+
+def test_throttled_copy_is_retried_and_reported(monkeypatch):
+    monkeypatch.setattr(retry_policy_module.random, "uniform", lambda low, high: 0.0)
+    client, stubber = _stubbed_client()
+    _stub_listing(stubber, [('data/a.txt', 3, '"ea"')])
+    stubber.add_client_error('copy_object', service_error_code='SlowDown', http_status_code=503,
+                             expected_params=_copy_params('a.txt'))
+    stubber.add_response('copy_object', {'CopyObjectResult': {'ETag': '"ea"'}}, _copy_params('a.txt'))
+    deleted = _stub_delete(client, stubber)
+    controller = S3ConcurrencyController()
+
+    with stubber:
+        result = _SerialMover(client, S3MultipartCopier(), retry_policy=S3RetryPolicy(),
+                              concurrency_controller=controller).move(_operation(), 'b', 'data/', 'b', 'trash/data/')
+
+    assert (result["moved_count"], result["failed_count"]) == (1, 0)
+    assert controller.evaluate(0)[1] == 1 # The throttle reached AIMD
+    assert deleted == ['data/a.txt']
+    stubber.assert_no_pending_responses()
+
+
+def test_copy_fails_without_retry_when_the_policy_says_no():
+    client, stubber = _stubbed_client()
+    _stub_listing(stubber, [('data/a.txt', 3, '"ea"')])
+    stubber.add_client_error('copy_object', service_error_code='AccessDenied', http_status_code=403,
+                             expected_params=_copy_params('a.txt'))
+
+    with stubber:
+        result = _SerialMover(client, S3MultipartCopier(), retry_policy=S3RetryPolicy()).move(
+            _operation(), 'b', 'data/', 'b', 'trash/data/')
+
+    assert (result["moved_count"], result["failed_count"]) == (0, 1)
+    stubber.assert_no_pending_responses() # No delete_objects: nothing was verified
+
+
+@pytest.mark.parametrize("dest_prefix", ["data/", "data/sub", "data/sub/deeper/"])
+def test_moving_a_prefix_into_itself_is_rejected(dest_prefix):
+    client, stubber = _stubbed_client()
+    with stubber, pytest.raises(ValueError, match="into itself"):
+        _SerialMover(client, S3MultipartCopier()).move(_operation(), 'b', 'data', 'b', dest_prefix)
+    stubber.assert_no_pending_responses()
+
+
+def test_copy_slots_are_shared_and_released():
+    client, stubber = _stubbed_client()
+    _stub_listing(stubber, [(f'data/{n}.txt', 1, f'"e{n}"') for n in range(3)])
+    for n in range(3):
+        stubber.add_response('copy_object', {'CopyObjectResult': {'ETag': f'"e{n}"'}}, _copy_params(f'{n}.txt'))
+    deleted = _stub_delete(client, stubber)
+
+    with stubber:
+        _SerialMover(client, S3MultipartCopier()).move(_operation(), 'b', 'data/', 'b', 'trash/data/')
+
+    assert deleted == ['data/0.txt', 'data/1.txt', 'data/2.txt']
+    # Every slot came back: all of them can be taken again without waiting
+    slots = S3PrefixMover._copy_slots
+    taken = sum(slots.acquire(blocking=False) for _ in range(S3PrefixMover.MAX_COPY_SLOTS))
+    for _ in range(taken): slots.release()
+    assert taken == S3PrefixMover.MAX_COPY_SLOTS
@@ -0,0 +1,83 @@
+import pytest
+
+from s3ops import S3RateLimiter as rate_limiter_module
+from s3ops.S3RateLimiter import S3RateLimiter, TokenBucket
+
+
+class _Clock:
+    """Fake monotonic clock; sleeping advances it and is recorded."""
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += max(seconds, 1e-9) # Real sleeps always move time; sub-ulp ones would spin forever
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = _Clock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", fake_clock.monotonic)
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", fake_clock.sleep)
+    return fake_clock
+
+
+def test_unlimited_never_waits(clock):
+    bucket = TokenBucket(rate=0)
+    assert bucket.acquire(10_000_000)
+    assert clock.slept == []
+
+
+def test_rate_is_kept_on_average(clock):
+    bucket = TokenBucket(rate=10) # Starts empty: no burst before the first refill
+    started = clock.now
+    for _ in range(50):
+        assert bucket.acquire(1)
+    assert clock.now - started == pytest.approx(5.0, abs=0.11)
+
+
+def test_idle_time_refills_at_most_one_burst(clock):
+    bucket = TokenBucket(rate=10, burst_seconds=1.0)
+    clock.now += 60 # Long idle: capacity is rate * burst_seconds, not 600 tokens
+    assert bucket.acquire(10)
+    assert clock.slept == []
+    assert bucket.acquire(5)
+    assert sum(clock.slept) == pytest.approx(0.5)
+
+
+def test_large_amounts_are_paid_in_instalments(clock):
+    bucket = TokenBucket(rate=1000)
+    assert bucket.acquire(2500)
+    assert sum(clock.slept) == pytest.approx(2.5)
+    assert max(clock.slept) <= TokenBucket.MAX_WAIT_SLICE_SECONDS
+
+
+def test_cancel_stops_waiting(clock):
+    bucket = TokenBucket(rate=1)
+    cancelled = iter([False, False, True])
+    assert bucket.acquire(100, is_cancelled=lambda: next(cancelled)) is False
+    assert sum(clock.slept) < 1.0
+
+
+@pytest.mark.parametrize("window, minute, inside", [
+    ({"start": "09:00", "end": "18:00"}, 9 * 60, True),
+    ({"start": "09:00", "end": "18:00"}, 18 * 60, False),
+    ({"start": "22:00", "end": "06:00"}, 23 * 60, True),
+    ({"start": "22:00", "end": "06:00"}, 5 * 60 + 59, True),
+    ({"start": "22:00", "end": "06:00"}, 12 * 60, False),
+    ({"start": "bad"}, 12 * 60, False),
+])
+def test_schedule_windows(window, minute, inside):
+    assert S3RateLimiter.window_contains(window, minute) is inside
+
+
+def test_configure_sets_base_limits(clock):
+    limiter = S3RateLimiter("test")
+    limiter.configure({"requests_per_sec": 5, "bytes_per_sec": 1024})
+    assert limiter.current_limits() == (5.0, 1024.0)
+    limiter.configure({})
+    assert limiter.current_limits() == (0.0, 0.0)
@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("botocore")
+from botocore.exceptions import ClientError, ReadTimeoutError
+
+from s3ops import S3RetryPolicy as retry_policy_module
+from s3ops.S3Operation import S3Operation, S3OpType
+from s3ops.S3RetryPolicy import S3RetryPolicy
+
+
+def _client_error(code, status=400, headers=None):
+    return ClientError({'Error': {'Code': code, 'Message': code},
+                        'ResponseMetadata': {'HTTPStatusCode': status, 'HTTPHeaders': headers or {}}}, 'PutObject')
+
+
+@pytest.fixture
+def max_jitter(monkeypatch):
+    # uniform(0, cap) -> cap: the delays under test are the upper bounds of the full-jitter window
+    monkeypatch.setattr(retry_policy_module.random, "uniform", lambda low, high: high)
+
+
+@pytest.mark.parametrize("exception, retryable", [
+    (_client_error("SlowDown", 503), True),
+    (_client_error("UnknownError", 502), True),
+    (_client_error("InternalError", 500), True),
+    (_client_error("NoSuchKey", 404), False),
+    (_client_error("AccessDenied", 403), False),
+    (ReadTimeoutError(endpoint_url="https://s3"), True),
+    (ValueError("local bug"), False),
+])
+def test_classify(exception, retryable):
+    assert S3RetryPolicy().classify(exception)[0] is retryable
+
+
+def test_retry_after_header_sets_a_lower_bound(max_jitter):
+    policy = S3RetryPolicy()
+    error = _client_error("SlowDown", 503, {"retry-after": "7"})
+    assert policy.classify(error) == (True, 7.0)
+    operation = S3Operation(S3OpType.UPLOAD_FILE, "bucket", key="f")
+    assert policy.next_delay(operation, error) == 7.0 # Above the first backoff cap of 1s
+
+
+def test_backoff_doubles_up_to_max_delay_then_gives_up(max_jitter):
+    policy = S3RetryPolicy()
+    operation = S3Operation(S3OpType.UPLOAD_FILE, "bucket", key="f")
+    max_retries, base_delay, max_delay = policy.settings_for(S3OpType.UPLOAD_FILE)
+    delays = []
+    for _ in range(max_retries):
+        delays.append(policy.next_delay(operation, _client_error("SlowDown", 503)))
+        operation.auto_retry_count += 1
+    assert delays == [min(max_delay, base_delay * 2 ** attempt) for attempt in range(max_retries)]
+    assert policy.next_delay(operation, _client_error("SlowDown", 503)) is None
+
+
+def test_not_retryable_and_cancelled_fail_at_once():
+    policy = S3RetryPolicy()
+    operation = S3Operation(S3OpType.UPLOAD_FILE, "bucket", key="f")
+    assert policy.next_delay(operation, _client_error("AccessDenied", 403)) is None
+    operation.cancel_token.cancel()
+    assert policy.next_delay(operation, _client_error("SlowDown", 503)) is None
+
+
+def test_max_retries_override():
+    policy = S3RetryPolicy()
+    policy.set_max_retries(0)
+    operation = S3Operation(S3OpType.UPLOAD_FILE, "bucket", key="f")
+    assert policy.next_delay(operation, _client_error("SlowDown", 503)) is None
+
+
+def test_batch_budget_is_shared_and_runs_out():
+    policy = S3RetryPolicy()
+    policy.register_batch("b1", total_items=10)
+    operations = [S3Operation(S3OpType.COPY_OBJECT, "bucket", key=f"k{i}", callback_data={"batch_id": "b1"})
+                  for i in range(S3RetryPolicy.BATCH_RETRY_BUDGET_MIN + 1)]
+    delays = [policy.next_delay(operation, _client_error("SlowDown", 503)) for operation in operations]
+    assert all(delay is not None for delay in delays[:-1])
+    assert delays[-1] is None
+    policy.unregister_batch("b1")
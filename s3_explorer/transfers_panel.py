@@ -0,0 +1,297 @@
+import time
+
+from PyQt6.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QTableView, QLabel,
+    QPushButton, QMenu, QAbstractItemView, QHeaderView
+)
+from PyQt6.QtGui import QColor
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+
+from s3ops.S3Operation import S3OpType
+from s3ops.S3TabContentWidget import format_size
+
+# --- Column indices for the transfers table ---
+TCOL_STATUS = 0
+TCOL_OPERATION = 1
+TCOL_BUCKET = 2
+TCOL_KEY = 3
+TCOL_BYTES = 4
+TCOL_RATE = 5
+TCOL_LATENCY = 6
+TCOL_RETRIES = 7
+TCOL_ERROR = 8
+TRANSFER_COLUMN_TITLES = ["Status", "Operation", "Bucket", "Key", "Bytes", "Rate", "Latency", "Retries", "Error"]
+
+# Browsing traffic would drown the transfers; the panel only shows work the user started
+UNTRACKED_OP_TYPES = {S3OpType.LIST, S3OpType.HEAD_OBJECT, S3OpType.SUMMARIZE_PREFIX}
+
+STATUS_PENDING = "Pending"
+STATUS_PAUSED = "Paused"
+STATUS_RUNNING = "Running"
+STATUS_DONE = "Done"
+STATUS_FAILED = "Failed"
+STATUS_CANCELLED = "Cancelled"
+
+
+def format_duration(seconds):
+    if seconds is None: return ""
+    if seconds < 1: return f"{seconds * 1000:.0f} ms"
+    if seconds < 60: return f"{seconds:.1f} s"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+class TransfersTableModel(QAbstractTableModel):
+    """Virtual table over S3Operation objects. Rows are appended in batches and cells are computed on demand."""
+
+    MAX_FINISHED_ROWS = 50000 # Oldest finished rows are dropped beyond this (unfinished rows are always kept)
+
+    def __init__(self, operation_manager, parent=None):
+        super().__init__(parent)
+        self.operation_manager = operation_manager
+        self._operations = []
+        self._known_ids = set()
+        self._incoming = [] # Enqueued since the last flush()
+        self._rates = {}    # operation.id -> bytes/sec from the latest progress sample
+        self._totals = {}   # operation.id -> total bytes of a running transfer
+
+    # --- Feeding ---
+    def add_operation(self, operation):
+        if operation.op_type in UNTRACKED_OP_TYPES: return
+        if operation.id in self._known_ids: return # Retried op re-enqueued, its row is reused
+        self._known_ids.add(operation.id)
+        self._incoming.append(operation)
+
+    def flush(self):
+        """Applies buffered inserts in one beginInsertRows and refreshes the cells of every row in one dataChanged."""
+        if self._incoming:
+            first_row = len(self._operations)
+            self.beginInsertRows(QModelIndex(), first_row, first_row + len(self._incoming) - 1)
+            self._operations.extend(self._incoming)
+            self._incoming = []
+            self.endInsertRows()
+            self._prune_finished_rows()
+
+        snapshot = self.operation_manager.last_progress_snapshot
+        self._rates = {t["operation"].id: t["rate"] for t in snapshot["transfers"]}
+        self._totals = {t["operation"].id: t["total_bytes"] for t in snapshot["transfers"]}
+        if self._operations:
+            # Views only repaint the visible part, so one range-wide dataChanged is cheap even at 100k rows
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._operations) - 1, len(TRANSFER_COLUMN_TITLES) - 1))
+
+    def _prune_finished_rows(self):
+        finished_count = sum(1 for op in self._operations if op.finished_at is not None)
+        excess = finished_count - self.MAX_FINISHED_ROWS
+        if excess <= 0: return
+        # Only a leading run of finished rows can be dropped with a single removal
+        leading = 0
+        while leading < len(self._operations) and leading < excess and self._operations[leading].finished_at is not None:
+            leading += 1
+        if leading == 0: return
+        self.beginRemoveRows(QModelIndex(), 0, leading - 1)
+        for op in self._operations[:leading]:
+            self._known_ids.discard(op.id)
+        del self._operations[:leading]
+        self.endRemoveRows()
+
+    def clear_finished(self):
+        self.beginResetModel()
+        kept = [op for op in self._operations if self.status_for(op) not in (STATUS_DONE, STATUS_FAILED, STATUS_CANCELLED)]
+        self._known_ids = {op.id for op in kept} | {op.id for op in self._incoming}
+        self._operations = kept
+        self.endResetModel()
+
+    def operation_at(self, row):
+        if 0 <= row < len(self._operations):
+            return self._operations[row]
+        return None
+
+    # --- Row state ---
+    def status_for(self, operation):
+        if operation.finished_at is not None:
+            if not operation.last_error: return STATUS_DONE
+            return STATUS_CANCELLED if operation.is_cancelled() else STATUS_FAILED
+        if self.operation_manager.is_operation_paused(operation): return STATUS_PAUSED
+        if operation.started_at is not None: return STATUS_RUNNING
+        return STATUS_PENDING
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._operations)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(TRANSFER_COLUMN_TITLES)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return TRANSFER_COLUMN_TITLES[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid(): return None
+        op = self._operations[index.row()]
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == TCOL_STATUS: return self.status_for(op)
+            if column == TCOL_OPERATION: return op.op_type.name.replace("_", " ").title()
+            if column == TCOL_BUCKET: return op.bucket
+            if column == TCOL_KEY:
+                key = op.key or op.new_key or ""
+                return f"{key} -> {op.new_key}" if op.op_type in (S3OpType.COPY_OBJECT, S3OpType.MOVE_PREFIX) and op.new_key else key
+            if column == TCOL_BYTES:
+                total = self._totals.get(op.id)
+                if total: return f"{format_size(op.bytes_transferred)} / {format_size(total)}"
+                return format_size(op.bytes_transferred) if op.bytes_transferred else ""
+            if column == TCOL_RATE:
+                rate = self._rates.get(op.id)
+                return f"{format_size(int(rate))}/s" if rate else ""
+            if column == TCOL_LATENCY:
+                if op.started_at is None: return ""
+                return format_duration((op.finished_at or time.monotonic()) - op.started_at)
+            if column == TCOL_RETRIES: return str(op.retry_count) if op.retry_count else ""
+            if column == TCOL_ERROR: return op.last_error
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            if column == TCOL_KEY: return op.local_path or None
+            if column == TCOL_ERROR: return op.last_error or None
+        elif role == Qt.ItemDataRole.ForegroundRole and column == TCOL_STATUS:
+            status = self.status_for(op)
+            if status == STATUS_FAILED: return QColor("firebrick")
+            if status == STATUS_RUNNING: return QColor("darkgreen")
+        return None
+
+
+class TransfersPanel(QDockWidget):
+    """Non-modal, dockable view of everything the OperationManager is doing (View > Transfers)."""
+
+    REFRESH_INTERVAL_MS = 500
+
+    def __init__(self, operation_manager, parent=None):
+        super().__init__("Transfers", parent)
+        self.setObjectName("TransfersDock") # Needed for QMainWindow.saveState/restoreState
+        self.operation_manager = operation_manager
+
+        self.model = TransfersTableModel(operation_manager, self)
+        operation_manager.operation_enqueued.connect(self.model.add_operation)
+
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(4, 4, 4, 4)
+
+        self.batch_summary_label = QLabel("No active batches")
+        self.batch_summary_label.setWordWrap(True)
+        layout.addWidget(self.batch_summary_label)
+
+        button_row = QHBoxLayout()
+        self.pause_button = QPushButton("Pause"); self.pause_button.clicked.connect(self.pause_selected)
+        self.resume_button = QPushButton("Resume"); self.resume_button.clicked.connect(self.resume_selected)
+        self.retry_button = QPushButton("Retry"); self.retry_button.clicked.connect(self.retry_selected)
+        self.run_next_button = QPushButton("Run Next"); self.run_next_button.clicked.connect(lambda: self.reprioritize_selected(True))
+        self.run_later_button = QPushButton("Run Later"); self.run_later_button.clicked.connect(lambda: self.reprioritize_selected(False))
+        self.cancel_button = QPushButton("Cancel"); self.cancel_button.clicked.connect(self.cancel_selected)
+        self.clear_button = QPushButton("Clear Finished"); self.clear_button.clicked.connect(self.model.clear_finished)
+        for button in (self.pause_button, self.resume_button, self.retry_button, self.run_next_button,
+                       self.run_later_button, self.cancel_button):
+            button_row.addWidget(button)
+        button_row.addStretch()
+        button_row.addWidget(self.clear_button)
+        layout.addLayout(button_row)
+
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_view.setWordWrap(False)
+        # Fixed row heights keep scrolling O(1) regardless of row count
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table_view.verticalHeader().setDefaultSectionSize(self.table_view.fontMetrics().height() + 6)
+        self.table_view.verticalHeader().hide()
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        self.table_view.setColumnWidth(TCOL_KEY, 320)
+        self.table_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.table_view.customContextMenuRequested.connect(self.show_context_menu)
+        layout.addWidget(self.table_view)
+
+        self.setWidget(container)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+
+    def refresh(self):
+        if not self.isVisible():
+            return # Rows keep buffering in the model; flushed in one go when the panel is shown
+        self.model.flush()
+        self._update_batch_summary()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def _update_batch_summary(self):
+        batches = self.operation_manager.active_batch_operations
+        if not batches:
+            self.batch_summary_label.setText("No active batches")
+            return
+        sampled = self.operation_manager.last_progress_snapshot["batches"]
+        lines = []
+        for batch_id, batch_info in batches.items():
+            line = f"{batch_info.get('op_type_display', 'Batch')}: {batch_info['completed']}/{batch_info['total']}"
+            if batch_info.get('failed'): line += f", {batch_info['failed']} failed"
+            if batch_info.get('cancelled'): line += f", {batch_info['cancelled']} cancelled"
+            if batch_info.get('retries'): line += f", {batch_info['retries']} retries"
+            batch_sample = sampled.get(batch_id)
+            if batch_sample:
+                if batch_sample["bytes"]: line += f", {format_size(batch_sample['bytes'])}"
+                rate_text = self.operation_manager.format_rate_and_eta(batch_sample["bytes_rate"], batch_sample["eta"])
+                if rate_text: line += f" ({rate_text})"
+            lines.append(line)
+        self.batch_summary_label.setText("\n".join(lines))
+
+    # --- Actions ---
+    def selected_operations(self):
+        rows = sorted({index.row() for index in self.table_view.selectionModel().selectedRows()})
+        return [op for op in (self.model.operation_at(row) for row in rows) if op is not None]
+
+    def pause_selected(self):
+        self.operation_manager.pause_operations(self.selected_operations())
+        self.refresh()
+
+    def resume_selected(self):
+        self.operation_manager.resume_operations(self.selected_operations())
+        self.refresh()
+
+    def retry_selected(self):
+        self.operation_manager.retry_operations(self.selected_operations())
+        self.refresh()
+
+    def reprioritize_selected(self, interactive):
+        self.operation_manager.reprioritize_operations(self.selected_operations(), interactive)
+
+    def cancel_selected(self):
+        for op in self.selected_operations():
+            if op.finished_at is None:
+                self.operation_manager.cancel_operation(op)
+        self.refresh()
+
+    def show_context_menu(self, position):
+        operations = self.selected_operations()
+        if not operations: return
+        statuses = {self.model.status_for(op) for op in operations}
+        menu = QMenu(self)
+        if STATUS_PENDING in statuses:
+            menu.addAction("Pause", self.pause_selected)
+            menu.addAction("Run Next", lambda: self.reprioritize_selected(True))
+            menu.addAction("Run Later", lambda: self.reprioritize_selected(False))
+        if STATUS_PAUSED in statuses:
+            menu.addAction("Resume", self.resume_selected)
+        if statuses & {STATUS_FAILED, STATUS_CANCELLED}:
+            menu.addAction("Retry", self.retry_selected)
+        if statuses & {STATUS_PENDING, STATUS_PAUSED, STATUS_RUNNING}:
+            menu.addSeparator()
+            menu.addAction("Cancel", self.cancel_selected)
+        if not menu.isEmpty():
+            menu.exec(self.table_view.viewport().mapToGlobal(position))